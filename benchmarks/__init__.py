@@ -0,0 +1,3 @@
+"""
+性能基准与本地CheatEngine协议替身服务器
+"""
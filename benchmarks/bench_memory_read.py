@@ -0,0 +1,146 @@
+"""
+memory_read延迟与吞吐基准
+
+在进程内启动替身服务器(benchmarks.mock_server)，通过tools.memory_tools.tool.memory_read
+测量几种典型读取的p50/p99延迟、每秒请求数、每次调用发出的请求数和线路上的字节数。
+地址在合成地址空间中轮换，配合--no-cache可以测量不经过页缓存和反汇编缓存的开销，
+--page-cache启用默认关闭的页缓存
+
+用法:
+    python -m benchmarks.bench_memory_read
+    python -m benchmarks.bench_memory_read --latency 2 --pipeline --binary --concurrency 8
+    python -m benchmarks.bench_memory_read --no-cache --scenario plain --scenario assembly --json result.json
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_server import MockCEServer, SyntheticAddressSpace, MODULE_BASE, HEAP_BASE
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Tuple
+import argparse
+import json
+import time
+import util
+
+
+# 场景: (名称, 数据类型, options, 地址所在区域)
+SCENARIOS = {
+    "plain": ("int32", {}, "heap"),
+    "assembly": ("int32", {"assembly": True, "assemblySize": 10}, "code"),
+    "multiType": ("int32", {"multiType": True}, "heap"),
+    "bytes4096": ("int32", {"rawBytes": True, "bytesSize": 4096}, "heap"),
+}
+# 轮换地址的步长，取奇数页数使连续的读取落在不同页上
+ADDRESS_STRIDE = 7 * 4096 + 0x48
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(percent / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _addresses(region: str, count: int, space: SyntheticAddressSpace) -> List[str]:
+    if region == "code":
+        base, size = MODULE_BASE + 0x1000, int(len(space.module) * 0.5)
+    else:
+        base, size = HEAP_BASE, len(space.heap) - 8192
+    return [f"0x{base + (i * ADDRESS_STRIDE) % size:X}" for i in range(count)]
+
+
+def run_scenario(server: MockCEServer, name: str, iterations: int, concurrency: int) -> Dict[str, Any]:
+    """
+    运行一个场景
+
+    @return {dict} - 延迟分位数(毫秒)、吞吐、每次调用的请求数和字节数、失败次数
+    """
+    from tools.memory_tools.tool import memory_read
+
+    data_type, options, region = SCENARIOS[name]
+    addresses = _addresses(region, iterations, server.space)
+    # 预热：建立连接、协商帧格式、获取区域表
+    memory_read(addresses[0], data_type, dict(options))
+    server.reset_stats()
+
+    def call(address: str) -> Tuple[float, bool]:
+        started = time.perf_counter()
+        result = memory_read(address, data_type, dict(options))
+        return time.perf_counter() - started, bool(result.get("success"))
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            samples = list(executor.map(call, addresses))
+    else:
+        samples = [call(address) for address in addresses]
+    elapsed = time.perf_counter() - started
+
+    stats = server.stats()
+    latencies = [latency * 1000 for latency, _ in samples]
+    requests = sum(stats["requests"].values())
+    return {
+        "scenario": name,
+        "iterations": iterations,
+        "failures": sum(1 for _, ok in samples if not ok),
+        "p50Ms": round(_percentile(latencies, 50), 3),
+        "p99Ms": round(_percentile(latencies, 99), 3),
+        "callsPerSec": round(iterations / elapsed, 1),
+        "requestsPerSec": round(requests / elapsed, 1),
+        "requestsPerCall": round(requests / iterations, 3),
+        "bytesSentPerCall": round(stats["bytesReceived"] / iterations, 1),
+        "bytesReceivedPerCall": round(stats["bytesSent"] / iterations, 1),
+        "requests": stats["requests"]
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="memory_read延迟与吞吐基准")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="要运行的场景，可重复，默认全部")
+    parser.add_argument("--iterations", type=int, default=500, help="每个场景的调用次数")
+    parser.add_argument("--concurrency", type=int, default=1, help="并发调用的线程数")
+    parser.add_argument("--latency", type=float, default=0.0, help="服务器注入的每请求延迟(毫秒)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="服务器注入的随机附加延迟上限(毫秒)")
+    parser.add_argument("--pipeline", action="store_true", help="使用流水线模式")
+    parser.add_argument("--long-frames", action="store_true", help="协商长帧")
+    parser.add_argument("--binary", action="store_true", help="以BYTECODE帧接收原始字节")
+    parser.add_argument("--no-cache", action="store_true", help="禁用页缓存和反汇编缓存")
+    parser.add_argument("--page-cache", type=int, default=0, help="启用页缓存并设置最多缓存的页数")
+    parser.add_argument("--no-symbols", action="store_true", help="禁用符号标注")
+    parser.add_argument("--json", dest="json_path", help="将结果写入JSON文件")
+    args = parser.parse_args()
+
+    space = SyntheticAddressSpace()
+    server = MockCEServer(space, latency=args.latency / 1000, jitter=args.jitter / 1000).start()
+
+    # 配置必须在第一次调用工具之前修改，缓存在第一次使用时按配置创建
+    util.cheatEngine_config["page_cache_pages"] = args.page_cache
+    if args.no_cache:
+        util.cheatEngine_config.update(page_cache_pages=0, disasm_cache_size=0)
+    if args.no_symbols:
+        util.cheatEngine_config["symbol_annotate"] = False
+    util.update_ce_config(host=server.host, port=server.port, pipeline=args.pipeline,
+                          long_frames=args.long_frames, binary_payload=args.binary)
+
+    results = []
+    try:
+        for name in args.scenario or list(SCENARIOS):
+            result = run_scenario(server, name, args.iterations, args.concurrency)
+            results.append(result)
+            print(f"{name:<10} p50={result['p50Ms']:>8.3f}ms p99={result['p99Ms']:>8.3f}ms "
+                  f"{result['callsPerSec']:>9.1f} calls/s {result['requestsPerCall']:>6.3f} req/call "
+                  f"sent={result['bytesSentPerCall']:>9.1f}B recv={result['bytesReceivedPerCall']:>10.1f}B "
+                  f"failures={result['failures']}", flush=True)
+    finally:
+        util.reset_ce_pool()
+        server.stop()
+
+    if args.json_path:
+        settings = {key: value for key, value in vars(args).items() if key != "json_path"}
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"settings": settings, "results": results}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,638 @@
+"""
+本地CheatEngine协议替身服务器
+
+按docs/Api_zh.md实现插件的Socket协议(帧格式协商、流水线、长帧、BYTECODE二进制字节)，
+以及MEMORY_READ、MEMORY_WRITE、MEMORY_BATCH、ENUM_MODULES、POINTER_READ、LUA_EXEC和PING，
+用于在没有Windows和CheatEngine的环境下测试和测量CESocketClient。
+
+地址空间可以是合成的(一个带导出符号的模块加一块堆内存，内容由种子确定)，
+也可以通过LinuxProcessBackend读写本机的真实进程。与CE一样，string按目标进程的ANSI代码页
+(默认GBK/cp936)编解码，客户端不能把原始字节当作UTF-8在本地解码。每个请求可以注入固定延迟和随机抖动，
+服务器统计每种数据包的请求数以及收发的字节数
+
+用法:
+    python -m benchmarks.mock_server --port 8082 --latency 2
+    python -m benchmarks.mock_server --pid 1234
+    python -m benchmarks.mock_server --codepage cp1252
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from util import (
+    CESocketClient, LinuxProcessBackend, decode_value, encode_value, decode_multi_type,
+    data_type_size, BYTES_READ_SIZE, MULTI_TYPE_READ_SIZE
+)
+from collections import Counter
+from typing import Dict, List, Any, Tuple, Optional
+import socketserver
+import socket
+import threading
+import argparse
+import random
+import struct
+import json
+import time
+
+
+PACKET_TYPE = CESocketClient.PACKET_TYPE
+PACKET_NAMES = {value: name for name, value in PACKET_TYPE.items()}
+FLAG_TAGGED = CESocketClient.FRAME_FLAG_TAGGED
+FLAG_LONG = CESocketClient.FRAME_FLAG_LONG
+TYPE_MASK = CESocketClient.FRAME_TYPE_MASK
+
+# 合成地址空间的布局
+MODULE_NAME = "game.exe"
+MODULE_BASE = 0x140000000
+HEAP_BASE = 0x20000000
+# 合成模块中.text区段占模块的比例，其余为.data
+TEXT_FRACTION = 0.75
+# CE按目标进程的ANSI代码页解码string，替身服务器默认模拟简体中文Windows
+DEFAULT_CODEPAGE = "gbk"
+# 与文档一致的错误代码
+ERROR_INVALID_ADDRESS = 3
+ERROR_INVALID_TYPE = 4
+ERROR_INVALID_PARAMS = 6
+ERROR_MODULE_NOT_FOUND = 13
+ERROR_POINTER = 14
+ERROR_SCRIPT_NOT_LOADED = 15
+
+
+class SyntheticAddressSpace:
+    """
+    合成的地址空间：一个模块(.text/.data区段和导出符号)和一块堆内存
+
+    内容由随机种子确定，.text区段中穿插call指令(E8 rel32)，便于测试跳转目标的符号标注；
+    堆中每隔一段放一个指向模块.data区段的指针
+    """
+
+    def __init__(self, module_size: int = 1 << 20, heap_size: int = 16 << 20, exports: int = 2000, seed: int = 1):
+        rng = random.Random(seed)
+        self.module = bytearray(rng.getrandbits(8) for _ in range(module_size))
+        self.heap = bytearray(heap_size)
+        text_size = int(module_size * TEXT_FRACTION) & ~0xFFF
+        self.sections = [(".text", 0x1000, text_size - 0x1000, "rx"), (".data", text_size, module_size - text_size, "rw")]
+
+        for offset in range(0x1000, text_size - 5, 64):
+            target = rng.randrange(0x1000, text_size - 16)
+            self.module[offset] = 0xE8
+            struct.pack_into("<i", self.module, offset + 1, target - (offset + 5))
+        for offset in range(0, heap_size - 8, 4096):
+            struct.pack_into("<Q", self.heap, offset, MODULE_BASE + text_size + (offset // 4096 * 8) % (module_size - text_size))
+            struct.pack_into("<if", self.heap, offset + 8, offset // 4096, offset / 4096.0)
+
+        step = max((text_size - 0x1000) // max(exports, 1), 16)
+        self.exports = [(f"Export{i}", 0x1000 + i * step) for i in range(exports) if 0x1000 + i * step < text_size]
+        self.regions_list = [
+            {"start": MODULE_BASE, "end": MODULE_BASE + module_size, "name": MODULE_NAME,
+             "path": f"C:\\Game\\{MODULE_NAME}", "buffer": self.module},
+            {"start": HEAP_BASE, "end": HEAP_BASE + heap_size, "name": "", "path": "", "buffer": self.heap},
+        ]
+
+    def _locate(self, address: int, size: int) -> Optional[Tuple[bytearray, int]]:
+        for region in self.regions_list:
+            if region["start"] <= address and address + size <= region["end"]:
+                return region["buffer"], address - region["start"]
+        return None
+
+    def read(self, address: int, size: int) -> Optional[bytes]:
+        located = self._locate(address, size)
+        if located is None:
+            return None
+        buffer, offset = located
+        return bytes(buffer[offset:offset + size])
+
+    def write(self, address: int, data: bytes) -> bool:
+        located = self._locate(address, len(data))
+        if located is None:
+            return False
+        buffer, offset = located
+        buffer[offset:offset + len(data)] = data
+        return True
+
+    def modules(self, detailed: bool) -> List[Dict[str, Any]]:
+        region = self.regions_list[0]
+        module = {
+            "name": region["name"],
+            "baseAddress": f"0x{region['start']:X}",
+            "size": region["end"] - region["start"],
+            "entryPoint": f"0x{region['start'] + 0x1000:X}",
+            "path": region["path"]
+        }
+        if detailed:
+            module["sections"] = [
+                {"name": name, "address": f"0x{MODULE_BASE + start:X}", "size": size, "flags": flags}
+                for name, start, size, flags in self.sections
+            ]
+            module["exports"] = [
+                {"name": name, "address": f"0x{MODULE_BASE + offset:X}", "ordinal": i + 1}
+                for i, (name, offset) in enumerate(self.exports)
+            ]
+        return [module]
+
+
+class ProcessAddressSpace:
+    """
+    通过LinuxProcessBackend读写本机真实进程的地址空间，模块来自/proc/<pid>/maps
+    """
+
+    def __init__(self, pid: int):
+        self.backend = LinuxProcessBackend(pid)
+
+    def read(self, address: int, size: int) -> Optional[bytes]:
+        return self.backend.read(address, size)
+
+    def write(self, address: int, data: bytes) -> bool:
+        results, _ = self.backend.write_many([{"address": address, "dataType": "bytes", "value": list(data)}])
+        return results[0]["success"]
+
+    def modules(self, detailed: bool) -> List[Dict[str, Any]]:
+        # 同一文件的多个映射合并为一个模块，/proc/<pid>/maps不提供导出符号
+        modules: Dict[str, Dict[str, Any]] = {}
+        for region in self.backend.regions():
+            if not region["path"].startswith("/"):
+                continue
+            module = modules.get(region["path"])
+            if module is None:
+                modules[region["path"]] = {"name": region["name"], "start": region["start"],
+                                           "end": region["end"], "path": region["path"]}
+            else:
+                module["end"] = max(module["end"], region["end"])
+        result = []
+        for module in modules.values():
+            item = {"name": module["name"], "baseAddress": f"0x{module['start']:X}",
+                    "size": module["end"] - module["start"], "path": module["path"]}
+            if detailed:
+                item.update(sections=[], exports=[])
+            result.append(item)
+        return result
+
+
+def _parse_address(value: Any) -> int:
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+def _error(code: int, message: str) -> Dict[str, Any]:
+    return {"success": False, "error": {"code": code, "message": message}}
+
+
+class MockCEServer:
+    """
+    CheatEngine插件协议的替身服务器
+    """
+
+    def __init__(self, space=None, host: str = "127.0.0.1", port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.0, tagged: bool = True, long_frames: bool = True,
+                 binary: bool = True, prepared_scripts: bool = True, codepage: str = DEFAULT_CODEPAGE,
+                 framing: bool = True):
+        """
+        @param {object} space - 地址空间，默认为SyntheticAddressSpace
+        @param {int} port - 监听端口，0表示由系统分配
+        @param {float} latency - 每个请求注入的固定延迟(秒)
+        @param {float} jitter - 在固定延迟上增加的随机延迟上限(秒)
+        @param {bool} tagged - 是否同意流水线模式
+        @param {bool} long_frames - 是否同意长帧
+        @param {bool} binary - 是否支持binaryBytes
+        @param {bool} prepared_scripts - 是否支持LUA_EXEC预编译脚本
+        @param {str} codepage - 编解码string使用的ANSI代码页
+        @param {bool} framing - 是否回复setFraming命令，False时模拟不回复未知命令的老版本插件
+        """
+        self.space = space if space is not None else SyntheticAddressSpace()
+        self.latency = latency
+        self.jitter = jitter
+        self.tagged = tagged
+        self.long_frames = long_frames
+        self.binary = binary
+        self.prepared_scripts = prepared_scripts
+        self.codepage = codepage
+        self.framing = framing
+        self.scripts: Dict[str, str] = {}
+        self.requests: Counter = Counter()
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self._stats_lock = threading.Lock()
+        self._server = _ThreadingServer((host, port), _ConnectionHandler)
+        self._server.mock = self
+        self.host, self.port = self._server.server_address[:2]
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "MockCEServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-ce-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self.requests.clear()
+            self.bytes_received = 0
+            self.bytes_sent = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "requests": {PACKET_NAMES.get(key, hex(key)): count for key, count in self.requests.items()},
+                "bytesReceived": self.bytes_received,
+                "bytesSent": self.bytes_sent
+            }
+
+    def _count(self, packet_type: int, received: int, sent: int) -> None:
+        with self._stats_lock:
+            self.requests[packet_type] += 1
+            self.bytes_received += received
+            self.bytes_sent += sent
+
+    def delay(self) -> None:
+        pause = self.latency + (random.random() * self.jitter if self.jitter else 0.0)
+        if pause > 0:
+            time.sleep(pause)
+
+    def handle(self, packet_type: int, data: bytes, state: Dict[str, Any]) -> List[Tuple[int, bytes]]:
+        """
+        处理一个请求
+
+        @return {list} - 要发送的(数据包类型, 数据)帧列表，BYTECODE帧位于JSON响应之前
+        """
+        if packet_type == PACKET_TYPE["TEXT"]:
+            return [(PACKET_TYPE["TEXT"], b"PONG")]
+        try:
+            request = json.loads(data.decode("utf-8")) if data else {}
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return [(PACKET_TYPE["ERROR"], json.dumps(_error(5, "Invalid JSON")).encode())]
+
+        if packet_type == PACKET_TYPE["COMMAND"]:
+            return [self._command(request, state)]
+        handler = {
+            PACKET_TYPE["MEMORY_READ"]: self._memory_read,
+            PACKET_TYPE["MEMORY_WRITE"]: self._memory_write,
+            PACKET_TYPE["MEMORY_BATCH"]: self._memory_batch,
+            PACKET_TYPE["ENUM_MODULES"]: self._enum_modules,
+            PACKET_TYPE["POINTER_READ"]: self._pointer_read,
+            PACKET_TYPE["LUA_EXEC"]: self._lua_exec,
+        }.get(packet_type)
+        if handler is None:
+            return [(PACKET_TYPE["ERROR"], json.dumps(_error(1, "Unsupported packet type")).encode())]
+        try:
+            response, payload = handler(request)
+        except (KeyError, ValueError, TypeError) as e:
+            response, payload = _error(ERROR_INVALID_PARAMS, str(e)), None
+        frames = [(PACKET_TYPE["BYTECODE"], payload)] if payload is not None else []
+        frames.append((PACKET_TYPE["RESPONSE"], json.dumps(response).encode("utf-8")))
+        return frames
+
+    def _command(self, request: Dict[str, Any], state: Dict[str, Any]) -> Tuple[int, bytes]:
+        if request.get("command") != "setFraming":
+            return PACKET_TYPE["ERROR"], json.dumps(_error(1, "Unknown command")).encode()
+        options = request.get("options") or {}
+        state["tagged"] = bool(options.get("tagged")) and self.tagged
+        state["long"] = bool(options.get("longFrames")) and self.long_frames
+        return PACKET_TYPE["RESPONSE"], json.dumps(
+            {"success": True, "tagged": state["tagged"], "longFrames": state["long"]}
+        ).encode()
+
+    def _attach_bytes(self, response: Dict[str, Any], key: str, data: bytes, binary: bool,
+                      payload: bytearray, path: List[Any]) -> None:
+        if binary:
+            response.setdefault("binary", []).append({"path": path + [key], "offset": len(payload), "length": len(data)})
+            payload += data
+        else:
+            response[key] = list(data)
+
+    def _disassemble(self, address: int, count: int, options: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        生成合成的反汇编结果：E8为call rel32，C3为ret，其余按字节值生成1~4字节的伪指令
+        """
+        instructions = []
+        endian = options.get("endian", "little")
+        for index in range(count):
+            head = self.space.read(address, 8)
+            if head is None:
+                break
+            if head[0] == 0xE8:
+                size = 5
+                target = address + 5 + struct.unpack_from("<i", head, 1)[0]
+                text = f"call {target:08X}"
+            elif head[0] == 0xC3:
+                size, text = 1, "ret"
+            else:
+                size = 1 + head[0] % 4
+                text = "db " + " ".join(f"{b:02X}" for b in head[:size])
+            instruction = {
+                "address": f"0x{address:X}",
+                "instruction": f"{address:08X} - {text}",
+                "comment": "",
+                "instructionCount": index + 1
+            }
+            if options.get("instructionMultiType"):
+                data = self.space.read(address, MULTI_TYPE_READ_SIZE) or head
+                instruction["multiType"] = _ce_multi_type(data, endian, self.codepage)
+            instructions.append(instruction)
+            address += size
+        if instructions:
+            instructions[0]["isFirstInstruction"] = True
+            instructions[-1]["isLastInstruction"] = True
+        return instructions
+
+    def _read_value(self, response: Dict[str, Any], address: int, data_type: str,
+                    options: Dict[str, Any], payload: bytearray, path: List[Any]) -> bool:
+        """
+        读取一个地址的值和请求的附加信息，写入response
+        """
+        endian = options.get("endian", "little")
+        try:
+            size = data_type_size(data_type, options.get("size"))
+        except ValueError:
+            response.update(_error(ERROR_INVALID_TYPE, f"Invalid data type: {data_type}"))
+            return False
+        data = self.space.read(address, size)
+        if data is None:
+            response.update(_error(ERROR_INVALID_ADDRESS, f"Address 0x{address:X} is not accessible"))
+            return False
+
+        binary = bool(options.get("binaryBytes")) and self.binary
+        response["value"] = _ce_decode(data, data_type, endian, self.codepage)
+        if options.get("rawBytes"):
+            raw = self.space.read(address, int(options.get("bytesSize", BYTES_READ_SIZE))) or b""
+            self._attach_bytes(response, "bytes", raw, binary, payload, path)
+        if options.get("opcode"):
+            opcode = self.space.read(address, int(options.get("opcodeSize", BYTES_READ_SIZE))) or b""
+            self._attach_bytes(response, "opcode", opcode, binary, payload, path)
+        if options.get("comments"):
+            response["comments"] = ""
+        if options.get("multiType"):
+            response["multiType"] = _ce_multi_type(self.space.read(address, MULTI_TYPE_READ_SIZE) or data, endian,
+                                                   self.codepage)
+        if options.get("assembly"):
+            instructions = self._disassemble(address, int(options.get("assemblySize", 10)), options)
+            response["assembly"] = instructions
+            response["instructionCount"] = len(instructions)
+            if instructions:
+                def reference(instruction):
+                    return {key: instruction[key] for key in ("address", "instruction", "instructionCount")}
+                response["startInstruction"] = reference(instructions[0])
+                response["endInstruction"] = reference(instructions[-1])
+        response["success"] = True
+        response["error"] = None
+        return True
+
+    def _memory_read(self, request: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[bytes]]:
+        address = _parse_address(request["address"])
+        data_type = request.get("dataType", "int32")
+        response = {"address": f"0x{address:X}", "dataType": data_type}
+        payload = bytearray()
+        self._read_value(response, address, data_type, request.get("options") or {}, payload, [])
+        return response, (bytes(payload) if "binary" in response else None)
+
+    def _memory_batch(self, request: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[bytes]]:
+        data_type = request.get("dataType", "int32")
+        options = request.get("options") or {}
+        payload = bytearray()
+        results = []
+        response = {"success": True, "dataType": data_type, "results": results}
+        for index, item in enumerate(request.get("addresses") or []):
+            address = _parse_address(item)
+            result = {"address": f"0x{address:X}"}
+            self._read_value(result, address, data_type, options, payload, ["results", index])
+            # 二进制字节的位置描述统一放在顶层
+            response.setdefault("binary", []).extend(result.pop("binary", []))
+            results.append(result)
+        if not response["binary"]:
+            del response["binary"]
+        return response, (bytes(payload) if "binary" in response else None)
+
+    def _write_one(self, address: int, data_type: str, value: Any, endian: str) -> Optional[str]:
+        try:
+            data = _ce_encode(value, data_type, endian, self.codepage)
+        except ValueError as e:
+            return str(e)
+        return None if self.space.write(address, data) else f"Address 0x{address:X} is not writable"
+
+    def _memory_write(self, request: Dict[str, Any]) -> Tuple[Dict[str, Any], None]:
+        address = _parse_address(request["address"])
+        data_type = request.get("dataType", "int32")
+        options = request.get("options") or {}
+        endian = options.get("endian", "little")
+        response = {"address": f"0x{address:X}", "dataType": data_type, "value": request.get("value")}
+
+        conditional = options.get("conditional")
+        if conditional is not None:
+            current = self.space.read(address, data_type_size(data_type))
+            if current is None or _ce_decode(current, data_type, endian, self.codepage) != conditional.get("previousValue"):
+                response.update(success=False, error="Current value does not match previousValue")
+                return response, None
+
+        error = self._write_one(address, data_type, request.get("value"), endian)
+        response.update(success=error is None, error=error)
+        if options.get("multiValues"):
+            response["multiValuesResult"] = {}
+            for offset, item in options["multiValues"].items():
+                item_error = self._write_one(address + int(offset), item.get("dataType", "int32"), item.get("value"), endian)
+                response["multiValuesResult"][offset] = {"success": item_error is None, "error": item_error}
+        return response, None
+
+    def _enum_modules(self, request: Dict[str, Any]) -> Tuple[Dict[str, Any], None]:
+        options = request.get("options") or {}
+        name_filter = (options.get("nameFilter") or "").lower()
+        modules = [module for module in self.space.modules(bool(options.get("detailed")))
+                   if name_filter in module["name"].lower()]
+        return {"success": True, "modules": modules, "error": None}, None
+
+    def _pointer_read(self, request: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[bytes]]:
+        name = request["baseModule"]
+        module = next((item for item in self.space.modules(False) if item["name"].lower() == name.lower()), None)
+        if module is None:
+            return _error(ERROR_MODULE_NOT_FOUND, f"Module not found: {name}"), None
+
+        base = _parse_address(module["baseAddress"])
+        offsets = [int(offset) for offset in request.get("offsets") or []]
+        chain = [{"step": 0, "offset": None, "address": f"0x{base:X}", "description": f"Base: {name}"}]
+        address = base
+        description = name
+        for step, offset in enumerate(offsets, 1):
+            if step > 1:
+                pointer = self.space.read(address, 8)
+                if pointer is None:
+                    return _error(ERROR_POINTER, f"Failed to read pointer at 0x{address:X}"), None
+                address = struct.unpack("<Q", pointer)[0]
+                description = f"[{description}]"
+            address += offset
+            description = f"{description}+{offset:X}"
+            chain.append({"step": step, "offset": offset, "address": f"0x{address:X}", "description": description})
+
+        response = {
+            "baseModule": name,
+            "baseAddress": f"0x{base:X}",
+            "offsets": offsets,
+            "offsetsText": f"{name}+" + ",".join(f"{offset:X}" for offset in offsets),
+            "addressChain": chain,
+            "finalAddress": f"0x{address:X}",
+            "dataType": request.get("dataType", "int32")
+        }
+        payload = bytearray()
+        self._read_value(response, address, response["dataType"], request.get("options") or {}, payload, [])
+        return response, (bytes(payload) if "binary" in response else None)
+
+    def _lua_exec(self, request: Dict[str, Any]) -> Tuple[Dict[str, Any], None]:
+        """
+        不解释Lua，只实现预编译脚本的缓存协议；result为脚本长度和params，便于客户端验证
+        """
+        script = request.get("script")
+        script_id = request.get("scriptId") if self.prepared_scripts else None
+        if script is None:
+            if script_id not in self.scripts:
+                return _error(ERROR_SCRIPT_NOT_LOADED, "Script not loaded"), None
+            script = self.scripts[script_id]
+        elif script_id:
+            self.scripts[script_id] = script
+        response = {"success": True, "result": {"scriptSize": len(script), "params": request.get("params")},
+                    "output": "", "executionTime": 0, "error": None}
+        if script_id:
+            response["scriptId"] = script_id
+        return response, None
+
+
+def _ce_decode(data: bytes, data_type: str, endian: str, codepage: str) -> Any:
+    """
+    按CE的方式解码值：string使用ANSI代码页，其余类型与客户端的本地解码一致
+    """
+    return decode_value(data, data_type, endian, codepage)
+
+
+def _ce_encode(value: Any, data_type: str, endian: str, codepage: str) -> bytes:
+    """
+    按CE的方式编码要写入的值：string使用ANSI代码页
+    """
+    return encode_value(value, data_type, endian, codepage)
+
+
+def _ce_multi_type(data: bytes, endian: str, codepage: str) -> Dict[str, Any]:
+    """
+    CE的multiType不包含wstring，string按ANSI代码页解码
+    """
+    result = decode_multi_type(data, endian, codepage)
+    result.pop("wstring", None)
+    return result
+
+
+def _pack_frame(packet_type: int, data: bytes, request_id: Optional[int], long_frames: bool) -> bytes:
+    flags = FLAG_TAGGED if request_id is not None else 0
+    if len(data) > CESocketClient.MAX_FRAME_SIZE:
+        if not long_frames:
+            raise ValueError(f"响应长度{len(data)}超过普通帧上限且未协商长帧")
+        header = struct.pack(">HI", packet_type | flags | FLAG_LONG, len(data))
+    else:
+        header = struct.pack(">HH", packet_type | flags, len(data))
+    if request_id is not None:
+        header += struct.pack(">I", request_id)
+    return header + data
+
+
+class _ConnectionHandler(socketserver.BaseRequestHandler):
+    """
+    一个客户端连接：普通模式逐个处理请求，流水线模式每个请求在单独的线程中处理并乱序回复
+    """
+
+    def _recv_exact(self, size: int) -> Optional[bytes]:
+        chunks = []
+        while size:
+            chunk = self.request.recv(size)
+            if not chunk:
+                return None
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    def handle(self) -> None:
+        mock: MockCEServer = self.server.mock
+        # 流水线和二进制响应由多个小帧组成，关闭Nagle算法避免与客户端的延迟确认相互等待
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        state = {"tagged": False, "long": False}
+        send_lock = threading.Lock()
+
+        def process(packet_type, data, request_id, received):
+            if packet_type == PACKET_TYPE["COMMAND"] and not mock.framing:
+                mock._count(packet_type, received, 0)
+                return
+            mock.delay()
+            try:
+                frames = mock.handle(packet_type, data, state)
+                out = b"".join(_pack_frame(frame_type, frame_data, request_id, state["long"])
+                               for frame_type, frame_data in frames)
+            except ValueError as e:
+                out = _pack_frame(PACKET_TYPE["ERROR"], json.dumps(_error(1, str(e))).encode(), request_id, False)
+            # 在发送前计数，客户端收到响应后读取的统计一定包含本次请求
+            mock._count(packet_type, received, len(out))
+            with send_lock:
+                try:
+                    self.request.sendall(out)
+                except OSError:
+                    return
+
+        while True:
+            header = self._recv_exact(4)
+            if header is None:
+                return
+            packet_type, length = struct.unpack(">HH", header)
+            received = 4
+            if packet_type & FLAG_LONG:
+                low = self._recv_exact(2)
+                if low is None:
+                    return
+                length = (length << 16) | struct.unpack(">H", low)[0]
+                received += 2
+            request_id = None
+            if packet_type & FLAG_TAGGED:
+                tag = self._recv_exact(4)
+                if tag is None:
+                    return
+                request_id = struct.unpack(">I", tag)[0]
+                received += 4
+            data = self._recv_exact(length) if length else b""
+            if data is None:
+                return
+            received += length
+            packet_type &= TYPE_MASK
+
+            if request_id is None:
+                process(packet_type, data, None, received)
+            else:
+                threading.Thread(target=process, args=(packet_type, data, request_id, received), daemon=True).start()
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="本地CheatEngine协议替身服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8082)
+    parser.add_argument("--pid", type=int, help="读写本机真实进程(需要ptrace权限)，默认使用合成地址空间")
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求注入的延迟(毫秒)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="随机附加延迟的上限(毫秒)")
+    parser.add_argument("--module-size", type=int, default=1 << 20, help="合成模块的大小(字节)")
+    parser.add_argument("--heap-size", type=int, default=16 << 20, help="合成堆的大小(字节)")
+    parser.add_argument("--exports", type=int, default=2000, help="合成模块的导出符号数")
+    parser.add_argument("--no-pipeline", action="store_true", help="拒绝流水线模式")
+    parser.add_argument("--no-binary", action="store_true", help="忽略binaryBytes")
+    parser.add_argument("--codepage", default=DEFAULT_CODEPAGE, help="编解码string使用的ANSI代码页")
+    args = parser.parse_args()
+
+    space = ProcessAddressSpace(args.pid) if args.pid else SyntheticAddressSpace(args.module_size, args.heap_size, args.exports)
+    server = MockCEServer(space, args.host, args.port, args.latency / 1000, args.jitter / 1000,
+                          tagged=not args.no_pipeline, binary=not args.no_binary, codepage=args.codepage).start()
+    print(f"替身服务器已启动: {server.host}:{server.port}", flush=True)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
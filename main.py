@@ -11,7 +11,7 @@ import importlib
 import os
 import glob
 import logging
-from util import logger, create_ce_client
+from util import logger, create_ce_client, instrument_tool
 import json
 from typing import Dict, Any, Union
 
@@ -42,6 +42,86 @@ MCP CheatEngine工具集使用说明：
    - 用途：接收任意类型的输入并原样输出
    - 参数：任意类型的输入数据
    - 示例：test_echo("测试字符串")、test_echo({"name": "测试", "value": 100})
+
+4. 批量内存读取 (memory_batch_read)
+   - 用途：一次读取多个地址，相邻地址自动合并为连续范围读取
+   - 参数：读取列表[[地址, 类型], ...]、选项(可选)
+   - 示例：memory_batch_read([["0x7065F60", "int32"], ["0x7065F64", "float"]])
+
+5. 内存后端选择 (memory_backend_select)
+   - 用途：切换读取内存的方式(ce: 通过CheatEngine，linux: 直接读取本机进程)
+   - 参数：后端名称、进程ID(linux后端必填)
+   - 示例：memory_backend_select("linux", 12345)
+
+6. 页缓存 (page_cache)
+   - 用途：查看内存读取页缓存的命中统计，或使缓存失效
+   - 参数：操作(stats/clear/invalidate)、地址、长度(可选)
+   - 示例：page_cache()、page_cache("invalidate", "0x7065F60", 64)
+
+7. 批量指针链解析 (pointer_chain_read)
+   - 用途：一次解析多条指针链，共享前缀只解引用一次
+   - 参数：指针链列表、默认数据类型、选项(可选)
+   - 示例：pointer_chain_read(["game.dll+1234,8,10", "game.dll+1234,8,14"], "int32")
+
+8. 快照指针扫描 (pointer_scan / pointer_rescan)
+   - 用途：基于内存快照在本地扫描指针路径，目标迁移后重扫过滤
+   - 参数：目标地址、选项(maxLevel、offsetFilter、regions、savePath等)
+   - 示例：pointer_scan("0x55C8E5A58440", {"maxLevel": 4})、pointer_rescan("hp.ptr.json")
+
+9. 数值扫描 (memory_first_scan / memory_next_scan / memory_scan_results / memory_scan_close)
+   - 用途：首次扫描查找数值，再次扫描按变化过滤候选
+   - 参数：数据类型、值、比较方式、选项(regions、alignment、min/max等)
+   - 示例：memory_first_scan("int32", 100)、memory_next_scan(1, "decreased")
+
+10. 特征码扫描 (aob_scan)
+   - 用途：一次遍历内存匹配整套特征码，支持??和半字节通配符
+   - 参数：特征码(字符串、列表或名称字典)、选项(modules、regions、writable、executable、maxResults)
+   - 示例：aob_scan({"hpWrite": "89 83 ?? ?? 00 00 8B 45"}, {"modules": ["game.exe"]})
+
+11. 快照文件与比较 (memory_snapshot_save / memory_snapshot_diff)
+   - 用途：把内存区域保存为快照文件，比较两个快照中变化的字节范围
+   - 参数：文件路径、选项(regions、modules、mergeGap、maxRanges等)
+   - 示例：memory_snapshot_save("before.snap")、memory_snapshot_diff("before.snap", "after.snap")
+
+12. 地址监视 (watch_add / watch_changes / watch_list / watch_remove)
+   - 用途：后台自适应轮询一组地址，只返回游标之后的变化
+   - 参数：监视列表(address、dataType、label)、选项(minInterval、maxInterval、history)
+   - 示例：watch_add([{"address": "game.exe+1A2B3C", "dataType": "float"}])、watch_changes(0, None, 10)
+
+13. 结构体解析 (struct_define / struct_read / struct_list)
+   - 用途：按声明式结构体定义一次读取并在本地解码对象的全部字段
+   - 参数：结构体定义(字段名、偏移、类型、count、struct、target)；地址、结构体名、选项(count、stride、pointerArray、depth)
+   - 示例：struct_read("0x1A2B3C40", "Player")、struct_read("game.exe+5F1000", "Player", {"count": 64, "pointerArray": true})
+
+14. 批量写入内存 (memory_write)
+   - 用途：一次写入多个值，相近地址合并为一个带multiValues的MEMORY_WRITE请求，写入后使读取缓存失效
+   - 参数：写入列表(地址、类型、值、可选previousValue)、选项(endian)
+   - 示例：memory_write([["game.exe+1A2B0", "int32", 100], ["game.exe+1A2B4", "float", 1.5]])
+
+15. 数值冻结 (freeze_add / freeze_pause / freeze_resume / freeze_list / freeze_remove)
+   - 用途：后台按设定频率把值反复写回，到期的条目合并为批量写入
+   - 参数：冻结列表(地址、类型、值、frequency、label)、选项(frequency、paused)；冻结项ID列表
+   - 示例：freeze_add([{"address": "game.exe+1A2B3C", "dataType": "int32", "value": 999}])、freeze_pause([1])
+
+16. Lua脚本 (lua_exec / lua_register / lua_call / lua_scripts)
+   - 用途：执行Lua脚本；反复调用的脚本注册为预编译脚本，之后只发送脚本ID和params
+   - 参数：Lua源码、params、选项(timeout、prepare)；脚本ID或名称
+   - 示例：lua_exec("return getOpenedProcessID()")、lua_call("module_list")
+
+17. 符号标注 (memory_read的symbols选项)
+   - 用途：将指针值和直接调用/跳转的目标标注为"模块!导出符号+偏移"，模块符号表按路径和大小缓存到磁盘
+   - 参数：memory_read选项symbols(默认开启)
+   - 示例：memory_read("0x7FF6A1B20100", "pointer")、memory_read("game.exe+1A2B", "int32", {"assembly": true})
+
+18. 运行指标 (ce_stats)
+   - 用途：查看每种数据包的往返延迟、收发字节、重连/超时/重试、JSON解码耗时、各工具耗时和缓存命中率
+   - 参数：action(stats/reset/dump)、path(dump的文件路径，默认使用配置metrics_file)
+   - 示例：ce_stats()、ce_stats("dump", "/var/lib/node_exporter/ce.prom")
+
+19. 调试跟踪 (log_trace)
+   - 用途：运行时按工具开启DEBUG级别的请求跟踪(参数、耗时、截断的返回值及工具内部细节)
+   - 参数：tool(工具名，"*"表示所有工具，单个工具的设置优先于"*")、enabled(默认true)
+   - 示例：log_trace("memory_read_adapter")、log_trace("*", false)
 """
 
 
@@ -52,6 +132,25 @@ def show_help():
     return HELP_INFO
 
 
+class InstrumentedMCP:
+    """
+    注册工具时包装工具函数，记录每次调用的耗时(见ce_stats)，其余属性转发给MCP实例
+    """
+
+    def __init__(self, mcp):
+        self._mcp = mcp
+
+    def tool(self, name=None, description=None, **kwargs):
+        register = self._mcp.tool(name=name, description=description, **kwargs)
+
+        def decorator(func):
+            return register(instrument_tool(name or func.__name__, func))
+        return decorator
+
+    def __getattr__(self, item):
+        return getattr(self._mcp, item)
+
+
 # 自动导入所有工具模块
 def load_all_tools():
     """
@@ -127,7 +226,7 @@ def load_all_tools():
 
             # 调用模块的register_tool函数注册工具
             if hasattr(module, 'register_tool'):
-                module.register_tool(mcp)
+                module.register_tool(InstrumentedMCP(mcp))
                 tool_count += 1
                 logger.info(f"成功加载工具: {item}")
             else:
@@ -0,0 +1,53 @@
+"""
+测试公共夹具
+
+需要CE的测试连接进程内启动的协议替身服务器(benchmarks.mock_server)，
+每个测试使用独立的连接配置、缓存和符号缓存目录
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_server import MockCEServer, SyntheticAddressSpace
+import pytest
+import util
+
+
+# 测试会修改、结束后需要恢复的配置项
+CONFIG_KEYS = ("host", "port", "timeout", "retries", "pool_size", "pipeline", "long_frames", "binary_payload",
+               "page_cache_pages", "disasm_cache_size", "symbol_annotate", "symbol_cache_dir", "local_multitype",
+               "ansi_codepage")
+
+
+@pytest.fixture(scope="session")
+def mock_server():
+    server = MockCEServer(SyntheticAddressSpace()).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def ce_config(monkeypatch, tmp_path):
+    """
+    隔离全局配置和进程级缓存，返回可直接修改的cheatEngine_config
+    """
+    for key in CONFIG_KEYS:
+        monkeypatch.setitem(util.cheatEngine_config, key, util.cheatEngine_config[key])
+    util.cheatEngine_config["symbol_cache_dir"] = str(tmp_path / "symbols")
+    for name in ("_page_cache", "_disassembly_cache", "_pointer_cache", "_symbol_index", "_memory_backend"):
+        monkeypatch.setattr(util, name, None)
+    yield util.cheatEngine_config
+    util.reset_ce_pool()
+    util.invalidate_region_map()
+
+
+@pytest.fixture
+def ce(mock_server, ce_config):
+    """
+    将客户端指向替身服务器(协商长帧，其余扩展关闭)，返回清零统计后的服务器
+    """
+    util.update_ce_config(host=mock_server.host, port=mock_server.port, pipeline=False,
+                          long_frames=True, binary_payload=False)
+    mock_server.reset_stats()
+    return mock_server
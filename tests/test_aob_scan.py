@@ -0,0 +1,79 @@
+"""
+特征码(AOB)扫描
+"""
+import random
+
+import pytest
+
+from benchmarks.mock_server import HEAP_BASE, MODULE_BASE, MODULE_NAME
+from util import SNAPSHOT_CHUNK_SIZE
+from tools.aob_scan import tool as aob_tool
+from tools.aob_scan.tool import AobMatcher, compile_pattern, aob_scan
+
+BASE = HEAP_BASE + 0xA0000
+SIZE = 3 * SNAPSHOT_CHUNK_SIZE
+REGIONS = [[f"0x{BASE:X}", SIZE]]
+
+
+def _naive(buffer, text):
+    values, masks = compile_pattern(text)
+    return [start for start in range(len(buffer) - len(values) + 1)
+            if all(buffer[start + i] & mask == value for i, (value, mask) in enumerate(zip(values, masks)))]
+
+
+def test_compile_pattern():
+    assert compile_pattern("48 8b ?? 4? ?8") == (bytes([0x48, 0x8B, 0, 0x40, 0x08]), bytes([0xFF, 0xFF, 0, 0xF0, 0x0F]))
+    for text in ("?? ??", "4G", "123"):
+        with pytest.raises(ValueError):
+            compile_pattern(text)
+
+
+def test_matcher_agrees_with_naive_search():
+    rng = random.Random(7)
+    buffer = bytes(rng.choice(b"\x00\x48\x8b\x05\x90\xe8\x41") for _ in range(20000))
+    patterns = ["48 8B 05", "?? 8B ?? 05", "4? 8B", "00 00 00", "E8 ?? ?? ?? 41"]
+    matcher = AobMatcher(patterns)
+    found = [[] for _ in patterns]
+    for index, address in matcher.scan(buffer, 0):
+        found[index].append(address)
+    assert [sorted(addresses) for addresses in found] == [_naive(buffer, text) for text in patterns]
+
+
+@pytest.fixture
+def signatures(ce):
+    ce.space.write(BASE, bytes(SIZE))
+    # 第一个跨越块边界，第二个在区域末尾
+    ce.space.write(BASE + SNAPSHOT_CHUNK_SIZE - 3, bytes.fromhex("DEADBEEF1337"))
+    ce.space.write(BASE + SIZE - 6, bytes.fromhex("DEADBEEF1337"))
+    ce.space.write(BASE + 0x500, bytes.fromhex("C0FFEE"))
+    yield ce
+    ce.space.write(BASE, bytes(SIZE))
+
+
+def test_scan_finds_matches_across_chunk_boundaries(signatures):
+    result = aob_scan({"sig": "DE AD ?? EF 13 37", "coffee": "C0 F? EE"}, {"regions": REGIONS, "workers": 1})
+    assert result["success"], result
+    sig, coffee = result["results"]
+    assert sig["name"] == "sig" and sig["count"] == 2
+    assert [item["address"] for item in sig["matches"]] == \
+        [f"0x{BASE + SNAPSHOT_CHUNK_SIZE - 3:X}", f"0x{BASE + SIZE - 6:X}"]
+    assert [item["address"] for item in coffee["matches"]] == [f"0x{BASE + 0x500:X}"]
+    assert result["stats"]["scannedBytes"] == SIZE
+
+
+def test_process_pool_matches_serial(signatures, monkeypatch):
+    serial = aob_scan(["DE AD BE EF", "C0 FF"], {"regions": REGIONS, "workers": 1})
+    monkeypatch.setattr(aob_tool, "AOB_POOL_MIN_BYTES", 1)
+    monkeypatch.setattr(aob_tool, "AOB_BATCH_CHUNKS", 1)
+    parallel = aob_scan(["DE AD BE EF", "C0 FF"], {"regions": REGIONS, "workers": 2})
+    assert parallel["success"], parallel
+    assert parallel["results"] == serial["results"]
+
+
+def test_module_filter(ce):
+    code = ce.space.read(MODULE_BASE + 0x2000, 8)
+    result = aob_scan(code.hex(" "), {"modules": [MODULE_NAME], "workers": 1})
+    assert result["success"], result
+    assert f"0x{MODULE_BASE + 0x2000:X}" in [item["address"] for item in result["results"][0]["matches"]]
+    assert result["stats"]["scannedBytes"] == len(ce.space.module)
+    assert not aob_scan("90 90", {"modules": ["missing.dll"]})["success"]
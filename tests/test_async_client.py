@@ -0,0 +1,121 @@
+"""
+asyncio客户端与异步工具
+"""
+import asyncio
+import json
+import struct
+import time
+
+import pytest
+
+from benchmarks.mock_server import MockCEServer, SyntheticAddressSpace, HEAP_BASE
+import util
+from util import AsyncCESocketClient
+from tools.memory_tools.tool import memory_read_async, memory_batch_read_async
+
+READ = AsyncCESocketClient.PACKET_TYPE["MEMORY_READ"]
+
+
+@pytest.fixture(scope="module")
+def slow_server():
+    server = MockCEServer(SyntheticAddressSpace(heap_size=1 << 20, exports=10), latency=0.02, jitter=0.02).start()
+    yield server
+    server.stop()
+
+
+def _request(address):
+    return json.dumps({"address": f"0x{address:X}", "dataType": "int32"})
+
+
+@pytest.mark.parametrize("pipelined", [False, True], ids=["serial", "pipelined"])
+def test_concurrent_requests_match_their_responses(slow_server, pipelined):
+    space = slow_server.space
+    addresses = [HEAP_BASE + 0x1000 * i + 8 for i in range(20)]
+
+    async def run():
+        client = AsyncCESocketClient(slow_server.host, slow_server.port, timeout=5, pipelined=pipelined)
+        assert await client.connect()
+        assert client.pipelined is pipelined
+        try:
+            started = time.perf_counter()
+            responses = await asyncio.gather(*(client.request(READ, _request(address)) for address in addresses))
+            return responses, time.perf_counter() - started
+        finally:
+            await client.disconnect()
+
+    responses, elapsed = asyncio.run(run())
+    assert [json.loads(content)["value"] for _, content in responses] == \
+        [struct.unpack("<i", space.read(address, 4))[0] for address in addresses]
+    if pipelined:
+        # 请求同时在途，不按每个请求至少20ms串行累加
+        assert elapsed < 0.2
+    else:
+        assert elapsed >= 0.4
+
+
+def test_silent_old_plugin_falls_back_quickly(monkeypatch):
+    monkeypatch.setattr(AsyncCESocketClient, "NEGOTIATE_TIMEOUT", 0.2)
+    server = MockCEServer(SyntheticAddressSpace(heap_size=1 << 20, exports=10), framing=False).start()
+
+    async def run():
+        client = AsyncCESocketClient(server.host, server.port, timeout=10, pipelined=True, long_frames=True)
+        started = time.perf_counter()
+        assert await client.connect()
+        elapsed = time.perf_counter() - started
+        try:
+            assert not client.pipelined and not client.long_frames
+            _, content = await client.request(READ, _request(HEAP_BASE))
+            return elapsed, json.loads(content)
+        finally:
+            await client.disconnect()
+
+    try:
+        elapsed, response = asyncio.run(run())
+    finally:
+        server.stop()
+    # 只等待协商超时，而不是普通请求的10秒
+    assert elapsed < 1
+    assert response["success"]
+
+
+def test_request_times_out_without_blocking_the_loop(slow_server):
+    async def run():
+        client = AsyncCESocketClient(slow_server.host, slow_server.port, timeout=5, pipelined=True)
+        assert await client.connect()
+        client.timeout = 0.005
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.001)
+                ticks += 1
+
+        task = asyncio.ensure_future(ticker())
+        try:
+            result = await client.request(READ, _request(HEAP_BASE), retry_count=0)
+        finally:
+            task.cancel()
+            await client.disconnect()
+        return result, ticks
+
+    result, ticks = asyncio.run(run())
+    assert result == (None, None)
+    assert ticks > 0
+
+
+def test_async_tools_against_mock(ce, ce_config):
+    ce_config["pipeline"] = True
+    space = ce.space
+
+    async def run():
+        reads = [memory_read_async(f"0x{HEAP_BASE + 0x2000 + i * 8:X}", "int64") for i in range(8)]
+        batch = memory_batch_read_async([[f"0x{HEAP_BASE + 0x3000 + i * 4:X}", "int32"] for i in range(8)])
+        return await asyncio.gather(*reads, batch)
+
+    *singles, batch = asyncio.run(run())
+    assert [item["value"] for item in singles] == \
+        [struct.unpack("<q", space.read(HEAP_BASE + 0x2000 + i * 8, 8))[0] for i in range(8)]
+    assert [item["value"] for item in batch["results"]] == \
+        [struct.unpack("<i", space.read(HEAP_BASE + 0x3000 + i * 4, 4))[0] for i in range(8)]
+    assert util._async_ce_client.pipelined
@@ -0,0 +1,80 @@
+"""
+批量读取的范围合并与请求规划
+"""
+import json
+
+from benchmarks.mock_server import HEAP_BASE, MODULE_BASE
+from util import (
+    coalesce_ranges, plan_batch_reads, read_memory_ranges, ce_client,
+    BATCH_MERGE_GAP, BATCH_PAGE_SIZE, BATCH_SIZE_CLASSES, CESocketClient
+)
+
+
+def test_coalesce_merges_overlapping_and_close_ranges():
+    ranges = [(0x1100, 8), (0x1000, 16), (0x1008, 16), (0x1018 + BATCH_MERGE_GAP, 4)]
+    assert coalesce_ranges(ranges) == [(0x1000, 0x1018 + BATCH_MERGE_GAP + 4 - 0x1000), (0x1100, 8)]
+
+
+def test_coalesce_keeps_distant_ranges_and_drops_empty():
+    ranges = [(0x3000, 4), (0x1000, 4), (0x2000, 0)]
+    assert coalesce_ranges(ranges) == [(0x1000, 4), (0x3000, 4)]
+    assert coalesce_ranges([(0x1000, 4), (0x1004 + 2, 4)], gap=0) == [(0x1000, 4), (0x1006, 4)]
+
+
+def test_plan_chunks_use_size_classes_within_pages():
+    ranges = [(0x10FF0, 8), (0x20000, 5000)]
+    plan = plan_batch_reads(ranges)
+    assert plan["merged"] == coalesce_ranges(ranges)
+    for (start, size), chunks in zip(plan["merged"], plan["chunks"]):
+        covered = set()
+        for chunk_start, chunk_size in chunks:
+            assert chunk_size in BATCH_SIZE_CLASSES
+            covered.update(range(chunk_start, chunk_start + chunk_size))
+            # 取整后的读取块不会越出原范围覆盖的页
+            page_low = start & ~(BATCH_PAGE_SIZE - 1)
+            page_high = (start + size + BATCH_PAGE_SIZE - 1) & ~(BATCH_PAGE_SIZE - 1)
+            assert page_low <= chunk_start and chunk_start + chunk_size <= page_high
+        assert set(range(start, start + size)) <= covered
+
+
+def test_plan_groups_by_size_and_splits_by_frame_size():
+    ranges = [(0x100000 + i * 0x1000, 16) for i in range(100)]
+    plan = plan_batch_reads(ranges)
+    assert len(plan["requests"]) == 1
+    request = json.loads(plan["requests"][0])
+    assert len(request["addresses"]) == 100
+    assert request["options"] == {"rawBytes": True, "bytesSize": 16}
+
+    # 帧上限很小时同一尺寸等级的块拆成多个请求
+    small = plan_batch_reads(ranges, max_frame_size=2000)
+    assert len(small["requests"]) > 1
+    assert sum(len(starts) for _, starts in small["layout"]) == 100
+
+    binary = plan_batch_reads(ranges, binary=True)
+    assert json.loads(binary["requests"][0])["options"]["binaryBytes"] is True
+
+
+def test_plan_large_range_fits_json_frame():
+    plan = plan_batch_reads([(0x200000, 64 * 1024)])
+    for request in plan["requests"]:
+        chunk_size = json.loads(request)["options"]["bytesSize"]
+        count = len(json.loads(request)["addresses"])
+        assert count * chunk_size * 5 < CESocketClient.MAX_FRAME_SIZE
+
+
+def test_read_memory_ranges_against_mock(ce):
+    ranges = [(HEAP_BASE + 0x10, 8), (HEAP_BASE + 0x18, 8), (MODULE_BASE + 0x1000, 300), (HEAP_BASE + 0x5000, 4)]
+    with ce_client() as client:
+        datas, request_count = read_memory_ranges(client, ranges)
+    assert [bytes(data) for data in datas] == [ce.space.read(address, size) for address, size in ranges]
+    # 新连接上的长帧协商会多发一条COMMAND，只统计批量读取请求
+    assert request_count == ce.stats()["requests"]["MEMORY_BATCH"]
+    assert request_count <= 2
+
+
+def test_read_memory_ranges_reports_unreadable(ce):
+    ranges = [(HEAP_BASE + 0x40, 4), (0x10, 4)]
+    with ce_client() as client:
+        datas, _ = read_memory_ranges(client, ranges)
+    assert bytes(datas[0]) == ce.space.read(HEAP_BASE + 0x40, 4)
+    assert datas[1] is None
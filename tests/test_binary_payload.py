@@ -0,0 +1,62 @@
+"""
+BYTECODE附加帧: 原始字节不经JSON整数数组传输
+"""
+import struct
+
+import pytest
+
+from benchmarks.mock_server import HEAP_BASE, MODULE_BASE
+import util
+from tools.memory_tools.tool import memory_read, memory_batch_read
+
+
+def test_attach_binary_payload_slices_without_copy():
+    payload = bytearray(b"\x01\x02\x03\x04\x05\x06")
+    response = {"results": [{"bytes": None}, {"bytes": None}],
+                "binary": [{"path": ["results", 0, "bytes"], "offset": 0, "length": 2},
+                           {"path": ["results", 1, "bytes"], "offset": 2, "length": 4}]}
+    util.attach_binary_payload(response, payload)
+    assert "binary" not in response
+    first, second = (item["bytes"] for item in response["results"])
+    assert isinstance(first, memoryview)
+    assert bytes(first) == b"\x01\x02" and bytes(second) == b"\x03\x04\x05\x06"
+    payload[0] = 0xFF
+    assert first[0] == 0xFF
+
+
+@pytest.fixture(params=[False, True], ids=["json", "binary"])
+def binary(request, ce):
+    util.cheatEngine_config["binary_payload"] = request.param
+    ce.reset_stats()
+    return request.param
+
+
+def test_read_memory_ranges_binary_matches_json(ce):
+    ranges = [(HEAP_BASE + 0x8000 + i * 0x1000, 0x400) for i in range(12)] + [(MODULE_BASE + 0x1000, 0x100)]
+    sent = {}
+    for binary in (False, True):
+        util.cheatEngine_config["binary_payload"] = binary
+        ce.reset_stats()
+        with util.ce_client() as client:
+            results, _ = util.read_memory_ranges(client, ranges)
+        assert [bytes(data) for data in results] == [ce.space.read(address, size) for address, size in ranges]
+        sent[binary] = ce.stats()["bytesSent"]
+    # JSON整数数组每字节约需4字节，附加帧与数据量相当
+    total = sum(size for _, size in ranges)
+    assert sent[True] < total * 1.2 < total * 3 < sent[False]
+
+
+def test_memory_read_raw_bytes_and_opcode(binary, ce):
+    address = MODULE_BASE + 0x2000
+    result = memory_read(f"0x{address:X}", "int32", {"rawBytes": True, "bytesSize": 32, "opcode": True})
+    assert result["success"], result
+    assert list(result["bytes"]) == list(ce.space.read(address, 32))
+    assert result["value"] == struct.unpack("<i", ce.space.read(address, 4))[0]
+
+
+def test_batch_read_raw_bytes(binary, ce):
+    reads = [[f"0x{HEAP_BASE + 0x9000 + i * 0x100:X}", "bytes", 16] for i in range(4)]
+    result = memory_batch_read(reads)
+    assert result["success"], result
+    for i, item in enumerate(result["results"]):
+        assert list(item["value"]) == list(ce.space.read(HEAP_BASE + 0x9000 + i * 0x100, 16))
@@ -0,0 +1,58 @@
+"""
+反汇编缓存与只读区段的信任判断
+"""
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+from benchmarks.mock_server import MODULE_BASE, MODULE_NAME
+import util
+from tools.memory_tools.tool import memory_read
+from tools.page_cache.tool import page_cache
+
+OPTIONS = {"assembly": True, "assemblySize": 5}
+
+
+def _read(address):
+    return memory_read(f"0x{address:X}", "int32", dict(OPTIONS))
+
+
+def test_listing_hit_skips_disassembly(ce):
+    first = _read(MODULE_BASE + 0x2000)
+    assert first["success"], first
+    ce.reset_stats()
+    second = _read(MODULE_BASE + 0x2000)
+    assert second["assembly"] == first["assembly"]
+    # 命中后只读取值，不再让CE反汇编
+    assert ce.stats()["requests"] == {"MEMORY_READ": 1}
+    assert util.get_disassembly_cache().stats()["hits"] >= 1
+
+
+def test_cold_reads_do_not_starve_a_small_pool(ce, ce_config):
+    """
+    第一次读取代码时要加载模块区段信息，不能在持有连接池客户端时再借用一个
+    """
+    ce_config["pool_size"] = 1
+    util.update_ce_config(timeout=3)
+    addresses = [MODULE_BASE + 0x3000 + i * 0x400 for i in range(4)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(_read, addresses))
+    assert all(result["success"] for result in results), [result["error"] for result in results]
+    assert time.perf_counter() - started < 2
+    assert all(result["assembly"][0]["symbol"] for result in results)
+
+
+def test_tool_manages_disassembly_cache_without_page_cache(ce, ce_config):
+    ce_config["page_cache_pages"] = 0
+    assert _read(MODULE_BASE + 0x2000)["success"]
+    stats = page_cache()
+    assert stats["success"], stats
+    assert stats["stats"] is None
+    assert stats["disassembly"]["listings"] == 1
+    invalidated = page_cache("invalidate", f"{MODULE_NAME}+2004", 1)
+    assert invalidated["success"], invalidated
+    assert invalidated["dropped"] == 0 and invalidated["disassemblyDropped"] == 1
+    assert _read(MODULE_BASE + 0x2000)["success"]
+    cleared = page_cache("clear")
+    assert cleared["disassemblyDropped"] == 1
+    assert cleared["disassembly"]["listings"] == 0
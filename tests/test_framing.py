@@ -0,0 +1,135 @@
+"""
+帧格式的打包、解包和接收
+"""
+import json
+import socket
+import struct
+import time
+
+import pytest
+
+from benchmarks.mock_server import MockCEServer, SyntheticAddressSpace, HEAP_BASE
+from util import CESocketClient, CEPipelinedClient
+
+
+def _client(long_frames: bool = False) -> CESocketClient:
+    client = CESocketClient(auto_connect=False)
+    if long_frames:
+        client.long_frames = True
+        client.max_frame_size = client.MAX_LONG_FRAME_SIZE
+    return client
+
+
+def test_pack_plain_frame():
+    client = _client()
+    packet = client._pack_data('{"a": 1}', client.PACKET_TYPE["MEMORY_READ"])
+    assert packet[:4] == struct.pack(">HH", client.PACKET_TYPE["MEMORY_READ"], 8)
+    assert client._unpack_data(packet) == (client.PACKET_TYPE["MEMORY_READ"], b'{"a": 1}')
+
+
+def test_pack_tagged_frame_carries_request_id():
+    client = _client()
+    packet = client._pack_data(b"xyz", client.PACKET_TYPE["TEXT"], request_id=0x01020304)
+    data_type, length, request_id = struct.unpack_from(">HHI", packet)
+    assert data_type == client.PACKET_TYPE["TEXT"] | client.FRAME_FLAG_TAGGED
+    assert (length, request_id) == (3, 0x01020304)
+    assert client._unpack_data(packet) == (client.PACKET_TYPE["TEXT"], b"xyz")
+
+
+def test_long_frame_requires_negotiation():
+    data = b"x" * (CESocketClient.MAX_FRAME_SIZE + 1)
+    with pytest.raises(ValueError):
+        _client()._pack_data(data, CESocketClient.PACKET_TYPE["LUA_EXEC"])
+
+    client = _client(long_frames=True)
+    packet = client._pack_data(data, client.PACKET_TYPE["LUA_EXEC"], request_id=7)
+    data_type, length = struct.unpack_from(">HI", packet)
+    assert data_type & client.FRAME_FLAG_LONG and data_type & client.FRAME_FLAG_TAGGED
+    assert length == len(data)
+    assert client._unpack_data(packet) == (client.PACKET_TYPE["LUA_EXEC"], data)
+
+
+def test_unpack_truncated_packet():
+    client = _client()
+    packet = client._pack_data(b"abcdef", client.PACKET_TYPE["TEXT"])
+    assert client._unpack_data(packet[:-1]) == (None, None)
+    assert client._unpack_data(packet[:3]) == (None, None)
+
+
+@pytest.mark.parametrize("request_id, size", [(None, 10), (42, 10), (None, 70000), (9, 70000)])
+def test_read_frame_from_socket(request_id, size):
+    client = _client(long_frames=True)
+    data = bytes(range(256)) * (size // 256) + b"\x01" * (size % 256)
+    left, right = socket.socketpair()
+    try:
+        # 分两次写入，接收方需要跨多次recv拼出完整的帧
+        packet = client._pack_data(data, client.PACKET_TYPE["BYTECODE"], request_id)
+        left.sendall(packet[:5])
+        left.sendall(packet[5:])
+        right.settimeout(2)
+        data_type, received_id, content = client._read_frame(right)
+    finally:
+        left.close()
+        right.close()
+    assert (data_type, received_id) == (client.PACKET_TYPE["BYTECODE"], request_id)
+    assert bytes(content) == data
+
+
+def test_negotiated_long_frames_against_mock(ce):
+    client = CESocketClient(host=ce.host, port=ce.port, long_frames=True)
+    assert client.connect()
+    try:
+        assert client.long_frames
+        # 带导出符号的detailed模块列表超过普通帧的64KB上限
+        request = json.dumps({"options": {"detailed": True}})
+        response_type, content = client.request(client.PACKET_TYPE["ENUM_MODULES"], request)
+        assert response_type == client.PACKET_TYPE["RESPONSE"]
+        assert len(content) > CESocketClient.MAX_FRAME_SIZE
+        assert json.loads(bytes(content))["modules"][0]["sections"]
+    finally:
+        client.disconnect()
+
+
+@pytest.fixture(scope="module")
+def old_plugin():
+    server = MockCEServer(SyntheticAddressSpace(heap_size=1 << 20, exports=10), framing=False).start()
+    yield server
+    server.stop()
+
+
+@pytest.mark.parametrize("client_class", [CESocketClient, CEPipelinedClient])
+def test_silent_old_plugin_falls_back_quickly(old_plugin, client_class, monkeypatch):
+    monkeypatch.setattr(CESocketClient, "NEGOTIATE_TIMEOUT", 0.2)
+    client = client_class(host=old_plugin.host, port=old_plugin.port, timeout=10, long_frames=True)
+    started = time.perf_counter()
+    try:
+        assert client.connect()
+        # 只等待协商超时，而不是普通请求的10秒
+        assert time.perf_counter() - started < 1
+        assert not client.long_frames
+        assert not getattr(client, "pipelined", False)
+        assert client.socket.gettimeout() == 10
+        request = json.dumps({"address": f"0x{HEAP_BASE:X}", "dataType": "int32"})
+        response_type, content = client.request(client.PACKET_TYPE["MEMORY_READ"], request)
+        assert response_type == client.PACKET_TYPE["RESPONSE"]
+        assert json.loads(bytes(content))["success"]
+    finally:
+        client.disconnect()
+
+
+def test_failed_reconnect_after_negotiation(old_plugin, monkeypatch):
+    client = CEPipelinedClient(host=old_plugin.host, port=old_plugin.port, timeout=10, long_frames=True)
+    monkeypatch.setattr(CESocketClient, "NEGOTIATE_TIMEOUT", 0.1)
+    opened = []
+    open_socket = CESocketClient._open_socket
+
+    def open_once(self):
+        # 只有第一次连接成功，协商超时后的重连失败
+        opened.append(True)
+        return open_socket(self) if len(opened) == 1 else False
+
+    monkeypatch.setattr(CESocketClient, "_open_socket", open_once)
+    assert not client.connect()
+    assert not client.connected
+    assert client._reader is None
+    assert len(opened) == 2
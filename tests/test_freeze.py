@@ -0,0 +1,91 @@
+"""
+数值冻结: 后台调度写回、合并写入和暂停/恢复
+"""
+import struct
+import time
+
+import pytest
+
+from benchmarks.mock_server import HEAP_BASE
+from tools.freeze import tool as freeze_tool
+from tools.freeze.tool import Freeze, freeze_add, freeze_pause, freeze_resume, freeze_list, freeze_remove
+
+BASE = HEAP_BASE + 0x110000
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def _int(space, address):
+    return struct.unpack("<i", space.read(address, 4))[0]
+
+
+@pytest.fixture
+def frozen(ce):
+    ce.space.write(BASE, bytes(0x400))
+    yield ce
+    freeze_remove()
+    _wait_for(lambda: freeze_tool._scheduler is None)
+    ce.space.write(BASE, bytes(0x400))
+
+
+def test_values_are_written_back(frozen):
+    space = frozen.space
+    added = freeze_add([{"address": f"0x{BASE:X}", "value": 999, "label": "hp"},
+                        {"address": f"0x{BASE + 8:X}", "dataType": "float", "value": 1.5}], {"frequency": 100})
+    assert added["success"], added
+    assert _wait_for(lambda: _int(space, BASE) == 999)
+    assert struct.unpack("<f", space.read(BASE + 8, 4))[0] == 1.5
+    space.write(BASE, struct.pack("<i", 1))
+    assert _wait_for(lambda: _int(space, BASE) == 999)
+    listed = freeze_list()
+    assert listed["scheduler"]["running"]
+    assert [item["label"] for item in listed["freezes"]] == ["hp", None]
+    assert all(item["writes"] > 0 and item["failures"] == 0 for item in listed["freezes"])
+
+
+def test_due_entries_share_requests(frozen):
+    freeze_add([{"address": f"0x{BASE + i * 4:X}", "value": i} for i in range(32)], {"frequency": 50})
+    assert _wait_for(lambda: _int(frozen.space, BASE + 31 * 4) == 31)
+    time.sleep(0.2)
+    scheduler = freeze_list()["scheduler"]
+    # 32个相邻地址每个周期合并为一个MEMORY_WRITE
+    assert scheduler["requests"] <= scheduler["ticks"] * 2
+
+
+def test_pause_and_resume(frozen):
+    space = frozen.space
+    added = freeze_add({"address": f"0x{BASE + 0x100:X}", "value": 7}, {"frequency": 100, "paused": True})
+    time.sleep(0.05)
+    assert _int(space, BASE + 0x100) == 0
+    assert freeze_resume(added["freezeIds"])["resumed"] == 1
+    assert _wait_for(lambda: _int(space, BASE + 0x100) == 7)
+    assert freeze_pause()["paused"] == 1
+    time.sleep(0.03)
+    space.write(BASE + 0x100, struct.pack("<i", 5))
+    time.sleep(0.05)
+    assert _int(space, BASE + 0x100) == 5
+    assert freeze_remove(added["freezeIds"])["removed"] == 1
+    assert _wait_for(lambda: freeze_tool._scheduler is None)
+
+
+def test_invalid_entries_are_rejected(frozen):
+    assert not freeze_add({"address": f"0x{BASE:X}", "dataType": "int8", "value": 1000})["success"]
+    assert not freeze_add({"address": f"0x{BASE:X}"})["success"]
+    assert not freeze_add({"address": f"0x{BASE:X}", "value": 1}, {"frequency": 0})["success"]
+    assert freeze_list()["freezes"] == []
+
+
+def test_late_ticks_skip_missed_cycles():
+    freeze = Freeze(1, 0, "int32", 1, None, 0.01, False)
+    due = freeze.next_due
+    freeze.complete(due + 0.001, due + 0.055, True, None)
+    assert freeze.missed == 5
+    assert due + 0.055 <= freeze.next_due < due + 0.065
+    assert freeze.writes == 1
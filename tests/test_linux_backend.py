@@ -0,0 +1,125 @@
+"""
+LinuxProcessBackend: 读写真实子进程的内存
+"""
+import asyncio
+import subprocess
+import sys
+
+import pytest
+
+import util
+from util import LinuxProcessBackend
+from tools.memory_tools.tool import memory_read, memory_batch_read, memory_write
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="需要Linux")
+
+# 子进程分配一块已知内容的缓冲区，输出地址后按行执行命令:
+# 空行退出，"dump <偏移> <长度>"输出缓冲区当前内容的十六进制
+CHILD = """
+import ctypes, sys
+buffer = ctypes.create_string_buffer(bytes(range(256)) * 16, 4096)
+print(hex(ctypes.addressof(buffer)), flush=True)
+for line in sys.stdin:
+    if not line.strip():
+        break
+    _, offset, size = line.split()
+    print(buffer.raw[int(offset):int(offset) + int(size)].hex(), flush=True)
+"""
+
+EXPECTED = bytes(range(256)) * 16
+
+
+@pytest.fixture
+def child():
+    process = subprocess.Popen([sys.executable, "-c", CHILD], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               text=True)
+    address = int(process.stdout.readline(), 16)
+
+    def dump(offset, size):
+        process.stdin.write(f"dump {offset} {size}\n")
+        process.stdin.flush()
+        return bytes.fromhex(process.stdout.readline().strip())
+
+    yield process, address, dump
+    process.stdin.write("\n")
+    process.stdin.flush()
+    process.wait(timeout=5)
+
+
+@pytest.fixture(params=["process_vm_readv", "proc_mem"])
+def backend(request, child):
+    backend = LinuxProcessBackend(child[0].pid)
+    if request.param == "proc_mem":
+        backend._readv = None
+    elif backend._readv is None:
+        pytest.skip("process_vm_readv不可用")
+    yield backend
+    backend.close()
+
+
+def _unreadable_address(backend):
+    # 区域之间的空洞，读取失败
+    regions = sorted(backend.regions(), key=lambda region: region["start"])
+    for previous, current in zip(regions, regions[1:]):
+        if current["start"] - previous["end"] >= 0x1000:
+            return previous["end"]
+    pytest.skip("没有找到未映射的地址")
+
+
+def test_read_many_matches_child_buffer(backend, child):
+    _, address, _ = child
+    ranges = [(address + offset, size) for offset, size in ((0, 16), (100, 300), (4000, 96), (1, 1))]
+    datas, _ = backend.read_many(ranges + [(_unreadable_address(backend), 16)])
+    assert datas[:-1] == [EXPECTED[offset - address:offset - address + size] for offset, size in ranges]
+    assert datas[-1] is None
+
+
+def test_read_many_async_runs_off_the_loop(backend, child):
+    _, address, _ = child
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0)
+                ticks += 1
+
+        task = asyncio.ensure_future(ticker())
+        try:
+            datas, _ = await backend.read_many_async([(address, 4096)] * 64)
+        finally:
+            task.cancel()
+        return datas, ticks
+
+    datas, ticks = asyncio.run(run())
+    assert all(data == EXPECTED for data in datas)
+    assert ticks > 0
+
+
+def test_write_many_is_visible_in_child(backend, child):
+    _, address, dump = child
+    results, _ = backend.write_many([
+        {"address": address + 16, "dataType": "int32", "value": 0x11223344},
+        {"address": address + 32, "dataType": "int32", "value": 7, "previousValue": 0x23222120},
+        {"address": address + 48, "dataType": "int32", "value": 7, "previousValue": 0},
+    ])
+    assert [result["success"] for result in results] == [True, True, False]
+    assert dump(16, 4) == bytes.fromhex("44332211")
+    assert dump(32, 4) == (7).to_bytes(4, "little")
+    assert dump(48, 4) == EXPECTED[48:52]
+
+
+def test_tools_use_local_backend(ce_config, child):
+    _, address, dump = child
+    util.set_memory_backend(LinuxProcessBackend(child[0].pid))
+    try:
+        assert memory_read(f"0x{address + 4:X}", "int32")["value"] == int.from_bytes(EXPECTED[4:8], "little")
+        batch = memory_batch_read([[f"0x{address + i * 8:X}", "int64"] for i in range(4)])
+        assert [item["value"] for item in batch["results"]] == \
+            [int.from_bytes(EXPECTED[i * 8:i * 8 + 8], "little") for i in range(4)]
+        assert memory_write([[f"0x{address + 64:X}", "string", "abc"]])["success"]
+        assert dump(64, 4) == b"abc" + EXPECTED[67:68]
+    finally:
+        util.set_memory_backend(None)
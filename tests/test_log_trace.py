@@ -0,0 +1,72 @@
+"""
+按工具的调试跟踪: "*"与单个工具设置的优先级、关闭时不记录
+"""
+import logging
+
+import pytest
+
+import util
+from tools.log_trace.tool import log_trace
+
+
+@pytest.fixture(autouse=True)
+def reset_trace():
+    yield
+    util.set_tool_trace("*", False)
+
+
+def _traced(tool):
+    return util.get_trace_logger(tool).isEnabledFor(logging.DEBUG)
+
+
+def test_single_tool():
+    assert log_trace("memory_read_adapter")["traced"] == ["memory_read_adapter"]
+    assert _traced("memory_read_adapter")
+    assert not _traced("memory_batch_read_adapter")
+    log_trace("memory_read_adapter", False)
+    assert not _traced("memory_read_adapter")
+    assert log_trace()["traced"] == []
+
+
+def test_tool_setting_overrides_wildcard():
+    log_trace("*")
+    result = log_trace("memory_batch_read_adapter", False)
+    assert result["traced"] == ["*"]
+    assert result["excluded"] == ["memory_batch_read_adapter"]
+    assert _traced("memory_read_adapter")
+    assert not _traced("memory_batch_read_adapter")
+
+    # 单独重新开启
+    result = log_trace("memory_batch_read_adapter")
+    assert result["excluded"] == []
+    assert _traced("memory_batch_read_adapter")
+
+
+def test_disabling_wildcard_turns_everything_off():
+    log_trace("memory_read_adapter")
+    log_trace("*")
+    log_trace("memory_batch_read_adapter", False)
+    result = log_trace("*", False)
+    assert result["traced"] == []
+    assert result["excluded"] == []
+    assert not _traced("memory_read_adapter")
+    assert not _traced("memory_batch_read_adapter")
+
+    # 之前单独关闭的工具重新跟随"*"
+    log_trace("*")
+    assert _traced("memory_batch_read_adapter")
+
+
+def test_instrumented_tool_traces_only_when_enabled(caplog):
+    tool = util.instrument_tool("trace_probe", lambda value: {"success": True, "value": value})
+    tool(1)
+    util.set_tool_trace("*", True)
+    util.set_tool_trace("trace_probe", False)
+    tool(2)
+    assert not caplog.records
+
+    util.set_tool_trace("trace_probe", True)
+    tool(list(range(1000)))
+    assert [record.name for record in caplog.records] == [f"{util.TRACE_LOGGER}.trace_probe"] * 2
+    # 过长的值被截断
+    assert all(len(record.getMessage()) < util.LOG_VALUE_LIMIT * 3 for record in caplog.records)
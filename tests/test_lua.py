@@ -0,0 +1,106 @@
+"""
+预编译Lua脚本: 首次上传、按ID复用、服务端缓存失效后补发源码
+"""
+import asyncio
+
+import pytest
+
+import util
+from tools.lua_exec.tool import lua_exec, lua_register, lua_call, lua_scripts
+
+SCRIPT = "return readInteger(params.address)"
+
+
+@pytest.fixture
+def lua(ce, monkeypatch):
+    """
+    每个测试使用新的注册表，并清空替身服务器缓存的脚本
+    """
+    monkeypatch.setattr(util, "_lua_registry", util.LuaScriptRegistry())
+    ce.scripts.clear()
+    yield ce
+    ce.scripts.clear()
+    ce.prepared_scripts = True
+
+
+def test_first_call_uploads_then_reuses_id(lua):
+    script_id = lua_register(SCRIPT, "read_int")["scriptId"]
+
+    first = asyncio.run(lua_call("read_int", {"address": 4096}))
+    assert first["success"], first["error"]
+    assert first["scriptId"] == script_id
+    assert first["uploaded"] is True
+    assert first["requestCount"] == 1
+    assert first["result"] == {"scriptSize": len(SCRIPT), "params": {"address": 4096}}
+    assert lua.scripts[script_id] == SCRIPT
+
+    second = asyncio.run(lua_call(script_id, '{"address": 8192}'))
+    assert second["success"], second["error"]
+    assert second["uploaded"] is False
+    assert second["requestCount"] == 1
+    assert second["result"]["params"] == {"address": 8192}
+
+    stats = {entry["scriptId"]: entry for entry in lua_scripts()["scripts"]}[script_id]
+    assert stats["calls"] == 2
+    assert stats["uploads"] == 1
+    assert stats["bytesSaved"] == len(SCRIPT)
+    assert stats["loaded"] is True
+
+
+def test_server_restart_reuploads_once(lua):
+    lua_register(SCRIPT, "read_int")
+    asyncio.run(lua_call("read_int"))
+
+    # 服务端丢失缓存: 先按ID请求失败，再附带源码重发
+    lua.scripts.clear()
+    retried = asyncio.run(lua_call("read_int"))
+    assert retried["success"], retried["error"]
+    assert retried["uploaded"] is True
+    assert retried["requestCount"] == 2
+
+    again = asyncio.run(lua_call("read_int"))
+    assert again["uploaded"] is False
+    assert again["requestCount"] == 1
+
+
+def test_forget_loaded_uploads_without_retry(lua):
+    lua_register(SCRIPT, "read_int")
+    asyncio.run(lua_call("read_int"))
+
+    util.get_lua_registry().forget_loaded()
+    result = asyncio.run(lua_call("read_int"))
+    assert result["uploaded"] is True
+    assert result["requestCount"] == 1
+
+
+def test_old_server_always_sends_source(lua):
+    lua.prepared_scripts = False
+    lua_register(SCRIPT, "read_int")
+
+    for _ in range(2):
+        result = asyncio.run(lua_call("read_int"))
+        assert result["success"], result["error"]
+        assert result["uploaded"] is True
+        assert result["requestCount"] == 1
+    assert util.get_lua_registry().supported is False
+    assert not lua.scripts
+
+
+def test_lua_exec_prepare(lua):
+    first = asyncio.run(lua_exec(SCRIPT, {"address": 1}, {"prepare": True}))
+    assert first["success"], first["error"]
+    assert first["uploaded"] is True
+    second = asyncio.run(lua_exec(SCRIPT, {"address": 2}, '{"prepare": true}'))
+    assert second["scriptId"] == first["scriptId"]
+    assert second["uploaded"] is False
+    assert second["result"]["params"] == {"address": 2}
+
+    plain = asyncio.run(lua_exec(SCRIPT))
+    assert plain["success"], plain["error"]
+    assert "uploaded" not in plain
+
+
+def test_unknown_script(lua):
+    result = asyncio.run(lua_call("missing"))
+    assert not result["success"]
+    assert "missing" in result["error"]
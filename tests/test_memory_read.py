@@ -0,0 +1,96 @@
+"""
+memory_read/memory_batch_read/memory_write对替身服务器的端到端测试
+"""
+import asyncio
+import struct
+
+import pytest
+
+from benchmarks.mock_server import HEAP_BASE, MODULE_BASE
+import util
+from tools.memory_tools.tool import (
+    memory_read, memory_read_async, memory_batch_read, memory_batch_read_async, memory_write
+)
+
+
+@pytest.fixture(params=[0, 64], ids=["no-cache", "page-cache"])
+def page_cache(request, ce):
+    """
+    分别在关闭和启用页缓存时运行，缓存在第一次使用时按配置创建
+    """
+    util.cheatEngine_config["page_cache_pages"] = request.param
+    util.get_region_map()
+    ce.reset_stats()
+    return util.get_page_cache()
+
+
+def test_ansi_string_round_trip(page_cache, ce):
+    address = HEAP_BASE + 0x100
+    result = memory_write([[f"0x{address:X}", "string", "中文"]])
+    assert result["success"], result
+    assert ce.space.read(address, 5) == "中文".encode("gbk") + b"\0"
+    assert memory_read(f"0x{address:X}", "string")["value"] == "中文"
+    batch = memory_batch_read([[f"0x{address:X}", "string", 4]])
+    assert batch["results"][0]["value"] == "中文"
+
+
+def test_cold_scalar_is_one_request(page_cache, ce):
+    address = HEAP_BASE + 0x4010
+    result = memory_read(f"0x{address:X}", "int32")
+    assert result["success"], result
+    assert result["value"] == struct.unpack("<i", ce.space.read(address, 4))[0]
+    stats = ce.stats()
+    # 启用页缓存时冷读取也不为几个字节拉取整页
+    assert stats["requests"] == {"MEMORY_READ": 1}
+    assert stats["bytesSent"] < 512
+
+
+def test_cold_assembly_read_is_one_request(page_cache, ce):
+    # 先加载模块符号表(一次ENUM_MODULES detailed)，之后的冷读取只发一个请求
+    util.get_symbol_index().section_perms(MODULE_BASE + 0x1000, util.get_region_map(), load=True)
+    ce.reset_stats()
+    result = memory_read(f"0x{MODULE_BASE + 0x2000:X}", "int32", {"assembly": True, "assemblySize": 5})
+    assert result["success"], result
+    assert result["assembly"]
+    assert ce.stats()["requests"] == {"MEMORY_READ": 1}
+
+
+def test_batch_read_matches_memory(page_cache, ce):
+    space = ce.space
+    reads = [[f"0x{HEAP_BASE + 0x6000 + i * 8:X}", "int64"] for i in range(16)]
+    reads.append([f"0x{MODULE_BASE + 0x1000:X}", "bytes", 32])
+    result = memory_batch_read(reads)
+    assert result["success"], result
+    for i, item in enumerate(result["results"][:16]):
+        expected = struct.unpack("<q", space.read(HEAP_BASE + 0x6000 + i * 8, 8))[0]
+        assert item["value"] == expected
+    assert result["requestCount"] <= 2
+
+
+def test_write_invalidates_page_cache(page_cache):
+    address = f"0x{HEAP_BASE + 0x8000:X}"
+    memory_batch_read([[address, "bytes", util.PageCache.PAGE_SIZE]])
+    assert memory_write([[address, "int32", 1234]])["success"]
+    assert memory_read(address, "int32")["value"] == 1234
+    assert memory_write([[address, "int32", 5678]])["success"]
+    assert memory_batch_read([[address, "int32"]])["results"][0]["value"] == 5678
+
+
+def test_async_matches_sync(page_cache):
+    address = f"0x{MODULE_BASE + 0x3000:X}"
+    options = {"assembly": True, "assemblySize": 3}
+    reads = [[f"0x{HEAP_BASE + 0x9000 + i * 4:X}", "int32"] for i in range(8)]
+
+    async def run():
+        return await memory_read_async(address, "int32", dict(options)), await memory_batch_read_async(reads)
+
+    single, batch = asyncio.run(run())
+    assert single == memory_read(address, "int32", dict(options))
+    assert [item["value"] for item in batch["results"]] == \
+        [item["value"] for item in memory_batch_read(reads)["results"]]
+
+
+def test_unmapped_address_fails_without_crash(page_cache):
+    result = memory_read("0x10", "int32")
+    assert not result["success"]
+    assert result["error"]
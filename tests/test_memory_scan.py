@@ -0,0 +1,75 @@
+"""
+首次扫描/再次扫描
+"""
+import struct
+
+import pytest
+
+from benchmarks.mock_server import HEAP_BASE, MODULE_BASE
+from tools.memory_scan.tool import memory_first_scan, memory_next_scan, memory_scan_results, memory_scan_close
+
+# 堆中一块专用的扫描范围
+BASE = HEAP_BASE + 0x80000
+SIZE = 0x20000
+REGIONS = [[f"0x{BASE:X}", SIZE]]
+MARKER = 0x5EED1234
+
+
+@pytest.fixture
+def scan_area(ce):
+    ce.space.write(BASE, bytes(SIZE))
+    for i in range(5):
+        ce.space.write(BASE + 0x3000 * i + 0x40, struct.pack("<i", MARKER))
+    ce.space.write(BASE + 0x100, struct.pack("<f", 1.25))
+    yield ce
+    ce.space.write(BASE, bytes(SIZE))
+    memory_scan_close()
+
+
+def _addresses(result):
+    return [item["address"] for item in result["results"]]
+
+
+def test_first_and_next_scan_narrow_candidates(scan_area):
+    space = scan_area.space
+    first = memory_first_scan("int32", MARKER, {"regions": REGIONS})
+    assert first["success"], first
+    assert first["count"] == 5
+    assert _addresses(first) == [f"0x{BASE + 0x3000 * i + 0x40:X}" for i in range(5)]
+
+    space.write(BASE + 0x40, struct.pack("<i", MARKER - 1))
+    space.write(BASE + 0x3040, struct.pack("<i", MARKER + 1))
+    decreased = memory_next_scan(first["scanId"], "decreased")
+    assert decreased["success"], decreased
+    assert decreased["count"] == 1 and decreased["removed"] == 4
+    assert decreased["results"][0]["value"] == MARKER - 1
+
+    unchanged = memory_next_scan(first["scanId"], "unchanged")
+    assert unchanged["count"] == 1
+    assert memory_next_scan(first["scanId"], "exact", MARKER)["count"] == 0
+
+
+def test_range_float_and_unaligned(scan_area):
+    result = memory_first_scan("float", None, {"compare": "range", "min": 1.0, "max": 1.5, "regions": REGIONS})
+    assert result["count"] == 1 and result["results"][0]["value"] == 1.25
+    # 按类型大小对齐时找不到跨对齐边界的值，alignment为1时可以
+    scan_area.space.write(BASE + 0x201, struct.pack("<i", MARKER))
+    assert memory_first_scan("int32", MARKER, {"regions": REGIONS})["count"] == 5
+    assert memory_first_scan("int32", MARKER, {"regions": REGIONS, "alignment": 1})["count"] == 6
+
+
+def test_results_paging_and_close(scan_area):
+    first = memory_first_scan("int32", MARKER, {"regions": REGIONS, "sampleSize": 2})
+    assert len(first["results"]) == 2
+    page = memory_scan_results(first["scanId"], 3, 10)
+    assert page["count"] == 5 and len(page["results"]) == 2
+    assert memory_scan_close(first["scanId"])["closed"] == 1
+    assert not memory_next_scan(first["scanId"], "changed")["success"]
+
+
+def test_default_regions_on_ce_are_module_images(scan_area):
+    # CE后端未指定regions时只扫描模块映像，堆中的值找不到
+    result = memory_first_scan("int32", MARKER, {"maxCandidates": 1000})
+    assert result["success"], result
+    assert result["stats"]["scannedBytes"] == len(scan_area.space.module)
+    assert all(int(address, 16) >= MODULE_BASE for address in _addresses(result))
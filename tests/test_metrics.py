@@ -0,0 +1,46 @@
+"""
+CE通信指标的统计口径
+"""
+from benchmarks.mock_server import HEAP_BASE
+import util
+from tools.memory_tools.tool import memory_read, memory_batch_read
+
+
+def _metrics():
+    metrics = util.get_ce_metrics()
+    metrics.reset()
+    return metrics
+
+
+def test_read_paths_record_json_decode(ce):
+    memory_read(f"0x{HEAP_BASE:X}", "int32")
+    metrics = _metrics()
+    ce.reset_stats()
+    memory_read(f"0x{HEAP_BASE + 0x10:X}", "int32")
+    # string由CE解码，批量读取中走MEMORY_BATCH回退请求
+    memory_batch_read([[f"0x{HEAP_BASE + 0x20:X}", "string", 8], [f"0x{HEAP_BASE + 0x30:X}", "int32"]])
+    snapshot = metrics.snapshot()
+    requests = sum(item["requests"] for item in snapshot["packets"].values())
+    assert snapshot["jsonDecode"]["count"] == requests == sum(ce.stats()["requests"].values())
+
+
+def test_bytes_sent_matches_the_wire(ce):
+    memory_read(f"0x{HEAP_BASE:X}", "int32")
+    metrics = _metrics()
+    ce.reset_stats()
+    for i in range(5):
+        memory_read(f"0x{HEAP_BASE + 0x100 + i * 4:X}", "int32")
+    assert metrics.snapshot()["bytesSent"] == ce.stats()["bytesReceived"]
+
+
+def test_resend_after_broken_socket_counts_once(ce):
+    request_type = util.CESocketClient.PACKET_TYPE["MEMORY_READ"]
+    payload = '{"address": "0x%X", "dataType": "int32"}' % HEAP_BASE
+    with util.ce_client() as client:
+        size = len(client._pack_data(payload, request_type))
+        metrics = _metrics()
+        # 第一次发送失败后重连重发，只有成功发出的一次计入
+        client.socket.close()
+        response_type, content = client.request(request_type, payload)
+    assert content is not None
+    assert metrics.snapshot()["packets"]["MEMORY_READ"]["bytesSent"] == size
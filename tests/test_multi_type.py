@@ -0,0 +1,59 @@
+"""
+multiType和instructionMultiType的本地解码
+"""
+from benchmarks.mock_server import HEAP_BASE, MODULE_BASE
+import util
+from util import decode_multi_type, decode_value, encode_value
+from tools.memory_tools.tool import memory_read, memory_write
+
+
+def test_decode_multi_type_fields():
+    data = encode_value(-2, "int32") + bytes(60)
+    result = decode_multi_type(data)
+    assert result["int32"] == -2 and result["uint32"] == 0xFFFFFFFE
+    assert result["int8"] == -2 and result["uint16"] == 0xFFFE
+    assert result["string"] == "����"
+    # 字节不足的定长类型不出现在结果中
+    assert "double" not in decode_multi_type(b"\1\2\3\4")
+
+
+def test_string_uses_given_encoding():
+    data = "中文".encode("gbk") + b"\0"
+    assert decode_value(data, "string") != "中文"
+    assert decode_value(data, "string", encoding="gbk") == "中文"
+    assert decode_multi_type(data + bytes(60), encoding="gbk")["string"] == "中文"
+    assert encode_value("中文", "string", encoding="gbk") == "中文".encode("gbk")
+
+
+def test_ce_backend_uses_ansi_codepage(ce_config):
+    assert util.CEBackend().string_encoding == "gbk"
+    ce_config["ansi_codepage"] = "cp1252"
+    assert util.CEBackend().string_encoding == "cp1252"
+
+
+def _read_both(address, options, ce_config):
+    ce_config["local_multitype"] = True
+    local = memory_read(address, "int32", dict(options))
+    ce_config["local_multitype"] = False
+    util.get_disassembly_cache().invalidate()
+    remote = memory_read(address, "int32", dict(options))
+    return local, remote
+
+
+def test_local_multi_type_matches_server(ce, ce_config):
+    address = f"0x{HEAP_BASE + 0xA100:X}"
+    assert memory_write([[address, "string", "中文"]])["success"]
+    local, remote = _read_both(address, {"multiType": True}, ce_config)
+    assert local["multiType"]["string"] == "中文"
+    local["multiType"].pop("wstring")
+    assert local["multiType"] == remote["multiType"]
+
+
+def test_local_instruction_multi_type_matches_server(ce, ce_config):
+    address = f"0x{MODULE_BASE + 0x5000:X}"
+    local, remote = _read_both(address, {"assembly": True, "assemblySize": 4, "instructionMultiType": True},
+                               ce_config)
+    assert len(local["assembly"]) == len(remote["assembly"]) == 4
+    for mine, theirs in zip(local["assembly"], remote["assembly"]):
+        mine["multiType"].pop("wstring")
+        assert mine["multiType"] == theirs["multiType"]
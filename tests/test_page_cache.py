@@ -0,0 +1,137 @@
+"""
+页缓存的填充、有效期、淘汰和失效
+"""
+import time
+
+import pytest
+
+from util import PageCache, RegionMap
+
+PAGE = PageCache.PAGE_SIZE
+
+
+class FakeMemory:
+    """
+    按地址生成内容的内存，记录每次fetch读取的范围
+    """
+
+    def __init__(self, unreadable=()):
+        self.calls = []
+        self.unreadable = set(unreadable)
+
+    def data(self, address, size):
+        return bytes((address + i) & 0xFF for i in range(size))
+
+    def fetch(self, ranges):
+        self.calls.append(list(ranges))
+        datas = []
+        for address, size in ranges:
+            pages = range(address - address % PAGE, address + size, PAGE)
+            datas.append(None if self.unreadable.intersection(pages) else self.data(address, size))
+        return datas, 1
+
+
+def test_fill_then_hit():
+    cache, memory = PageCache(), FakeMemory()
+    ranges = [(0x10010, PAGE // 2), (0x10800, 16)]
+    datas, count = cache.read_many(ranges, memory.fetch)
+    assert datas == [memory.data(*r) for r in ranges]
+    assert count == 1 and memory.calls == [[(0x10000, PAGE)]]
+
+    datas, count = cache.read_many([(0x10020, 8)], memory.fetch)
+    assert datas == [memory.data(0x10020, 8)]
+    assert count == 0 and len(memory.calls) == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_small_miss_reads_exact_range_without_filling():
+    cache, memory = PageCache(), FakeMemory()
+    datas, count = cache.read_many([(0x20004, 4)], memory.fetch)
+    assert datas == [memory.data(0x20004, 4)]
+    assert memory.calls == [[(0x20004, 4)]]
+    assert cache.stats()["pages"] == 0
+    assert cache.peek(0x20004, 4) is None
+
+
+def test_large_read_bypasses_cache():
+    cache, memory = PageCache(), FakeMemory()
+    size = (PageCache.MAX_CACHED_READ_PAGES + 1) * PAGE
+    datas, _ = cache.read_many([(0x30000, size)], memory.fetch)
+    assert datas == [memory.data(0x30000, size)]
+    assert memory.calls == [[(0x30000, size)]]
+    assert cache.stats()["pages"] == 0
+
+
+def test_expired_pages_are_refetched():
+    cache, memory = PageCache(ttl=0.05), FakeMemory()
+    cache.read_many([(0x40000, PAGE)], memory.fetch)
+    assert cache.peek(0x40000, 8) == memory.data(0x40000, 8)
+    time.sleep(0.1)
+    assert cache.peek(0x40000, 8) is None
+    cache.read_many([(0x40000, PAGE)], memory.fetch)
+    assert len(memory.calls) == 2
+
+
+def test_read_only_regions_use_code_ttl():
+    region_map = RegionMap([
+        {"start": 0x50000, "end": 0x51000, "perms": "r-xp", "name": "code"},
+        {"start": 0x51000, "end": 0x52000, "perms": "rw-p", "name": "code"},
+    ], complete=True)
+    cache = PageCache(ttl=0.05, code_ttl=60)
+    memory = FakeMemory()
+    cache.read_many([(0x50000, PAGE), (0x51000, PAGE)], memory.fetch, region_map)
+    time.sleep(0.1)
+    assert cache.peek(0x50010, 4) == memory.data(0x50010, 4)
+    assert cache.peek(0x51010, 4) is None
+
+
+def test_lru_eviction():
+    cache, memory = PageCache(max_pages=2), FakeMemory()
+    for page in (0x60000, 0x61000):
+        cache.read_many([(page, PAGE)], memory.fetch)
+    # 访问第一页使其成为最近使用，第三页淘汰第二页
+    assert cache.peek(0x60000, 4) is not None
+    cache.read_many([(0x62000, PAGE)], memory.fetch)
+    stats = cache.stats()
+    assert stats["pages"] == 2 and stats["evictions"] == 1
+    assert cache.peek(0x60000, 4) is not None
+    assert cache.peek(0x61000, 4) is None
+    assert cache.peek(0x62000, 4) is not None
+
+
+def test_invalidate_range_and_all():
+    cache, memory = PageCache(), FakeMemory()
+    cache.read_many([(0x70000, 3 * PAGE)], memory.fetch)
+    assert cache.stats()["pages"] == 3
+    # 跨越页边界的写入使两页失效
+    assert cache.invalidate(0x70FFE, 4) == 2
+    assert cache.peek(0x70000, 4) is None
+    assert cache.peek(0x72000, 4) == memory.data(0x72000, 4)
+    assert cache.invalidate() == 1
+    assert cache.stats()["pages"] == 0
+
+
+def test_failed_page_fetch_falls_back_to_exact_range():
+    cache, memory = PageCache(), FakeMemory(unreadable={0x81000})
+    # 跨页读取中第二页不可读，整页读取失败后按原始范围重试
+    datas, count = cache.read_many([(0x80000, PAGE), (0x80F00, 0x200)], memory.fetch)
+    assert datas[0] == memory.data(0x80000, PAGE)
+    assert datas[1] is None
+    assert count == 2
+    assert memory.calls[1] == [(0x80F00, 0x200)]
+    assert cache.stats()["pages"] == 1
+
+
+@pytest.mark.parametrize("size", [1, PAGE - 1, PAGE, PAGE + 1])
+def test_read_many_async_matches_sync(size):
+    import asyncio
+
+    memory = FakeMemory()
+
+    async def fetch(ranges):
+        return memory.fetch(ranges)
+
+    cache = PageCache()
+    datas, _ = asyncio.run(cache.read_many_async([(0x90FF0, size)], fetch))
+    assert datas == [memory.data(0x90FF0, size)]
@@ -0,0 +1,42 @@
+"""
+工具共用的地址和参数解析
+"""
+import pytest
+
+from benchmarks.mock_server import MODULE_BASE, MODULE_NAME
+from util import parse_address, parse_json_arg, parse_options
+from tools.memory_tools.tool import format_address
+
+
+@pytest.mark.parametrize("address, expected", [
+    (0x1234, 0x1234),
+    ("1234", 0x1234),
+    ("0x1a2B", 0x1A2B),
+    ("$1A2B", 0x1A2B),
+    (" 0x1000 + 10 ", 0x1010),
+    ("DEADBEEF", 0xDEADBEEF),
+])
+def test_numeric_addresses(address, expected):
+    assert parse_address(address) == expected
+
+
+def test_module_addresses(ce):
+    assert parse_address(f"{MODULE_NAME}+1A2B") == MODULE_BASE + 0x1A2B
+    assert parse_address(MODULE_NAME.upper()) == MODULE_BASE
+    assert format_address(f"{MODULE_NAME}+10") == (f"0x{MODULE_BASE + 0x10:X}", MODULE_BASE + 0x10)
+    assert format_address("$7065f60") == ("0x7065F60", 0x7065F60)
+    with pytest.raises(ValueError, match="找不到模块"):
+        parse_address("missing.dll+10")
+    with pytest.raises(ValueError, match="无效的地址偏移"):
+        parse_address(f"{MODULE_NAME}+xyz")
+    with pytest.raises(ValueError):
+        parse_address("")
+
+
+def test_json_arguments():
+    assert parse_json_arg('[1, 2]') == [1, 2]
+    assert parse_json_arg(' {"a": 1}') == {"a": 1}
+    assert parse_json_arg("Player") == "Player"
+    assert parse_json_arg([3]) == [3]
+    assert parse_options(None) == {} and parse_options("") == {}
+    assert parse_options('{"count": 2}') == {"count": 2}
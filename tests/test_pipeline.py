@@ -0,0 +1,141 @@
+"""
+流水线模式：按请求ID分发乱序响应、超时放弃、断线和退化为逐个收发
+"""
+from concurrent.futures import ThreadPoolExecutor
+import json
+import struct
+import time
+
+import pytest
+
+from benchmarks.mock_server import MockCEServer, SyntheticAddressSpace, HEAP_BASE
+from util import CEConnectionPool, CEPipelinedClient, CESocketClient
+
+READ = CEPipelinedClient.PACKET_TYPE["MEMORY_READ"]
+
+
+@pytest.fixture(scope="module")
+def space():
+    return SyntheticAddressSpace(heap_size=1 << 20, exports=10)
+
+
+def _server(space, **kwargs):
+    return MockCEServer(space, **kwargs).start()
+
+
+def _request(address):
+    return json.dumps({"address": f"0x{address:X}", "dataType": "int32"})
+
+
+def _value(space, address):
+    return struct.unpack("<i", space.read(address, 4))[0]
+
+
+def test_out_of_order_responses_reach_their_callers(space):
+    # 服务端并发处理带ID的请求，随机延迟使响应乱序到达
+    server = _server(space, latency=0.01, jitter=0.03)
+    client = CEPipelinedClient(server.host, server.port, timeout=5)
+    try:
+        assert client.connect() and client.pipelined
+        addresses = [HEAP_BASE + 0x1000 * i + 8 for i in range(40)]
+        started = time.perf_counter()
+        responses = client.request_many([(READ, _request(address)) for address in addresses])
+        elapsed = time.perf_counter() - started
+        assert [json.loads(content)["value"] for _, content in responses] == \
+            [_value(space, address) for address in addresses]
+        # 40个请求同时在途，总耗时远小于逐个收发的0.4秒以上
+        assert elapsed < 0.3
+    finally:
+        client.disconnect()
+        server.stop()
+
+
+def test_falls_back_to_serial_exchange(space):
+    server = _server(space, tagged=False)
+    client = CEPipelinedClient(server.host, server.port, timeout=5)
+    try:
+        assert client.connect() and not client.pipelined
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            contents = list(executor.map(lambda i: client.request(READ, _request(HEAP_BASE + i * 4))[1], range(20)))
+        values = [json.loads(content)["value"] for content in contents]
+        assert values == [_value(space, HEAP_BASE + i * 4) for i in range(20)]
+    finally:
+        client.disconnect()
+        server.stop()
+
+
+def test_serial_fallback_uses_configured_retries(space, monkeypatch):
+    server = _server(space, tagged=False)
+    client = CEPipelinedClient(server.host, server.port, timeout=5, max_retries=5)
+    retries = []
+    exchange = CESocketClient._exchange
+
+    def record(self, packet_type, data, retry_count, binary):
+        retries.append(retry_count)
+        return exchange(self, packet_type, data, retry_count, binary)
+
+    monkeypatch.setattr(CESocketClient, "_exchange", record)
+    try:
+        assert client.connect() and not client.pipelined
+        client.submit(READ, _request(HEAP_BASE)).result()
+        client.request(READ, _request(HEAP_BASE), retry_count=0)
+        client.request_many_binary([(READ, _request(HEAP_BASE))], retry_count=1)
+        assert retries == [5, 0, 1]
+    finally:
+        client.disconnect()
+        server.stop()
+
+
+def test_timed_out_request_is_abandoned(space):
+    server = _server(space, latency=0.3)
+    client = CEPipelinedClient(server.host, server.port, timeout=5)
+    try:
+        assert client.connect() and client.pipelined
+        client.timeout = 0.1
+        assert client.request(READ, _request(HEAP_BASE), retry_count=0) == (None, None)
+        # 迟到的响应被读取线程丢弃，连接继续可用
+        client.timeout = 5
+        _, content = client.request(READ, _request(HEAP_BASE + 4))
+        assert json.loads(content)["value"] == _value(space, HEAP_BASE + 4)
+        assert client.is_alive() and not client._pending
+    finally:
+        client.disconnect()
+        server.stop()
+
+
+def test_disconnect_fails_in_flight_requests(space):
+    server = _server(space, latency=0.3)
+    client = CEPipelinedClient(server.host, server.port, timeout=5)
+    try:
+        assert client.connect()
+        futures = [client.submit(READ, _request(HEAP_BASE)) for _ in range(3)]
+        client.disconnect()
+        for future in futures:
+            with pytest.raises(ConnectionError):
+                future.result(timeout=1)
+        assert not client.is_alive()
+    finally:
+        server.stop()
+
+
+def test_pool_shares_one_pipelined_connection(space):
+    server = _server(space, latency=0.005)
+    pool = CEConnectionPool(server.host, server.port, timeout=5, pipelined=True)
+    try:
+        def work(i):
+            with pool.client() as client:
+                return client, json.loads(client.request(READ, _request(HEAP_BASE + i * 4))[1])["value"]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(work, range(32)))
+        assert len({id(client) for client, _ in results}) == 1
+        assert [value for _, value in results] == [_value(space, HEAP_BASE + i * 4) for i in range(32)]
+
+        # 共享连接断开后下一个借用方透明重建
+        shared = results[0][0]
+        shared.disconnect()
+        client, value = work(1)
+        assert client is not shared and value == _value(space, HEAP_BASE + 4)
+    finally:
+        pool.close()
+        server.stop()
@@ -0,0 +1,68 @@
+"""
+Python端指针扫描与重新扫描
+"""
+import struct
+
+import pytest
+
+from benchmarks.mock_server import HEAP_BASE, MODULE_BASE, MODULE_NAME
+import util
+from tools.pointer_scan import tool as pointer_scan_tool
+from tools.pointer_scan.tool import pointer_scan, pointer_rescan, scan_snapshot
+
+# .data中的静态槽 -> 对象A，A+0x18 -> 对象B，目标为B+0x24
+SLOT = 0xE0000
+OBJECT_A = HEAP_BASE + 0x70040
+OBJECT_B = HEAP_BASE + 0x71080
+TARGET = OBJECT_B + 0x24
+REGIONS = [[f"0x{MODULE_BASE + 0xC0000:X}", 0x40000], [f"0x{HEAP_BASE + 0x70000:X}", 0x10000]]
+
+
+@pytest.fixture
+def chain(ce):
+    ce.space.write(MODULE_BASE + SLOT, struct.pack("<Q", OBJECT_A))
+    ce.space.write(OBJECT_A + 0x18, struct.pack("<Q", OBJECT_B))
+    yield ce
+    ce.space.write(MODULE_BASE + SLOT, bytes(8))
+    ce.space.write(OBJECT_A + 0x18, bytes(8))
+
+
+def test_scan_finds_static_path(chain):
+    result = pointer_scan(f"0x{TARGET:X}", {"maxLevel": 3, "regions": REGIONS, "workers": 1})
+    assert result["success"], result
+    paths = {item["offsetsText"]: item for item in result["results"]}
+    expected = f"{MODULE_NAME}+{SLOT:X},18,24"
+    assert expected in paths
+    assert paths[expected]["baseAddress"] == f"0x{MODULE_BASE:X}"
+    assert result["stats"]["levels"][0]["targets"] == 1
+    # offsetFilter排除0x24时找不到
+    narrow = pointer_scan(f"0x{TARGET:X}", {"regions": REGIONS, "workers": 1, "offsetFilter": {"max": 0x20}})
+    assert expected not in {item["offsetsText"] for item in narrow["results"]}
+
+
+def test_rescan_filters_broken_paths(chain, tmp_path):
+    path = str(tmp_path / "paths.json")
+    result = pointer_scan(f"0x{TARGET:X}", {"regions": REGIONS, "workers": 1, "savePath": path})
+    assert result["success"] and result["results"]
+    kept = pointer_rescan(path, None, {"regions": REGIONS})
+    assert kept["success"] and kept["removed"] == 0
+
+    # 对象B重新分配到新地址后，用新目标重新扫描仍然有效
+    moved = HEAP_BASE + 0x72000
+    chain.space.write(OBJECT_A + 0x18, struct.pack("<Q", moved))
+    kept = pointer_rescan(path, f"0x{moved + 0x24:X}", {"regions": REGIONS})
+    assert f"{MODULE_NAME}+{SLOT:X},18,24" in {item["offsetsText"] for item in kept["results"]}
+
+    chain.space.write(MODULE_BASE + SLOT, bytes(8))
+    gone = pointer_rescan(path, None, {"regions": REGIONS})
+    assert gone["success"] and not gone["results"] and gone["removed"] == len(kept["results"])
+
+
+def test_parallel_search_matches_serial(chain, monkeypatch):
+    regions = [(int(start, 16), size) for start, size in REGIONS]
+    snapshot = util.take_memory_snapshot(regions=regions)
+    region_map = util.get_region_map()
+    serial, _ = scan_snapshot(snapshot, region_map, TARGET, workers=1)
+    monkeypatch.setattr(pointer_scan_tool, "POOL_MIN_TARGETS", 1)
+    parallel, _ = scan_snapshot(snapshot, region_map, TARGET, workers=2)
+    assert sorted(item["offsetsText"] for item in parallel) == sorted(item["offsetsText"] for item in serial)
@@ -0,0 +1,88 @@
+"""
+指针链批量解析
+"""
+import asyncio
+import struct
+
+import pytest
+
+from benchmarks.mock_server import HEAP_BASE, MODULE_BASE, MODULE_NAME
+import util
+from tools.pointer_tools.tool import pointer_chain_read_async
+from tools.memory_tools.tool import memory_write
+
+# .data区段中的两个指针槽，分别指向堆中的两个对象
+SLOT = 0xD0000
+TARGETS = (HEAP_BASE + 0x40000, HEAP_BASE + 0x50000)
+
+
+@pytest.fixture
+def chains(ce):
+    for i, target in enumerate(TARGETS):
+        ce.space.write(MODULE_BASE + SLOT + i * 8, struct.pack("<Q", target))
+        # 对象+0x10处是指向下一级的指针，下一级+0x4处是int32值
+        ce.space.write(target + 0x10, struct.pack("<Q", target + 0x800))
+        for j in range(8):
+            ce.space.write(target + 0x800 + 4 + j * 4, struct.pack("<i", i * 100 + j))
+    ce.space.write(MODULE_BASE + SLOT + 0x100, bytes(8))
+    ce.reset_stats()
+    return ce
+
+
+def _read(chains, data_type="int32", options=None):
+    return asyncio.run(pointer_chain_read_async(chains, data_type, options))
+
+
+def test_shared_prefixes_resolve_level_by_level(chains):
+    items = [f"{MODULE_NAME}+{SLOT + i * 8:X},10,{4 + j * 4:X}" for i in range(2) for j in range(8)]
+    result = _read(items)
+    assert result["success"], result
+    assert [item["value"] for item in result["results"]] == [i * 100 + j for i in range(2) for j in range(8)]
+    first = result["results"][0]
+    assert [step["address"] for step in first["addressChain"]] == \
+        [f"0x{MODULE_BASE:X}", f"0x{MODULE_BASE + SLOT:X}", f"0x{TARGETS[0] + 0x10:X}", f"0x{TARGETS[0] + 0x804:X}"]
+    # 两层指针各一次批量读取，最终值一次
+    assert result["requestCount"] == 3
+    assert sum(chains.stats()["requests"].get(name, 0) for name in ("MEMORY_READ", "MEMORY_BATCH")) == 3
+
+
+def test_dict_chains_and_errors(chains):
+    result = _read([
+        {"baseModule": MODULE_NAME, "offsets": [SLOT + 8, 0x10, 0x8], "dataType": "int64"},
+        {"chain": f"{MODULE_NAME}+{SLOT + 0x100:X},10"},
+        "missing.dll+10,8",
+    ])
+    first, null_pointer, missing = result["results"]
+    assert first["success"]
+    assert first["value"] == struct.unpack("<q", chains.space.read(TARGETS[1] + 0x808, 8))[0]
+    assert not null_pointer["success"] and "无法读取指针" in null_pointer["error"]
+    assert not missing["success"] and chains.stats()["requests"].get("POINTER_READ") == 1
+    assert not result["success"]
+
+
+def test_intermediate_pointers_are_cached(chains):
+    items = [f"{MODULE_NAME}+{SLOT:X},10,4"]
+    assert _read(items, options={"maxAge": 0})["requestCount"] == 3
+    assert _read(items, options={"maxAge": 60})["requestCount"] == 1
+    assert _read(items, options={"maxAge": 0})["requestCount"] == 3
+
+
+def test_writes_invalidate_cached_pointers(chains):
+    items = [f"{MODULE_NAME}+{SLOT:X},10,4"]
+    assert _read(items, options={"maxAge": 60})["results"][0]["value"] == 0
+    # 改写槽中的指针，缓存的旧指针值必须失效
+    result = memory_write([[f"0x{MODULE_BASE + SLOT:X}", "int64", TARGETS[1]]])
+    assert result["success"], result
+    assert _read(items, options={"maxAge": 60})["results"][0]["value"] == 100
+    util.get_pointer_cache().put_many({MODULE_BASE + SLOT: TARGETS[0]}, 8, 1e12)
+    util.set_memory_backend(util.CEBackend())
+    assert _read(items, options={"maxAge": 60})["results"][0]["value"] == 100
+
+
+def test_pointer_cache_invalidates_overlapping_ranges():
+    cache = util.PointerCache()
+    cache.put_many({0x1000: 1, 0x1008: 2, 0x1010: 3}, 8, 1e12)
+    assert cache.invalidate(0x100F, 1) == 1
+    assert cache.get_many([0x1000, 0x1008, 0x1010], 60) == {0x1000: 1, 0x1010: 3}
+    assert cache.invalidate(0xFFC, 8) == 1
+    assert cache.invalidate() == 1
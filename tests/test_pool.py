@@ -0,0 +1,99 @@
+"""
+CE连接池的复用、上限、失效连接和回收
+"""
+from concurrent.futures import ThreadPoolExecutor
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from benchmarks.mock_server import HEAP_BASE
+from util import CEConnectionPool, CESocketClient
+
+READ = CESocketClient.PACKET_TYPE["MEMORY_READ"]
+
+
+@pytest.fixture
+def pool(ce):
+    pool = CEConnectionPool(ce.host, ce.port, timeout=2, max_size=2, pipelined=False)
+    yield pool
+    pool.close()
+
+
+def _read(client, address=HEAP_BASE):
+    _, content = client.request(READ, json.dumps({"address": f"0x{address:X}", "dataType": "int32"}))
+    return json.loads(content)
+
+
+def test_connections_are_reused(pool):
+    with pool.client() as first:
+        assert _read(first)["success"]
+    with pool.client() as second:
+        assert second is first
+        assert _read(second)["success"]
+    assert pool.stats()["idle"] == 1 and pool.stats()["inUse"] == 0
+
+
+def test_pool_size_limits_borrowers(pool):
+    first, second = pool.acquire(), pool.acquire()
+    assert first is not second
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.1)
+
+    # 归还后等待中的调用方拿到被归还的连接
+    threading.Timer(0.1, pool.release, (second,)).start()
+    started = time.monotonic()
+    third = pool.acquire(timeout=2)
+    assert third is second and time.monotonic() - started < 1
+    pool.release(first)
+    pool.release(third)
+
+
+def test_concurrent_borrowers_share_the_limit(pool):
+    def work(i):
+        with pool.client() as client:
+            return _read(client, HEAP_BASE + i * 8)["success"]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert all(executor.map(work, range(40)))
+    assert pool.stats()["idle"] <= 2
+
+
+def test_failed_borrower_discards_the_connection(pool):
+    with pytest.raises(RuntimeError):
+        with pool.client() as broken:
+            raise RuntimeError("中途失败")
+    assert not broken.connected
+    with pool.client() as client:
+        assert client is not broken
+
+
+def test_dead_idle_connection_is_replaced(pool):
+    with pool.client() as client:
+        pass
+    client.socket.shutdown(socket.SHUT_RDWR)
+    with pool.client() as fresh:
+        assert fresh is not client
+        assert _read(fresh)["success"]
+
+
+def test_idle_connections_expire(ce):
+    pool = CEConnectionPool(ce.host, ce.port, timeout=2, max_size=2, idle_timeout=0.05, pipelined=False)
+    with pool.client() as client:
+        pass
+    time.sleep(0.1)
+    with pool.client() as fresh:
+        assert fresh is not client
+    assert not client.connected
+    pool.close()
+
+
+def test_closed_pool_rejects_borrowers(pool):
+    with pool.client() as client:
+        pass
+    pool.close()
+    assert not client.connected
+    with pytest.raises(RuntimeError):
+        pool.acquire()
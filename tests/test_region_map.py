@@ -0,0 +1,82 @@
+"""
+区域表的查找、解析和模块区段权限
+"""
+from benchmarks.mock_server import MODULE_BASE, MODULE_NAME, HEAP_BASE
+import util
+from util import ModuleSymbols, RegionMap
+
+REGIONS = [
+    {"start": 0x400000, "end": 0x401000, "perms": "r--p", "name": "game", "path": "/opt/game"},
+    {"start": 0x401000, "end": 0x405000, "perms": "r-xp", "name": "game", "path": "/opt/game"},
+    {"start": 0x405000, "end": 0x406000, "perms": "rw-p", "name": "game", "path": "/opt/game"},
+    {"start": 0x800000, "end": 0x900000, "perms": "rw-p", "name": "[heap]", "path": "[heap]"},
+    {"start": 0x7F0000000000, "end": 0x7F0000010000, "perms": "r-xp", "name": "libc.so.6", "path": "/lib/libc.so.6"},
+]
+
+
+def test_find_and_contains():
+    region_map = RegionMap(list(reversed(REGIONS)), complete=True)
+    assert region_map.find(0x400000)["perms"] == "r--p"
+    assert region_map.find(0x404FFF)["perms"] == "r-xp"
+    assert region_map.find(0x406000) is None
+    assert region_map.find(0x3FFFFF) is None
+    # 首尾相接的区域可以连续跨越，中间有空洞时不行
+    assert region_map.contains(0x400F00, 0x5100)
+    assert not region_map.contains(0x405F00, 0x200)
+    assert not region_map.contains(0x300000)
+
+
+def test_module_offset_uses_lowest_mapping_as_base():
+    region_map = RegionMap(REGIONS, complete=True)
+    assert region_map.module_offset(0x401234) == "game+1234"
+    assert region_map.module_offset(0x7F0000000010) == "libc.so.6+10"
+    assert region_map.module_offset(0x800010) is None
+
+
+def test_resolve_is_case_insensitive():
+    region_map = RegionMap(REGIONS, complete=True)
+    assert region_map.resolve("GAME", 0x10) == 0x400010
+    assert region_map.resolve("libc.so.6") == 0x7F0000000000
+    assert region_map.resolve("missing.dll") is None
+
+
+def test_update_reports_changes_and_keeps_unchanged_regions():
+    region_map = RegionMap(REGIONS, complete=True)
+    heap = region_map.find(0x800000)
+    regions = [dict(region) for region in REGIONS[:3]] + [REGIONS[3]]
+    regions.append({"start": 0xA00000, "end": 0xA01000, "perms": "rw-p", "name": "", "path": ""})
+    assert region_map.update(regions) == {"added": 1, "removed": 1}
+    assert region_map.find(0x800000) is heap
+    assert region_map.resolve("libc.so.6") is None
+    assert len(region_map) == 5
+
+
+def test_module_symbols_lookup_and_perms():
+    symbols = ModuleSymbols(
+        [(0x1000, "Start"), (0x1800, "Helper"), (0x3000, "GlobalTable")],
+        [(0x1000, 0x2000, ".text", "rx"), (0x3000, 0x4000, ".data", "rw")])
+    assert symbols.lookup(0x1000) == "Start"
+    assert symbols.lookup(0x17FF) == "Start+7FF"
+    assert symbols.lookup(0x1900) == "Helper+100"
+    # 区段之外或区段内没有导出符号时不标注
+    assert symbols.lookup(0x2800) is None
+    assert symbols.lookup(0x0800) is None
+    assert symbols.lookup(0x3010) == "GlobalTable+10"
+    assert symbols.perms(0x1FFF) == "rx"
+    assert symbols.perms(0x3000) == "rw"
+    assert symbols.perms(0x2000) is None
+    assert ModuleSymbols.from_json(symbols.to_json()).lookup(0x1900) == "Helper+100"
+
+
+def test_region_perms_from_ce_sections(ce):
+    space = ce.space
+    region_map = util.get_region_map()
+    assert region_map.resolve(MODULE_NAME.upper()) == MODULE_BASE
+    assert region_map.module_offset(MODULE_BASE + 0x1234) == f"{MODULE_NAME}+1234"
+
+    (_, text_start, _, _), (_, data_start, _, _) = space.sections
+    # 未加载符号表时不做I/O，权限未知
+    assert util.region_perms(region_map, MODULE_BASE + text_start) == ""
+    assert util.region_perms(region_map, MODULE_BASE + text_start, load=True) == "rx"
+    assert util.region_perms(region_map, MODULE_BASE + data_start) == "rw"
+    assert util.region_perms(region_map, HEAP_BASE) == ""
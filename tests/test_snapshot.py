@@ -0,0 +1,82 @@
+"""
+快照文件保存与比较
+"""
+import struct
+
+import pytest
+
+from benchmarks.mock_server import HEAP_BASE, MODULE_BASE
+from util import SNAPSHOT_CHUNK_SIZE
+from tools.snapshot.tool import SnapshotFile, memory_snapshot_save, memory_snapshot_diff
+
+BASE = HEAP_BASE + 0xC0000
+SIZE = 2 * SNAPSHOT_CHUNK_SIZE + 0x300
+OTHER = HEAP_BASE + 0xE0000
+
+
+@pytest.fixture
+def area(ce):
+    ce.space.write(BASE, bytes(SIZE))
+    yield ce
+    ce.space.write(BASE, bytes(SIZE))
+
+
+def test_save_round_trips_region_data(area, tmp_path):
+    area.space.write(BASE + 0x1234, b"snapshot")
+    path = str(tmp_path / "a.snap")
+    result = memory_snapshot_save(path, {"regions": [[f"0x{BASE:X}", SIZE], [f"0x{OTHER:X}", 0x100]]})
+    assert result["success"], result
+    assert result["regions"] == 2 and result["totalBytes"] == SIZE + 0x100
+    with SnapshotFile(path) as snapshot:
+        assert [(start, size) for start, size, _ in snapshot.regions] == [(BASE, SIZE), (OTHER, 0x100)]
+        # 区域数据按页对齐，可以直接映射为NumPy视图
+        assert all(offset % 4096 == 0 for _, _, offset in snapshot.regions)
+        assert snapshot.view(0).tobytes() == area.space.read(BASE, SIZE)
+        assert snapshot.read(BASE + 0x1234, 8) == b"snapshot"
+        assert snapshot.read(BASE + SIZE - 4, 8) is None
+
+
+def test_diff_reports_changed_ranges(area, tmp_path):
+    regions = {"regions": [[f"0x{BASE:X}", SIZE]]}
+    before, after = str(tmp_path / "before.snap"), str(tmp_path / "after.snap")
+    assert memory_snapshot_save(before, regions)["success"]
+    area.space.write(BASE + 0x10, struct.pack("<i", 100))
+    area.space.write(BASE + 0x18, b"\x01")
+    area.space.write(BASE + SNAPSHOT_CHUNK_SIZE - 2, b"\xFF" * 4)
+    assert memory_snapshot_save(after, regions)["success"]
+
+    diff = memory_snapshot_diff(before, after)
+    assert diff["success"], diff
+    assert [(item["address"], item["size"]) for item in diff["ranges"]] == \
+        [(f"0x{BASE + 0x10:X}", 1), (f"0x{BASE + 0x18:X}", 1), (f"0x{BASE + SNAPSHOT_CHUNK_SIZE - 2:X}", 4)]
+    assert diff["changedBytes"] == 6 and diff["comparedBytes"] == SIZE
+    assert diff["ranges"][2]["old"] == "00 00 00 00" and diff["ranges"][2]["new"] == "FF FF FF FF"
+
+    merged = memory_snapshot_diff(before, after, {"mergeGap": 8, "includeBytes": 0})
+    assert [(item["address"], item["size"]) for item in merged["ranges"]][0] == (f"0x{BASE + 0x10:X}", 9)
+    assert "old" not in merged["ranges"][0]
+
+
+def test_diff_lists_regions_only_in_one_snapshot(area, tmp_path):
+    a, b = str(tmp_path / "a.snap"), str(tmp_path / "b.snap")
+    assert memory_snapshot_save(a, {"regions": [[f"0x{BASE:X}", 0x2000]]})["success"]
+    assert memory_snapshot_save(b, {"regions": [[f"0x{BASE + 0x1000:X}", 0x2000]]})["success"]
+    diff = memory_snapshot_diff(a, b)
+    assert diff["comparedBytes"] == 0x1000
+    assert diff["onlyInA"] == [{"address": f"0x{BASE:X}", "size": 0x1000}]
+    assert diff["onlyInB"] == [{"address": f"0x{BASE + 0x2000:X}", "size": 0x1000}]
+
+
+def test_default_regions_on_ce_are_module_images(ce, tmp_path):
+    result = memory_snapshot_save(str(tmp_path / "modules.snap"))
+    assert result["success"], result
+    assert result["totalBytes"] == len(ce.space.module)
+    with SnapshotFile(str(tmp_path / "modules.snap")) as snapshot:
+        assert snapshot.regions[0][0] == MODULE_BASE
+
+
+def test_invalid_file(tmp_path):
+    path = tmp_path / "bad.snap"
+    path.write_bytes(b"not a snapshot" * 10)
+    result = memory_snapshot_diff(str(path), str(path))
+    assert not result["success"] and "不是有效的快照文件" in result["error"]
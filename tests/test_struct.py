@@ -0,0 +1,101 @@
+"""
+结构体定义与读取
+"""
+import asyncio
+import struct
+
+import pytest
+
+from benchmarks.mock_server import HEAP_BASE, MODULE_BASE, MODULE_NAME
+from tools.struct_tools.tool import struct_define, struct_read, struct_read_adapter
+
+BASE = HEAP_BASE + 0x100000
+WEAPONS = HEAP_BASE + 0x101000
+TABLE = HEAP_BASE + 0x102000
+STRIDE = 0x80
+
+DEFINITIONS = [
+    {"name": "Player", "size": "80", "fields": [
+        {"name": "hp", "offset": "0", "type": "int32"},
+        {"name": "pos", "offset": "8", "type": "float", "count": 3},
+        {"name": "name", "offset": "20", "type": "string", "size": 16},
+        {"name": "stats", "offset": "30", "type": "struct", "struct": "Stats"},
+        {"name": "weapon", "offset": "40", "type": "pointer", "target": "Weapon"},
+    ]},
+    {"name": "Stats", "fields": [{"name": "level", "offset": 0, "type": "uint16"},
+                                 {"name": "xp", "offset": 8, "type": "double"}]},
+    {"name": "Weapon", "fields": [{"name": "ammo", "offset": "8", "type": "int32"}]},
+]
+
+
+def _player(index):
+    data = bytearray(STRIDE)
+    struct.pack_into("<i4x3f", data, 0, 100 + index, index, index + 0.5, -1.0)
+    data[0x20:0x20 + 6] = f"玩家{index}".encode("gbk")
+    struct.pack_into("<Hxxxxxxd", data, 0x30, index, index * 1.5)
+    struct.pack_into("<Q", data, 0x40, WEAPONS + index * 0x10 if index % 2 == 0 else 0)
+    return bytes(data)
+
+
+@pytest.fixture
+def players(ce):
+    assert struct_define(DEFINITIONS)["success"]
+    for i in range(4):
+        ce.space.write(BASE + i * STRIDE, _player(i))
+        ce.space.write(WEAPONS + i * 0x10 + 8, struct.pack("<i", 30 + i))
+    ce.space.write(TABLE, struct.pack("<4Q", BASE + 3 * STRIDE, 0, BASE, BASE + 3 * STRIDE))
+    ce.reset_stats()
+    return ce
+
+
+def test_read_object_with_nested_struct_and_pointer(players):
+    result = struct_read(f"0x{BASE:X}", "Player")
+    assert result["success"], result
+    fields = result["items"][0]["fields"]
+    assert fields["hp"] == 100
+    assert fields["pos"] == [0.0, 0.5, -1.0]
+    assert fields["name"] == "玩家0"
+    assert fields["stats"] == {"level": 0, "xp": 0.0}
+    assert fields["weapon"] == {"address": f"0x{WEAPONS:X}", "fields": {"ammo": 30}}
+    # 对象一次读取，指针一层一次读取
+    assert result["requestCount"] == 2
+
+
+def test_array_of_objects_follows_pointers_in_one_batch(players):
+    result = struct_read(f"0x{BASE:X}", "Player", {"count": 4})
+    assert result["success"], result
+    assert [item["fields"]["hp"] for item in result["items"]] == [100, 101, 102, 103]
+    assert [item["fields"]["stats"]["xp"] for item in result["items"]] == [0.0, 1.5, 3.0, 4.5]
+    assert result["items"][1]["fields"]["weapon"] == "0x0"
+    assert result["items"][2]["fields"]["weapon"]["fields"]["ammo"] == 32
+    assert result["requestCount"] == 2
+    unfollowed = struct_read(f"0x{BASE:X}", "Player", {"count": 4, "depth": 0})
+    assert unfollowed["items"][2]["fields"]["weapon"] == f"0x{WEAPONS + 0x20:X}"
+    assert unfollowed["requestCount"] == 1
+
+
+def test_pointer_array_and_inline_definition(players):
+    result = struct_read(f"0x{TABLE:X}", "Player", {"count": 4, "pointerArray": True, "depth": 0})
+    assert result["success"], result
+    assert [(item["index"], item["fields"]["hp"]) for item in result["items"]] == [(0, 103), (2, 100), (3, 103)]
+    # 重复的指针只读取一次
+    assert result["requestCount"] == 2
+
+    inline = {"name": "Header", "fields": [{"name": "magic", "offset": 0, "type": "bytes", "size": 2}]}
+    header = struct_read(f"{MODULE_NAME}+0", inline)
+    assert header["success"], header
+    assert header["items"][0]["address"] == f"0x{MODULE_BASE:X}"
+
+
+def test_invalid_definitions_keep_previous(players):
+    result = struct_define({"name": "Player", "fields": [{"name": "x", "offset": 0, "type": "struct", "struct": "Nope"}]})
+    assert not result["success"]
+    assert struct_read(f"0x{BASE:X}", "Player")["items"][0]["fields"]["hp"] == 100
+    assert not struct_read(f"0x{BASE:X}", "Unknown")["success"]
+
+
+def test_adapter_runs_in_executor(players):
+    async def run():
+        return await asyncio.gather(*(struct_read_adapter(f"0x{BASE + i * STRIDE:X}", "Player") for i in range(4)))
+
+    assert [result["items"][0]["fields"]["hp"] for result in asyncio.run(run())] == [100, 101, 102, 103]
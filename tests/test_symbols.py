@@ -0,0 +1,119 @@
+"""
+符号索引: 从ENUM_MODULES构建一次、按模块路径+大小持久化、标注memory_read的值和跳转目标
+"""
+import struct
+
+import pytest
+
+import util
+from benchmarks.mock_server import MODULE_BASE, MODULE_NAME, HEAP_BASE
+from tools.memory_tools.tool import memory_read
+
+BASE = HEAP_BASE + 0x130000
+
+
+@pytest.fixture
+def symbols(ce):
+    ce.space.write(BASE, bytes(0x100))
+    # 先加载区域表，之后的ENUM_MODULES只来自符号索引
+    util.get_region_map()
+    ce.reset_stats()
+    yield ce
+    ce.space.write(BASE, bytes(0x100))
+
+
+def test_index_is_built_once(symbols):
+    space = symbols.space
+    name, offset = space.exports[3]
+    index = util.get_symbol_index()
+    region_map = util.get_region_map()
+
+    assert index.symbolize(MODULE_BASE + offset, region_map) == f"{MODULE_NAME}!{name}"
+    assert index.symbolize(MODULE_BASE + offset + 0x1A, region_map) == f"{MODULE_NAME}!{name}+1A"
+    assert symbols.stats()["requests"] == {"ENUM_MODULES": 1}
+
+    for i in range(50):
+        name, offset = space.exports[i]
+        assert index.symbolize(MODULE_BASE + offset + 1, region_map) == f"{MODULE_NAME}!{name}+1"
+    assert symbols.stats()["requests"] == {"ENUM_MODULES": 1}
+    stats = index.stats()
+    assert stats["modules"] == 1
+    assert stats["exports"] == len(space.exports)
+    assert stats["fetches"] == 1
+
+
+def test_addresses_outside_exports(symbols):
+    index = util.get_symbol_index()
+    region_map = util.get_region_map()
+    # 模块头部在第一个导出符号之前，.data区段没有导出符号，堆不属于任何模块
+    assert index.symbolize(MODULE_BASE + 0x10, region_map) is None
+    assert index.symbolize(MODULE_BASE + 0xC0010, region_map) is None
+    assert index.symbolize(HEAP_BASE + 0x10, region_map) is None
+    assert index.section_perms(MODULE_BASE + 0x1000, region_map) == "rx"
+    assert index.section_perms(MODULE_BASE + 0xC0010, region_map) == "rw"
+
+
+def test_disk_cache_survives_restart(symbols, ce_config):
+    name, offset = symbols.space.exports[7]
+    region_map = util.get_region_map()
+    util.get_symbol_index().symbolize(MODULE_BASE + offset, region_map)
+
+    # 新进程: 从磁盘读取符号表，不再向CE枚举
+    restarted = util.SymbolIndex(ce_config["symbol_cache_dir"])
+    symbols.reset_stats()
+    assert restarted.symbolize(MODULE_BASE + offset + 4, region_map) == f"{MODULE_NAME}!{name}+4"
+    assert symbols.stats()["requests"] == {}
+    assert restarted.stats()["fileLoads"] == 1
+    assert restarted.stats()["fetches"] == 0
+
+
+def test_disk_cache_is_keyed_by_path_and_size(symbols, ce_config):
+    region_map = util.get_region_map()
+    util.get_symbol_index().symbolize(MODULE_BASE + 0x1000, region_map)
+
+    region = dict(region_map.find(MODULE_BASE + 0x1000))
+    index = util.SymbolIndex(ce_config["symbol_cache_dir"])
+    assert index._load_file(index._module_key(region)) is not None
+    region["end"] += 0x1000
+    assert index._load_file(index._module_key(region)) is None
+    region = dict(region_map.find(MODULE_BASE + 0x1000), path="C:\\Other\\game.exe")
+    assert index._load_file(index._module_key(region)) is None
+
+
+def test_failed_fetch_is_not_retried(symbols, monkeypatch):
+    index = util.SymbolIndex(None)
+    region_map = util.get_region_map()
+    calls = []
+
+    def fail(name):
+        calls.append(name)
+        raise ConnectionError("断开")
+
+    monkeypatch.setattr(util.get_memory_backend(), "module_symbols", fail)
+    assert index.symbolize(MODULE_BASE + 0x1000, region_map) is None
+    assert index.is_loaded(MODULE_BASE + 0x1000, region_map)
+    assert index.symbolize(MODULE_BASE + 0x1000, region_map) is None
+    assert calls == [MODULE_NAME]
+
+
+def test_memory_read_annotates_value(symbols):
+    name, offset = symbols.space.exports[11]
+    symbols.space.write(BASE, struct.pack("<Q", MODULE_BASE + offset + 0x20))
+
+    result = memory_read(f"0x{BASE:X}", "int64")
+    assert result["success"], result
+    assert result["symbol"] == f"{MODULE_NAME}!{name}+20"
+
+    plain = memory_read(f"0x{BASE:X}", "int64", {"symbols": False})
+    assert "symbol" not in plain
+
+
+def test_memory_read_annotates_call_targets(symbols):
+    space = symbols.space
+    # .text中每隔64字节有一条call，目标位于导出符号之间
+    result = memory_read(f"0x{MODULE_BASE + 0x1000:X}", "int32", {"assembly": True, "assemblySize": 5})
+    assert result["success"], result
+    instruction = result["assembly"][0]
+    target = MODULE_BASE + 0x1005 + struct.unpack("<i", space.read(MODULE_BASE + 0x1001, 4))[0]
+    assert instruction["symbol"] == util.get_symbol_index().symbolize(target, util.get_region_map())
+    assert instruction["symbol"].startswith(f"{MODULE_NAME}!Export")
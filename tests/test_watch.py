@@ -0,0 +1,77 @@
+"""
+地址监视: 后台轮询、变化记录和游标
+"""
+import struct
+import time
+
+import pytest
+
+from benchmarks.mock_server import HEAP_BASE, MODULE_BASE, MODULE_NAME
+from tools.watch import tool as watch_tool
+from tools.watch.tool import Watch, watch_add, watch_changes, watch_list, watch_remove
+
+BASE = HEAP_BASE + 0xF0000
+FAST = {"minInterval": 0.01, "maxInterval": 0.05}
+
+
+@pytest.fixture
+def watched(ce):
+    ce.space.write(BASE, bytes(0x100))
+    yield ce
+    watch_remove()
+    deadline = time.time() + 2
+    while watch_tool._poller is not None and time.time() < deadline:
+        time.sleep(0.01)
+    ce.space.write(BASE, bytes(0x100))
+
+
+def test_changes_after_cursor(watched):
+    added = watch_add([{"address": f"0x{BASE:X}", "dataType": "int32", "label": "hp"},
+                       {"address": f"0x{BASE + 8:X}", "dataType": "float"}], FAST)
+    assert added["success"], added
+    first = watch_changes(added["cursor"], None, 2)
+    initial = {change["watchId"]: change["value"] for change in first["changes"]}
+    assert initial == {added["watchIds"][0]: 0, added["watchIds"][1]: 0.0}
+
+    watched.space.write(BASE, struct.pack("<i", 42))
+    cursor = first["cursor"]
+    changes = watch_changes(cursor, None, 2)
+    assert [(change["label"], change["value"]) for change in changes["changes"]] == [("hp", 42)]
+    assert changes["cursor"] > cursor
+    assert watch_changes(changes["cursor"])["changes"] == []
+    # 只查询另一个监视
+    assert watch_changes(0, [added["watchIds"][1]])["changes"][0]["value"] == 0.0
+
+
+def test_due_watches_share_one_read(watched):
+    added = watch_add([{"address": f"0x{BASE + i * 4:X}"} for i in range(16)], FAST)
+    watch_changes(added["cursor"], None, 2)
+    time.sleep(0.3)
+    watched.reset_stats()
+    time.sleep(0.3)
+    requests = watched.stats()["requests"]
+    polls = sum(watch["polls"] for watch in watch_list()["watches"])
+    reads = requests.get("MEMORY_BATCH", 0) + requests.get("MEMORY_READ", 0)
+    # 16个监视的轮询被合并，读取次数远少于单独轮询
+    assert 0 < reads * 8 <= polls
+
+
+def test_module_address_and_removal(watched):
+    added = watch_add({"address": f"{MODULE_NAME}+2000", "dataType": "bytes", "size": 4}, FAST)
+    assert added["success"], added
+    listed = watch_list()["watches"]
+    assert listed[0]["address"] == f"0x{MODULE_BASE + 0x2000:X}"
+    assert watch_remove(added["watchIds"])["removed"] == 1
+    assert not watch_add([{"address": "missing.dll+10"}])["success"]
+
+
+def test_unchanged_values_back_off_and_history_overflows():
+    watch = Watch(1, 0, "int32", 4, None, 0.01, 0.1, history=3)
+    for seq in range(1, 20):
+        watch.record(seq, seq, b"\0\0\0\0")
+    assert watch.interval == 0.1 and watch.changes == 1
+    for seq in range(20, 25):
+        watch.record(seq, seq, struct.pack("<i", seq))
+    assert watch.interval == 0.01
+    assert [seq for seq, _, _ in watch.samples] == [22, 23, 24]
+    assert watch.dropped_seq == 21
@@ -0,0 +1,3 @@
+"""
+特征码扫描工具
+"""
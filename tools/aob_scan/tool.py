@@ -0,0 +1,354 @@
+"""
+特征码扫描工具
+
+在Python端扫描字节特征码(AOB)，支持??通配符和半字节通配符(例如4?)。
+每个特征码编译为以一个固定字节为锚点的正则表达式，其余字节由定长断言校验；
+一次读取内存即可同时匹配整套特征码，内存较大时分块交给进程池并行匹配
+"""
+from util import logger, get_memory_backend, get_region_map, SNAPSHOT_CHUNK_SIZE, parse_address, parse_options
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Union, Any, Optional
+import asyncio
+import json
+import os
+import re
+import time
+
+
+TOOL_DESCRIPTION = """
+    特征码(AOB)扫描：在目标进程内存中查找一个或多个字节模式
+
+    整套特征码只需要遍历一次内存，特征码越多越划算。
+
+    参数:
+    - patterns: 特征码，可以是：
+      - 单个字符串 "48 8B ?? ?? 89"(??或?为通配符，4?或?8为半字节通配符)
+      - 字符串列表 ["48 8B 05 ?? ?? ?? ??", "E8 ?? ?? ?? ?? 84 C0"]
+      - 名称到特征码的字典 {"playerBase": "48 8B 05 ?? ?? ?? ??", ...}
+    - options: 可选参数：
+      - modules: 只扫描这些模块，例如["game.exe"]
+      - regions: 扫描范围[[起始地址, 长度], ...]
+      - writable: true只扫描可写区域，false只扫描不可写区域(默认不限)
+      - executable: true只扫描可执行区域，false只扫描不可执行区域(默认不限)
+      - maxResults: 每个特征码最多返回的结果数(默认100)
+      - workers: 并行进程数(默认CPU核数)
+
+    用法示例:
+    aob_scan({"hpWrite": "89 83 ?? ?? 00 00 8B 45", "camera": "F3 0F 10 05 ?? ?? ?? ??"}, {"modules": ["game.exe"]})
+
+    返回:
+    - results: 每个特征码一项，包含name、pattern、count、matches(address、module)
+    - stats: 扫描字节数、耗时
+
+    注意: CE后端不提供内存权限信息，writable/executable过滤只对本地后端生效
+"""
+
+# 每批读取的块数(每块SNAPSHOT_CHUNK_SIZE字节)，也是分发给进程池的单位
+AOB_BATCH_CHUNKS = 64
+# 扫描总量达到该值时才使用进程池，内存较小时进程间传输的开销大于匹配
+AOB_POOL_MIN_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_RESULTS = 100
+
+
+def compile_pattern(text: str) -> tuple:
+    """
+    将特征码字符串编译为(值, 掩码)字节序列
+
+    Args:
+        text: 以空格分隔的十六进制字节，??或?为通配符，4?或?8为半字节通配符
+
+    Returns:
+        tuple: (值bytes, 掩码bytes)，掩码为0的位不参与比较
+    """
+    values, masks = bytearray(), bytearray()
+    for token in text.split():
+        token = token.upper()
+        if token in ("?", "??"):
+            values.append(0)
+            masks.append(0)
+            continue
+        if len(token) != 2 or any(char not in "0123456789ABCDEF?" for char in token):
+            raise ValueError(f"无效的特征码字节: {token}")
+        high, low = token
+        mask = (0xF0 if high != "?" else 0) | (0x0F if low != "?" else 0)
+        value = int(token.replace("?", "0"), 16)
+        values.append(value & mask)
+        masks.append(mask)
+    if not any(masks):
+        raise ValueError(f"特征码不能全部为通配符: {text}")
+    return bytes(values), bytes(masks)
+
+
+# x86代码和填充数据中最常见的字节，选择锚点时尽量避开
+COMMON_BYTES = frozenset(b"\x00\xff\xcc\x90\x48\x8b\x89\x0f\xe8\x4c\x24\x83\x01")
+
+
+def _byte_regex(value: int, mask: int) -> bytes:
+    if mask == 0xFF:
+        return b"\\x%02x" % value
+    if mask == 0:
+        return b"."
+    return b"[" + b"".join(b"\\x%02x" % byte for byte in range(256) if byte & mask == value) + b"]"
+
+
+class AobMatcher:
+    """
+    一组特征码的匹配器
+
+    每个特征码编译为一个正则表达式：只消耗一个较少见的完整固定字节作为锚点，
+    其前后的字节用定长的后顾/前瞻断言校验，匹配循环和校验都在re的C实现中完成，
+    重叠的匹配也不会遗漏
+    """
+
+    def __init__(self, patterns: List[str]):
+        """
+        @param {list} patterns - 特征码字符串列表
+        """
+        self.lengths = []
+        # (编译后的正则, 锚点在特征码中的偏移)
+        self.regexes = []
+        for text in patterns:
+            values, masks = compile_pattern(text)
+            tokens = [_byte_regex(value, mask) for value, mask in zip(values, masks)]
+            fixed = [offset for offset, mask in enumerate(masks) if mask == 0xFF]
+            if fixed:
+                rare = [offset for offset in fixed if values[offset] not in COMMON_BYTES]
+                anchor = (rare or fixed)[0]
+                regex = tokens[anchor]
+                if anchor + 1 < len(tokens):
+                    regex += b"(?=" + b"".join(tokens[anchor + 1:]) + b")"
+                if anchor:
+                    regex += b"(?<=" + b"".join(tokens[:anchor + 1]) + b")"
+            else:
+                # 没有完整固定字节时只能逐个位置尝试
+                anchor = 0
+                regex = b"(?=" + b"".join(tokens) + b")"
+            self.regexes.append((re.compile(regex, re.S), anchor))
+            self.lengths.append(len(values))
+        self.max_length = max(self.lengths) if self.lengths else 0
+
+    def scan(self, buffer: bytes, base: int, skip: int = 0) -> List[tuple]:
+        """
+        在一段缓冲区中匹配全部特征码
+
+        Args:
+            buffer: 内存数据
+            base: 缓冲区起始地址
+            skip: 缓冲区开头与上一块重叠的字节数，完全落在其中的匹配已由上一块报告
+
+        Returns:
+            list: (特征码下标, 匹配地址)列表
+        """
+        matches = []
+        for index, (regex, anchor) in enumerate(self.regexes):
+            length = self.lengths[index]
+            for match in regex.finditer(buffer):
+                start = match.start() - anchor
+                if start + length > skip:
+                    matches.append((index, base + start))
+        return matches
+
+
+# 进程池工作进程中的匹配器，由_init_worker设置
+_worker_matcher: Optional[AobMatcher] = None
+
+
+def _init_worker(patterns: List[str]) -> None:
+    global _worker_matcher
+    _worker_matcher = AobMatcher(patterns)
+
+
+def _scan_worker(buffers: List[tuple]) -> List[tuple]:
+    matches = []
+    for base, data, skip in buffers:
+        matches.extend(_worker_matcher.scan(data, base, skip))
+    return matches
+
+
+def _select_regions(options: Dict) -> List[tuple]:
+    """
+    根据选项选择扫描范围
+
+    Returns:
+        list: (起始地址, 长度)列表
+    """
+    if options.get("regions"):
+        return [(parse_address(start), int(size)) for start, size in options["regions"]]
+
+    modules = {name.lower() for name in options.get("modules") or []}
+    writable = options.get("writable")
+    executable = options.get("executable")
+    regions = []
+    for region in get_memory_backend().regions():
+        if modules and (region.get("name") or "").lower() not in modules:
+            continue
+        perms = region.get("perms", "")
+        if perms:
+            if "r" not in perms:
+                continue
+            if writable is not None and ("w" in perms) != bool(writable):
+                continue
+            if executable is not None and ("x" in perms) != bool(executable):
+                continue
+        if region.get("path") in ("[vvar]", "[vsyscall]"):
+            continue
+        regions.append((region["start"], region["end"] - region["start"]))
+    if modules and not regions:
+        raise ValueError(f"未找到模块: {', '.join(options['modules'])}")
+    return regions
+
+
+def scan_regions(patterns: List[str], regions: List[tuple], workers: Optional[int] = None) -> tuple:
+    """
+    一次遍历内存匹配一组特征码
+
+    Args:
+        patterns: 特征码字符串列表
+        regions: (起始地址, 长度)列表
+        workers: 并行进程数
+
+    Returns:
+        tuple: (每个特征码的匹配地址列表, 扫描字节数)
+    """
+    matcher = AobMatcher(patterns)
+    backend = get_memory_backend()
+    carry = matcher.max_length - 1
+
+    chunks = []
+    for start, size in sorted(regions):
+        for offset in range(0, size, SNAPSHOT_CHUNK_SIZE):
+            chunks.append((start + offset, min(SNAPSHOT_CHUNK_SIZE, size - offset)))
+    total = sum(size for _, size in chunks)
+
+    workers = workers or os.cpu_count() or 1
+    pool = None
+    if workers > 1 and total >= AOB_POOL_MIN_BYTES:
+        pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(patterns,))
+
+    matches: List[tuple] = []
+    futures = []
+    scanned = 0
+    tail, tail_end = b"", None
+    try:
+        for batch_start in range(0, len(chunks), AOB_BATCH_CHUNKS):
+            batch = chunks[batch_start:batch_start + AOB_BATCH_CHUNKS]
+            datas, _ = backend.read_many(batch)
+            buffers = []
+            for (start, size), data in zip(batch, datas):
+                if data is None:
+                    tail, tail_end = b"", None
+                    continue
+                scanned += len(data)
+                # 与上一块相邻时带上它的末尾，跨越块边界的匹配不会遗漏
+                prefix = tail if start == tail_end else b""
+                buffers.append((start - len(prefix), prefix + data if prefix else data, len(prefix)))
+                tail, tail_end = (data[-carry:] if carry else b""), start + size
+
+            if pool is None:
+                for base, data, skip in buffers:
+                    matches.extend(matcher.scan(data, base, skip))
+                continue
+            # 读取下一批的同时由进程池匹配当前批，限制在途批数以控制内存
+            futures.append(pool.submit(_scan_worker, buffers))
+            if len(futures) >= workers * 2:
+                matches.extend(futures.pop(0).result())
+        for future in futures:
+            matches.extend(future.result())
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    found: List[List[int]] = [[] for _ in patterns]
+    for index, address in matches:
+        found[index].append(address)
+    return [sorted(addresses) for addresses in found], scanned
+
+
+def _parse_patterns(patterns: Union[str, List[str], Dict[str, str]]) -> tuple:
+    """
+    Returns:
+        tuple: (名称列表, 特征码列表)
+    """
+    if isinstance(patterns, str):
+        text = patterns.strip()
+        if text.startswith(("[", "{")):
+            patterns = json.loads(text)
+        else:
+            return [None], [text]
+    if isinstance(patterns, dict):
+        return list(patterns.keys()), list(patterns.values())
+    return [None] * len(patterns), list(patterns)
+
+
+def aob_scan(patterns: Union[str, List[str], Dict[str, str]],
+             options: Optional[Union[Dict, str]] = None) -> Dict[str, Any]:
+    """
+    扫描一组特征码
+
+    Args:
+        patterns: 特征码，见TOOL_DESCRIPTION
+        options: 可选参数
+
+    Returns:
+        Dict: 每个特征码的匹配结果
+    """
+    result = {"success": False, "results": [], "stats": None, "error": None}
+
+    try:
+        options = parse_options(options)
+        names, texts = _parse_patterns(patterns)
+        if not texts:
+            raise ValueError("缺少特征码")
+        max_results = int(options.get("maxResults", DEFAULT_MAX_RESULTS))
+
+        started = time.time()
+        found, scanned = scan_regions(texts, _select_regions(options), options.get("workers"))
+
+        region_map = get_region_map()
+        for name, text, addresses in zip(names, texts, found):
+            result["results"].append({
+                "name": name,
+                "pattern": text,
+                "count": len(addresses),
+                "matches": [
+                    {"address": f"0x{address:X}", "module": region_map.module_offset(address)}
+                    for address in addresses[:max_results]
+                ]
+            })
+        result["success"] = True
+        result["stats"] = {
+            "patterns": len(texts),
+            "scannedBytes": scanned,
+            "elapsed": round(time.time() - started, 3)
+        }
+        logger.info("特征码扫描完成: %s个特征码, 扫描%s字节, 耗时%s秒", len(texts), scanned, result['stats']['elapsed'])
+    except Exception as e:
+        logger.error("特征码扫描失败: %s", e)
+        result["error"] = f"特征码扫描失败: {str(e)}"
+
+    return result
+
+
+# 为MCP创建适配器函数，扫描在线程池中执行，不阻塞事件循环
+async def aob_scan_adapter(patterns=None, options=None):
+    """
+    为MCP适配的aob_scan包装器
+
+    Args:
+        patterns: 特征码
+        options: 可选参数
+
+    Returns:
+        Dict: aob_scan的返回结果
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, aob_scan, patterns, options)
+
+
+def register_tool(mcp):
+    """
+    向MCP注册工具
+
+    Args:
+        mcp: MCP实例
+    """
+    mcp.tool(name="aob_scan", description=TOOL_DESCRIPTION)(aob_scan_adapter)
@@ -3,7 +3,7 @@ CheatEngine连接测试工具
 
 用于测试CheatEngine连接是否正常工作
 """
-from util import logger, create_ce_client, cheatEngine_config
+from util import logger, ce_client, cheatEngine_config, get_async_ce_client
 
 
 TOOL_DESCRIPTION = """
@@ -19,29 +19,44 @@ def ce_connect() -> str:
         str: 连接状态信息
     """
     try:
-        # 创建CE客户端
-        client = create_ce_client(
-            host=cheatEngine_config["host"], 
-            port=cheatEngine_config["port"],
-            auto_connect=True
-        )
+        # 从连接池借用CE客户端，检测完成后归还供其他工具复用
+        with ce_client() as client:
+            # 检查服务器状态
+            if client.connected:
+                # 进一步测试连接是否响应
+                if client.check_server(timeout=3):
+                    return f"已成功连接到CheatEngine服务器 {client.host}:{client.port}，连接正常"
+                else:
+                    return f"已连接到CheatEngine服务器 {client.host}:{client.port}，但服务器无响应"
+            else:
+                return f"无法连接到CheatEngine服务器 {cheatEngine_config['host']}:{cheatEngine_config['port']}"
+    except Exception as e:
+        logger.error("连接CheatEngine服务器时发生错误: %s", e)
+        return f"连接CheatEngine服务器时发生错误: {str(e)}"
+
+
+async def ce_connect_async() -> str:
+    """
+    ce_connect的asyncio版本，检测期间不阻塞事件循环
+    
+    Returns:
+        str: 连接状态信息
+    """
+    try:
+        client = await get_async_ce_client()
         
         # 检查服务器状态
         if client.connected:
             # 进一步测试连接是否响应
-            if client.check_server(timeout=3):
+            if await client.check_server(timeout=3):
                 return f"已成功连接到CheatEngine服务器 {client.host}:{client.port}，连接正常"
             else:
                 return f"已连接到CheatEngine服务器 {client.host}:{client.port}，但服务器无响应"
         else:
             return f"无法连接到CheatEngine服务器 {cheatEngine_config['host']}:{cheatEngine_config['port']}"
     except Exception as e:
-        logger.error(f"连接CheatEngine服务器时发生错误: {str(e)}")
+        logger.error("连接CheatEngine服务器时发生错误: %s", e)
         return f"连接CheatEngine服务器时发生错误: {str(e)}"
-    finally:
-        # 确保断开连接
-        if 'client' in locals() and client.connected:
-            client.disconnect()
 
 
 def register_tool(mcp):
@@ -51,4 +66,5 @@ def register_tool(mcp):
     Args:
         mcp: MCP实例
     """
-    mcp.tool(description=TOOL_DESCRIPTION)(ce_connect) 
\ No newline at end of file
+    # 注册异步版本，工具名保持为ce_connect
+    mcp.tool(name="ce_connect", description=TOOL_DESCRIPTION)(ce_connect_async)
\ No newline at end of file
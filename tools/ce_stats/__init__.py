@@ -0,0 +1,3 @@
+"""
+运行指标工具
+"""
\ No newline at end of file
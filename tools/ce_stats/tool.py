@@ -0,0 +1,83 @@
+"""
+运行指标工具
+
+查看CE通信和工具调用的运行指标：每种数据包的往返延迟、收发字节数、连接与重连、
+接收超时与重试、JSON解码耗时、各工具的调用耗时以及缓存命中率
+"""
+from util import (
+    logger, cheatEngine_config, get_ce_metrics, collect_ce_stats, write_prometheus_metrics, start_metrics_writer
+)
+from typing import Dict, Any, Optional
+
+
+TOOL_DESCRIPTION = """
+    查看CheatEngine通信和工具调用的运行指标
+    
+    延迟以直方图统计，返回count、avgMs、p50Ms、p90Ms、p99Ms、maxMs，分位数按直方图桶的上限估算。
+    配置metrics_file后，每metrics_interval秒(默认15)自动写出一次Prometheus文本格式的指标文件。
+    
+    参数:
+    - action: 操作(stats: 查看指标，reset: 清零指标，dump: 写出Prometheus文本格式文件)，默认stats
+    - path: dump的目标文件路径，默认使用配置metrics_file
+    
+    用法示例:
+    ce_stats()
+    ce_stats("dump", "/var/lib/node_exporter/ce.prom")
+    ce_stats("reset")
+    
+    返回:
+    - packets: 按数据包类型统计的请求数、失败数、往返延迟(rtt)、发送和接收字节数
+    - connection: 连接数、连接失败数、重连数、接收超时数、超时重试数
+    - jsonDecode: JSON响应解码耗时和字节数
+    - tools: 每个工具的调用数、失败数和耗时
+    - caches: 页缓存、反汇编缓存、符号索引和Lua脚本缓存的命中统计
+    - pool: 连接池状态
+"""
+
+
+def ce_stats(action: str = "stats", path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    查看、清零或写出运行指标
+    
+    Args:
+        action: stats/reset/dump
+        path: dump的目标文件路径
+        
+    Returns:
+        Dict: 运行指标
+    """
+    result = {"success": False, "stats": None, "error": None}
+    
+    try:
+        if action == "reset":
+            get_ce_metrics().reset()
+        elif action == "dump":
+            path = path or cheatEngine_config.get("metrics_file")
+            if not path:
+                result["error"] = "dump需要指定path或配置metrics_file"
+                return result
+            write_prometheus_metrics(path)
+            result["path"] = path
+        elif action != "stats":
+            result["error"] = f"不支持的操作: {action}"
+            return result
+        
+        result["stats"] = collect_ce_stats()
+        result["success"] = True
+    except Exception as e:
+        logger.error("获取运行指标失败: %s", e)
+        result["error"] = f"获取运行指标失败: {str(e)}"
+    
+    return result
+
+
+def register_tool(mcp):
+    """
+    向MCP注册工具
+    
+    Args:
+        mcp: MCP实例
+    """
+    mcp.tool(description=TOOL_DESCRIPTION)(ce_stats)
+    if start_metrics_writer():
+        logger.info("已启动指标文件写出: %s", cheatEngine_config['metrics_file'])
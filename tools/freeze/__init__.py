@@ -0,0 +1,3 @@
+"""
+数值冻结工具
+"""
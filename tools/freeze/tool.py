@@ -0,0 +1,399 @@
+"""
+数值冻结工具
+
+相当于CheatEngine的"冻结"：注册一组(地址, 类型, 值)后由后台调度线程按各自的频率反复写回。
+同一时刻到期的条目合并为一次write_many，地址相近的写入再合并为带multiValues的MEMORY_WRITE请求，
+几百个60Hz的冻结值每个周期通常只需要几个请求；调度落后时跳过错过的周期并计数，不会补写堆积
+"""
+from util import logger, get_memory_backend, encode_value, parse_address, parse_options, parse_json_arg
+from typing import Dict, List, Union, Any, Optional
+import threading
+import asyncio
+import time
+
+
+ADD_TOOL_DESCRIPTION = """
+    冻结内存中的值，由后台线程按设定频率持续写回
+
+    参数:
+    - entries: 冻结列表，每项为字典：
+      - address: 地址(十六进制字符串、整数或"模块名+偏移")
+      - dataType: 数据类型(默认int32)
+      - value: 冻结的值
+      - frequency: 该项的写入频率(Hz，可选，默认使用options中的frequency)
+      - label: 标签(可选)
+    - options: 可选参数：
+      - frequency: 默认写入频率(Hz，默认60)
+      - paused: 添加后先不写入(默认false)，之后用freeze_resume开始
+
+    用法示例:
+    freeze_add([{"address": "game.exe+1A2B3C", "dataType": "int32", "value": 999, "label": "hp"}])
+    freeze_add([{"address": "0x7065F60", "dataType": "float", "value": 100.0, "frequency": 10}])
+
+    返回:
+    - freezeIds: 新增冻结项的ID
+"""
+
+PAUSE_TOOL_DESCRIPTION = """
+    暂停冻结项(保留设置，不再写入)
+
+    参数:
+    - freeze_ids: 冻结项ID列表，为空时暂停全部
+"""
+
+RESUME_TOOL_DESCRIPTION = """
+    恢复已暂停的冻结项，立即写入一次并重新开始计时
+
+    参数:
+    - freeze_ids: 冻结项ID列表，为空时恢复全部
+"""
+
+LIST_TOOL_DESCRIPTION = """
+    列出全部冻结项及调度统计
+
+    返回:
+    - freezes: 每项的地址、值、频率、是否暂停、写入次数、失败次数、
+               错过的周期数(missed)、最大延迟(maxLateMs)和最近的错误
+    - scheduler: 调度周期数、发出的请求数、平均及最长周期耗时
+"""
+
+REMOVE_TOOL_DESCRIPTION = """
+    取消冻结
+
+    参数:
+    - freeze_ids: 冻结项ID列表，为空时取消全部冻结
+"""
+
+DEFAULT_FREQUENCY = 60.0
+# 单项写入间隔的下限(秒)
+MIN_INTERVAL = 0.005
+# 到期时间相差不超过该比例(相对最短间隔)的条目合并到同一次写入
+FREEZE_COALESCE = 0.25
+
+
+class Freeze:
+    """
+    一个被冻结的值及其写入统计
+    """
+
+    def __init__(self, freeze_id: int, address: int, data_type: str, value: Any,
+                 label: Optional[str], interval: float, paused: bool):
+        self.freeze_id = freeze_id
+        self.address = address
+        self.data_type = data_type
+        self.value = value
+        self.label = label
+        self.interval = interval
+        self.paused = paused
+        self.next_due = time.time()
+        self.writes = 0
+        self.failures = 0
+        # 调度落后而跳过的周期数，以及相对到期时间的最大延迟(秒)
+        self.missed = 0
+        self.max_late = 0.0
+        self.last_error: Optional[str] = None
+
+    def complete(self, started: float, now: float, success: bool, error: Optional[str]) -> None:
+        """
+        记录一次写入结果并计算下一次到期时间
+
+        @param {float} started - 本次写入开始的时间
+        @param {float} now - 写入完成的时间
+        """
+        self.max_late = max(self.max_late, started - self.next_due)
+        if success:
+            self.writes += 1
+        else:
+            self.failures += 1
+            self.last_error = error
+        self.next_due += self.interval
+        if self.next_due < now:
+            skipped = int((now - self.next_due) // self.interval) + 1
+            self.missed += skipped
+            self.next_due += skipped * self.interval
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "freezeId": self.freeze_id,
+            "label": self.label,
+            "address": f"0x{self.address:X}",
+            "dataType": self.data_type,
+            "value": self.value,
+            "frequency": round(1.0 / self.interval, 3),
+            "paused": self.paused,
+            "writes": self.writes,
+            "failures": self.failures,
+            "missed": self.missed,
+            "maxLateMs": round(self.max_late * 1000, 3),
+            "lastError": self.last_error
+        }
+
+
+_freezes: Dict[int, Freeze] = {}
+# 保护_freezes和调度统计，条目变化时唤醒调度线程
+_freeze_condition = threading.Condition()
+_next_freeze_id = 1
+_scheduler: Optional[threading.Thread] = None
+_stats = {"ticks": 0, "requests": 0, "tickTime": 0.0, "maxTickTime": 0.0}
+
+
+def _freeze_loop() -> None:
+    """
+    后台调度线程：每次取出全部到期的冻结项，合并为一次write_many
+    """
+    global _scheduler
+    logger.info("冻结调度线程已启动")
+    last_error = None
+    while True:
+        with _freeze_condition:
+            if not _freezes:
+                _scheduler = None
+                logger.info("没有冻结项，调度线程退出")
+                return
+            active = [freeze for freeze in _freezes.values() if not freeze.paused]
+            if not active:
+                _freeze_condition.wait()
+                continue
+            now = time.time()
+            earliest = min(freeze.next_due for freeze in active)
+            if earliest > now:
+                _freeze_condition.wait(earliest - now)
+                continue
+            horizon = now + min(freeze.interval for freeze in active) * FREEZE_COALESCE
+            due = [freeze for freeze in active if freeze.next_due <= horizon]
+            writes = [{"address": freeze.address, "dataType": freeze.data_type, "value": freeze.value}
+                      for freeze in due]
+
+        started = time.time()
+        request_count = 0
+        try:
+            results, request_count = get_memory_backend().write_many(writes)
+            error = None
+        except Exception as e:
+            results = [{"success": False, "error": str(e)}] * len(due)
+            error = str(e)
+        if error != last_error:
+            # 只在错误状态变化时记录日志，避免每个周期刷屏
+            if error:
+                logger.warning("冻结写入失败: %s", error)
+            else:
+                logger.info("冻结写入已恢复")
+            last_error = error
+
+        now = time.time()
+        with _freeze_condition:
+            for freeze, item in zip(due, results):
+                freeze.complete(started, now, item["success"], item["error"])
+            elapsed = now - started
+            _stats["ticks"] += 1
+            _stats["requests"] += request_count
+            _stats["tickTime"] += elapsed
+            _stats["maxTickTime"] = max(_stats["maxTickTime"], elapsed)
+
+
+def _ensure_scheduler() -> None:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = threading.Thread(target=_freeze_loop, name="freeze-scheduler", daemon=True)
+        _scheduler.start()
+
+
+def _frequency_interval(frequency: Any) -> float:
+    frequency = float(frequency)
+    if frequency <= 0:
+        raise ValueError(f"frequency必须大于0: {frequency}")
+    return max(1.0 / frequency, MIN_INTERVAL)
+
+
+def freeze_add(entries: Union[List[Dict], Dict, str], options: Optional[Union[Dict, str]] = None) -> Dict[str, Any]:
+    """
+    添加冻结项并启动调度线程
+
+    Args:
+        entries: 冻结列表
+        options: 可选参数，见ADD_TOOL_DESCRIPTION
+
+    Returns:
+        Dict: 新增冻结项的ID
+    """
+    global _next_freeze_id
+    result = {"success": False, "freezeIds": [], "error": None}
+
+    try:
+        entries = parse_json_arg(entries)
+        if isinstance(entries, dict):
+            entries = [entries]
+        options = parse_options(options)
+        default_frequency = options.get("frequency", DEFAULT_FREQUENCY)
+        paused = bool(options.get("paused", False))
+
+        parsed = []
+        for item in entries:
+            if item.get("value") is None:
+                raise ValueError(f"冻结项缺少value: {item}")
+            data_type = (item.get("dataType") or "int32").lower()
+            # 添加时先编码一次，值与类型不匹配的条目不进入调度
+            encode_value(item["value"], data_type, encoding=get_memory_backend().string_encoding)
+            parsed.append((
+                parse_address(item["address"]),
+                data_type,
+                item["value"],
+                item.get("label"),
+                _frequency_interval(item.get("frequency", default_frequency))
+            ))
+
+        with _freeze_condition:
+            for address, data_type, value, label, interval in parsed:
+                freeze = Freeze(_next_freeze_id, address, data_type, value, label, interval, paused)
+                _freezes[freeze.freeze_id] = freeze
+                result["freezeIds"].append(freeze.freeze_id)
+                _next_freeze_id += 1
+            _ensure_scheduler()
+            _freeze_condition.notify_all()
+
+        result["success"] = True
+        logger.info("添加了%s个冻结项，当前共%s个", len(parsed), len(_freezes))
+    except Exception as e:
+        logger.error("添加冻结项失败: %s", e)
+        result["error"] = f"添加冻结项失败: {str(e)}"
+
+    return result
+
+
+def _select(freeze_ids: Any) -> List[Freeze]:
+    freeze_ids = parse_json_arg(freeze_ids)
+    if not freeze_ids:
+        return list(_freezes.values())
+    return [_freezes[int(freeze_id)] for freeze_id in freeze_ids if int(freeze_id) in _freezes]
+
+
+def freeze_pause(freeze_ids: Optional[Union[List[int], str]] = None) -> Dict[str, Any]:
+    """
+    暂停冻结项
+
+    Args:
+        freeze_ids: 冻结项ID列表，为None时暂停全部
+
+    Returns:
+        Dict: 暂停的冻结项数量
+    """
+    with _freeze_condition:
+        selected = _select(freeze_ids)
+        for freeze in selected:
+            freeze.paused = True
+        _freeze_condition.notify_all()
+    return {"success": True, "paused": len(selected)}
+
+
+def freeze_resume(freeze_ids: Optional[Union[List[int], str]] = None) -> Dict[str, Any]:
+    """
+    恢复冻结项，立即写入一次
+
+    Args:
+        freeze_ids: 冻结项ID列表，为None时恢复全部
+
+    Returns:
+        Dict: 恢复的冻结项数量
+    """
+    now = time.time()
+    with _freeze_condition:
+        selected = [freeze for freeze in _select(freeze_ids) if freeze.paused]
+        for freeze in selected:
+            freeze.paused = False
+            freeze.next_due = now
+        _freeze_condition.notify_all()
+    return {"success": True, "resumed": len(selected)}
+
+
+def freeze_list() -> Dict[str, Any]:
+    """
+    列出全部冻结项及调度统计
+
+    Returns:
+        Dict: 冻结项状态列表和调度统计
+    """
+    with _freeze_condition:
+        ticks = _stats["ticks"]
+        return {
+            "success": True,
+            "freezes": [freeze.describe() for freeze in _freezes.values()],
+            "scheduler": {
+                "running": _scheduler is not None,
+                "ticks": ticks,
+                "requests": _stats["requests"],
+                "avgTickMs": round(_stats["tickTime"] / ticks * 1000, 3) if ticks else 0.0,
+                "maxTickMs": round(_stats["maxTickTime"] * 1000, 3)
+            }
+        }
+
+
+def freeze_remove(freeze_ids: Optional[Union[List[int], str]] = None) -> Dict[str, Any]:
+    """
+    取消冻结，没有冻结项时调度线程自动退出
+
+    Args:
+        freeze_ids: 冻结项ID列表，为None时取消全部
+
+    Returns:
+        Dict: 取消的冻结项数量
+    """
+    freeze_ids = parse_json_arg(freeze_ids)
+    with _freeze_condition:
+        if not freeze_ids:
+            removed = len(_freezes)
+            _freezes.clear()
+        else:
+            removed = sum(1 for freeze_id in freeze_ids if _freezes.pop(int(freeze_id), None) is not None)
+        _freeze_condition.notify_all()
+    logger.info("取消了%s个冻结项", removed)
+    return {"success": True, "removed": removed}
+
+
+# 为MCP创建适配器函数
+async def freeze_add_adapter(entries=None, options=None):
+    """
+    为MCP适配的freeze_add包装器，解析模块地址可能需要刷新区域表，在线程池中执行
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, freeze_add, entries, options)
+
+
+def freeze_pause_adapter(freeze_ids=None):
+    """
+    为MCP适配的freeze_pause包装器
+    """
+    return freeze_pause(freeze_ids)
+
+
+def freeze_resume_adapter(freeze_ids=None):
+    """
+    为MCP适配的freeze_resume包装器
+    """
+    return freeze_resume(freeze_ids)
+
+
+def freeze_list_adapter():
+    """
+    为MCP适配的freeze_list包装器
+    """
+    return freeze_list()
+
+
+def freeze_remove_adapter(freeze_ids=None):
+    """
+    为MCP适配的freeze_remove包装器
+    """
+    return freeze_remove(freeze_ids)
+
+
+def register_tool(mcp):
+    """
+    向MCP注册工具
+
+    Args:
+        mcp: MCP实例
+    """
+    mcp.tool(name="freeze_add", description=ADD_TOOL_DESCRIPTION)(freeze_add_adapter)
+    mcp.tool(name="freeze_pause", description=PAUSE_TOOL_DESCRIPTION)(freeze_pause_adapter)
+    mcp.tool(name="freeze_resume", description=RESUME_TOOL_DESCRIPTION)(freeze_resume_adapter)
+    mcp.tool(name="freeze_list", description=LIST_TOOL_DESCRIPTION)(freeze_list_adapter)
+    mcp.tool(name="freeze_remove", description=REMOVE_TOOL_DESCRIPTION)(freeze_remove_adapter)
@@ -0,0 +1,3 @@
+"""
+调试跟踪工具
+"""
\ No newline at end of file
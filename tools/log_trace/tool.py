@@ -0,0 +1,62 @@
+"""
+调试跟踪工具
+
+运行时按工具开启或关闭DEBUG级别的请求跟踪，跟踪日志经后台线程写入mcp_ssh.log
+"""
+from util import logger, set_tool_trace, traced_tools, untraced_tools, LOG_FILE
+from typing import Dict, Any, Optional
+
+
+TOOL_DESCRIPTION = """
+    按工具开启或关闭调试跟踪
+    
+    开启后记录该工具每次调用的参数、耗时和返回值，以及工具内部的请求细节(如memory_read的缓存命中、
+    发出的请求和解码结果)。过长的值会被截断。关闭时这些日志不产生任何格式化开销。
+    
+    参数:
+    - tool: 工具名(与ce_stats中tools的名称一致，例如memory_read_adapter)，"*"表示所有工具；不指定时只返回当前状态
+    - enabled: 开启(true)或关闭(false)，默认true
+    
+    单个工具的设置优先于"*"，开启"*"后可以单独关闭某个工具；关闭"*"会关闭所有工具的跟踪
+    
+    用法示例:
+    log_trace("memory_read_adapter")
+    log_trace("*")
+    log_trace("memory_batch_read_adapter", false)
+    log_trace("*", false)
+    log_trace()
+    
+    返回:
+    - traced: 当前开启了跟踪的工具
+    - excluded: 开启了"*"但单独关闭了跟踪的工具
+    - logFile: 日志文件路径
+"""
+
+
+def log_trace(tool: Optional[str] = None, enabled: bool = True) -> Dict[str, Any]:
+    """
+    开启或关闭工具的调试跟踪
+    
+    Args:
+        tool: 工具名，"*"表示所有工具
+        enabled: 是否开启
+        
+    Returns:
+        Dict: 当前开启了跟踪的工具
+    """
+    if tool:
+        traced = set_tool_trace(tool, bool(enabled))
+        logger.info("调试跟踪已%s: %s", "开启" if enabled else "关闭", tool)
+    else:
+        traced = traced_tools()
+    return {"success": True, "traced": traced, "excluded": untraced_tools(), "logFile": LOG_FILE, "error": None}
+
+
+def register_tool(mcp):
+    """
+    向MCP注册工具
+    
+    Args:
+        mcp: MCP实例
+    """
+    mcp.tool(description=TOOL_DESCRIPTION)(log_trace)
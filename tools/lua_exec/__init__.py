@@ -0,0 +1,3 @@
+"""
+Lua脚本执行工具
+"""
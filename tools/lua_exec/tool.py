@@ -0,0 +1,279 @@
+"""
+Lua脚本执行工具
+
+通过LUA_EXEC在CheatEngine中执行Lua脚本。需要反复调用的脚本先注册为预编译脚本，
+服务端只编译一次，之后每次调用只发送脚本ID和params
+"""
+from util import (
+    logger, get_async_ce_client, get_lua_registry, call_lua_script_async,
+    decode_json_response, LUA_DEFAULT_TIMEOUT, parse_options, parse_json_arg
+)
+from typing import Dict, Union, Any, Optional
+import json
+
+
+EXEC_TOOL_DESCRIPTION = """
+    在CheatEngine中执行一段Lua脚本
+
+    参数:
+    - script: Lua源码，脚本的返回值作为result返回
+    - params: 传给脚本的参数(可选)，脚本中通过全局变量params访问
+    - options: 可选参数：
+      - timeout: 执行超时(毫秒，默认5000)
+      - prepare: 是否注册为预编译脚本(默认false)，相同的脚本之后只发送脚本ID
+
+    用法示例:
+    lua_exec("return getOpenedProcessID()")
+    lua_exec("return readInteger(params.address)", {"address": "game.exe+1A2B"})
+
+    返回:
+    - result: 脚本返回值
+    - output: 脚本print输出
+    - executionTime: 执行时间(毫秒)
+    - scriptId、uploaded、requestCount: 使用prepare时返回，含义同lua_call
+"""
+
+REGISTER_TOOL_DESCRIPTION = """
+    注册预编译Lua脚本，之后用lua_call按ID或名称调用
+
+    脚本以内容的SHA-256作为ID，第一次调用时上传并由CE编译缓存，之后的调用只发送ID和params。
+    内置脚本: module_list(列出模块)、resolve_pointers(批量解析指针链，params为{"chains": [{"base": 地址, "offsets": [偏移]}]})
+
+    参数:
+    - script: Lua源码，通过全局变量params读取参数
+    - name: 脚本名称(可选)
+
+    用法示例:
+    lua_register("return readFloat(params.address) * 2", "double_float")
+
+    返回:
+    - scriptId: 脚本ID
+"""
+
+CALL_TOOL_DESCRIPTION = """
+    调用已注册的预编译Lua脚本
+
+    参数:
+    - script: 脚本ID或名称
+    - params: 传给脚本的参数(可选)
+    - options: 可选参数：
+      - timeout: 执行超时(毫秒，默认5000)
+
+    用法示例:
+    lua_call("module_list")
+    lua_call("resolve_pointers", {"chains": [{"base": "game.exe+1000", "offsets": [16, 32]}]})
+
+    返回:
+    - result、output、executionTime: 同lua_exec
+    - uploaded: 本次调用是否上传了源码
+    - requestCount: 实际发出的请求数(服务端缓存失效需要补发源码时为2)
+"""
+
+LIST_TOOL_DESCRIPTION = """
+    列出已注册的预编译Lua脚本及调用统计(调用次数、上传次数、节省的源码字节数)
+"""
+
+# 内置的预编译脚本，参数通过全局变量params传入
+BUILTIN_SCRIPTS = {
+    "module_list": """
+local modules = enumModules()
+local result = {}
+for i = 1, #modules do
+  result[i] = {
+    name = modules[i].Name,
+    base = string.format("%X", modules[i].Address),
+    size = getModuleSize(modules[i].Name)
+  }
+end
+return result
+""",
+    "resolve_pointers": """
+local p = rawget(_G, "params") or _G
+local results = {}
+for i, chain in ipairs(p.chains) do
+  local addr = getAddressSafe(chain.base)
+  for _, offset in ipairs(chain.offsets or {}) do
+    if not addr then break end
+    local value = readPointer(addr)
+    addr = value and value + offset or nil
+  end
+  results[i] = addr and string.format("%X", addr) or false
+end
+return results
+""",
+}
+
+for _name, _source in BUILTIN_SCRIPTS.items():
+    get_lua_registry().register(_source.strip(), _name)
+
+
+def _lua_result(response: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    从LUA_EXEC响应中提取返回给调用方的字段
+    """
+    error = response.get("error")
+    if isinstance(error, dict):
+        error = error.get("message") or error.get("details") or str(error)
+    return {
+        "success": bool(response.get("success")),
+        "result": response.get("result"),
+        "output": response.get("output"),
+        "executionTime": response.get("executionTime"),
+        "error": error
+    }
+
+
+async def lua_exec(script: str, params: Optional[Union[Dict, str]] = None,
+                   options: Optional[Union[Dict, str]] = None) -> Dict[str, Any]:
+    """
+    执行一段Lua脚本
+
+    Args:
+        script: Lua源码
+        params: 传给脚本的参数
+        options: 可选参数，支持timeout、prepare
+
+    Returns:
+        Dict: 脚本的执行结果
+    """
+    result = {"success": False, "result": None, "output": None, "executionTime": None, "error": None}
+
+    try:
+        params = parse_json_arg(params)
+        options = parse_options(options)
+        timeout = int(options.get("timeout", LUA_DEFAULT_TIMEOUT))
+        if not script:
+            raise ValueError("script不能为空")
+
+        client = await get_async_ce_client()
+        if not client.connected:
+            result["error"] = "未连接到CheatEngine服务器"
+            return result
+
+        if options.get("prepare"):
+            script_id = get_lua_registry().register(script)
+            response, request_count, uploaded = await call_lua_script_async(client, script_id, params, timeout)
+            result.update(_lua_result(response), scriptId=script_id, uploaded=uploaded, requestCount=request_count)
+            return result
+
+        request = {"script": script, "timeout": timeout}
+        if params:
+            request["params"] = params
+        response_type, content = await client.request(client.PACKET_TYPE["LUA_EXEC"], json.dumps(request))
+        if response_type is None or content is None:
+            result["error"] = "未收到服务器响应"
+            return result
+        result.update(_lua_result(decode_json_response(content)))
+    except Exception as e:
+        logger.error("执行Lua脚本失败: %s", e)
+        result["error"] = f"执行Lua脚本失败: {str(e)}"
+
+    return result
+
+
+def lua_register(script: str, name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    注册预编译Lua脚本
+
+    Args:
+        script: Lua源码
+        name: 脚本名称
+
+    Returns:
+        Dict: 脚本ID
+    """
+    if not script:
+        return {"success": False, "scriptId": None, "error": "script不能为空"}
+    script_id = get_lua_registry().register(script, name or None)
+    logger.info("注册Lua脚本: %s", name or script_id[:12])
+    return {"success": True, "scriptId": script_id, "name": name, "error": None}
+
+
+async def lua_call(script: str, params: Optional[Union[Dict, str]] = None,
+                   options: Optional[Union[Dict, str]] = None) -> Dict[str, Any]:
+    """
+    调用已注册的预编译Lua脚本
+
+    Args:
+        script: 脚本ID或名称
+        params: 传给脚本的参数
+        options: 可选参数，支持timeout
+
+    Returns:
+        Dict: 脚本的执行结果
+    """
+    result = {"success": False, "result": None, "output": None, "executionTime": None, "error": None}
+
+    try:
+        params = parse_json_arg(params)
+        options = parse_options(options)
+        timeout = int(options.get("timeout", LUA_DEFAULT_TIMEOUT))
+        script_id = get_lua_registry().resolve(script)
+
+        client = await get_async_ce_client()
+        if not client.connected:
+            result["error"] = "未连接到CheatEngine服务器"
+            return result
+
+        response, request_count, uploaded = await call_lua_script_async(client, script_id, params, timeout)
+        result.update(_lua_result(response), scriptId=script_id, uploaded=uploaded, requestCount=request_count)
+    except KeyError as e:
+        result["error"] = str(e.args[0])
+    except Exception as e:
+        logger.error("调用Lua脚本失败: %s", e)
+        result["error"] = f"调用Lua脚本失败: {str(e)}"
+
+    return result
+
+
+def lua_scripts() -> Dict[str, Any]:
+    """
+    列出已注册的预编译Lua脚本
+
+    Returns:
+        Dict: 脚本列表及服务端是否支持预编译
+    """
+    registry = get_lua_registry()
+    return {"success": True, "serverSupportsPrepare": registry.supported, "scripts": registry.stats()}
+
+
+# 为MCP创建适配器函数
+async def lua_exec_adapter(script=None, params=None, options=None):
+    """
+    为MCP适配的lua_exec包装器
+    """
+    return await lua_exec(script, params, options)
+
+
+def lua_register_adapter(script=None, name=None):
+    """
+    为MCP适配的lua_register包装器
+    """
+    return lua_register(script, name)
+
+
+async def lua_call_adapter(script=None, params=None, options=None):
+    """
+    为MCP适配的lua_call包装器
+    """
+    return await lua_call(script, params, options)
+
+
+def lua_scripts_adapter():
+    """
+    为MCP适配的lua_scripts包装器
+    """
+    return lua_scripts()
+
+
+def register_tool(mcp):
+    """
+    向MCP注册工具
+
+    Args:
+        mcp: MCP实例
+    """
+    mcp.tool(name="lua_exec", description=EXEC_TOOL_DESCRIPTION)(lua_exec_adapter)
+    mcp.tool(name="lua_register", description=REGISTER_TOOL_DESCRIPTION)(lua_register_adapter)
+    mcp.tool(name="lua_call", description=CALL_TOOL_DESCRIPTION)(lua_call_adapter)
+    mcp.tool(name="lua_scripts", description=LIST_TOOL_DESCRIPTION)(lua_scripts_adapter)
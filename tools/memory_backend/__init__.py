@@ -0,0 +1,3 @@
+"""
+内存后端选择工具
+"""
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+内存后端选择工具
+
+切换当前会话读取内存的方式：通过CheatEngine插件，或直接读取本机Linux进程
+"""
+from util import logger, get_memory_backend, set_memory_backend, LinuxProcessBackend
+from typing import Dict, Any, Optional, Union
+
+
+TOOL_DESCRIPTION = """
+    选择当前会话的内存后端，memory_read、memory_batch_read等工具随之切换读取方式
+    
+    参数:
+    - backend: 后端名称(可选，不传时仅返回当前后端)
+      - ce: 通过CheatEngine插件读取(默认)
+      - linux: 直接读取本机Linux进程(process_vm_readv或/proc/<pid>/mem)，
+               不经过CE和JSON，需要对目标进程有ptrace权限
+    - pid: 目标进程ID(backend为linux时必填)
+    
+    用法示例:
+    memory_backend_select("linux", 12345)
+    memory_backend_select("ce")
+    memory_backend_select()
+    
+    返回:
+    - backend: 当前后端的描述信息
+    - regionCount: 目标进程的内存区域数量(仅linux后端)
+    
+    注意: 本地后端不支持assembly、comments、multiType等依赖CE的选项
+"""
+
+
+def memory_backend_select(backend: Optional[str] = None, pid: Optional[Union[int, str]] = None) -> Dict[str, Any]:
+    """
+    选择当前会话的内存后端
+    
+    Args:
+        backend: 后端名称(ce/linux)，为None时只查询当前后端
+        pid: 目标进程ID，linux后端必填
+        
+    Returns:
+        Dict: 当前后端的描述信息
+    """
+    result = {"success": False, "backend": None, "error": None}
+    
+    try:
+        if backend is None:
+            current = get_memory_backend()
+        elif backend.lower() == "ce":
+            current = set_memory_backend(None)
+        elif backend.lower() == "linux":
+            if pid is None:
+                result["error"] = "linux后端需要指定pid"
+                return result
+            current = set_memory_backend(LinuxProcessBackend(int(pid)))
+            result["regionCount"] = len(current.regions())
+        else:
+            result["error"] = f"不支持的内存后端: {backend}"
+            return result
+        
+        result["backend"] = current.describe()
+        result["success"] = True
+    except Exception as e:
+        logger.error("切换内存后端失败: %s", e)
+        result["error"] = f"切换内存后端失败: {str(e)}"
+    
+    return result
+
+
+def register_tool(mcp):
+    """
+    向MCP注册工具
+    
+    Args:
+        mcp: MCP实例
+    """
+    mcp.tool(description=TOOL_DESCRIPTION)(memory_backend_select)
@@ -0,0 +1,3 @@
+"""
+数值扫描工具
+"""
@@ -0,0 +1,611 @@
+"""
+数值扫描工具
+
+在Python端实现CE的首次扫描/再次扫描。首次扫描按块读取可读内存并用NumPy向量化比较，
+候选结果保存为地址列和数值列两个数组(int32每个候选12字节)，再次扫描只重新读取候选所在的页
+"""
+from util import logger, get_memory_backend, get_region_map, snapshot_regions, SNAPSHOT_CHUNK_SIZE, parse_address, parse_options
+from typing import Dict, List, Union, Any, Optional, Callable
+import numpy as np
+import threading
+import asyncio
+import time
+
+
+FIRST_SCAN_TOOL_DESCRIPTION = """
+    首次扫描：在目标进程的可读内存中查找指定类型的数值
+
+    参数:
+    - data_type: 数据类型(int8, uint8, int16, uint16, int32, uint32, int64, uint64, float, double)
+    - value: 要查找的值(compare为exact/greater/less时使用)
+    - options: 可选参数：
+      - compare: 比较方式 exact(默认)、range、greater、less
+      - min / max: compare为range时的范围(包含两端)
+      - tolerance: 浮点数比较的允许误差(默认0，按该类型的精度比较)
+      - alignment: 地址对齐(默认为类型大小，1表示扫描所有地址)
+      - regions: 扫描范围[[起始地址, 长度], ...](默认为目标进程的可写区域，CE后端见下方注意)
+      - writableOnly: 未指定regions时是否只扫描可写区域(默认true)
+      - maxCandidates: 最多保留的候选数量(默认10000000)
+      - sampleSize: 返回的候选样本数量(默认20)
+
+    用法示例:
+    memory_first_scan("int32", 100)
+    memory_first_scan("float", None, {"compare": "range", "min": 0.5, "max": 1.5})
+
+    返回:
+    - scanId: 扫描会话ID，用于memory_next_scan和memory_scan_results
+    - count: 候选数量
+    - results: 前sampleSize个候选(address、module、value)
+
+    注意: CE后端只能枚举模块，未指定regions时只扫描各模块映像(包括代码区段，writableOnly不生效)，
+    不包含堆和栈；需要扫描堆中的数值时应通过regions显式指定。Linux本地后端会自动包含全部可写区域
+"""
+
+NEXT_SCAN_TOOL_DESCRIPTION = """
+    再次扫描：重新读取候选地址的当前值，只保留满足条件的候选
+
+    只读取候选所在的内存页，候选越少越快。比较的"上次的值"为上一次扫描时读到的值。
+
+    参数:
+    - scan_id: memory_first_scan返回的扫描会话ID
+    - compare: 比较方式：
+      - exact: 等于value
+      - changed / unchanged: 与上次的值相比变化/未变化
+      - increased / decreased: 比上次的值大/小
+      - range: 在min和max之间(包含两端)
+      - greater / less: 大于/小于value
+    - value: compare为exact/greater/less时的比较值
+    - options: 可选参数：min、max、tolerance、sampleSize
+
+    用法示例:
+    memory_next_scan(1, "decreased")
+    memory_next_scan(1, "exact", 95)
+
+    返回:
+    - count: 剩余候选数量
+    - removed: 本次过滤掉的候选数量
+    - results: 前sampleSize个候选
+"""
+
+RESULTS_TOOL_DESCRIPTION = """
+    分页查看扫描会话的候选结果(显示的是最近一次扫描时读到的值)
+
+    参数:
+    - scan_id: 扫描会话ID
+    - offset: 起始序号(默认0)
+    - limit: 数量(默认100)
+
+    返回:
+    - results: 候选列表(address、module、value)
+    - count: 候选总数
+"""
+
+CLOSE_TOOL_DESCRIPTION = """
+    关闭扫描会话，释放候选占用的内存
+
+    参数:
+    - scan_id: 扫描会话ID，为空时关闭全部会话
+"""
+
+SCAN_DTYPES = {
+    "int8": np.dtype("<i1"),
+    "uint8": np.dtype("<u1"),
+    "int16": np.dtype("<i2"),
+    "uint16": np.dtype("<u2"),
+    "int32": np.dtype("<i4"),
+    "uint32": np.dtype("<u4"),
+    "int64": np.dtype("<i8"),
+    "uint64": np.dtype("<u8"),
+    "float": np.dtype("<f4"),
+    "double": np.dtype("<f8")
+}
+
+PAGE_SIZE = 4096
+# 首次扫描每次批量读取的块数(每块SNAPSHOT_CHUNK_SIZE字节)，限制扫描时的峰值内存
+SCAN_BATCH_CHUNKS = 256
+# 再次扫描每批最多读取的页数
+RESCAN_BATCH_PAGES = 4096
+DEFAULT_MAX_CANDIDATES = 10000000
+# 同时保留的扫描会话数量，超过时关闭最早的会话
+MAX_SCAN_SESSIONS = 8
+
+
+class ScanSession:
+    """
+    一次扫描的候选集合
+
+    地址和数值分别保存在按地址排序的NumPy数组中
+    """
+
+    def __init__(self, scan_id: int, data_type: str, addresses: np.ndarray, values: np.ndarray):
+        self.scan_id = scan_id
+        self.data_type = data_type
+        self.dtype = SCAN_DTYPES[data_type]
+        self.addresses = addresses
+        self.values = values
+        self.scan_count = 1
+        self.updated_at = time.time()
+
+    @property
+    def count(self) -> int:
+        return len(self.addresses)
+
+    @property
+    def nbytes(self) -> int:
+        return self.addresses.nbytes + self.values.nbytes
+
+    def update(self, keep: np.ndarray, values: np.ndarray) -> None:
+        self.addresses = self.addresses[keep]
+        self.values = values[keep]
+        self.scan_count += 1
+        self.updated_at = time.time()
+
+
+_sessions: Dict[int, ScanSession] = {}
+_sessions_lock = threading.Lock()
+_next_scan_id = 1
+
+
+def _add_session(data_type: str, addresses: np.ndarray, values: np.ndarray) -> ScanSession:
+    global _next_scan_id
+    with _sessions_lock:
+        while len(_sessions) >= MAX_SCAN_SESSIONS:
+            oldest = min(_sessions.values(), key=lambda session: session.updated_at)
+            logger.info("扫描会话过多，关闭最早的会话: %s", oldest.scan_id)
+            del _sessions[oldest.scan_id]
+        session = ScanSession(_next_scan_id, data_type, addresses, values)
+        _sessions[session.scan_id] = session
+        _next_scan_id += 1
+        return session
+
+
+def _get_session(scan_id: Union[str, int]) -> ScanSession:
+    session = _sessions.get(int(scan_id))
+    if session is None:
+        raise ValueError(f"扫描会话不存在: {scan_id}")
+    return session
+
+
+def _to_scalar(value: Union[str, int, float], dtype: np.dtype):
+    """
+    将比较值转换为与候选数组相同类型的标量，整数超出类型范围时报错
+    """
+    if value is None:
+        raise ValueError("缺少比较值")
+    if dtype.kind == "f":
+        return dtype.type(float(value))
+    number = int(value, 0) if isinstance(value, str) else int(value)
+    info = np.iinfo(dtype)
+    if number < info.min or number > info.max:
+        raise ValueError(f"值{number}超出{dtype.name}的范围")
+    return dtype.type(number)
+
+
+def _build_predicate(compare: str, dtype: np.dtype, value: Any, options: Dict,
+                     first: bool) -> Callable[[np.ndarray, Optional[np.ndarray]], np.ndarray]:
+    """
+    生成比较函数
+
+    Args:
+        compare: 比较方式
+        dtype: 数据类型
+        value: 比较值
+        options: 包含min、max、tolerance的选项
+        first: 是否为首次扫描(首次扫描没有上次的值)
+
+    Returns:
+        Callable: (当前值数组, 上次值数组) -> 布尔掩码
+    """
+    tolerance = float(options.get("tolerance", 0)) if dtype.kind == "f" else 0
+
+    if compare == "exact":
+        target = _to_scalar(value, dtype)
+        if tolerance:
+            return lambda current, previous: np.abs(current - target) <= tolerance
+        return lambda current, previous: current == target
+    if compare == "range":
+        low = _to_scalar(options.get("min"), dtype)
+        high = _to_scalar(options.get("max"), dtype)
+        return lambda current, previous: (current >= low - tolerance) & (current <= high + tolerance)
+    if compare == "greater":
+        target = _to_scalar(value, dtype)
+        return lambda current, previous: current > target
+    if compare == "less":
+        target = _to_scalar(value, dtype)
+        return lambda current, previous: current < target
+
+    if first:
+        raise ValueError(f"首次扫描不支持比较方式: {compare}")
+    if compare == "changed":
+        if tolerance:
+            return lambda current, previous: np.abs(current - previous) > tolerance
+        return lambda current, previous: current != previous
+    if compare == "unchanged":
+        if tolerance:
+            return lambda current, previous: np.abs(current - previous) <= tolerance
+        return lambda current, previous: current == previous
+    if compare == "increased":
+        return lambda current, previous: current > previous
+    if compare == "decreased":
+        return lambda current, previous: current < previous
+    raise ValueError(f"不支持的比较方式: {compare}")
+
+
+def _aligned_views(buffer: bytes, base: int, dtype: np.dtype, alignment: int) -> List[tuple]:
+    """
+    按对齐方式把缓冲区解释为若干个数值数组
+
+    Returns:
+        list: (数值数组, 首个数值的地址, 数值间距)列表
+    """
+    size = dtype.itemsize
+    views = []
+    if alignment >= size:
+        if alignment % size:
+            raise ValueError(f"对齐{alignment}必须是类型大小{size}的倍数或约数")
+        values = np.frombuffer(buffer, dtype=dtype, count=len(buffer) // size)
+        views.append((values[::alignment // size], base, alignment))
+    else:
+        if size % alignment:
+            raise ValueError(f"对齐{alignment}必须是类型大小{size}的倍数或约数")
+        for phase in range(0, size, alignment):
+            count = (len(buffer) - phase) // size
+            if count > 0:
+                views.append((np.frombuffer(buffer, dtype=dtype, count=count, offset=phase), base + phase, size))
+    return views
+
+
+def first_scan(data_type: str, predicate: Callable, regions: List[tuple], alignment: int,
+               max_candidates: int) -> tuple:
+    """
+    在一组内存区域中查找满足条件的数值
+
+    按SNAPSHOT_CHUNK_SIZE分块批量读取，同一区域内相邻块的边界处保留
+    (类型大小-对齐)字节，跨越块边界的非对齐数值不会遗漏
+
+    Args:
+        data_type: 数据类型
+        predicate: 比较函数
+        regions: (起始地址, 长度)列表
+        alignment: 地址对齐
+        max_candidates: 候选数量上限
+
+    Returns:
+        tuple: (地址数组, 数值数组, 扫描字节数, 是否因达到上限而截断)
+    """
+    dtype = SCAN_DTYPES[data_type]
+    backend = get_memory_backend()
+    carry = max(dtype.itemsize - alignment, 0)
+
+    chunks = []
+    for start, size in sorted(regions):
+        for offset in range(0, size, SNAPSHOT_CHUNK_SIZE):
+            chunks.append((start + offset, min(SNAPSHOT_CHUNK_SIZE, size - offset)))
+
+    addresses, values = [], []
+    found = 0
+    scanned = 0
+    truncated = False
+    tail, tail_end = b"", None
+
+    with np.errstate(invalid="ignore", over="ignore"):
+        for batch_start in range(0, len(chunks), SCAN_BATCH_CHUNKS):
+            batch = chunks[batch_start:batch_start + SCAN_BATCH_CHUNKS]
+            datas, _ = backend.read_many(batch)
+            for (start, size), data in zip(batch, datas):
+                if data is None:
+                    tail, tail_end = b"", None
+                    continue
+                scanned += len(data)
+                prefix = tail if start == tail_end else b""
+                buffer = prefix + data if prefix else data
+                for view, first_address, stride in _aligned_views(buffer, start - len(prefix), dtype, alignment):
+                    positions = np.nonzero(predicate(view, None))[0]
+                    if len(positions):
+                        addresses.append(first_address + positions.astype(np.int64) * stride)
+                        values.append(view[positions])
+                        found += len(positions)
+                tail, tail_end = (data[-carry:] if carry else b""), start + size
+                if found >= max_candidates:
+                    truncated = True
+                    break
+            if truncated:
+                break
+
+    if not addresses:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=dtype), scanned, truncated
+    addresses = np.concatenate(addresses)
+    values = np.concatenate(values)
+    order = np.argsort(addresses, kind="stable")[:max_candidates]
+    return addresses[order], values[order], scanned, truncated
+
+
+def read_candidates(addresses: np.ndarray, dtype: np.dtype) -> tuple:
+    """
+    重新读取候选地址的当前值，只读取候选所在的页
+
+    Args:
+        addresses: 按地址排序的候选地址
+        dtype: 数据类型
+
+    Returns:
+        tuple: (数值数组, 读取成功的掩码, 请求次数)
+    """
+    size = dtype.itemsize
+    values = np.zeros(len(addresses), dtype=dtype)
+    valid = np.zeros(len(addresses), dtype=bool)
+    if len(addresses) == 0:
+        return values, valid, 0
+
+    backend = get_memory_backend()
+    first_pages = addresses // PAGE_SIZE
+    pages = np.unique(first_pages)
+    request_count = 0
+
+    for batch_start in range(0, len(pages), RESCAN_BATCH_PAGES):
+        batch_pages = pages[batch_start:batch_start + RESCAN_BATCH_PAGES]
+        low = np.searchsorted(first_pages, batch_pages[0], side="left")
+        high = np.searchsorted(first_pages, batch_pages[-1], side="right")
+        batch_addresses = addresses[low:high]
+
+        # 跨页的数值还需要读取下一页
+        last_pages = (batch_addresses + size - 1) // PAGE_SIZE
+        batch_pages = np.union1d(batch_pages, last_pages)
+
+        # 连续的页合并为一次读取
+        breaks = np.nonzero(np.diff(batch_pages) != 1)[0] + 1
+        ranges = []
+        for run in np.split(batch_pages, breaks):
+            for offset in range(0, len(run), SNAPSHOT_CHUNK_SIZE // PAGE_SIZE):
+                part = run[offset:offset + SNAPSHOT_CHUNK_SIZE // PAGE_SIZE]
+                ranges.append((int(part[0]) * PAGE_SIZE, len(part) * PAGE_SIZE))
+        datas, count = backend.read_many(ranges)
+        request_count += count
+
+        page_valid = np.zeros(len(batch_pages), dtype=bool)
+        parts = []
+        index = 0
+        for (start, length), data in zip(ranges, datas):
+            pages_in_range = length // PAGE_SIZE
+            if data is not None and len(data) == length:
+                page_valid[index:index + pages_in_range] = True
+                parts.append(data)
+            else:
+                parts.append(bytes(length))
+            index += pages_in_range
+        buffer = np.frombuffer(b"".join(parts), dtype=np.uint8)
+
+        # 页按顺序连续存放在缓冲区中，跨页数值的两页在缓冲区中也相邻
+        page_index = np.searchsorted(batch_pages, batch_addresses // PAGE_SIZE)
+        positions = page_index * PAGE_SIZE + batch_addresses % PAGE_SIZE
+        gathered = buffer[positions[:, None] + np.arange(size)]
+        values[low:high] = gathered.view(dtype).ravel()
+        last_index = np.searchsorted(batch_pages, (batch_addresses + size - 1) // PAGE_SIZE)
+        valid[low:high] = page_valid[page_index] & page_valid[last_index]
+
+    return values, valid, request_count
+
+
+def _format_results(session: ScanSession, offset: int, limit: int) -> List[Dict[str, Any]]:
+    region_map = get_region_map()
+    results = []
+    for address, value in zip(session.addresses[offset:offset + limit], session.values[offset:offset + limit]):
+        address = int(address)
+        results.append({
+            "address": f"0x{address:X}",
+            "module": region_map.module_offset(address),
+            "value": float(value) if session.dtype.kind == "f" else int(value)
+        })
+    return results
+
+
+def memory_first_scan(data_type: str, value: Any = None, options: Optional[Union[Dict, str]] = None) -> Dict[str, Any]:
+    """
+    执行首次扫描并创建扫描会话
+
+    Args:
+        data_type: 数据类型
+        value: 比较值
+        options: 可选参数，见FIRST_SCAN_TOOL_DESCRIPTION
+
+    Returns:
+        Dict: 扫描结果
+    """
+    result = {"success": False, "scanId": None, "count": 0, "results": [], "stats": None, "error": None}
+
+    try:
+        options = parse_options(options)
+        if data_type not in SCAN_DTYPES:
+            raise ValueError(f"不支持的扫描类型: {data_type}")
+        dtype = SCAN_DTYPES[data_type]
+        predicate = _build_predicate(options.get("compare", "exact"), dtype, value, options, first=True)
+        alignment = int(options.get("alignment", dtype.itemsize))
+
+        regions = options.get("regions")
+        if regions:
+            regions = [(parse_address(start), int(size)) for start, size in regions]
+        else:
+            regions = snapshot_regions(get_memory_backend(), options.get("writableOnly", True))
+
+        started = time.time()
+        addresses, values, scanned, truncated = first_scan(
+            data_type, predicate, regions, alignment,
+            int(options.get("maxCandidates", DEFAULT_MAX_CANDIDATES))
+        )
+        session = _add_session(data_type, addresses, values)
+
+        result.update(
+            success=True,
+            scanId=session.scan_id,
+            count=session.count,
+            results=_format_results(session, 0, int(options.get("sampleSize", 20))),
+            stats={
+                "scannedBytes": scanned,
+                "candidateBytes": session.nbytes,
+                "truncated": truncated,
+                "elapsed": round(time.time() - started, 3)
+            }
+        )
+        logger.info("首次扫描完成: 会话%s, %s个候选, 扫描%s字节", session.scan_id, session.count, scanned)
+    except Exception as e:
+        logger.error("首次扫描失败: %s", e)
+        result["error"] = f"首次扫描失败: {str(e)}"
+
+    return result
+
+
+def memory_next_scan(scan_id: Union[str, int], compare: str, value: Any = None,
+                     options: Optional[Union[Dict, str]] = None) -> Dict[str, Any]:
+    """
+    对扫描会话执行再次扫描
+
+    Args:
+        scan_id: 扫描会话ID
+        compare: 比较方式
+        value: 比较值
+        options: 可选参数
+
+    Returns:
+        Dict: 扫描结果
+    """
+    result = {"success": False, "scanId": scan_id, "count": 0, "removed": 0, "results": [], "stats": None,
+              "error": None}
+
+    try:
+        options = parse_options(options)
+        session = _get_session(scan_id)
+        predicate = _build_predicate(compare, session.dtype, value, options, first=False)
+
+        started = time.time()
+        before = session.count
+        values, valid, request_count = read_candidates(session.addresses, session.dtype)
+        with np.errstate(invalid="ignore", over="ignore"):
+            keep = valid & predicate(values, session.values)
+        session.update(keep, values)
+
+        result.update(
+            success=True,
+            scanId=session.scan_id,
+            count=session.count,
+            removed=before - session.count,
+            results=_format_results(session, 0, int(options.get("sampleSize", 20))),
+            stats={
+                "unreadable": int(before - valid.sum()),
+                "requestCount": request_count,
+                "scanCount": session.scan_count,
+                "elapsed": round(time.time() - started, 3)
+            }
+        )
+        logger.info("再次扫描完成: 会话%s, %s, 剩余%s个候选", session.scan_id, compare, session.count)
+    except Exception as e:
+        logger.error("再次扫描失败: %s", e)
+        result["error"] = f"再次扫描失败: {str(e)}"
+
+    return result
+
+
+def memory_scan_results(scan_id: Union[str, int], offset: int = 0, limit: int = 100) -> Dict[str, Any]:
+    """
+    分页获取扫描会话的候选
+
+    Args:
+        scan_id: 扫描会话ID
+        offset: 起始序号
+        limit: 数量
+
+    Returns:
+        Dict: 候选列表
+    """
+    result = {"success": False, "scanId": scan_id, "dataType": None, "count": 0, "results": [], "error": None}
+
+    try:
+        session = _get_session(scan_id)
+        result.update(
+            success=True,
+            dataType=session.data_type,
+            count=session.count,
+            results=_format_results(session, int(offset or 0), int(limit or 100))
+        )
+    except Exception as e:
+        logger.error("获取扫描结果失败: %s", e)
+        result["error"] = f"获取扫描结果失败: {str(e)}"
+
+    return result
+
+
+def memory_scan_close(scan_id: Optional[Union[str, int]] = None) -> Dict[str, Any]:
+    """
+    关闭扫描会话
+
+    Args:
+        scan_id: 扫描会话ID，为None时关闭全部会话
+
+    Returns:
+        Dict: 关闭的会话数量
+    """
+    with _sessions_lock:
+        if scan_id is None or scan_id == "":
+            closed = len(_sessions)
+            _sessions.clear()
+        else:
+            closed = 1 if _sessions.pop(int(scan_id), None) is not None else 0
+    return {"success": True, "closed": closed}
+
+
+# 为MCP创建适配器函数，扫描在线程池中执行，不阻塞事件循环
+async def memory_first_scan_adapter(data_type=None, value=None, options=None):
+    """
+    为MCP适配的memory_first_scan包装器
+
+    Args:
+        data_type: 数据类型
+        value: 比较值
+        options: 可选参数
+
+    Returns:
+        Dict: memory_first_scan的返回结果
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, memory_first_scan, data_type, value, options)
+
+
+async def memory_next_scan_adapter(scan_id=None, compare="exact", value=None, options=None):
+    """
+    为MCP适配的memory_next_scan包装器
+
+    Args:
+        scan_id: 扫描会话ID
+        compare: 比较方式
+        value: 比较值
+        options: 可选参数
+
+    Returns:
+        Dict: memory_next_scan的返回结果
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, memory_next_scan, scan_id, compare, value, options)
+
+
+def memory_scan_results_adapter(scan_id=None, offset=0, limit=100):
+    """
+    为MCP适配的memory_scan_results包装器
+    """
+    return memory_scan_results(scan_id, offset, limit)
+
+
+def memory_scan_close_adapter(scan_id=None):
+    """
+    为MCP适配的memory_scan_close包装器
+    """
+    return memory_scan_close(scan_id)
+
+
+def register_tool(mcp):
+    """
+    向MCP注册工具
+
+    Args:
+        mcp: MCP实例
+    """
+    mcp.tool(name="memory_first_scan", description=FIRST_SCAN_TOOL_DESCRIPTION)(memory_first_scan_adapter)
+    mcp.tool(name="memory_next_scan", description=NEXT_SCAN_TOOL_DESCRIPTION)(memory_next_scan_adapter)
+    mcp.tool(name="memory_scan_results", description=RESULTS_TOOL_DESCRIPTION)(memory_scan_results_adapter)
+    mcp.tool(name="memory_scan_close", description=CLOSE_TOOL_DESCRIPTION)(memory_scan_close_adapter)
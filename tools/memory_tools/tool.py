@@ -1,20 +1,31 @@
 """
-内存读取工具
+内存读写工具
 
-提供读取指定内存地址数据的功能
+提供读取指定内存地址数据的功能、合并相邻地址的批量读取功能，以及合并相近写入的批量写入功能
 """
 from util import (
-    logger, create_ce_client
+    logger, get_trace_logger, log_brief, ce_client, get_async_ce_client, cheatEngine_config, decode_json_response,
+    get_memory_backend, MemoryBackend, BYTES_READ_SIZE, decode_multi_type, MULTI_TYPE_READ_SIZE,
+    get_page_cache, get_disassembly_cache, get_symbol_index, DisassemblyCache, RegionMap, get_region_map, get_region_map_async, check_mapped, check_mapped_async,
+    data_type_size, decode_value, read_memory_ranges, read_memory_ranges_async, CE_DECODED_TYPES,
+    region_perms, region_perms_async, parse_address, parse_options
 )
-from typing import Dict, Union, Any, Optional
+from collections import defaultdict
+from typing import Dict, List, Union, Any, Optional
+import logging
 import time
 import json
+import re
+
+# memory_read的调试跟踪，运行时通过log_trace工具开启
+_trace = get_trace_logger("memory_read_adapter")
 
 TOOL_DESCRIPTION = """
     读取指定内存地址的数据
     
     参数:
-    - address: 内存地址(十六进制字符串或整数，例如：0x7065F60 或 117879888)
+    - address: 内存地址(十六进制字符串或整数，例如：0x7065F60 或 117879888)，
+               也可以是"模块名+偏移"(例如：game.exe+1A2B)
     - data_type: 数据类型(int32, int64, float, double, string, bytes等)
     - options: 可选参数，支持以下选项：
       - assembly: 是否返回汇编代码(true/false)
@@ -26,6 +37,7 @@ TOOL_DESCRIPTION = """
       - comments: 是否返回地址注释(true/false)
       - multiType: 是否返回多种数据类型解释(true/false)
       - instructionMultiType: 是否为指令提供多种解释(true/false)
+      - symbols: 是否用模块导出符号标注(true/false，默认开启)
     
     用法示例:
     memory_read("0x7065F60", "int32", {"assembly": True, "bytesSize": 16})
@@ -48,61 +60,87 @@ TOOL_DESCRIPTION = """
     
     返回:
     - 读取的内存数据及元信息的字典
+    - 地址位于模块内时，result["module"]为"模块名+偏移"
+    - 值或直接跳转/调用的目标位于模块导出符号附近时，result["symbol"]或对应指令的symbol为"模块!符号+偏移"
     - 如果成功，result["success"]=True且result["value"]包含读取的值
     - 如果失败，result["success"]=False且result["error"]包含错误信息
 """
 
-def format_address(address: Union[str, int]) -> tuple:
+BATCH_TOOL_DESCRIPTION = """
+    批量读取多个内存地址的数据
+    
+    相邻或重叠的地址会被合并为连续范围，通过尽可能少的MEMORY_BATCH请求读取原始字节，
+    再在本地按各自的数据类型解码。读取一整个实体列表通常只需要一到两次往返。
+    
+    参数:
+    - reads: 读取列表，每项为 {"address": 地址, "dataType": 类型, "size": 可选长度}
+             或 [地址, 类型] / [地址, 类型, 长度]
+             (size仅对string、wstring、bytes有效)
+    - options: 可选参数，支持以下选项：
+      - endian: 字节序(little/big，默认little)
+    
+    用法示例:
+    memory_batch_read([["0x7065F60", "int32"], ["0x7065F64", "float"], ["0x7065F68", "string", 32]])
+    
+    返回:
+    - results: 与reads一一对应的结果列表，每项包含address、dataType、value、success、error
+    - requestCount: 实际发出的请求数
+"""
+
+WRITE_TOOL_DESCRIPTION = """
+    批量写入内存
+
+    地址相近的写入(距组内第一项不超过4096字节)合并为一个MEMORY_WRITE请求，
+    其余项以相对偏移放进multiValues，修改一个结构体的几十个字段通常只需一次请求。
+    写入后会使客户端页缓存和反汇编缓存中涉及的范围失效。
+
+    参数:
+    - writes: 写入列表，每项为 {"address": 地址, "dataType": 类型, "value": 值, "previousValue": 可选}
+              或 [地址, 类型, 值] / [地址, 类型, 值, previousValue]
+              - previousValue: 比较并交换，只有当前值等于它时才写入，这样的写入单独发送
+              - bytes类型的值为整数列表或"90 90 C3"形式的十六进制字符串
+              - string/wstring不会写入结尾的\\0
+              - 同一次调用中相互重叠的写入只执行先出现的一项
+    - options: 可选参数，支持以下选项：
+      - endian: 字节序(little/big，默认little)
+
+    用法示例:
+    memory_write([["game.exe+1A2B0", "int32", 100], ["game.exe+1A2B4", "float", 1.5]])
+    memory_write([{"address": "0x7065F60", "dataType": "int32", "value": 999, "previousValue": 100}])
+
+    返回:
+    - results: 与writes一一对应的结果列表，每项包含address、dataType、value、success、error
+    - requestCount: 实际发出的请求数
+"""
+
+
+def format_address(address: Union[str, int], region_map: Optional[RegionMap] = None) -> tuple:
     """
     格式化内存地址，返回格式化后的地址字符串和整数值
 
     Args:
-        address: 内存地址(十六进制字符串或整数)
+        address: 内存地址(十六进制字符串或整数)，也可以是"模块名+偏移"
+        region_map: 解析模块名使用的区域表，为None时按需获取
 
     Returns:
         tuple: (格式化后的地址字符串, 地址整数值)
     """
-    if isinstance(address, str):
-        # 如果地址是字符串格式，确保正确的0x前缀
-        if address.startswith('0x') or address.startswith('$'):
-            # 已经有前缀，保持原样
-            formatted_addr = address
-            if address.startswith('$'):
-                formatted_addr = '0x' + address[1:]
-        else:
-            # 添加0x前缀
-            formatted_addr = f"0x{address}"
-
-        # 尝试转换为整数
-        try:
-            if formatted_addr.startswith('0x'):
-                addr_int = int(formatted_addr[2:], 16)
-            elif formatted_addr.startswith('$'):
-                addr_int = int(formatted_addr[1:], 16)
-            else:
-                addr_int = int(formatted_addr, 16)
-        except ValueError:
-            raise ValueError(f"无效的内存地址格式: {address}")
-    else:
-        # 如果是整数，则直接使用
-        addr_int = address
-        formatted_addr = f"0x{addr_int:X}"
+    addr_int = parse_address(address, region_map)
+    return f"0x{addr_int:X}", addr_int
 
-    return formatted_addr, addr_int
 
-def memory_read(address: Union[str, int], data_type: str, options: Optional[Union[Dict, str]] = None) -> Dict[str, Any]:
+def _normalize_read_args(address: Union[str, int], data_type: str,
+                         options: Optional[Union[Dict, str]]) -> tuple:
     """
-    读取指定内存地址的数据
-    
-    支持多种数据类型和高级选项，能够处理包含特殊字符的响应数据
+    规范化memory_read的参数，兼容以JSON字符串形式传入的参数
 
     Args:
         address: 内存地址(十六进制字符串或整数)，可以是字符串形式的JSON
-        data_type: 数据类型(int32, float, double, string, bytes等)
-        options: 可选参数，包括assembly、multiType等，可以是字符串(将尝试解析为JSON)或字典
+        data_type: 数据类型，可以是字符串形式的JSON
+        options: 可选参数，可以是字符串(将尝试解析为JSON)或字典
 
     Returns:
-        Dict: 读取的内存数据及元信息
+        tuple: (地址, 数据类型, 选项字典)
     """
     # 处理address参数
     if isinstance(address, str):
@@ -112,7 +150,7 @@ def memory_read(address: Union[str, int], data_type: str, options: Optional[Unio
             if isinstance(addr_data, (int, str)):
                 # 如果是数字或字符串，直接使用
                 address = addr_data
-                logger.info(f"将JSON字符串address解析为: {address}")
+                _trace.debug("将JSON字符串address解析为: %s", address)
         except json.JSONDecodeError:
             # 不是JSON字符串，保持原样
             pass
@@ -124,7 +162,7 @@ def memory_read(address: Union[str, int], data_type: str, options: Optional[Unio
             dt_value = json.loads(data_type)
             if isinstance(dt_value, str):
                 data_type = dt_value
-                logger.info(f"将JSON字符串data_type解析为: {data_type}")
+                _trace.debug("将JSON字符串data_type解析为: %s", data_type)
         except json.JSONDecodeError:
             # 不是JSON字符串，保持原样
             pass
@@ -133,168 +171,1300 @@ def memory_read(address: Union[str, int], data_type: str, options: Optional[Unio
     if isinstance(options, str):
         try:
             options = json.loads(options)
-            logger.info(f"将字符串options解析为: {options}")
+            if _trace.isEnabledFor(logging.DEBUG):
+                _trace.debug("将字符串options解析为: %s", log_brief(options))
         except json.JSONDecodeError:
-            logger.warning(f"无法解析options字符串，将设为None: {options}")
+            logger.warning("无法解析options字符串，将设为None: %s", log_brief(options))
             options = None
     
     # 初始化选项
     options = options or {}
 
-    print(address, data_type, options)
+    return address, data_type, options
 
-    # 默认响应结构
-    result = {
-        "success": False,
-        "address": None,
-        "dataType": data_type,
-        "value": None,
-        "error": None
+
+def _build_read_request(addr_int: int, data_type: str, options: Dict) -> str:
+    """
+    构建MEMORY_READ请求
+
+    Args:
+        addr_int: 地址整数值
+        data_type: 数据类型
+        options: 选项字典
+
+    Returns:
+        str: JSON格式的请求数据
+    """
+    # 构建请求结构
+    request = {
+        "address": addr_int,
+        "dataType": data_type
     }
 
+    # 添加选项
+    if options:
+        # 原始字节/操作码改为以BYTECODE帧返回，避免JSON整数数组的膨胀
+        if cheatEngine_config["binary_payload"] and (options.get("rawBytes") or options.get("opcode")):
+            options = dict(options, binaryBytes=True)
+        request["options"] = options
+
+    # 记录高级选项，只在开启跟踪时拼接
+    if options and _trace.isEnabledFor(logging.DEBUG):
+        advanced_opts = []
+        if options.get("rawBytes"):
+            advanced_opts.append("原始字节")
+            if options.get("bytesSize"):
+                advanced_opts[-1] += f"({options.get('bytesSize')}字节)"
+        if options.get("assembly"):
+            advanced_opts.append("汇编代码")
+            if options.get("assemblySize"):
+                advanced_opts[-1] += f"({options.get('assemblySize')}条)"
+        if options.get("opcode"):
+            advanced_opts.append("操作码")
+            if options.get("opcodeSize"):
+                advanced_opts[-1] += f"({options.get('opcodeSize')}字节)"
+        if options.get("comments"):
+            advanced_opts.append("注释")
+        if options.get("multiType"):
+            advanced_opts.append("多类型解释")
+        if options.get("instructionMultiType"):
+            advanced_opts.append("指令多类型解释")
+
+        if advanced_opts:
+            _trace.debug("内存读取高级选项: %s", ", ".join(advanced_opts))
+
+    # 将请求转换为JSON
+    return json.dumps(request)
+
+
+def _read_size(data_type: str, options: Dict) -> int:
+    """
+    估算一次读取覆盖的字节数，用于检查地址范围是否已映射
+
+    Args:
+        data_type: 数据类型
+        options: 选项字典
+
+    Returns:
+        int: 字节数，未知类型按1字节计算
+    """
     try:
-        # 格式化地址
-        formatted_addr, addr_int = format_address(address)
-        result["address"] = formatted_addr
+        return data_type_size(data_type, options.get("size"))
+    except ValueError:
+        return 1
 
-        # 获取CE客户端(优先使用长连接)
-        client = create_ce_client(auto_connect=True)
 
-        # 构建请求结构
-        request = {
-            "address": addr_int,
-            "dataType": data_type
-        }
+def _annotate_region(result: Dict[str, Any], mapped: bool, region_map: RegionMap, addr_int: int) -> bool:
+    """
+    根据区域表拒绝未映射的地址，并为结果标注模块+偏移
 
-        # 添加选项
-        if options:
-            request["options"] = options
-
-            # 记录高级选项
-            advanced_opts = []
-            if options.get("rawBytes"):
-                advanced_opts.append("原始字节")
-                if options.get("bytesSize"):
-                    advanced_opts[-1] += f"({options.get('bytesSize')}字节)"
-            if options.get("assembly"):
-                advanced_opts.append("汇编代码")
-                if options.get("assemblySize"):
-                    advanced_opts[-1] += f"({options.get('assemblySize')}条)"
-            if options.get("opcode"):
-                advanced_opts.append("操作码")
-                if options.get("opcodeSize"):
-                    advanced_opts[-1] += f"({options.get('opcodeSize')}字节)"
-            if options.get("comments"):
-                advanced_opts.append("注释")
-            if options.get("multiType"):
-                advanced_opts.append("多类型解释")
-            if options.get("instructionMultiType"):
-                advanced_opts.append("指令多类型解释")
-
-            # 记录日志
-            if advanced_opts:
-                logger.info(f"内存读取高级选项: {', '.join(advanced_opts)}")
-
-        # 发送读取请求
-        if not client.connected:
-            result["error"] = "未连接到CheatEngine服务器"
-            return result
+    Args:
+        result: 默认响应结构
+        mapped: 地址是否已映射
+        region_map: 区域表
+        addr_int: 地址整数值
 
-        # 将请求转换为JSON并发送
-        json_data = json.dumps(request)
-        packet = client._pack_data(json_data, client.PACKET_TYPE["MEMORY_READ"])
+    Returns:
+        bool: 是否继续读取
+    """
+    if not mapped:
+        result["error"] = f"地址未映射: {result['address']}"
+        logger.warning("内存读取失败: %s", result["error"])
+        return False
+    module = region_map.module_offset(addr_int)
+    if module:
+        result["module"] = module
+    return True
 
-        try:
-            client.socket.sendall(packet)
-            logger.info(f"已发送内存读取请求: {formatted_addr}, 类型: {data_type}")
 
-            # 接收响应
-            data_type, content = client.receive_response(retry_count=2)
+# 需要CE才能提供的选项，包含这些选项的读取不能在本地完成
+CE_ONLY_OPTIONS = ("assembly", "comments", "multiType", "instructionMultiType")
 
-            if data_type is None or content is None:
-                result["error"] = "未收到服务器响应"
-                return result
 
-            # 解析响应JSON - 改进的解析方式，处理特殊字符
-            try:
-                # 首先尝试标准解析
-                try:
-                    response = json.loads(content.decode('utf-8'))
-                    # 将响应内容合并到结果中
-                    result.update(response)
-                except (json.JSONDecodeError, UnicodeDecodeError) as e:
-                    # 处理特殊字符和控制字符
-                    logger.info(f"标准解析失败，尝试处理特殊字符: {str(e)}")
-                    
-                    content_str = content.decode('utf-8', errors='replace')
-                    
-                    # 2. 在解析时忽略特殊字符
-                    response = json.loads(content_str, strict=False)
-                    # 将响应内容合并到结果中
-                    result.update(response)
-
-                # 日志记录
-                if result.get("success"):
-                    logger.info(f"内存读取成功: {formatted_addr}, 值: {result.get('value')}")
-
-                    # 记录高级信息
-                    advanced_info = []
-                    if result.get("bytes"):
-                        advanced_info.append(f"原始字节({len(result.get('bytes'))}字节)")
-                    if result.get("assembly"):
-                        advanced_info.append(f"汇编代码({len(result.get('assembly'))}条)")
-                    if result.get("opcode"):
-                        advanced_info.append(f"操作码({len(result.get('opcode'))}字节)")
-                    if result.get("multiType"):
-                        advanced_info.append(f"多类型解释({len(result.get('multiType'))}种)")
-
-                    if advanced_info:
-                        logger.info(f"返回高级信息: {', '.join(advanced_info)}")
-                else:
-                    logger.warning(f"内存读取失败: {result.get('error')}")
-            except Exception as parse_error:
-                logger.error(f"解析响应数据失败: {str(parse_error)}")
-                result["error"] = f"解析响应数据失败: {str(parse_error)}"
-                result["raw_content"] = content.decode('utf-8', errors='replace')
-                
-        except Exception as comm_error:
-            logger.error(f"与CheatEngine服务器通信时发生错误: {str(comm_error)}")
-            result["error"] = f"通信错误: {str(comm_error)}"
-        finally:
-            # 不关闭连接，保持长连接
-            pass
-    except Exception as e:
-        logger.error(f"内存读取处理失败: {str(e)}")
-        result["error"] = f"处理错误: {str(e)}"
-        
+def _local_read_sizes(data_type: str, options: Dict) -> tuple:
+    """
+    计算在本地完成一次读取所需的字节数
+
+    Args:
+        data_type: 数据类型
+        options: 选项字典
+
+    Returns:
+        tuple: (值的字节数, 原始字节数, 操作码字节数)，不需要的部分为0
+    """
+    size = data_type_size(data_type, options.get("size"))
+    bytes_size = options.get("bytesSize", BYTES_READ_SIZE) if options.get("rawBytes") else 0
+    opcode_size = options.get("opcodeSize", BYTES_READ_SIZE) if options.get("opcode") else 0
+    return size, bytes_size, opcode_size
+
+
+def _fill_local_result(result: Dict[str, Any], data: Optional[bytes], data_type: str,
+                       options: Dict, sizes: tuple) -> Dict[str, Any]:
+    """
+    将本地读取到的原始字节解码到结果中，格式与CE的响应一致
+
+    Args:
+        result: 默认响应结构
+        data: 原始字节，读取失败为None
+        data_type: 数据类型
+        options: 选项字典
+        sizes: _local_read_sizes的返回值
+
+    Returns:
+        Dict: 合并后的结果
+    """
+    if data is None:
+        result["error"] = f"无法读取地址: {result['address']}"
+        return result
+
+    size, bytes_size, opcode_size = sizes
+    result["value"] = decode_value(data[:size], data_type, options.get("endian", "little"),
+                                   get_memory_backend().string_encoding)
+    if bytes_size:
+        result["bytes"] = list(data[:bytes_size])
+    if opcode_size:
+        result["opcode"] = list(data[:opcode_size])
+    result["success"] = True
+    if _trace.isEnabledFor(logging.DEBUG):
+        _trace.debug("本地内存读取成功: %s, 值: %s", result["address"], log_brief(result["value"]))
     return result
 
 
-# 为MCP创建适配器函数
-def memory_read_adapter(address=None, data_type=None, options=None):
+def _cacheable_sizes(data_type: str, options: Dict) -> Optional[tuple]:
     """
-    为MCP适配的memory_read包装器
-    
-    用于适配MCP的参数格式，将多个独立的参数传递给memory_read函数
-    
+    判断一次CE读取能否通过页缓存在本地完成
+
+    字符串等依赖编码的类型必须由CE解码，不经过页缓存
+
     Args:
-        address: 内存地址(十六进制字符串或整数)
         data_type: 数据类型
-        options: 可选参数
-        
+        options: 选项字典
+
     Returns:
-        Dict: memory_read的返回结果
+        tuple: 可以时返回_local_read_sizes的结果，否则为None
     """
+    if get_page_cache() is None or any(options.get(key) for key in CE_ONLY_OPTIONS):
+        return None
+    if data_type.lower() in CE_DECODED_TYPES:
+        return None
     try:
-        logger.info(f"内存读取适配器接收到参数: address={address}, data_type={data_type}, options={options}")
-        return memory_read(address, data_type, options)
-    except Exception as e:
-        logger.error(f"内存读取适配器错误: {str(e)}")
-        return {
-            "success": False,
-            "error": f"参数处理错误: {str(e)}",
-            "address": str(address) if address else None,
-            "dataType": data_type
+        return _local_read_sizes(data_type, options)
+    except ValueError:
+        return None
+
+
+def _read_cached(addr_int: int, data_type: str, options: Dict) -> tuple:
+    """
+    尝试直接从页缓存完成一次读取
+
+    只使用已缓存的页，未命中时由调用方照常向CE发送MEMORY_READ，
+    不为单个值的冷读取拉取整页
+
+    Args:
+        addr_int: 地址整数值
+        data_type: 数据类型
+        options: 选项字典
+
+    Returns:
+        tuple: (原始字节(未命中为None), _local_read_sizes的结果)
+    """
+    sizes = _cacheable_sizes(data_type, options)
+    if sizes is None:
+        return None, None
+    return get_page_cache().peek(addr_int, max(sizes)), sizes
+
+
+def _read_ranges(client, ranges: List[tuple], region_map: Optional[RegionMap]) -> tuple:
+    """
+    通过CE读取原始字节，启用页缓存时经过缓存
+
+    Args:
+        client: CE客户端
+        ranges: (起始地址, 长度)列表
+        region_map: 用于选择缓存有效期的区域表
+
+    Returns:
+        tuple: (与ranges一一对应的字节数据列表, 实际发出的请求数)
+    """
+    cache = get_page_cache()
+    if cache is not None:
+        return cache.read_many(ranges, lambda missing: read_memory_ranges(client, missing), region_map)
+    return read_memory_ranges(client, ranges)
+
+
+async def _read_ranges_async(client, ranges: List[tuple], region_map: Optional[RegionMap]) -> tuple:
+    """
+    _read_ranges的asyncio版本
+    """
+    cache = get_page_cache()
+    if cache is not None:
+        async def fetch(missing):
+            return await read_memory_ranges_async(client, missing)
+        return await cache.read_many_async(ranges, fetch, region_map)
+    return await read_memory_ranges_async(client, ranges)
+
+
+# CE未指定assemblySize时反汇编的指令数
+DEFAULT_ASSEMBLY_SIZE = 10
+
+
+def _assembly_window(options: Dict) -> Optional[tuple]:
+    """
+    获取反汇编缓存的查询参数
+
+    Args:
+        options: 选项字典
+
+    Returns:
+        tuple: (指令数量, 影响指令内容的选项)，未请求反汇编或缓存未启用时为None
+    """
+    if not options.get("assembly") or get_disassembly_cache() is None:
+        return None
+    count = int(options.get("assemblySize") or DEFAULT_ASSEMBLY_SIZE)
+    return count, (bool(options.get("comments")), bool(options.get("instructionMultiType")))
+
+
+def _without_assembly(options: Dict) -> Dict:
+    """
+    去掉只影响反汇编的选项
+    """
+    return {key: value for key, value in options.items()
+            if key not in ("assembly", "assemblySize", "instructionMultiType")}
+
+
+def _attach_assembly(result: Dict[str, Any], instructions: List[Dict[str, Any]]) -> None:
+    """
+    将缓存的指令列表按CE的响应格式放入结果
+    """
+    def reference(instruction):
+        return {key: instruction.get(key) for key in ("address", "instruction", "instructionCount")}
+
+    result["assembly"] = instructions
+    result["instructionCount"] = len(instructions)
+    result["startInstruction"] = reference(instructions[0])
+    result["endInstruction"] = reference(instructions[-1])
+    _trace.debug("反汇编缓存命中: %s, %d条指令", result["address"], len(instructions))
+
+
+# 启用local_multitype时不发给CE、改为在本地计算的选项
+MULTI_TYPE_OPTIONS = ("multiType", "instructionMultiType")
+
+
+def _split_multi_type(options: Dict) -> tuple:
+    """
+    启用local_multitype时去掉多类型解释选项，改为向CE请求足够的原始字节在本地计算
+
+    Args:
+        options: 选项字典
+
+    Returns:
+        tuple: (发给CE的选项, 是否在本地计算multiType, 是否在本地计算instructionMultiType)
+    """
+    if not cheatEngine_config["local_multitype"] or not any(options.get(key) for key in MULTI_TYPE_OPTIONS):
+        return options, False, False
+
+    request_options = {key: value for key, value in options.items() if key not in MULTI_TYPE_OPTIONS}
+    multi_type = bool(options.get("multiType"))
+    if multi_type:
+        bytes_size = options.get("bytesSize", BYTES_READ_SIZE) if options.get("rawBytes") else 0
+        request_options.update(rawBytes=True, bytesSize=max(bytes_size, MULTI_TYPE_READ_SIZE))
+    return request_options, multi_type, bool(options.get("instructionMultiType") and options.get("assembly"))
+
+
+def _attach_multi_type(result: Dict[str, Any], options: Dict) -> None:
+    """
+    用响应中的原始字节计算multiType，并把原始字节恢复为调用方请求的长度
+
+    Args:
+        result: 读取结果
+        options: 调用方传入的原始选项
+    """
+    data = result.get("bytes")
+    if not result.get("success") or data is None:
+        return
+    result["multiType"] = decode_multi_type(bytes(data), options.get("endian", "little"),
+                                            get_memory_backend().string_encoding)
+    if options.get("rawBytes"):
+        result["bytes"] = data[:options.get("bytesSize", BYTES_READ_SIZE)]
+    else:
+        del result["bytes"]
+
+
+def _instruction_code_range(instructions: List[Dict[str, Any]]) -> tuple:
+    """
+    计算instructionMultiType需要的代码范围，最后一条指令之后也要有MULTI_TYPE_READ_SIZE字节
+    """
+    start, size = DisassemblyCache.code_range(instructions)
+    return start, size + max(MULTI_TYPE_READ_SIZE - DisassemblyCache.MAX_INSTRUCTION_SIZE, 0)
+
+
+def _code_bytes_size(options: Dict, window: Optional[tuple], trusted: bool, instruction_multi_type: bool) -> int:
+    """
+    计算反汇编请求需要附带的代码字节数
+
+    写入反汇编缓存的哈希和instructionMultiType都需要指令覆盖的代码字节，
+    随反汇编请求一起取回，不必在拿到指令列表后再单独读取一次
+
+    Args:
+        options: 发给CE的选项
+        window: _assembly_window的返回值
+        trusted: 地址是否位于只读区域(写入缓存时不需要哈希)
+        instruction_multi_type: 是否在本地计算instructionMultiType
+
+    Returns:
+        int: 从起始地址开始的字节数，不需要时为0
+    """
+    if not options.get("assembly") or not ((window and not trusted) or instruction_multi_type):
+        return 0
+    count = int(options.get("assemblySize") or DEFAULT_ASSEMBLY_SIZE)
+    size = count * DisassemblyCache.MAX_INSTRUCTION_SIZE
+    if instruction_multi_type:
+        size += max(MULTI_TYPE_READ_SIZE - DisassemblyCache.MAX_INSTRUCTION_SIZE, 0)
+    return size
+
+
+def _with_code_bytes(options: Dict, size: int) -> Dict:
+    """
+    借用opcode字段让CE同时返回从起始地址开始的size字节
+    """
+    if not size:
+        return options
+    opcode_size = options.get("opcodeSize", BYTES_READ_SIZE) if options.get("opcode") else 0
+    return dict(options, opcode=True, opcodeSize=max(size, opcode_size))
+
+
+def _take_code_bytes(result: Dict[str, Any], options: Dict, size: int) -> Optional[bytes]:
+    """
+    取出响应中附带的代码字节，并把opcode恢复为调用方请求的样子
+
+    Args:
+        result: 读取结果
+        options: 附带代码字节之前的选项
+        size: _code_bytes_size的返回值
+
+    Returns:
+        bytes: 代码字节，未附带或CE未返回时为None
+    """
+    if not size:
+        return None
+    data = result.get("opcode")
+    if not options.get("opcode"):
+        result.pop("opcode", None)
+    elif data is not None:
+        result["opcode"] = data[:options.get("opcodeSize", BYTES_READ_SIZE)]
+    return bytes(data) if data is not None else None
+
+
+def _slice_code(code: Optional[bytes], addr_int: int, start: int, size: int) -> Optional[bytes]:
+    """
+    从随请求取回的代码字节中切出[start, start + size)，范围不完整时为None
+    """
+    offset = start - addr_int
+    if code is None or offset < 0 or len(code) < offset + size:
+        return None
+    return code[offset:offset + size]
+
+
+def _attach_instruction_multi_type(result: Dict[str, Any], start: int, data: Optional[bytes], options: Dict) -> None:
+    """
+    为每条指令计算其地址处的多类型解释
+
+    指令列表可能来自反汇编缓存，这里复制每条指令，不修改缓存中的对象
+
+    Args:
+        result: 包含assembly的读取结果
+        start: data的起始地址
+        data: 覆盖全部指令的代码字节，读取失败为None
+        options: 调用方传入的原始选项
+    """
+    if data is None or not result.get("assembly"):
+        return
+    endian = options.get("endian", "little")
+    encoding = get_memory_backend().string_encoding
+    assembly = []
+    for instruction in result["assembly"]:
+        offset = int(instruction["address"], 16) - start
+        assembly.append(dict(
+            instruction, multiType=decode_multi_type(data[offset:offset + MULTI_TYPE_READ_SIZE], endian, encoding)
+        ))
+    result["assembly"] = assembly
+
+
+# 值可能是地址、需要标注符号的数据类型
+SYMBOL_VALUE_TYPES = ("pointer", "int64", "uint64", "int32", "uint32")
+# 反汇编文本中直接跳转/调用的目标地址，如"call 7FF6A1B2C3D0"、"jne 00401A2B"
+BRANCH_TARGET_PATTERN = re.compile(r"^(?:call|j[a-z]{1,3}|loop[a-z]*)\s+(?:0x)?([0-9A-Fa-f]{6,16})\b")
+
+
+def _symbol_targets(result: Dict[str, Any], data_type: str, options: Dict) -> tuple:
+    """
+    收集读取结果中需要标注符号的地址
+
+    Args:
+        result: 读取结果
+        data_type: 数据类型
+        options: 调用方传入的原始选项
+
+    Returns:
+        tuple: (值对应的地址或None, 每条指令的跳转目标地址或None的列表)
+    """
+    if not result.get("success") or not options.get("symbols", cheatEngine_config["symbol_annotate"]):
+        return None, []
+    value = result.get("value")
+    value_target = value if data_type.lower() in SYMBOL_VALUE_TYPES and isinstance(value, int) and value > 0 else None
+    branch_targets = []
+    for instruction in result.get("assembly") or []:
+        match = BRANCH_TARGET_PATTERN.match(instruction.get("instruction", "").split(" - ", 1)[-1].strip())
+        branch_targets.append(int(match.group(1), 16) if match else None)
+    return value_target, branch_targets
+
+
+def _attach_symbols(result: Dict[str, Any], value_target: Optional[int],
+                    branch_targets: List[Optional[int]], symbols: Dict[int, Optional[str]]) -> None:
+    """
+    将符号写入结果：值的符号放在result["symbol"]，跳转目标的符号放在对应指令的symbol字段
+
+    指令列表可能来自反汇编缓存，只复制带符号的指令，不修改缓存中的对象
+    """
+    if value_target is not None and symbols.get(value_target):
+        result["symbol"] = symbols[value_target]
+    if any(target is not None and symbols.get(target) for target in branch_targets):
+        result["assembly"] = [
+            dict(instruction, symbol=symbols[target]) if target is not None and symbols.get(target) else instruction
+            for instruction, target in zip(result["assembly"], branch_targets)
+        ]
+
+
+def _annotate_symbols(result: Dict[str, Any], data_type: str, options: Dict, region_map: RegionMap) -> None:
+    """
+    用符号索引标注值和跳转目标
+    """
+    value_target, branch_targets = _symbol_targets(result, data_type, options)
+    targets = {target for target in [value_target] + branch_targets if target is not None}
+    if targets:
+        index = get_symbol_index()
+        _attach_symbols(result, value_target, branch_targets,
+                        {target: index.symbolize(target, region_map) for target in targets})
+
+
+async def _annotate_symbols_async(result: Dict[str, Any], data_type: str, options: Dict,
+                                  region_map: RegionMap) -> None:
+    """
+    _annotate_symbols的asyncio版本
+    """
+    value_target, branch_targets = _symbol_targets(result, data_type, options)
+    targets = {target for target in [value_target] + branch_targets if target is not None}
+    if targets:
+        symbols = await get_symbol_index().symbolize_many_async(sorted(targets), region_map)
+        _attach_symbols(result, value_target, branch_targets, symbols)
+
+
+def _is_read_only(region_map: Optional[RegionMap], addr_int: int) -> bool:
+    """
+    判断地址是否位于已知的只读区域
+
+    CE后端的模块区段权限未知时先加载该模块的区段信息，每个模块只需一次
+    """
+    perms = region_perms(region_map, addr_int, load=True)
+    return bool(perms) and "w" not in perms
+
+
+async def _is_read_only_async(region_map: Optional[RegionMap], addr_int: int) -> bool:
+    """
+    _is_read_only的asyncio版本
+    """
+    perms = await region_perms_async(region_map, addr_int)
+    return bool(perms) and "w" not in perms
+
+
+def _read_local(result: Dict[str, Any], backend: MemoryBackend, addr_int: int,
+                data_type: str, options: Dict) -> Dict[str, Any]:
+    """
+    通过本地内存后端读取并在本地解码，不经过CheatEngine
+
+    Args:
+        result: 默认响应结构
+        backend: 本地内存后端
+        addr_int: 地址整数值
+        data_type: 数据类型
+        options: 选项字典
+
+    Returns:
+        Dict: 合并后的结果
+    """
+    # 反汇编、注释等依赖CE的功能本地后端无法提供，multiType在启用local_multitype时可以本地计算
+    request_options, multi_type, _ = _split_multi_type(options)
+    unsupported = [key for key in CE_ONLY_OPTIONS if request_options.get(key)]
+    if unsupported:
+        result["error"] = f"本地内存后端不支持选项: {', '.join(unsupported)}"
+        return result
+
+    sizes = _local_read_sizes(data_type, request_options)
+    _fill_local_result(result, backend.read(addr_int, max(sizes)), data_type, request_options, sizes)
+    if multi_type:
+        _attach_multi_type(result, options)
+    return result
+
+
+def _parse_read_response(result: Dict[str, Any], formatted_addr: str,
+                         response_type: Optional[int], content: Optional[bytes],
+                         payload: Optional[bytearray] = None) -> Dict[str, Any]:
+    """
+    解析MEMORY_READ响应并合并到结果中
+
+    Args:
+        result: 默认响应结构
+        formatted_addr: 格式化后的地址字符串
+        response_type: 响应的数据包类型
+        content: 响应内容
+        payload: 响应前附带的BYTECODE帧数据(未使用二进制传输时为None)
+
+    Returns:
+        Dict: 合并后的结果
+    """
+    if response_type is None or content is None:
+        result["error"] = "未收到服务器响应"
+        return result
+
+    # 解析响应JSON(兼容控制字符)并挂载二进制附加帧，同时记录解码耗时
+    try:
+        response = decode_json_response(content, payload)
+
+        # 二进制传输的字段还原为整数列表，保持与JSON传输一致的返回结构
+        for key in ("bytes", "opcode"):
+            if isinstance(response.get(key), memoryview):
+                response[key] = list(response[key])
+
+        # 将响应内容合并到结果中
+        result.update(response)
+
+        # 日志记录，成功时的详细信息只在开启跟踪时拼接
+        if not result.get("success"):
+            logger.warning("内存读取失败: %s", log_brief(result.get("error")))
+        elif _trace.isEnabledFor(logging.DEBUG):
+            _trace.debug("内存读取成功: %s, 值: %s", formatted_addr, log_brief(result.get("value")))
+
+            # 记录高级信息
+            advanced_info = []
+            if result.get("bytes"):
+                advanced_info.append(f"原始字节({len(result.get('bytes'))}字节)")
+            if result.get("assembly"):
+                advanced_info.append(f"汇编代码({len(result.get('assembly'))}条)")
+            if result.get("opcode"):
+                advanced_info.append(f"操作码({len(result.get('opcode'))}字节)")
+            if result.get("multiType"):
+                advanced_info.append(f"多类型解释({len(result.get('multiType'))}种)")
+
+            if advanced_info:
+                _trace.debug("返回高级信息: %s", ", ".join(advanced_info))
+    except Exception as parse_error:
+        logger.error("解析响应数据失败: %s", parse_error)
+        result["error"] = f"解析响应数据失败: {str(parse_error)}"
+        result["raw_content"] = content.decode('utf-8', errors='replace')
+
+    return result
+
+
+def _new_read_result(data_type: str) -> Dict[str, Any]:
+    """
+    memory_read的默认响应结构
+    """
+    return {
+        "success": False,
+        "address": None,
+        "dataType": data_type,
+        "value": None,
+        "error": None
+    }
+
+
+class _ReadPlan:
+    """
+    一次经过CE的memory_read中与I/O无关的步骤
+
+    memory_read和memory_read_async共用这里的规划和解码，各自只负责收发：
+    查询反汇编缓存 -> use_listing -> 判断只读区域 -> set_trusted ->
+    read_cached或request_payload/apply_response -> finish -> 读取instructionMultiType缺少的代码 -> 符号标注
+    """
+
+    def __init__(self, result: Dict[str, Any], addr_int: int, data_type: str, options: Dict):
+        """
+        Args:
+            result: 默认响应结构(address已填写)
+            addr_int: 地址整数值
+            data_type: 数据类型
+            options: 调用方传入的选项
+        """
+        self.result = result
+        self.addr_int = addr_int
+        self.data_type = data_type
+        self.options = options
+        # 多类型解释改为请求原始字节后在本地计算
+        self.request_options, self.multi_type, self.instruction_multi_type = _split_multi_type(options)
+        self.window = _assembly_window(self.request_options)
+        self.listing: Optional[List[Dict[str, Any]]] = None
+        self.trusted = False
+        self.code_size = 0
+        self.code: Optional[bytes] = None
+
+    def use_listing(self, listing: Optional[List[Dict[str, Any]]]) -> None:
+        """
+        反汇编缓存命中时，只向CE请求反汇编以外的部分
+        """
+        self.listing = listing
+        if listing is not None:
+            self.request_options = _without_assembly(self.request_options)
+
+    @property
+    def needs_trust_check(self) -> bool:
+        """
+        是否需要判断地址是否位于只读区域(将把CE返回的指令列表写入反汇编缓存)
+        """
+        return bool(self.window and self.request_options.get("assembly"))
+
+    def set_trusted(self, trusted: bool) -> None:
+        """
+        只读区域的指令列表直接信任，其余情况让反汇编请求附带代码字节
+        """
+        self.trusted = trusted
+        self.code_size = _code_bytes_size(self.request_options, self.window, trusted, self.instruction_multi_type)
+
+    def read_cached(self) -> bool:
+        """
+        普通的值读取命中页缓存时在本地完成，不需要往返CE
+
+        Returns:
+            bool: 是否已在本地完成
+        """
+        data, sizes = _read_cached(self.addr_int, self.data_type, self.request_options)
+        if data is None:
+            return False
+        _fill_local_result(self.result, data, self.data_type, self.request_options, sizes)
+        return True
+
+    def request_payload(self) -> str:
+        """
+        构建发给CE的MEMORY_READ请求
+        """
+        _trace.debug("发送内存读取请求: %s, 类型: %s", self.result["address"], self.data_type)
+        return _build_read_request(self.addr_int, self.data_type,
+                                   _with_code_bytes(self.request_options, self.code_size))
+
+    def apply_response(self, response_type: Optional[int], content: Optional[bytes],
+                       payload: Optional[bytearray] = None) -> None:
+        """
+        解析MEMORY_READ响应，并取出随反汇编请求附带的代码字节
+        """
+        _parse_read_response(self.result, self.result["address"], response_type, content, payload)
+        self.code = _take_code_bytes(self.result, self.request_options, self.code_size)
+
+    def finish(self) -> Optional[tuple]:
+        """
+        合并缓存的指令列表、写入反汇编缓存并在本地计算多类型解释
+
+        Returns:
+            tuple: instructionMultiType还需要读取的代码范围(起始地址, 长度)，不需要时为None
+        """
+        result = self.result
+        if self.listing is not None:
+            _attach_assembly(result, self.listing)
+        elif self.window and result.get("success") and result.get("assembly"):
+            start, size = DisassemblyCache.code_range(result["assembly"])
+            hashed = None if self.trusted else _slice_code(self.code, self.addr_int, start, size)
+            get_disassembly_cache().put(self.addr_int, result["assembly"], self.window[1], hashed, self.trusted)
+
+        if self.multi_type:
+            _attach_multi_type(result, self.options)
+        if self.instruction_multi_type and result.get("assembly"):
+            start, size = _instruction_code_range(result["assembly"])
+            data = _slice_code(self.code, self.addr_int, start, size)
+            if data is None:
+                return start, size
+            _attach_instruction_multi_type(result, start, data, self.options)
+        return None
+
+    def attach_instruction_code(self, start: int, data: Optional[bytes]) -> None:
+        """
+        用单独读取的代码字节计算instructionMultiType
+        """
+        _attach_instruction_multi_type(self.result, start, data, self.options)
+
+
+def memory_read(address: Union[str, int], data_type: str, options: Optional[Union[Dict, str]] = None) -> Dict[str, Any]:
+    """
+    读取指定内存地址的数据
+    
+    支持多种数据类型和高级选项，能够处理包含特殊字符的响应数据
+
+    Args:
+        address: 内存地址(十六进制字符串或整数)，可以是字符串形式的JSON
+        data_type: 数据类型(int32, float, double, string, bytes等)
+        options: 可选参数，包括assembly、multiType等，可以是字符串(将尝试解析为JSON)或字典
+
+    Returns:
+        Dict: 读取的内存数据及元信息
+    """
+    address, data_type, options = _normalize_read_args(address, data_type, options)
+    result = _new_read_result(data_type)
+
+    try:
+        # 格式化地址
+        formatted_addr, addr_int = format_address(address, get_region_map())
+        result["address"] = formatted_addr
+
+        # 在本地区域表中检查地址，未映射的地址不必再发给CE
+        mapped, region_map = check_mapped(addr_int, _read_size(data_type, options))
+        if not _annotate_region(result, mapped, region_map, addr_int):
+            return result
+
+        backend = get_memory_backend()
+        if backend.is_local:
+            return _read_local(result, backend, addr_int, data_type, options)
+
+        try:
+            plan = _ReadPlan(result, addr_int, data_type, options)
+            # 加载模块区段信息本身也要从连接池借用客户端，必须在借用之前完成，
+            # 否则连接池耗尽时持有客户端的调用会互相等待
+            read_only = plan.needs_trust_check and _is_read_only(region_map, addr_int)
+
+            # 从连接池借用CE客户端，请求完成后归还以复用长连接
+            with ce_client() as client:
+                if not client.connected:
+                    result["error"] = "未连接到CheatEngine服务器"
+                    return result
+
+                def read_code(start, size):
+                    return _read_ranges(client, [(start, size)], region_map)[0][0]
+
+                if plan.window:
+                    plan.use_listing(get_disassembly_cache().get(addr_int, *plan.window, read_code))
+                plan.set_trusted(plan.needs_trust_check and read_only)
+
+                if not plan.read_cached():
+                    plan.apply_response(*client.request_binary(
+                        client.PACKET_TYPE["MEMORY_READ"], plan.request_payload(), retry_count=2
+                    ))
+
+                code_range = plan.finish()
+                if code_range is not None:
+                    plan.attach_instruction_code(code_range[0], read_code(*code_range))
+            # 符号标注同样可能获取符号表，在归还客户端之后进行
+            _annotate_symbols(result, data_type, options, region_map)
+        except Exception as comm_error:
+            logger.error("与CheatEngine服务器通信时发生错误: %s", comm_error)
+            result["error"] = f"通信错误: {str(comm_error)}"
+    except Exception as e:
+        logger.error("内存读取处理失败: %s", e)
+        result["error"] = f"处理错误: {str(e)}"
+        
+    return result
+
+
+async def memory_read_async(address: Union[str, int], data_type: str,
+                            options: Optional[Union[Dict, str]] = None) -> Dict[str, Any]:
+    """
+    memory_read的asyncio版本
+
+    使用共享的AsyncCESocketClient收发，等待CheatEngine响应期间不占用线程
+
+    Args:
+        address: 内存地址(十六进制字符串或整数)，可以是字符串形式的JSON
+        data_type: 数据类型(int32, float, double, string, bytes等)
+        options: 可选参数，包括assembly、multiType等，可以是字符串(将尝试解析为JSON)或字典
+
+    Returns:
+        Dict: 读取的内存数据及元信息
+    """
+    address, data_type, options = _normalize_read_args(address, data_type, options)
+    result = _new_read_result(data_type)
+
+    try:
+        # 格式化地址
+        formatted_addr, addr_int = format_address(address, await get_region_map_async())
+        result["address"] = formatted_addr
+
+        # 在本地区域表中检查地址，未映射的地址不必再发给CE
+        mapped, region_map = await check_mapped_async(addr_int, _read_size(data_type, options))
+        if not _annotate_region(result, mapped, region_map, addr_int):
+            return result
+
+        backend = get_memory_backend()
+        if backend.is_local:
+            return _read_local(result, backend, addr_int, data_type, options)
+
+        try:
+            client = await get_async_ce_client()
+            if not client.connected:
+                result["error"] = "未连接到CheatEngine服务器"
+                return result
+
+            async def read_code(start, size):
+                return (await _read_ranges_async(client, [(start, size)], region_map))[0][0]
+
+            plan = _ReadPlan(result, addr_int, data_type, options)
+            if plan.window:
+                plan.use_listing(await get_disassembly_cache().get_async(addr_int, *plan.window, read_code))
+            plan.set_trusted(plan.needs_trust_check and await _is_read_only_async(region_map, addr_int))
+
+            if not plan.read_cached():
+                plan.apply_response(*await client.request_binary(
+                    client.PACKET_TYPE["MEMORY_READ"], plan.request_payload(), retry_count=2
+                ))
+
+            code_range = plan.finish()
+            if code_range is not None:
+                plan.attach_instruction_code(code_range[0], await read_code(*code_range))
+            await _annotate_symbols_async(result, data_type, options, region_map)
+        except Exception as comm_error:
+            logger.error("与CheatEngine服务器通信时发生错误: %s", comm_error)
+            result["error"] = f"通信错误: {str(comm_error)}"
+    except Exception as e:
+        logger.error("内存读取处理失败: %s", e)
+        result["error"] = f"处理错误: {str(e)}"
+
+    return result
+
+
+def _parse_batch_reads(reads: Union[List, str]) -> List[Dict[str, Any]]:
+    """
+    解析批量读取列表
+
+    Args:
+        reads: 读取列表，可以是JSON字符串
+
+    Returns:
+        List[Dict]: 每项包含address、addr、dataType、size的读取项
+    """
+    if isinstance(reads, str):
+        reads = json.loads(reads)
+    if not isinstance(reads, list):
+        raise ValueError("reads必须是列表")
+
+    entries = []
+    for item in reads:
+        if isinstance(item, dict):
+            address, data_type, size = item.get("address"), item.get("dataType"), item.get("size")
+        elif isinstance(item, (list, tuple)) and len(item) >= 2:
+            address, data_type = item[0], item[1]
+            size = item[2] if len(item) > 2 else None
+        else:
+            raise ValueError(f"无效的读取项: {item}")
+
+        formatted_addr, addr_int = format_address(address)
+        entries.append({
+            "address": formatted_addr,
+            "addr": addr_int,
+            "dataType": data_type,
+            "size": data_type_size(data_type, size)
+        })
+    return entries
+
+
+def _decode_batch_reads(entries: List[Dict[str, Any]], datas: List[Optional[bytes]],
+                        endian: str) -> List[Dict[str, Any]]:
+    """
+    在本地解码批量读取得到的原始字节
+
+    Args:
+        entries: _parse_batch_reads返回的读取项
+        datas: 与entries一一对应的原始字节(读取失败为None)
+        endian: 字节序
+
+    Returns:
+        List[Dict]: 每个读取项的结果
+    """
+    encoding = get_memory_backend().string_encoding
+    results = []
+    for entry, data in zip(entries, datas):
+        item = {
+            "address": entry["address"],
+            "dataType": entry["dataType"],
+            "value": None,
+            "success": False,
+            "error": None
+        }
+        if data is None:
+            item["error"] = "读取失败"
+        else:
+            try:
+                item["value"] = decode_value(data, entry["dataType"], endian, encoding)
+                item["success"] = True
+            except Exception as e:
+                item["error"] = f"解码失败: {str(e)}"
+        results.append(item)
+    return results
+
+
+def _raw_read_indexes(entries: List[Dict[str, Any]]) -> List[int]:
+    """
+    可以读取原始字节后在本地解码的读取项下标，字符串等依赖编码的类型留给CE解码
+
+    Args:
+        entries: _parse_batch_reads返回的读取项
+
+    Returns:
+        List[int]: 读取项下标列表
+    """
+    return [i for i, entry in enumerate(entries) if entry["dataType"].lower() not in CE_DECODED_TYPES]
+
+
+def _spread_raw_reads(count: int, indexes: List[int], datas: List[Optional[bytes]]) -> List[Optional[bytes]]:
+    """
+    将部分读取项的原始字节放回完整列表，未读取的项为None
+    """
+    spread: List[Optional[bytes]] = [None] * count
+    for index, data in zip(indexes, datas):
+        spread[index] = data
+    return spread
+
+
+def _build_batch_fallback(entries: List[Dict[str, Any]], results: List[Dict[str, Any]]) -> List[tuple]:
+    """
+    为原始字节读取失败的项构建按数据类型分组的MEMORY_BATCH请求，交给CE直接解码
+
+    Args:
+        entries: 读取项
+        results: 当前结果
+
+    Returns:
+        List[tuple]: (结果下标列表, 请求JSON)列表
+    """
+    groups = defaultdict(list)
+    for index, item in enumerate(results):
+        if not item["success"]:
+            groups[entries[index]["dataType"]].append(index)
+    return [
+        (indexes, json.dumps({"addresses": [entries[i]["address"] for i in indexes], "dataType": data_type}))
+        for data_type, indexes in groups.items()
+    ]
+
+
+def _apply_batch_fallback(results: List[Dict[str, Any]], fallback: List[tuple], responses: List[tuple]) -> None:
+    """
+    将按类型分组的MEMORY_BATCH响应合并到结果中
+
+    Args:
+        results: 当前结果
+        fallback: _build_batch_fallback返回的请求
+        responses: 与fallback一一对应的响应
+    """
+    for (indexes, _), (response_type, content) in zip(fallback, responses):
+        if response_type is None or content is None:
+            continue
+        try:
+            response = decode_json_response(content)
+        except ValueError as e:
+            logger.warning("批量读取响应解析失败: %s", e)
+            continue
+        for index, item in zip(indexes, response.get("results") or []):
+            if item.get("success"):
+                results[index].update(value=item.get("value"), success=True, error=None)
+            elif item.get("error"):
+                results[index]["error"] = item.get("error")
+
+
+def _new_batch_result() -> Dict[str, Any]:
+    """
+    批量读写的默认响应结构
+    """
+    return {"success": False, "results": [], "requestCount": 0, "error": None}
+
+
+def _finish_batch(result: Dict[str, Any], results: List[Dict[str, Any]], request_count: int) -> Dict[str, Any]:
+    """
+    将每项的结果和请求数合并到批量读写的响应中
+    """
+    result.update(
+        success=all(item["success"] for item in results),
+        results=results,
+        requestCount=request_count
+    )
+    return result
+
+
+def memory_batch_read(reads: Union[List, str], options: Optional[Union[Dict, str]] = None) -> Dict[str, Any]:
+    """
+    批量读取多个内存地址的数据
+
+    Args:
+        reads: 读取列表，每项为字典或[地址, 类型(, 长度)]，可以是JSON字符串
+        options: 可选参数，目前支持endian
+
+    Returns:
+        Dict: 包含每个读取项结果的字典
+    """
+    options = parse_options(options)
+    endian = options.get("endian", "little")
+    result = _new_batch_result()
+
+    try:
+        entries = _parse_batch_reads(reads)
+        ranges = [(entry["addr"], entry["size"]) for entry in entries]
+
+        backend = get_memory_backend()
+        if backend.is_local:
+            # 本地后端直接读取并解码，没有CE可以回退
+            datas, request_count = backend.read_many(ranges)
+            return _finish_batch(result, _decode_batch_reads(entries, datas, endian), request_count)
+
+        region_map = get_region_map() if get_page_cache() is not None else None
+
+        with ce_client() as client:
+            if not client.connected:
+                result["error"] = "未连接到CheatEngine服务器"
+                return result
+
+            indexes = _raw_read_indexes(entries)
+            datas, request_count = _read_ranges(client, [ranges[i] for i in indexes], region_map)
+            results = _decode_batch_reads(entries, _spread_raw_reads(len(entries), indexes, datas), endian)
+
+            fallback = _build_batch_fallback(entries, results)
+            if fallback:
+                batch_type = client.PACKET_TYPE["MEMORY_BATCH"]
+                responses = client.request_many([(batch_type, data) for _, data in fallback])
+                _apply_batch_fallback(results, fallback, responses)
+                request_count += len(fallback)
+
+        _finish_batch(result, results, request_count)
+        logger.info("批量读取完成: %d项, %d次请求", len(entries), request_count)
+    except Exception as e:
+        logger.error("批量读取处理失败: %s", e)
+        result["error"] = f"处理错误: {str(e)}"
+
+    return result
+
+
+async def memory_batch_read_async(reads: Union[List, str],
+                                  options: Optional[Union[Dict, str]] = None) -> Dict[str, Any]:
+    """
+    memory_batch_read的asyncio版本
+
+    Args:
+        reads: 读取列表，每项为字典或[地址, 类型(, 长度)]，可以是JSON字符串
+        options: 可选参数，目前支持endian
+
+    Returns:
+        Dict: 包含每个读取项结果的字典
+    """
+    options = parse_options(options)
+    endian = options.get("endian", "little")
+    result = _new_batch_result()
+
+    try:
+        entries = _parse_batch_reads(reads)
+        ranges = [(entry["addr"], entry["size"]) for entry in entries]
+
+        backend = get_memory_backend()
+        if backend.is_local:
+            # 本地后端直接读取并解码，没有CE可以回退
+            datas, request_count = await backend.read_many_async(ranges)
+            return _finish_batch(result, _decode_batch_reads(entries, datas, endian), request_count)
+
+        client = await get_async_ce_client()
+        if not client.connected:
+            result["error"] = "未连接到CheatEngine服务器"
+            return result
+
+        region_map = await get_region_map_async() if get_page_cache() is not None else None
+        indexes = _raw_read_indexes(entries)
+        datas, request_count = await _read_ranges_async(client, [ranges[i] for i in indexes], region_map)
+        results = _decode_batch_reads(entries, _spread_raw_reads(len(entries), indexes, datas), endian)
+
+        fallback = _build_batch_fallback(entries, results)
+        if fallback:
+            batch_type = client.PACKET_TYPE["MEMORY_BATCH"]
+            responses = await client.request_many([(batch_type, data) for _, data in fallback])
+            _apply_batch_fallback(results, fallback, responses)
+            request_count += len(fallback)
+
+        _finish_batch(result, results, request_count)
+        logger.info("批量读取完成: %d项, %d次请求", len(entries), request_count)
+    except Exception as e:
+        logger.error("批量读取处理失败: %s", e)
+        result["error"] = f"处理错误: {str(e)}"
+
+    return result
+
+
+def _parse_writes(writes: Union[List, Dict, str]) -> List[Dict[str, Any]]:
+    """
+    解析写入列表
+
+    Args:
+        writes: 写入列表或单个写入项，可以是JSON字符串
+
+    Returns:
+        List[Dict]: 每项包含address(整数)、formatted、dataType、value及可选previousValue的写入项
+    """
+    if isinstance(writes, str):
+        writes = json.loads(writes)
+    if isinstance(writes, dict):
+        writes = [writes]
+    if not isinstance(writes, list):
+        raise ValueError("writes必须是列表")
+
+    entries = []
+    for item in writes:
+        if isinstance(item, dict):
+            address, data_type, value = item.get("address"), item.get("dataType"), item.get("value")
+            previous = item.get("previousValue")
+        elif isinstance(item, (list, tuple)) and len(item) >= 3:
+            address, data_type, value = item[0], item[1], item[2]
+            previous = item[3] if len(item) > 3 else None
+        else:
+            raise ValueError(f"无效的写入项: {item}")
+        if address is None or not data_type or value is None:
+            raise ValueError(f"写入项缺少address、dataType或value: {item}")
+
+        formatted_addr, addr_int = format_address(address)
+        entry = {"address": addr_int, "formatted": formatted_addr, "dataType": data_type, "value": value}
+        if previous is not None:
+            entry["previousValue"] = previous
+        entries.append(entry)
+    return entries
+
+
+def _format_write_results(entries: List[Dict[str, Any]], results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    组合每个写入项的返回结果
+    """
+    formatted = []
+    for entry, item in zip(entries, results):
+        result = {
+            "address": entry["formatted"],
+            "dataType": entry["dataType"],
+            "value": entry["value"],
+            "success": item["success"],
+            "error": item["error"]
+        }
+        if "previousValue" in entry:
+            result["previousValue"] = entry["previousValue"]
+        formatted.append(result)
+    return formatted
+
+
+def memory_write(writes: Union[List, Dict, str], options: Optional[Union[Dict, str]] = None) -> Dict[str, Any]:
+    """
+    批量写入内存
+
+    Args:
+        writes: 写入列表，每项为字典或[地址, 类型, 值(, previousValue)]，可以是JSON字符串
+        options: 可选参数，目前支持endian
+
+    Returns:
+        Dict: 包含每个写入项结果的字典
+    """
+    options = parse_options(options)
+    result = _new_batch_result()
+
+    try:
+        entries = _parse_writes(writes)
+        results, request_count = get_memory_backend().write_many(entries, options.get("endian", "little"))
+        _finish_batch(result, _format_write_results(entries, results), request_count)
+        logger.info("批量写入完成: %d项, %d次请求", len(entries), request_count)
+    except Exception as e:
+        logger.error("批量写入处理失败: %s", e)
+        result["error"] = f"处理错误: {str(e)}"
+
+    return result
+
+
+async def memory_write_async(writes: Union[List, Dict, str],
+                             options: Optional[Union[Dict, str]] = None) -> Dict[str, Any]:
+    """
+    memory_write的asyncio版本
+
+    Args:
+        writes: 写入列表，每项为字典或[地址, 类型, 值(, previousValue)]，可以是JSON字符串
+        options: 可选参数，目前支持endian
+
+    Returns:
+        Dict: 包含每个写入项结果的字典
+    """
+    options = parse_options(options)
+    result = _new_batch_result()
+
+    try:
+        entries = _parse_writes(writes)
+        results, request_count = await get_memory_backend().write_many_async(entries, options.get("endian", "little"))
+        _finish_batch(result, _format_write_results(entries, results), request_count)
+        logger.info("批量写入完成: %d项, %d次请求", len(entries), request_count)
+    except Exception as e:
+        logger.error("批量写入处理失败: %s", e)
+        result["error"] = f"处理错误: {str(e)}"
+
+    return result
+
+
+# 为MCP创建适配器函数
+async def memory_read_adapter(address=None, data_type=None, options=None):
+    """
+    为MCP适配的memory_read包装器
+    
+    用于适配MCP的参数格式，将多个独立的参数传递给memory_read_async函数。
+    FastMCP会直接在事件循环中等待异步工具，不会阻塞其他工具调用
+    
+    Args:
+        address: 内存地址(十六进制字符串或整数)
+        data_type: 数据类型
+        options: 可选参数
+        
+    Returns:
+        Dict: memory_read的返回结果
+    """
+    try:
+        return await memory_read_async(address, data_type, options)
+    except Exception as e:
+        logger.error("内存读取适配器错误: %s", e)
+        return {
+            "success": False,
+            "error": f"参数处理错误: {str(e)}",
+            "address": str(address) if address else None,
+            "dataType": data_type
+        }
+
+
+async def memory_batch_read_adapter(reads=None, options=None):
+    """
+    为MCP适配的memory_batch_read包装器
+    
+    Args:
+        reads: 读取列表
+        options: 可选参数
+        
+    Returns:
+        Dict: memory_batch_read_async的返回结果
+    """
+    try:
+        return await memory_batch_read_async(reads, options)
+    except Exception as e:
+        logger.error("批量读取适配器错误: %s", e)
+        return {
+            "success": False,
+            "error": f"参数处理错误: {str(e)}",
+            "results": []
+        }
+
+
+async def memory_write_adapter(writes=None, options=None):
+    """
+    为MCP适配的memory_write包装器
+
+    Args:
+        writes: 写入列表
+        options: 可选参数
+
+    Returns:
+        Dict: memory_write_async的返回结果
+    """
+    try:
+        return await memory_write_async(writes, options)
+    except Exception as e:
+        logger.error("批量写入适配器错误: %s", e)
+        return {
+            "success": False,
+            "error": f"参数处理错误: {str(e)}",
+            "results": []
         }
 
 
@@ -306,4 +1476,8 @@ def register_tool(mcp):
         mcp: MCP实例
     """
     # 注册memory_read工具
-    mcp.tool(description=TOOL_DESCRIPTION)(memory_read_adapter)
\ No newline at end of file
+    mcp.tool(description=TOOL_DESCRIPTION)(memory_read_adapter)
+    # 注册memory_batch_read工具
+    mcp.tool(description=BATCH_TOOL_DESCRIPTION)(memory_batch_read_adapter)
+    # 注册memory_write工具
+    mcp.tool(description=WRITE_TOOL_DESCRIPTION)(memory_write_adapter)
\ No newline at end of file
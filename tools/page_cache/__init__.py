@@ -0,0 +1,3 @@
+"""
+页缓存工具
+"""
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""
+页缓存工具
+
+查看内存读取页缓存的命中统计，或手动使缓存失效
+"""
+from util import (
+    logger, get_page_cache, invalidate_page_cache, get_disassembly_cache, invalidate_disassembly_cache,
+    parse_address
+)
+from typing import Dict, Any, Optional, Union
+
+
+TOOL_DESCRIPTION = """
+    查看或清理内存读取的页缓存和反汇编缓存
+    
+    启用page_cache_pages后，memory_read和memory_batch_read会按4KB页缓存从CheatEngine读取的原始字节，
+    同一页内的后续读取直接在本地完成。可写区域的页很快过期，只读代码页缓存更久。
+    反汇编结果另有缓存(disasm_cache_size)，命中时通过代码字节的哈希校验代码未被修改；
+    两个缓存分别启用，操作对已启用的缓存生效。
+    
+    参数:
+    - action: 操作(stats: 查看统计，clear: 清空缓存，invalidate: 使指定范围失效)，默认stats
+    - address: invalidate的起始地址(十六进制字符串、整数或"模块名+偏移")
+    - size: invalidate的长度(字节，默认1)
+    
+    用法示例:
+    page_cache()
+    page_cache("invalidate", "0x7065F60", 64)
+    page_cache("clear")
+    
+    返回:
+    - stats: 缓存页数、命中/未命中次数、命中率、淘汰次数等(页缓存未启用时为null)
+    - disassembly: 反汇编缓存的统计信息(未启用时为null)
+    - dropped: 本次丢弃的页数
+    - disassemblyDropped: 本次丢弃的反汇编缓存项数
+"""
+
+
+def page_cache(action: str = "stats", address: Optional[Union[str, int]] = None,
+               size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    查看或清理页缓存
+    
+    Args:
+        action: stats/clear/invalidate
+        address: invalidate的起始地址
+        size: invalidate的长度
+        
+    Returns:
+        Dict: 缓存统计信息
+    """
+    result = {"success": False, "stats": None, "error": None}
+    
+    try:
+        if action == "clear":
+            result["dropped"] = invalidate_page_cache()
+            result["disassemblyDropped"] = invalidate_disassembly_cache()
+        elif action == "invalidate":
+            if address is None:
+                result["error"] = "invalidate需要指定address"
+                return result
+            addr_int = parse_address(address)
+            result["dropped"] = invalidate_page_cache(addr_int, int(size or 1))
+            result["disassemblyDropped"] = invalidate_disassembly_cache(addr_int, int(size or 1))
+        elif action != "stats":
+            result["error"] = f"不支持的操作: {action}"
+            return result
+        
+        # 页缓存和反汇编缓存分别由page_cache_pages和disasm_cache_size启用
+        cache = get_page_cache()
+        disassembly_cache = get_disassembly_cache()
+        result["stats"] = cache.stats() if cache is not None else None
+        result["disassembly"] = disassembly_cache.stats() if disassembly_cache is not None else None
+        result["success"] = True
+    except Exception as e:
+        logger.error("页缓存操作失败: %s", e)
+        result["error"] = f"页缓存操作失败: {str(e)}"
+    
+    return result
+
+
+def register_tool(mcp):
+    """
+    向MCP注册工具
+    
+    Args:
+        mcp: MCP实例
+    """
+    mcp.tool(description=TOOL_DESCRIPTION)(page_cache)
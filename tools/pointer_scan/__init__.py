@@ -0,0 +1,3 @@
+"""
+指针扫描工具
+"""
\ No newline at end of file
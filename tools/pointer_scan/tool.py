@@ -0,0 +1,448 @@
+"""
+指针扫描工具
+
+在Python端对内存快照执行指针扫描，代替CE中不稳定的Lua实现(POINTER_SCAN)。
+先用NumPy建立按指针值排序的索引，再从目标地址开始逐层反向查找指向它的指针，
+目标较多的层级分发到进程池并行计算。结果可以保存，之后对新快照重新扫描，过滤失效的路径
+"""
+from util import (
+    logger, cheatEngine_config, get_region_map, take_memory_snapshot, MemorySnapshot, RegionMap, parse_address, parse_options
+)
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Union, Any, Optional
+import numpy as np
+import asyncio
+import json
+import os
+import time
+
+
+TOOL_DESCRIPTION = """
+    指针扫描：查找从模块静态地址出发、最终指向目标地址的指针路径
+    
+    在Python端对内存快照计算，不依赖CE中的Lua指针扫描。
+    
+    参数:
+    - target_address: 目标地址(十六进制字符串或整数)
+    - options: 可选参数，与POINTER_SCAN一致并有扩展：
+      - maxLevel: 最大指针层级(默认3)
+      - maxResults: 最大结果数量(默认100)
+      - baseModules: 只接受这些模块作为基址(默认全部模块)
+      - offsetFilter: {"min": 最小偏移, "max": 最大偏移(默认0x1000), "alignAs": 偏移对齐(默认4)}
+      - maxCandidates: 每层最多保留的中间指针数(默认200000)
+      - regions: 快照范围[[起始地址, 长度], ...](默认为目标进程的可写区域)
+      - workers: 并行进程数(默认CPU核数)
+      - savePath: 保存结果的文件路径，之后可用pointer_rescan过滤
+    
+    用法示例:
+    pointer_scan("0x1A2B3C40", {"maxLevel": 4, "offsetFilter": {"max": 0x800, "alignAs": 8}})
+    
+    返回:
+    - results: 指针路径列表，格式同POINTER_SCAN响应(baseModule、offsets、offsetsText、score等)
+    - stats: 快照大小、索引指针数、每层候选数、耗时
+    
+    注意: CE后端只能枚举模块，堆内存需要通过regions显式指定；Linux本地后端会自动包含全部可写区域
+"""
+
+RESCAN_TOOL_DESCRIPTION = """
+    对保存的指针扫描结果重新扫描，只保留在新快照中仍然指向目标地址的路径
+    
+    参数:
+    - path: pointer_scan的savePath
+    - target_address: 新的目标地址(可选，默认与扫描时相同，目标对象重新分配后应指定新地址)
+    - options: 可选参数：
+      - regions: 快照范围(默认为目标进程的可写区域)
+      - save: 是否将过滤后的结果写回文件(默认true)
+    
+    返回:
+    - results: 仍然有效的路径
+    - removed: 被过滤掉的路径数量
+"""
+
+# 每层目标数量达到该值时才使用进程池，目标较少时进程间传输的开销大于计算
+POOL_MIN_TARGETS = 4096
+DEFAULT_MAX_CANDIDATES = 200000
+
+
+def build_pointer_index(snapshot: MemorySnapshot, pointer_size: int) -> tuple:
+    """
+    在快照中找出所有指向快照内部的对齐指针，按指针值排序
+
+    Args:
+        snapshot: 内存快照
+        pointer_size: 指针大小(4或8)
+
+    Returns:
+        tuple: (指针值数组, 指针所在地址数组)，均为int64并按指针值排序
+    """
+    dtype = np.dtype("<u8") if pointer_size == 8 else np.dtype("<u4")
+    starts = np.array([start for start, _ in snapshot.segments], dtype=np.uint64)
+    ends = starts + np.array([len(data) for _, data in snapshot.segments], dtype=np.uint64)
+
+    values, locations = [], []
+    for start, data in snapshot.segments:
+        # 段起始地址按页对齐，从段首开始按指针大小对齐读取
+        words = np.frombuffer(data, dtype=dtype, count=len(data) // pointer_size).astype(np.uint64)
+        segment = np.searchsorted(starts, words, side="right") - 1
+        valid = (segment >= 0) & (words < ends[np.maximum(segment, 0)])
+        positions = np.nonzero(valid)[0]
+        values.append(words[positions].astype(np.int64))
+        locations.append(start + positions.astype(np.int64) * pointer_size)
+
+    if not values:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    values = np.concatenate(values)
+    locations = np.concatenate(locations)
+    order = np.argsort(values, kind="stable")
+    return values[order], locations[order]
+
+
+def search_pointers(values: np.ndarray, locations: np.ndarray, targets: np.ndarray,
+                    min_offset: int, max_offset: int, align: int) -> tuple:
+    """
+    查找所有满足 指针值 + 偏移 = 目标 且偏移在范围内并对齐的指针
+
+    Args:
+        values: 排序后的指针值
+        locations: 对应的指针地址
+        targets: 目标地址数组
+        min_offset: 最小偏移
+        max_offset: 最大偏移
+        align: 偏移对齐
+
+    Returns:
+        tuple: (目标下标数组, 指针地址数组, 偏移数组)
+    """
+    low = np.searchsorted(values, targets - max_offset, side="left")
+    high = np.searchsorted(values, targets - min_offset, side="right")
+    counts = high - low
+    total = int(counts.sum())
+    if total == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+
+    # 把每个目标对应的[low, high)区间展开为一维下标
+    target_index = np.repeat(np.arange(len(targets), dtype=np.int64), counts)
+    first = np.repeat(low - (np.cumsum(counts) - counts), counts)
+    positions = first + np.arange(total, dtype=np.int64)
+    offsets = targets[target_index] - values[positions]
+    if align > 1:
+        keep = offsets % align == 0
+        return target_index[keep], locations[positions[keep]], offsets[keep]
+    return target_index, locations[positions], offsets
+
+
+# 进程池工作进程中的指针索引，由_init_worker在进程启动时设置
+_worker_index: Optional[tuple] = None
+
+
+def _init_worker(values: np.ndarray, locations: np.ndarray) -> None:
+    global _worker_index
+    _worker_index = (values, locations)
+
+
+def _search_worker(args: tuple) -> tuple:
+    targets, min_offset, max_offset, align, base = args
+    target_index, found, offsets = search_pointers(*_worker_index, targets, min_offset, max_offset, align)
+    # 目标下标转换为整层中的下标
+    return target_index + base, found, offsets
+
+
+def _parallel_search(pool: ProcessPoolExecutor, workers: int, targets: np.ndarray,
+                     min_offset: int, max_offset: int, align: int) -> tuple:
+    """
+    将一层的目标分块交给进程池查找，并按原顺序合并结果
+    """
+    size = -(-len(targets) // workers)
+    tasks = [(targets[i:i + size], min_offset, max_offset, align, i) for i in range(0, len(targets), size)]
+    parts = list(pool.map(_search_worker, tasks))
+    return tuple(np.concatenate([part[k] for part in parts]) for k in range(3))
+
+
+def _path_score(offsets: List[int], max_offset: int) -> int:
+    """
+    路径评分：层级越少、偏移越小越可靠
+    """
+    penalty = 10 * (len(offsets) - 2) + sum(min(5, 5 * offset // max(max_offset, 1)) for offset in offsets[1:])
+    return max(0, 100 - penalty)
+
+
+def _format_result(module: str, base: int, offsets: List[int], target: int, max_offset: int) -> Dict[str, Any]:
+    return {
+        "baseModule": module,
+        "baseAddress": f"0x{base:X}",
+        "offsets": offsets,
+        "resultAddress": f"0x{target:X}",
+        "offsetsText": f"{module}+" + ",".join(f"{offset:X}" for offset in offsets),
+        "score": _path_score(offsets, max_offset)
+    }
+
+
+def scan_snapshot(snapshot: MemorySnapshot, region_map: RegionMap, target: int,
+                  max_level: int = 3, min_offset: int = 0, max_offset: int = 0x1000, align: int = 4,
+                  base_modules: Optional[List[str]] = None, max_results: int = 100,
+                  max_candidates: int = DEFAULT_MAX_CANDIDATES, workers: Optional[int] = None) -> tuple:
+    """
+    在快照上执行逐层反向指针扫描
+
+    Args:
+        snapshot: 内存快照
+        region_map: 用于判断静态地址的区域表
+        target: 目标地址
+        max_level: 最大指针层级
+        min_offset: 最小偏移
+        max_offset: 最大偏移
+        align: 偏移对齐
+        base_modules: 允许的基址模块(不区分大小写)，None表示全部
+        max_results: 最大结果数量
+        max_candidates: 每层最多保留的中间指针数
+        workers: 并行进程数
+
+    Returns:
+        tuple: (结果列表, 统计信息)
+    """
+    started = time.time()
+    pointer_size = cheatEngine_config["pointer_size"]
+    values, locations = build_pointer_index(snapshot, pointer_size)
+    stats = {"snapshotBytes": snapshot.total_bytes, "indexedPointers": int(len(values)), "levels": []}
+
+    allowed = {name.lower() for name in base_modules} if base_modules else None
+    modules = [module for module in region_map.module_regions()
+               if allowed is None or module[2].lower() in allowed]
+    module_starts = np.array([module[0] for module in modules], dtype=np.int64)
+    module_ends = np.array([module[1] for module in modules], dtype=np.int64)
+
+    workers = workers or os.cpu_count() or 1
+    pool: Optional[ProcessPoolExecutor] = None
+    results: List[Dict[str, Any]] = []
+    # 每层保存去重后的地址，以及该层的节点(地址下标, 偏移, 上一层地址下标)；
+    # 同一地址可能经由多个上一层地址到达目标，查找只按去重后的地址进行一次
+    levels = [{"addresses": np.array([target], dtype=np.int64)}]
+
+    def paths(depth: int, index: int):
+        # 枚举从第depth层第index个地址到目标的所有偏移序列
+        if depth == 0:
+            yield []
+            return
+        level = levels[depth]
+        begin, end = np.searchsorted(level["sorted_locations"], [index, index + 1])
+        for node in level["order"][begin:end]:
+            for rest in paths(depth - 1, int(level["parents"][node])):
+                yield [int(level["offsets"][node])] + rest
+
+    try:
+        for depth in range(1, max_level + 1):
+            targets = levels[-1]["addresses"]
+            if len(targets) == 0 or len(results) >= max_results:
+                break
+
+            if workers > 1 and len(targets) >= POOL_MIN_TARGETS:
+                if pool is None:
+                    pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(values, locations))
+                parent, found, offsets = _parallel_search(pool, workers, targets, min_offset, max_offset, align)
+            else:
+                parent, found, offsets = search_pointers(values, locations, targets, min_offset, max_offset, align)
+
+            # 位于基址模块内的指针就是路径的起点
+            module_index = np.searchsorted(module_starts, found, side="right") - 1
+            static = (module_index >= 0) & (found < module_ends[np.maximum(module_index, 0)]) \
+                if len(modules) else np.zeros(len(found), dtype=bool)
+            for i in np.nonzero(static)[0]:
+                _, _, name, base = modules[module_index[i]]
+                for rest in paths(depth - 1, int(parent[i])):
+                    if len(results) >= max_results:
+                        break
+                    results.append(_format_result(name, base, [int(found[i]) - base, int(offsets[i])] + rest,
+                                                  target, max_offset))
+
+            # 其余指针作为下一层的目标
+            dynamic = ~static
+            addresses, inverse = np.unique(found[dynamic], return_inverse=True)
+            node_offsets, node_parents = offsets[dynamic], parent[dynamic]
+            truncated = len(addresses) > max_candidates
+            if truncated:
+                keep = inverse < max_candidates
+                addresses, inverse = addresses[:max_candidates], inverse[keep]
+                node_offsets, node_parents = node_offsets[keep], node_parents[keep]
+            order = np.argsort(inverse, kind="stable")
+            levels.append({
+                "addresses": addresses,
+                "offsets": node_offsets,
+                "parents": node_parents,
+                "order": order,
+                "sorted_locations": inverse[order]
+            })
+            stats["levels"].append({
+                "level": depth,
+                "targets": int(len(targets)),
+                "pointers": int(len(found)),
+                "static": int(static.sum()),
+                "truncated": bool(truncated)
+            })
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    stats["elapsed"] = round(time.time() - started, 3)
+    return results, stats
+
+
+def _resolve_path(snapshot: MemorySnapshot, region_map: RegionMap, result: Dict[str, Any],
+                  pointer_size: int) -> Optional[int]:
+    """
+    在快照上解析一条保存的路径
+
+    Returns:
+        int: 最终地址，路径断裂时为None
+    """
+    base = region_map.resolve(result["baseModule"])
+    if base is None:
+        return None
+    offsets = result["offsets"]
+    address = base + offsets[0]
+    for offset in offsets[1:]:
+        data = snapshot.read(address, pointer_size)
+        if data is None:
+            return None
+        address = int.from_bytes(data, "little") + offset
+    return address
+
+
+def pointer_scan(target_address: Union[str, int], options: Optional[Union[Dict, str]] = None) -> Dict[str, Any]:
+    """
+    对当前目标进程执行指针扫描
+
+    Args:
+        target_address: 目标地址
+        options: 可选参数，见TOOL_DESCRIPTION
+
+    Returns:
+        Dict: 扫描结果
+    """
+    result = {"success": False, "targetAddress": None, "results": [], "stats": None, "error": None}
+
+    try:
+        options = parse_options(options)
+        target = parse_address(target_address)
+        result["targetAddress"] = f"0x{target:X}"
+        offset_filter = options.get("offsetFilter") or {}
+        regions = options.get("regions")
+
+        snapshot = take_memory_snapshot(
+            regions=[(parse_address(start), int(size)) for start, size in regions] if regions else None
+        )
+        results, stats = scan_snapshot(
+            snapshot, get_region_map(), target,
+            max_level=int(options.get("maxLevel", 3)),
+            min_offset=int(offset_filter.get("min", 0)),
+            max_offset=int(offset_filter.get("max", 0x1000)),
+            align=int(offset_filter.get("alignAs", 4)),
+            base_modules=options.get("baseModules"),
+            max_results=int(options.get("maxResults", 100)),
+            max_candidates=int(options.get("maxCandidates", DEFAULT_MAX_CANDIDATES)),
+            workers=options.get("workers")
+        )
+        result.update(success=True, results=results, stats=stats)
+
+        if options.get("savePath"):
+            with open(options["savePath"], "w", encoding="utf-8") as f:
+                json.dump({
+                    "targetAddress": result["targetAddress"],
+                    "pointerSize": cheatEngine_config["pointer_size"],
+                    "results": results
+                }, f)
+            result["savePath"] = options["savePath"]
+        logger.info("指针扫描完成: 目标%s, %s条路径, 耗时%s秒", result['targetAddress'], len(results), stats['elapsed'])
+    except Exception as e:
+        logger.error("指针扫描失败: %s", e)
+        result["error"] = f"指针扫描失败: {str(e)}"
+
+    return result
+
+
+def pointer_rescan(path: str, target_address: Optional[Union[str, int]] = None,
+                   options: Optional[Union[Dict, str]] = None) -> Dict[str, Any]:
+    """
+    对新快照重新检查保存的指针路径
+
+    Args:
+        path: 保存结果的文件
+        target_address: 新的目标地址，默认与扫描时相同
+        options: 可选参数，支持regions、save
+
+    Returns:
+        Dict: 仍然有效的路径
+    """
+    result = {"success": False, "targetAddress": None, "results": [], "removed": 0, "error": None}
+
+    try:
+        options = parse_options(options)
+        with open(path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        target = parse_address(target_address if target_address is not None else saved["targetAddress"])
+        result["targetAddress"] = f"0x{target:X}"
+        regions = options.get("regions")
+
+        snapshot = take_memory_snapshot(
+            regions=[(parse_address(start), int(size)) for start, size in regions] if regions else None
+        )
+        region_map = get_region_map()
+        pointer_size = saved.get("pointerSize", cheatEngine_config["pointer_size"])
+        kept = []
+        for item in saved["results"]:
+            if _resolve_path(snapshot, region_map, item, pointer_size) == target:
+                item["resultAddress"] = result["targetAddress"]
+                kept.append(item)
+
+        result.update(success=True, results=kept, removed=len(saved["results"]) - len(kept))
+        if options.get("save", True):
+            saved.update(targetAddress=result["targetAddress"], results=kept)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(saved, f)
+        logger.info("指针重新扫描完成: 保留%s条, 过滤%s条", len(kept), result['removed'])
+    except Exception as e:
+        logger.error("指针重新扫描失败: %s", e)
+        result["error"] = f"指针重新扫描失败: {str(e)}"
+
+    return result
+
+
+# 为MCP创建适配器函数，扫描在线程池中执行，不阻塞事件循环
+async def pointer_scan_adapter(target_address=None, options=None):
+    """
+    为MCP适配的pointer_scan包装器
+    
+    Args:
+        target_address: 目标地址
+        options: 可选参数
+        
+    Returns:
+        Dict: pointer_scan的返回结果
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, pointer_scan, target_address, options)
+
+
+async def pointer_rescan_adapter(path=None, target_address=None, options=None):
+    """
+    为MCP适配的pointer_rescan包装器
+    
+    Args:
+        path: 保存结果的文件
+        target_address: 新的目标地址
+        options: 可选参数
+        
+    Returns:
+        Dict: pointer_rescan的返回结果
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, pointer_rescan, path, target_address, options)
+
+
+def register_tool(mcp):
+    """
+    向MCP注册工具
+    
+    Args:
+        mcp: MCP实例
+    """
+    mcp.tool(name="pointer_scan", description=TOOL_DESCRIPTION)(pointer_scan_adapter)
+    mcp.tool(name="pointer_rescan", description=RESCAN_TOOL_DESCRIPTION)(pointer_rescan_adapter)
@@ -0,0 +1,4 @@
+"""
+指针工具包初始化文件
+包含指针链解析等功能
+"""
\ No newline at end of file
@@ -0,0 +1,309 @@
+"""
+指针链批量解析工具
+
+一次解析多条"模块+偏移"指针链。所有链按偏移前缀去重后逐层解引用，
+同一层的所有指针通过一次批量读取完成，中间指针在短时间内缓存复用
+"""
+from util import (
+    logger, cheatEngine_config, get_memory_backend, get_region_map_async, get_async_ce_client,
+    decode_value, data_type_size, decode_json_response, get_pointer_cache, parse_options
+)
+from typing import Dict, List, Union, Any, Optional
+import time
+import json
+
+
+TOOL_DESCRIPTION = """
+    批量解析指针链并读取最终地址的值
+    
+    共享前缀的指针链(例如game.dll+1234,8,10 与 game.dll+1234,8,20)只解引用一次公共部分，
+    每一层的所有指针合并为一次批量读取，解析数百条链通常只需要几次往返。
+    
+    参数:
+    - chains: 指针链列表，每项可以是:
+      - 字符串 "模块名+基址偏移,偏移1,偏移2,..."(偏移为十六进制)，例如 "game.dll+1234,8,10"
+      - 字典 {"baseModule": "game.dll", "offsets": [0x1234, 0x8, 0x10], "dataType": "float"}
+      - 字典 {"chain": "game.dll+1234,8,10", "dataType": "float"}
+    - data_type: 默认数据类型(int32, float, double, pointer, string等，默认int32)
+    - options: 可选参数，支持以下选项：
+      - endian: 字节序(little/big，默认little)
+      - maxAge: 允许复用的中间指针缓存时间(秒，默认使用pointer_cache_ttl配置，0表示不使用缓存)
+    
+    用法示例:
+    pointer_chain_read(["game.dll+1234,8,10", "game.dll+1234,8,14", "game.dll+1234,C"], "int32")
+    
+    返回:
+    - results: 与chains一一对应的结果，格式同POINTER_READ响应，
+      包含addressChain(每一步的地址)、finalAddress、value、success、error
+    - requestCount: 实际发出的请求数
+"""
+
+
+def _parse_offset(value: Union[str, int]) -> int:
+    """
+    解析十六进制偏移，支持负偏移
+    """
+    if isinstance(value, int):
+        return value
+    text = value.strip().lower()
+    sign = -1 if text.startswith('-') else 1
+    text = text.lstrip('+-')
+    return sign * int(text[2:] if text.startswith('0x') else text, 16)
+
+
+def _parse_chain(item: Union[str, Dict], default_type: str) -> Dict[str, Any]:
+    """
+    解析一条指针链
+
+    Args:
+        item: 链的字符串或字典形式
+        default_type: 默认数据类型
+
+    Returns:
+        Dict: 包含baseModule、offsets、dataType的链描述
+    """
+    data_type = default_type
+    if isinstance(item, dict):
+        data_type = item.get("dataType") or default_type
+        if "chain" in item:
+            item = item["chain"]
+        else:
+            offsets = [_parse_offset(offset) for offset in item.get("offsets") or []]
+            if not item.get("baseModule") or not offsets:
+                raise ValueError(f"无效的指针链: {item}")
+            return {"baseModule": item["baseModule"], "offsets": offsets, "dataType": data_type}
+
+    if not isinstance(item, str):
+        raise ValueError(f"无效的指针链: {item}")
+    parts = [part.strip() for part in item.split(',') if part.strip()]
+    if not parts:
+        raise ValueError(f"无效的指针链: {item}")
+    module, sep, first = parts[0].partition('+')
+    offsets = [_parse_offset(first) if sep else 0] + [_parse_offset(part) for part in parts[1:]]
+    return {"baseModule": module.strip(), "offsets": offsets, "dataType": data_type}
+
+
+def _format_offset(offset: int) -> str:
+    return f"-{-offset:X}" if offset < 0 else f"{offset:X}"
+
+
+def _new_result(chain: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    构建与POINTER_READ响应格式一致的结果结构
+    """
+    offsets = chain["offsets"]
+    return {
+        "success": False,
+        "baseModule": chain["baseModule"],
+        "baseAddress": None,
+        "offsets": offsets,
+        "offsetsText": f"{chain['baseModule']}+" + ",".join(_format_offset(offset) for offset in offsets),
+        "addressChain": [],
+        "finalAddress": None,
+        "dataType": chain["dataType"],
+        "value": None,
+        "error": None
+    }
+
+
+def _chain_step(result: Dict[str, Any], step: int, offset: Optional[int], address: int, description: str) -> None:
+    result["addressChain"].append({
+        "step": step,
+        "offset": offset,
+        "address": f"0x{address:X}",
+        "description": description
+    })
+
+
+async def _read_pointer_level(backend, addresses: List[int], max_age: float) -> tuple:
+    """
+    解引用一层指针，缓存未命中的地址合并为一次批量读取
+
+    Args:
+        backend: 内存后端
+        addresses: 需要解引用的地址(已去重)
+        max_age: 允许复用的缓存时间(秒)
+
+    Returns:
+        tuple: (地址 -> 指针值(失败为None), 实际发出的请求数)
+    """
+    pointer_size = cheatEngine_config["pointer_size"]
+    cache = get_pointer_cache()
+    values: Dict[int, Optional[int]] = dict(cache.get_many(addresses, max_age)) if max_age > 0 else {}
+    missing = [address for address in addresses if address not in values]
+
+    request_count = 0
+    if missing:
+        read_at = time.time()
+        datas, request_count = await backend.read_many_async([(address, pointer_size) for address in missing])
+        loaded = {address: decode_value(data, "pointer") for address, data in zip(missing, datas) if data is not None}
+        cache.put_many(loaded, pointer_size, read_at)
+        values.update(loaded)
+        for address in missing:
+            values.setdefault(address, None)
+    return values, request_count
+
+
+async def _pointer_read_fallback(chain: Dict[str, Any], result: Dict[str, Any]) -> int:
+    """
+    本地无法解析基址模块时，交给CE的POINTER_READ解析整条链
+
+    Returns:
+        int: 实际发出的请求数
+    """
+    client = await get_async_ce_client()
+    if not client.connected:
+        result["error"] = f"找不到模块: {chain['baseModule']}"
+        return 0
+    request = json.dumps({
+        "baseModule": chain["baseModule"],
+        "offsets": chain["offsets"],
+        "dataType": chain["dataType"]
+    })
+    response_type, content = await client.request(client.PACKET_TYPE["POINTER_READ"], request)
+    if response_type is None or content is None:
+        result["error"] = "未收到服务器响应"
+    else:
+        result.update(decode_json_response(content))
+    return 1
+
+
+async def pointer_chain_read_async(chains: Union[List, str], data_type: str = "int32",
+                                   options: Optional[Union[Dict, str]] = None) -> Dict[str, Any]:
+    """
+    批量解析指针链并读取最终地址的值
+
+    Args:
+        chains: 指针链列表，可以是JSON字符串
+        data_type: 默认数据类型
+        options: 可选参数，支持endian、maxAge
+
+    Returns:
+        Dict: 包含每条链结果的字典
+    """
+    if isinstance(chains, str):
+        try:
+            chains = json.loads(chains)
+        except json.JSONDecodeError:
+            # 单条链的字符串形式
+            chains = [chains]
+    options = parse_options(options)
+    endian = options.get("endian", "little")
+    max_age = float(options.get("maxAge", cheatEngine_config["pointer_cache_ttl"]))
+    response = {"success": False, "results": [], "requestCount": 0, "error": None}
+
+    try:
+        parsed = [_parse_chain(item, data_type or "int32") for item in chains]
+        results = [_new_result(chain) for chain in parsed]
+        backend = get_memory_backend()
+        region_map = await get_region_map_async()
+        request_count = 0
+
+        # 第1层: 模块基址 + 第一个偏移，在本地计算
+        addresses: List[Optional[int]] = []
+        fallback = []
+        for index, (chain, result) in enumerate(zip(parsed, results)):
+            base = region_map.resolve(chain["baseModule"])
+            if base is None:
+                addresses.append(None)
+                fallback.append(index)
+                continue
+            result["baseAddress"] = f"0x{base:X}"
+            _chain_step(result, 0, None, base, f"Base: {chain['baseModule']}")
+            address = base + chain["offsets"][0]
+            description = f"{chain['baseModule']}+{_format_offset(chain['offsets'][0])}"
+            _chain_step(result, 1, chain["offsets"][0], address, description)
+            addresses.append(address)
+
+        # 逐层解引用；共享前缀的链在同一层得到相同的地址，只读取一次
+        depth = max((len(chain["offsets"]) for chain in parsed), default=0)
+        for level in range(1, depth):
+            active = [i for i, chain in enumerate(parsed)
+                      if addresses[i] is not None and len(chain["offsets"]) > level]
+            if not active:
+                break
+            pointers, count = await _read_pointer_level(
+                backend, list(dict.fromkeys(addresses[i] for i in active)), max_age
+            )
+            request_count += count
+            for i in active:
+                pointer = pointers.get(addresses[i])
+                if not pointer:
+                    results[i]["error"] = f"无法读取指针: 0x{addresses[i]:X}"
+                    addresses[i] = None
+                    continue
+                offset = parsed[i]["offsets"][level]
+                previous = results[i]["addressChain"][-1]["description"]
+                addresses[i] = pointer + offset
+                _chain_step(results[i], level + 1, offset, addresses[i], f"[{previous}]+{_format_offset(offset)}")
+
+        # 最终地址的值合并为一次批量读取，在本地解码
+        finals = []
+        ranges = []
+        for i in range(len(parsed)):
+            if addresses[i] is None:
+                continue
+            results[i]["finalAddress"] = f"0x{addresses[i]:X}"
+            try:
+                ranges.append((addresses[i], data_type_size(parsed[i]["dataType"])))
+                finals.append(i)
+            except ValueError as e:
+                results[i]["error"] = str(e)
+        if ranges:
+            datas, count = await backend.read_many_async(ranges)
+            request_count += count
+            for i, data in zip(finals, datas):
+                if data is None:
+                    results[i]["error"] = f"无法读取地址: 0x{addresses[i]:X}"
+                    continue
+                results[i]["value"] = decode_value(data, parsed[i]["dataType"], endian, backend.string_encoding)
+                results[i]["success"] = True
+
+        for i in fallback:
+            request_count += await _pointer_read_fallback(parsed[i], results[i])
+
+        response.update(
+            success=all(result["success"] for result in results),
+            results=results,
+            requestCount=request_count
+        )
+        logger.info("指针链解析完成: %s条, %s次请求", len(parsed), request_count)
+    except Exception as e:
+        logger.error("指针链解析失败: %s", e)
+        response["error"] = f"处理错误: {str(e)}"
+
+    return response
+
+
+# 为MCP创建适配器函数
+async def pointer_chain_read_adapter(chains=None, data_type="int32", options=None):
+    """
+    为MCP适配的pointer_chain_read包装器
+    
+    Args:
+        chains: 指针链列表
+        data_type: 默认数据类型
+        options: 可选参数
+        
+    Returns:
+        Dict: pointer_chain_read_async的返回结果
+    """
+    try:
+        return await pointer_chain_read_async(chains, data_type, options)
+    except Exception as e:
+        logger.error("指针链解析适配器错误: %s", e)
+        return {
+            "success": False,
+            "error": f"参数处理错误: {str(e)}",
+            "results": []
+        }
+
+
+def register_tool(mcp):
+    """
+    向MCP注册工具
+    
+    Args:
+        mcp: MCP实例
+    """
+    mcp.tool(name="pointer_chain_read", description=TOOL_DESCRIPTION)(pointer_chain_read_adapter)
@@ -0,0 +1,3 @@
+"""
+内存快照文件工具
+"""
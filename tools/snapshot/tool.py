@@ -0,0 +1,445 @@
+"""
+内存快照文件工具
+
+将选定的内存区域写入单个可mmap的快照文件(文件头 + 区域索引 + 原始数据)，
+打开后各区域直接以零拷贝的NumPy数组访问，两个快照之间的差异用向量化比较计算，
+用于"按下跳跃键之后哪些内存变了"这类分析
+"""
+from util import (
+    logger, cheatEngine_config, get_memory_backend, get_region_map, snapshot_regions, SNAPSHOT_CHUNK_SIZE, parse_address, parse_options
+)
+from typing import Dict, List, Union, Any, Optional
+import numpy as np
+import asyncio
+import struct
+import mmap
+import time
+
+
+SAVE_TOOL_DESCRIPTION = """
+    保存内存快照到文件
+
+    参数:
+    - path: 快照文件路径
+    - options: 可选参数：
+      - regions: 快照范围[[起始地址, 长度], ...](默认为目标进程的可写区域，CE后端见下方注意)
+      - modules: 只包含这些模块的区域，例如["game.exe"]
+      - writableOnly: 未指定regions时是否只包含可写区域(默认true)
+      - maxBytes: 快照大小上限(默认使用snapshot_max_bytes配置)
+
+    用法示例:
+    memory_snapshot_save("before.snap")
+
+    返回:
+    - regions: 实际保存的区域数量
+    - totalBytes: 保存的字节数
+
+    注意: CE后端只能枚举模块，未指定regions时只保存各模块映像，堆内存需要通过regions显式指定
+"""
+
+DIFF_TOOL_DESCRIPTION = """
+    比较两个快照文件，返回发生变化的字节范围
+
+    只比较两个快照共有的地址范围，只存在于其中一个快照的区域单独列出。
+
+    参数:
+    - path_a: 较早的快照文件
+    - path_b: 较晚的快照文件
+    - options: 可选参数：
+      - mergeGap: 间隔不超过该字节数的变化合并为一个范围(默认0)
+      - maxRanges: 最多返回的范围数量(默认1000)
+      - includeBytes: 每个范围返回变化前后数据的字节数上限(默认32，0表示不返回)
+
+    用法示例:
+    memory_snapshot_save("before.snap")
+    (在游戏中操作)
+    memory_snapshot_save("after.snap")
+    memory_snapshot_diff("before.snap", "after.snap", {"mergeGap": 8})
+
+    返回:
+    - ranges: 变化范围列表(address、module、size、old、new)
+    - changedBytes / changedRanges: 变化的字节数和范围数(不受maxRanges限制)
+    - onlyInA / onlyInB: 只存在于一个快照中的地址范围
+"""
+
+SNAPSHOT_MAGIC = b"CESNAP01"
+SNAPSHOT_VERSION = 1
+# 文件头: 魔数, 版本, 指针大小, 区域数量, 快照时间, 区域索引在文件中的偏移
+SNAPSHOT_HEADER = struct.Struct("<8sIIIdQ")
+# 区域索引项: 起始地址, 长度, 数据在文件中的偏移
+SNAPSHOT_INDEX_ENTRY = struct.Struct("<QQQ")
+# 每个区域的数据在文件中按页对齐，映射后的NumPy视图也是对齐的
+SNAPSHOT_FILE_ALIGN = 4096
+# 保存时每次批量读取的块数(每块SNAPSHOT_CHUNK_SIZE字节)
+SAVE_BATCH_CHUNKS = 256
+# 比较时每次处理的字节数，限制临时数组的大小
+DIFF_BLOCK_SIZE = 16 * 1024 * 1024
+
+
+class SnapshotFile:
+    """
+    只读打开的快照文件
+
+    区域数据保存在mmap中，view/read不会把整个文件读入内存
+    """
+
+    def __init__(self, path: str):
+        """
+        @param {str} path - 快照文件路径
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        if len(self._mmap) < SNAPSHOT_HEADER.size:
+            self.close()
+            raise ValueError(f"不是有效的快照文件: {path}")
+        magic, version, self.pointer_size, count, self.taken_at, index_offset = \
+            SNAPSHOT_HEADER.unpack_from(self._mmap, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            self.close()
+            raise ValueError(f"不是有效的快照文件: {path}")
+        # (起始地址, 长度, 文件偏移)列表，按起始地址排序
+        self.regions = sorted(
+            SNAPSHOT_INDEX_ENTRY.unpack_from(self._mmap, index_offset + i * SNAPSHOT_INDEX_ENTRY.size)
+            for i in range(count)
+        )
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(size for _, size, _ in self.regions)
+
+    def view(self, index: int) -> np.ndarray:
+        """
+        获取一个区域数据的零拷贝视图
+
+        @param {int} index - 区域下标
+        @return {ndarray} - uint8数组
+        """
+        _, size, offset = self.regions[index]
+        return np.frombuffer(self._mmap, dtype=np.uint8, count=size, offset=offset)
+
+    def read(self, address: int, size: int) -> Optional[bytes]:
+        """
+        读取快照中的一段数据，不完全位于同一区域内时返回None
+        """
+        for start, length, offset in self.regions:
+            if start <= address and address + size <= start + length:
+                position = offset + address - start
+                return self._mmap[position:position + size]
+        return None
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def save_snapshot(path: str, regions: List[tuple], max_bytes: Optional[int] = None) -> Dict[str, Any]:
+    """
+    读取一组内存区域并写入快照文件
+
+    按块批量读取并直接写入文件，峰值内存只有一批数据的大小。
+    读取失败的块不写入，其两侧的数据成为两个独立的区域
+
+    Args:
+        path: 快照文件路径
+        regions: (起始地址, 长度)列表
+        max_bytes: 快照大小上限
+
+    Returns:
+        Dict: 区域数量、字节数、请求次数
+    """
+    backend = get_memory_backend()
+    max_bytes = max_bytes if max_bytes is not None else cheatEngine_config["snapshot_max_bytes"]
+
+    chunks = []
+    total = 0
+    for start, size in sorted(regions):
+        if total + size > max_bytes:
+            logger.warning("快照超过大小上限(%s字节)，跳过区域: 0x%X", max_bytes, start)
+            continue
+        total += size
+        for offset in range(0, size, SNAPSHOT_CHUNK_SIZE):
+            chunks.append((start + offset, min(SNAPSHOT_CHUNK_SIZE, size - offset)))
+
+    # [起始地址, 长度, 文件偏移]
+    segments: List[list] = []
+    request_count = 0
+    taken_at = time.time()
+    with open(path, "wb") as f:
+        f.write(bytes(SNAPSHOT_FILE_ALIGN))
+        for batch_start in range(0, len(chunks), SAVE_BATCH_CHUNKS):
+            batch = chunks[batch_start:batch_start + SAVE_BATCH_CHUNKS]
+            datas, count = backend.read_many(batch)
+            request_count += count
+            for (start, size), data in zip(batch, datas):
+                if data is None:
+                    continue
+                last = segments[-1] if segments else None
+                if last is None or last[0] + last[1] != start or f.tell() != last[2] + last[1]:
+                    padding = -f.tell() % SNAPSHOT_FILE_ALIGN
+                    f.write(bytes(padding))
+                    last = [start, 0, f.tell()]
+                    segments.append(last)
+                f.write(data)
+                last[1] += len(data)
+
+        index_offset = f.tell()
+        for segment in segments:
+            f.write(SNAPSHOT_INDEX_ENTRY.pack(*segment))
+        f.seek(0)
+        f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, cheatEngine_config["pointer_size"],
+                                     len(segments), taken_at, index_offset))
+
+    return {
+        "regions": len(segments),
+        "totalBytes": sum(size for _, size, _ in segments),
+        "requestCount": request_count
+    }
+
+
+def _changed_positions(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    找出两个等长uint8数组中不同字节的下标
+
+    先按8字节整体比较，只对不同的字再逐字节比较
+    """
+    word_bytes = len(a) & ~7
+    positions = []
+    if word_bytes:
+        a_words = a[:word_bytes].view(np.uint64)
+        b_words = b[:word_bytes].view(np.uint64)
+        changed = np.nonzero(a_words != b_words)[0]
+        if len(changed):
+            xor = (a_words[changed] ^ b_words[changed]).view(np.uint8).reshape(-1, 8)
+            rows, columns = np.nonzero(xor)
+            positions.append(changed[rows] * 8 + columns)
+    if word_bytes < len(a):
+        positions.append(word_bytes + np.nonzero(a[word_bytes:] != b[word_bytes:])[0])
+    return np.concatenate(positions) if positions else np.empty(0, dtype=np.int64)
+
+
+def _subtract_ranges(ranges: List[tuple], others: List[tuple]) -> List[tuple]:
+    """
+    计算ranges中不被others覆盖的部分，两者均为按起始地址排序的(起始, 结束)列表
+    """
+    result = []
+    for start, end in ranges:
+        for other_start, other_end in others:
+            if other_end <= start or other_start >= end:
+                continue
+            if other_start > start:
+                result.append((start, other_start))
+            start = max(start, other_end)
+            if start >= end:
+                break
+        if start < end:
+            result.append((start, end))
+    return result
+
+
+def diff_snapshots(a: SnapshotFile, b: SnapshotFile, merge_gap: int = 0, max_ranges: int = 1000) -> Dict[str, Any]:
+    """
+    比较两个快照共有的地址范围
+
+    Args:
+        a: 较早的快照
+        b: 较晚的快照
+        merge_gap: 间隔不超过该字节数的变化合并为一个范围
+        max_ranges: 最多保留的范围数量
+
+    Returns:
+        Dict: ranges((起始, 结束)列表)、changedBytes、changedRanges、comparedBytes、onlyInA、onlyInB
+    """
+    ranges: List[list] = []
+    changed_bytes = 0
+    range_count = 0
+    compared = 0
+    last_end = None
+
+    i = j = 0
+    while i < len(a.regions) and j < len(b.regions):
+        a_start, a_size, _ = a.regions[i]
+        b_start, b_size, _ = b.regions[j]
+        low, high = max(a_start, b_start), min(a_start + a_size, b_start + b_size)
+        if low < high:
+            a_view, b_view = a.view(i), b.view(j)
+            for block in range(low, high, DIFF_BLOCK_SIZE):
+                block_end = min(block + DIFF_BLOCK_SIZE, high)
+                positions = _changed_positions(
+                    a_view[block - a_start:block_end - a_start], b_view[block - b_start:block_end - b_start]
+                )
+                compared += block_end - block
+                if not len(positions):
+                    continue
+                changed_bytes += len(positions)
+                addresses = block + positions
+                breaks = np.nonzero(np.diff(addresses) > merge_gap + 1)[0] + 1
+                starts = addresses[np.concatenate(([0], breaks))]
+                ends = addresses[np.concatenate((breaks - 1, [len(addresses) - 1]))] + 1
+                for start, end in zip(starts.tolist(), ends.tolist()):
+                    # 与上一个范围相邻时合并(跨块或跨区域)
+                    if last_end is not None and start - last_end <= merge_gap:
+                        if ranges and ranges[-1][1] == last_end:
+                            ranges[-1][1] = end
+                        last_end = end
+                        continue
+                    range_count += 1
+                    if len(ranges) < max_ranges:
+                        ranges.append([start, end])
+                    last_end = end
+        if a_start + a_size <= b_start + b_size:
+            i += 1
+        else:
+            j += 1
+
+    a_ranges = [(start, start + size) for start, size, _ in a.regions]
+    b_ranges = [(start, start + size) for start, size, _ in b.regions]
+    return {
+        "ranges": [tuple(item) for item in ranges],
+        "changedBytes": changed_bytes,
+        "changedRanges": range_count,
+        "comparedBytes": compared,
+        "onlyInA": _subtract_ranges(a_ranges, b_ranges),
+        "onlyInB": _subtract_ranges(b_ranges, a_ranges)
+    }
+
+
+def memory_snapshot_save(path: str, options: Optional[Union[Dict, str]] = None) -> Dict[str, Any]:
+    """
+    保存内存快照
+
+    Args:
+        path: 快照文件路径
+        options: 可选参数，见SAVE_TOOL_DESCRIPTION
+
+    Returns:
+        Dict: 保存结果
+    """
+    result = {"success": False, "path": path, "regions": 0, "totalBytes": 0, "error": None}
+
+    try:
+        options = parse_options(options)
+        if options.get("regions"):
+            regions = [(parse_address(start), int(size)) for start, size in options["regions"]]
+        else:
+            backend = get_memory_backend()
+            regions = snapshot_regions(backend, options.get("writableOnly", True))
+            modules = {name.lower() for name in options.get("modules") or []}
+            if modules:
+                wanted = {
+                    (region["start"], region["end"] - region["start"])
+                    for region in backend.regions()
+                    if (region.get("name") or "").lower() in modules
+                }
+                regions = [region for region in regions if region in wanted]
+
+        started = time.time()
+        info = save_snapshot(path, regions, options.get("maxBytes"))
+        result.update(success=True, elapsed=round(time.time() - started, 3), **info)
+        logger.info("快照已保存: %s, %s个区域, %s字节", path, info['regions'], info['totalBytes'])
+    except Exception as e:
+        logger.error("保存快照失败: %s", e)
+        result["error"] = f"保存快照失败: {str(e)}"
+
+    return result
+
+
+def memory_snapshot_diff(path_a: str, path_b: str, options: Optional[Union[Dict, str]] = None) -> Dict[str, Any]:
+    """
+    比较两个快照文件
+
+    Args:
+        path_a: 较早的快照文件
+        path_b: 较晚的快照文件
+        options: 可选参数，见DIFF_TOOL_DESCRIPTION
+
+    Returns:
+        Dict: 变化范围
+    """
+    result = {"success": False, "ranges": [], "changedBytes": 0, "changedRanges": 0, "error": None}
+
+    try:
+        options = parse_options(options)
+        include_bytes = int(options.get("includeBytes", 32))
+        started = time.time()
+        with SnapshotFile(path_a) as a, SnapshotFile(path_b) as b:
+            diff = diff_snapshots(a, b, int(options.get("mergeGap", 0)), int(options.get("maxRanges", 1000)))
+            region_map = get_region_map()
+            ranges = []
+            for start, end in diff["ranges"]:
+                item = {"address": f"0x{start:X}", "module": region_map.module_offset(start), "size": end - start}
+                if include_bytes:
+                    size = min(end - start, include_bytes)
+                    # 合并后的范围可能跨越区域边界，此时不返回数据
+                    old, new = a.read(start, size), b.read(start, size)
+                    item["old"] = old.hex(" ").upper() if old is not None else None
+                    item["new"] = new.hex(" ").upper() if new is not None else None
+                ranges.append(item)
+
+        result.update(
+            success=True,
+            ranges=ranges,
+            changedBytes=diff["changedBytes"],
+            changedRanges=diff["changedRanges"],
+            comparedBytes=diff["comparedBytes"],
+            onlyInA=[{"address": f"0x{start:X}", "size": end - start} for start, end in diff["onlyInA"]],
+            onlyInB=[{"address": f"0x{start:X}", "size": end - start} for start, end in diff["onlyInB"]],
+            elapsed=round(time.time() - started, 3)
+        )
+        logger.info("快照比较完成: %s个范围, %s字节变化", diff['changedRanges'], diff['changedBytes'])
+    except Exception as e:
+        logger.error("比较快照失败: %s", e)
+        result["error"] = f"比较快照失败: {str(e)}"
+
+    return result
+
+
+# 为MCP创建适配器函数，读写文件在线程池中执行，不阻塞事件循环
+async def memory_snapshot_save_adapter(path=None, options=None):
+    """
+    为MCP适配的memory_snapshot_save包装器
+
+    Args:
+        path: 快照文件路径
+        options: 可选参数
+
+    Returns:
+        Dict: memory_snapshot_save的返回结果
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, memory_snapshot_save, path, options)
+
+
+async def memory_snapshot_diff_adapter(path_a=None, path_b=None, options=None):
+    """
+    为MCP适配的memory_snapshot_diff包装器
+
+    Args:
+        path_a: 较早的快照文件
+        path_b: 较晚的快照文件
+        options: 可选参数
+
+    Returns:
+        Dict: memory_snapshot_diff的返回结果
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, memory_snapshot_diff, path_a, path_b, options)
+
+
+def register_tool(mcp):
+    """
+    向MCP注册工具
+
+    Args:
+        mcp: MCP实例
+    """
+    mcp.tool(name="memory_snapshot_save", description=SAVE_TOOL_DESCRIPTION)(memory_snapshot_save_adapter)
+    mcp.tool(name="memory_snapshot_diff", description=DIFF_TOOL_DESCRIPTION)(memory_snapshot_diff_adapter)
@@ -0,0 +1,3 @@
+"""
+结构体工具
+"""
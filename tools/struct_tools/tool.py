@@ -0,0 +1,455 @@
+"""
+结构体工具
+
+以声明式的字段列表(名称、偏移、类型、数组长度、内嵌结构体、指向结构体的指针)定义结构体，
+编译为NumPy结构化dtype后按名称缓存。读取时一次读出整个对象(或对象数组)的原始字节，
+在本地一次性解码全部字段；指针字段按层合并为批量读取后继续解码
+"""
+from util import (
+    logger, cheatEngine_config, get_memory_backend, decode_value, DATA_TYPE_FORMATS,
+    parse_address, parse_options, parse_json_arg
+)
+from typing import Dict, List, Union, Any, Optional
+import numpy as np
+import threading
+import asyncio
+
+
+DEFINE_TOOL_DESCRIPTION = """
+    定义(或重新定义)结构体，定义按名称保存，之后struct_read直接使用名称
+
+    参数:
+    - definitions: 一个或多个结构体定义：
+      {
+        "name": "Player",
+        "size": "0x120",                                   // 结构体大小(可选，默认为最后一个字段的结尾)
+        "fields": [
+          {"name": "hp", "offset": "30", "type": "int32"},
+          {"name": "pos", "offset": "40", "type": "float", "count": 3},       // 数组
+          {"name": "name", "offset": "60", "type": "string", "size": 32},     // 变长类型需要size
+          {"name": "stats", "offset": "80", "type": "struct", "struct": "Stats"},   // 内嵌结构体
+          {"name": "weapon", "offset": "100", "type": "pointer", "target": "Weapon"} // 指向结构体的指针
+        ]
+      }
+      偏移和大小为十六进制字符串或整数；type支持int8~uint64、float、double、pointer、string、wstring、bytes、struct
+
+    返回:
+    - structs: 每个结构体的名称、大小、字段数
+"""
+
+READ_TOOL_DESCRIPTION = """
+    按结构体定义读取对象，一次读取整个对象后在本地解码全部字段
+
+    参数:
+    - address: 对象地址(十六进制字符串、整数或"模块名+偏移")
+    - struct_name: 结构体名称(也可以直接传入结构体定义)
+    - options: 可选参数：
+      - count: 连续读取的对象数量(默认1)，用于实体数组
+      - stride: 相邻对象的间距(默认为结构体大小)
+      - pointerArray: address处是count个指向对象的指针(默认false)
+      - depth: 跟随target指针的层数(默认1，0表示不跟随)
+
+    用法示例:
+    struct_read("0x1A2B3C40", "Player")
+    struct_read("game.exe+5F1000", "Player", {"count": 64, "pointerArray": true})
+
+    返回:
+    - items: 对象列表，每项包含address和fields；跟随的指针字段为{"address", "fields"}，
+      未跟随或为空的指针为十六进制地址字符串
+    - requestCount: 实际发出的读取请求数
+"""
+
+LIST_TOOL_DESCRIPTION = """
+    列出已定义的结构体及其字段布局
+"""
+
+# 原始定义: 名称 -> 定义字典；编译结果在定义变化时整体失效
+_definitions: Dict[str, Dict[str, Any]] = {}
+_layouts: Dict[str, "StructLayout"] = {}
+_struct_lock = threading.RLock()
+
+
+class StructLayout:
+    """
+    编译后的结构体布局
+    """
+
+    def __init__(self, name: str, size: int, dtype: np.dtype, fields: List[Dict[str, Any]]):
+        self.name = name
+        self.size = size
+        self.dtype = dtype
+        # 每项包含name、offset、type、count、kind(value/pointer/raw/struct)、target、layout
+        self.fields = fields
+
+    def with_stride(self, stride: int) -> np.dtype:
+        """
+        获取相邻对象间距为stride时使用的dtype
+        """
+        if stride == self.size:
+            return self.dtype
+        if stride < self.size:
+            raise ValueError(f"间距{stride}小于结构体{self.name}的大小{self.size}")
+        return np.dtype({
+            "names": list(self.dtype.names),
+            "formats": [self.dtype.fields[name][0] for name in self.dtype.names],
+            "offsets": [self.dtype.fields[name][1] for name in self.dtype.names],
+            "itemsize": stride
+        })
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "size": self.size,
+            "fields": [
+                {
+                    "name": field["name"],
+                    "offset": f"{field['offset']:X}",
+                    "type": field["type"],
+                    "count": field["count"],
+                    "target": field["target"] or field.get("struct")
+                }
+                for field in self.fields
+            ]
+        }
+
+
+def _parse_hex(value: Union[str, int]) -> int:
+    """
+    解析十六进制偏移或大小，与指针链的偏移写法一致
+    """
+    if isinstance(value, int):
+        return value
+    text = value.strip().lower()
+    return int(text[2:] if text.startswith('0x') else text, 16)
+
+
+def _compile(name: str, compiling: tuple = ()) -> StructLayout:
+    """
+    编译结构体定义，内嵌结构体递归编译
+
+    Args:
+        name: 结构体名称
+        compiling: 正在编译的结构体名称，用于发现循环内嵌
+
+    Returns:
+        StructLayout: 编译结果
+    """
+    layout = _layouts.get(name)
+    if layout is not None:
+        return layout
+    if name in compiling:
+        raise ValueError(f"结构体循环内嵌: {' -> '.join(compiling + (name,))}")
+    definition = _definitions.get(name)
+    if definition is None:
+        raise ValueError(f"未定义的结构体: {name}")
+
+    pointer_format = "<u8" if cheatEngine_config["pointer_size"] == 8 else "<u4"
+    names, formats, offsets, fields = [], [], [], []
+    end = 0
+    for item in definition.get("fields") or []:
+        field_type = (item.get("type") or "int32").lower()
+        field = {
+            "name": item["name"],
+            "offset": _parse_hex(item.get("offset", 0)),
+            "type": field_type,
+            "count": int(item.get("count", 1)),
+            "target": item.get("target") if field_type == "pointer" else None,
+            "layout": None
+        }
+        if field_type in DATA_TYPE_FORMATS:
+            field["kind"] = "value"
+            element = np.dtype("<" + DATA_TYPE_FORMATS[field_type])
+        elif field_type == "pointer":
+            field["kind"] = "pointer"
+            element = np.dtype(pointer_format)
+        elif field_type in ("string", "wstring", "bytes", "aob"):
+            if not item.get("size"):
+                raise ValueError(f"字段{item['name']}缺少size")
+            field["kind"] = "raw"
+            element = np.dtype(f"V{_parse_hex(item['size'])}")
+        elif field_type == "struct":
+            field["kind"] = "struct"
+            field["struct"] = item.get("struct")
+            field["layout"] = _compile(item.get("struct"), compiling + (name,))
+            element = field["layout"].dtype
+        else:
+            raise ValueError(f"字段{item['name']}的类型不支持: {field_type}")
+
+        names.append(field["name"])
+        formats.append((element, (field["count"],)) if field["count"] > 1 else element)
+        offsets.append(field["offset"])
+        fields.append(field)
+        end = max(end, field["offset"] + element.itemsize * field["count"])
+
+    size = _parse_hex(definition["size"]) if definition.get("size") else end
+    if size < end:
+        raise ValueError(f"结构体{name}的大小{size}小于字段结尾{end}")
+    dtype = np.dtype({"names": names, "formats": formats, "offsets": offsets, "itemsize": size})
+    layout = StructLayout(name, size, dtype, fields)
+    _layouts[name] = layout
+    return layout
+
+
+def get_layout(name: str) -> StructLayout:
+    """
+    获取已编译的结构体布局，首次使用时编译并缓存
+    """
+    with _struct_lock:
+        return _compile(name)
+
+
+def _decode_records(layout: StructLayout, array: np.ndarray, slots: List[tuple]) -> List[Dict[str, Any]]:
+    """
+    按列解码一组对象，每个字段只做一次向量化转换
+
+    Args:
+        layout: 结构体布局
+        array: 结构化数组
+        slots: 收集需要跟随的指针(容器, 键, 指针值, 目标结构体名)
+
+    Returns:
+        list: 每个对象的字段字典
+    """
+    records = [{} for _ in range(len(array))]
+    for field in layout.fields:
+        name, count = field["name"], field["count"]
+        column = array[name]
+
+        if field["kind"] == "value":
+            values = column.tolist()
+        elif field["kind"] == "pointer":
+            pointers = column.tolist()
+            if count > 1:
+                values = [[f"0x{pointer:X}" for pointer in row] for row in pointers]
+            else:
+                values = [f"0x{pointer:X}" for pointer in pointers]
+            if field["target"]:
+                for record_index, row in enumerate(pointers):
+                    if count > 1:
+                        slots.extend((values[record_index], i, pointer, field["target"])
+                                     for i, pointer in enumerate(row) if pointer)
+                    elif row:
+                        slots.append((records[record_index], name, row, field["target"]))
+        elif field["kind"] == "raw":
+            raw = column.tolist()
+            encoding = get_memory_backend().string_encoding
+            if count > 1:
+                values = [[decode_value(item, field["type"], encoding=encoding) for item in row] for row in raw]
+            else:
+                values = [decode_value(item, field["type"], encoding=encoding) for item in raw]
+        else:
+            flat = _decode_records(field["layout"], column.reshape(-1), slots)
+            values = [flat[i * count:(i + 1) * count] for i in range(len(array))] if count > 1 else flat
+
+        for record, value in zip(records, values):
+            record[name] = value
+    return records
+
+
+def _follow_pointers(slots: List[tuple], depth: int, backend) -> int:
+    """
+    逐层跟随指针字段，每一层的所有目标对象合并为一次批量读取，同一结构体的对象一次解码
+
+    Returns:
+        int: 实际发出的请求数
+    """
+    request_count = 0
+    while slots and depth > 0:
+        targets: Dict[str, List[int]] = {}
+        for _, _, pointer, target in slots:
+            targets.setdefault(target, [])
+            targets[target].append(pointer)
+        ranges, keys = [], []
+        for target, pointers in targets.items():
+            layout = get_layout(target)
+            for pointer in dict.fromkeys(pointers):
+                ranges.append((pointer, layout.size))
+                keys.append((target, pointer))
+        datas, count = backend.read_many(ranges)
+        request_count += count
+
+        objects: Dict[tuple, Dict[str, Any]] = {}
+        next_slots: List[tuple] = []
+        for target in targets:
+            layout = get_layout(target)
+            found = [(key[1], data) for key, data in zip(keys, datas) if key[0] == target and data is not None]
+            if not found:
+                continue
+            array = np.frombuffer(b"".join(data for _, data in found), dtype=layout.dtype, count=len(found))
+            for (pointer, _), record in zip(found, _decode_records(layout, array, next_slots)):
+                objects[(target, pointer)] = {"address": f"0x{pointer:X}", "fields": record}
+
+        for container, key, pointer, target in slots:
+            if (target, pointer) in objects:
+                container[key] = objects[(target, pointer)]
+        slots = next_slots
+        depth -= 1
+    return request_count
+
+
+def struct_define(definitions: Union[Dict, List[Dict], str]) -> Dict[str, Any]:
+    """
+    定义结构体
+
+    Args:
+        definitions: 一个或多个结构体定义
+
+    Returns:
+        Dict: 定义后的结构体概要
+    """
+    result = {"success": False, "structs": [], "error": None}
+
+    try:
+        definitions = parse_json_arg(definitions)
+        if isinstance(definitions, dict):
+            definitions = [definitions]
+        with _struct_lock:
+            previous = dict(_definitions)
+            for definition in definitions:
+                if not definition.get("name"):
+                    raise ValueError("结构体定义缺少name")
+                _definitions[definition["name"]] = definition
+            # 内嵌该结构体的其他结构体也需要重新编译
+            _layouts.clear()
+            try:
+                layouts = [_compile(definition["name"]) for definition in definitions]
+            except Exception:
+                _definitions.clear()
+                _definitions.update(previous)
+                _layouts.clear()
+                raise
+        result["structs"] = [
+            {"name": layout.name, "size": layout.size, "fields": len(layout.fields)} for layout in layouts
+        ]
+        result["success"] = True
+        logger.info("定义了%s个结构体: %s", len(layouts), ', '.join(layout.name for layout in layouts))
+    except Exception as e:
+        logger.error("定义结构体失败: %s", e)
+        result["error"] = f"定义结构体失败: {str(e)}"
+
+    return result
+
+
+def struct_read(address: Union[str, int], struct_name: Union[str, Dict],
+                options: Optional[Union[Dict, str]] = None) -> Dict[str, Any]:
+    """
+    读取并解码结构体对象
+
+    Args:
+        address: 对象(或指针数组)的地址
+        struct_name: 结构体名称或定义
+        options: 可选参数，见READ_TOOL_DESCRIPTION
+
+    Returns:
+        Dict: 解码后的对象列表
+    """
+    result = {"success": False, "struct": None, "items": [], "requestCount": 0, "error": None}
+
+    try:
+        options = parse_options(options)
+        struct_name = parse_json_arg(struct_name)
+        if isinstance(struct_name, dict):
+            if struct_define(struct_name)["error"]:
+                raise ValueError(f"无效的结构体定义: {struct_name.get('name')}")
+            struct_name = struct_name["name"]
+        layout = get_layout(struct_name)
+        result["struct"] = layout.name
+
+        base = parse_address(address)
+        count = int(options.get("count", 1))
+        stride = _parse_hex(options.get("stride", layout.size))
+        dtype = layout.with_stride(stride)
+        backend = get_memory_backend()
+        request_count = 0
+        slots: List[tuple] = []
+
+        if options.get("pointerArray"):
+            pointer_size = cheatEngine_config["pointer_size"]
+            (data,), request_count = backend.read_many([(base, count * pointer_size)])
+            if data is None:
+                raise ValueError(f"无法读取指针数组: 0x{base:X}")
+            pointers = np.frombuffer(data, dtype="<u8" if pointer_size == 8 else "<u4").tolist()
+            addresses = [pointer for pointer in dict.fromkeys(pointers) if pointer]
+            datas, extra = backend.read_many([(pointer, layout.size) for pointer in addresses])
+            request_count += extra
+            found = [(pointer, data) for pointer, data in zip(addresses, datas) if data is not None]
+            records = _decode_records(
+                layout, np.frombuffer(b"".join(data for _, data in found), dtype=layout.dtype, count=len(found)),
+                slots
+            ) if found else []
+            decoded = {pointer: record for (pointer, _), record in zip(found, records)}
+            items = [
+                {"index": index, "address": f"0x{pointer:X}", "fields": decoded.get(pointer)}
+                for index, pointer in enumerate(pointers) if pointer
+            ]
+        else:
+            span = stride * (count - 1) + layout.size
+            (data,), request_count = backend.read_many([(base, span)])
+            if data is None:
+                raise ValueError(f"无法读取内存: 0x{base:X}, {span}字节")
+            # 最后一个对象之后不足一个间距的部分补零，按间距整体解码
+            array = np.frombuffer(data + bytes(stride * count - span), dtype=dtype, count=count)
+            items = [
+                {"index": index, "address": f"0x{base + index * stride:X}", "fields": record}
+                for index, record in enumerate(_decode_records(layout, array, slots))
+            ]
+
+        request_count += _follow_pointers(slots, int(options.get("depth", 1)), backend)
+        result.update(success=True, items=items, requestCount=request_count)
+    except Exception as e:
+        logger.error("读取结构体失败: %s", e)
+        result["error"] = f"读取结构体失败: {str(e)}"
+
+    return result
+
+
+def struct_list() -> Dict[str, Any]:
+    """
+    列出已定义的结构体
+
+    Returns:
+        Dict: 结构体布局列表
+    """
+    structs = []
+    errors = []
+    with _struct_lock:
+        for name in _definitions:
+            try:
+                structs.append(_compile(name).describe())
+            except Exception as e:
+                errors.append(f"{name}: {str(e)}")
+    return {"success": True, "structs": structs, "errors": errors}
+
+
+# 为MCP创建适配器函数
+def struct_define_adapter(definitions=None):
+    """
+    为MCP适配的struct_define包装器
+    """
+    return struct_define(definitions)
+
+
+async def struct_read_adapter(address=None, struct_name=None, options=None):
+    """
+    为MCP适配的struct_read包装器，读取和解码在线程池中执行，不阻塞事件循环
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, struct_read, address, struct_name, options)
+
+
+def struct_list_adapter():
+    """
+    为MCP适配的struct_list包装器
+    """
+    return struct_list()
+
+
+def register_tool(mcp):
+    """
+    向MCP注册工具
+
+    Args:
+        mcp: MCP实例
+    """
+    mcp.tool(name="struct_define", description=DEFINE_TOOL_DESCRIPTION)(struct_define_adapter)
+    mcp.tool(name="struct_read", description=READ_TOOL_DESCRIPTION)(struct_read_adapter)
+    mcp.tool(name="struct_list", description=LIST_TOOL_DESCRIPTION)(struct_list_adapter)
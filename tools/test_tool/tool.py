@@ -3,7 +3,7 @@
 
 提供接收任意类型输入并原样输出的功能
 """
-from util import logger
+from util import logger, log_brief
 from typing import Any, Dict, List, Union, Optional
 import json
 
@@ -29,14 +29,14 @@ def test_echo(input_data: Any) -> Dict[str, Any]:
         Dict: 包含输入数据、类型信息和元数据的字典
     """
     # 记录日志
-    logger.info(f"测试工具接收到输入: {input_data}")
+    logger.info("测试工具接收到输入: %s", log_brief(input_data))
     
     # 如果是字符串，尝试解析为JSON
     original_input = input_data
     if isinstance(input_data, str):
         try:
             input_data = json.loads(input_data)
-            logger.info(f"将字符串输入解析为: {input_data}")
+            logger.info("将字符串输入解析为: %s", log_brief(input_data))
         except json.JSONDecodeError:
             # 如果不是有效的JSON，保持为字符串
             logger.info("输入不是有效的JSON，保持为字符串")
@@ -70,7 +70,7 @@ def test_echo(input_data: Any) -> Dict[str, Any]:
     elif isinstance(input_data, (int, float)):
         result["meta"]["is_negative"] = input_data < 0
         
-    logger.info(f"测试工具返回结果: {result}")
+    logger.info("测试工具返回结果: %s", log_brief(result))
     return result
 
  # 创建一个包装函数，接收字符串参数然后转发给test_echo
@@ -85,12 +85,12 @@ def test_echo_adapter(input_data=None):
         Dict: test_echo的返回结果
     """
     try:
-        logger.info(f"适配器接收到: {input_data}，类型: {type(input_data)}")
+        logger.info("适配器接收到: %s，类型: %s", log_brief(input_data), type(input_data))
         
         # 传递给原始的test_echo函数
         return test_echo(input_data)
     except Exception as e:
-        logger.error(f"适配器处理错误: {str(e)}")
+        logger.error("适配器处理错误: %s", e)
         return {
             "success": False,
             "error": f"参数处理错误: {str(e)}",
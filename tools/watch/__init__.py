@@ -0,0 +1,3 @@
+"""
+地址监视工具
+"""
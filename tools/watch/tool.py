@@ -0,0 +1,401 @@
+"""
+地址监视工具
+
+注册一组地址后由后台线程轮询，同一时刻到期的监视合并为一次批量读取。
+值保持不变的监视逐渐降低轮询频率，频繁变化的监视提高频率；
+每个监视保留最近的变化记录，查询时只返回游标之后的变化
+"""
+from util import logger, get_memory_backend, decode_value, data_type_size, parse_address, parse_options, parse_json_arg
+from collections import deque
+from typing import Dict, List, Union, Any, Optional
+import threading
+import asyncio
+import time
+
+
+ADD_TOOL_DESCRIPTION = """
+    添加地址监视，由后台线程持续轮询，只记录值的变化
+
+    参数:
+    - watches: 监视列表，每项为字典：
+      - address: 地址(十六进制字符串、整数或"模块名+偏移")
+      - dataType: 数据类型(默认int32)
+      - size: 变长类型(string/bytes等)的长度
+      - label: 标签(可选)
+    - options: 可选参数：
+      - minInterval: 最短轮询间隔(秒，默认0.05)，值变化时间隔逐步缩短到该值
+      - maxInterval: 最长轮询间隔(秒，默认2)，值不变时间隔逐步延长到该值
+      - history: 每个监视保留的变化记录数(默认64)
+
+    用法示例:
+    watch_add([{"address": "game.exe+1A2B3C", "dataType": "float", "label": "hp"}])
+
+    返回:
+    - watchIds: 新增监视的ID
+    - cursor: 当前游标，之后用watch_changes查询该游标之后的变化
+"""
+
+CHANGES_TOOL_DESCRIPTION = """
+    查询游标之后发生的变化
+
+    参数:
+    - cursor: 上次返回的游标(默认0，返回全部保留的记录)
+    - watch_ids: 只查询这些监视(默认全部)
+    - wait: 没有新变化时最多等待的秒数(默认0，立即返回)，适合长时间监控
+    - limit: 最多返回的变化数(默认500)
+
+    用法示例:
+    watch_changes(0)
+    watch_changes(37, None, 10)
+
+    返回:
+    - changes: 变化列表(seq、watchId、label、address、time、value)，第一条为添加时的初始值
+    - cursor: 新游标，下次查询时传入
+    - overflow: 游标之后的部分记录已被覆盖(history太小或查询间隔太长)
+"""
+
+LIST_TOOL_DESCRIPTION = """
+    列出全部监视及其当前状态(最新值、当前轮询间隔、轮询次数、变化次数)
+"""
+
+REMOVE_TOOL_DESCRIPTION = """
+    移除监视
+
+    参数:
+    - watch_ids: 要移除的监视ID列表，为空时移除全部监视
+"""
+
+DEFAULT_MIN_INTERVAL = 0.05
+DEFAULT_MAX_INTERVAL = 2.0
+DEFAULT_HISTORY = 64
+# 值变化时间隔乘以WATCH_SPEEDUP，不变时乘以WATCH_BACKOFF
+WATCH_SPEEDUP = 0.5
+WATCH_BACKOFF = 1.5
+# 到期时间相差不超过该比例(相对最短间隔)的监视合并到同一次读取
+WATCH_COALESCE = 0.5
+
+
+class Watch:
+    """
+    一个被监视的地址及其变化记录
+    """
+
+    def __init__(self, watch_id: int, address: int, data_type: str, size: int, label: Optional[str],
+                 min_interval: float, max_interval: float, history: int):
+        self.watch_id = watch_id
+        self.address = address
+        self.data_type = data_type
+        self.size = size
+        self.label = label
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.next_due = 0.0
+        # (序号, 时间, 值)环形缓冲区，值为None表示无法读取
+        self.samples = deque(maxlen=history)
+        # 最近一条被覆盖的记录的序号
+        self.dropped_seq = 0
+        self.last_data: Optional[bytes] = None
+        self.has_sample = False
+        self.polls = 0
+        self.changes = 0
+
+    def record(self, seq: int, now: float, data: Optional[bytes], encoding: str = "utf-8") -> bool:
+        """
+        记录一次轮询结果并调整轮询间隔
+
+        @param {str} encoding - string类型的字符编码
+        @return {bool} - 值是否发生变化
+        """
+        self.polls += 1
+        changed = not self.has_sample or data != self.last_data
+        if changed:
+            value = decode_value(data, self.data_type, encoding=encoding) if data is not None else None
+            if len(self.samples) == self.samples.maxlen:
+                self.dropped_seq = self.samples[0][0]
+            self.samples.append((seq, now, value))
+            self.last_data = data
+            self.has_sample = True
+            self.changes += 1
+            self.interval = max(self.min_interval, self.interval * WATCH_SPEEDUP)
+        else:
+            self.interval = min(self.max_interval, self.interval * WATCH_BACKOFF)
+        self.next_due = now + self.interval
+        return changed
+
+    def describe(self) -> Dict[str, Any]:
+        latest = self.samples[-1] if self.samples else None
+        return {
+            "watchId": self.watch_id,
+            "label": self.label,
+            "address": f"0x{self.address:X}",
+            "dataType": self.data_type,
+            "value": latest[2] if latest else None,
+            "interval": round(self.interval, 3),
+            "polls": self.polls,
+            "changes": self.changes
+        }
+
+
+_watches: Dict[int, Watch] = {}
+# 保护_watches和序号，新变化到达时通知watch_changes的等待者
+_watch_condition = threading.Condition()
+_next_watch_id = 1
+_next_seq = 1
+_poller: Optional[threading.Thread] = None
+
+
+def _poll_loop() -> None:
+    """
+    后台轮询线程：每次取出全部到期的监视，合并为一次批量读取
+    """
+    global _poller, _next_seq
+    logger.info("监视轮询线程已启动")
+    while True:
+        with _watch_condition:
+            if not _watches:
+                _poller = None
+                logger.info("没有监视，轮询线程退出")
+                return
+            now = time.time()
+            earliest = min(watch.next_due for watch in _watches.values())
+            if earliest > now:
+                _watch_condition.wait(earliest - now)
+                continue
+            horizon = now + min(watch.min_interval for watch in _watches.values()) * WATCH_COALESCE
+            due = [watch for watch in _watches.values() if watch.next_due <= horizon]
+
+        backend = get_memory_backend()
+        try:
+            datas, _ = backend.read_many([(watch.address, watch.size) for watch in due])
+        except Exception as e:
+            logger.warning("监视轮询失败: %s", e)
+            datas = [None] * len(due)
+
+        now = time.time()
+        with _watch_condition:
+            notify = False
+            for watch, data in zip(due, datas):
+                if watch.watch_id not in _watches:
+                    continue
+                if watch.record(_next_seq, now, data, backend.string_encoding):
+                    _next_seq += 1
+                    notify = True
+            if notify:
+                _watch_condition.notify_all()
+
+
+def _ensure_poller() -> None:
+    global _poller
+    if _poller is None:
+        _poller = threading.Thread(target=_poll_loop, name="watch-poller", daemon=True)
+        _poller.start()
+
+
+def watch_add(watches: Union[List[Dict], Dict, str], options: Optional[Union[Dict, str]] = None) -> Dict[str, Any]:
+    """
+    添加监视并启动轮询线程
+
+    Args:
+        watches: 监视列表
+        options: 可选参数，见ADD_TOOL_DESCRIPTION
+
+    Returns:
+        Dict: 新增监视的ID和当前游标
+    """
+    global _next_watch_id
+    result = {"success": False, "watchIds": [], "cursor": None, "error": None}
+
+    try:
+        watches = parse_json_arg(watches)
+        if isinstance(watches, dict):
+            watches = [watches]
+        options = parse_options(options)
+        min_interval = float(options.get("minInterval", DEFAULT_MIN_INTERVAL))
+        max_interval = max(float(options.get("maxInterval", DEFAULT_MAX_INTERVAL)), min_interval)
+        history = int(options.get("history", DEFAULT_HISTORY))
+
+        parsed = []
+        for item in watches:
+            data_type = (item.get("dataType") or "int32").lower()
+            parsed.append((
+                parse_address(item["address"]),
+                data_type,
+                data_type_size(data_type, item.get("size")),
+                item.get("label")
+            ))
+
+        with _watch_condition:
+            for address, data_type, size, label in parsed:
+                watch = Watch(_next_watch_id, address, data_type, size, label, min_interval, max_interval, history)
+                _watches[watch.watch_id] = watch
+                result["watchIds"].append(watch.watch_id)
+                _next_watch_id += 1
+            result["cursor"] = _next_seq - 1
+            _ensure_poller()
+            _watch_condition.notify_all()
+
+        result["success"] = True
+        logger.info("添加了%s个监视，当前共%s个", len(parsed), len(_watches))
+    except Exception as e:
+        logger.error("添加监视失败: %s", e)
+        result["error"] = f"添加监视失败: {str(e)}"
+
+    return result
+
+
+def _collect_changes(cursor: int, watch_ids: Optional[set], limit: int) -> tuple:
+    changes = []
+    overflow = False
+    for watch in _watches.values():
+        if watch_ids is not None and watch.watch_id not in watch_ids:
+            continue
+        # 游标之后的记录已被覆盖
+        if watch.dropped_seq > cursor:
+            overflow = True
+        for seq, timestamp, value in reversed(watch.samples):
+            if seq <= cursor:
+                break
+            changes.append((seq, watch, timestamp, value))
+    changes.sort(key=lambda change: change[0])
+    return changes[:limit], overflow
+
+
+def watch_changes(cursor: int = 0, watch_ids: Optional[Union[List[int], str]] = None,
+                  wait: float = 0, limit: int = 500) -> Dict[str, Any]:
+    """
+    查询游标之后的变化
+
+    Args:
+        cursor: 游标
+        watch_ids: 只查询这些监视
+        wait: 没有新变化时最多等待的秒数
+        limit: 最多返回的变化数
+
+    Returns:
+        Dict: 变化列表和新游标
+    """
+    result = {"success": False, "changes": [], "cursor": cursor, "overflow": False, "error": None}
+
+    try:
+        cursor = int(cursor or 0)
+        watch_ids = parse_json_arg(watch_ids)
+        watch_ids = {int(watch_id) for watch_id in watch_ids} if watch_ids else None
+        limit = int(limit or 500)
+        deadline = time.time() + float(wait or 0)
+
+        with _watch_condition:
+            changes, overflow = _collect_changes(cursor, watch_ids, limit)
+            while not changes and _watches and time.time() < deadline:
+                _watch_condition.wait(deadline - time.time())
+                changes, overflow = _collect_changes(cursor, watch_ids, limit)
+
+        result.update(
+            success=True,
+            changes=[
+                {
+                    "seq": seq,
+                    "watchId": watch.watch_id,
+                    "label": watch.label,
+                    "address": f"0x{watch.address:X}",
+                    "time": round(timestamp, 3),
+                    "value": value
+                }
+                for seq, watch, timestamp, value in changes
+            ],
+            cursor=changes[-1][0] if changes else max(cursor, 0),
+            overflow=overflow
+        )
+    except Exception as e:
+        logger.error("查询监视变化失败: %s", e)
+        result["error"] = f"查询监视变化失败: {str(e)}"
+
+    return result
+
+
+def watch_list() -> Dict[str, Any]:
+    """
+    列出全部监视
+
+    Returns:
+        Dict: 监视状态列表
+    """
+    with _watch_condition:
+        return {
+            "success": True,
+            "watches": [watch.describe() for watch in _watches.values()],
+            "cursor": _next_seq - 1
+        }
+
+
+def watch_remove(watch_ids: Optional[Union[List[int], str]] = None) -> Dict[str, Any]:
+    """
+    移除监视，没有监视时轮询线程自动退出
+
+    Args:
+        watch_ids: 要移除的监视ID列表，为None时移除全部
+
+    Returns:
+        Dict: 移除的监视数量
+    """
+    watch_ids = parse_json_arg(watch_ids)
+    with _watch_condition:
+        if not watch_ids:
+            removed = len(_watches)
+            _watches.clear()
+        else:
+            removed = sum(1 for watch_id in watch_ids if _watches.pop(int(watch_id), None) is not None)
+        _watch_condition.notify_all()
+    logger.info("移除了%s个监视", removed)
+    return {"success": True, "removed": removed}
+
+
+# 为MCP创建适配器函数
+async def watch_add_adapter(watches=None, options=None):
+    """
+    为MCP适配的watch_add包装器，解析模块地址可能需要刷新区域表，在线程池中执行
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, watch_add, watches, options)
+
+
+async def watch_changes_adapter(cursor=0, watch_ids=None, wait=0, limit=500):
+    """
+    为MCP适配的watch_changes包装器，等待在线程池中进行，不阻塞事件循环
+
+    Args:
+        cursor: 游标
+        watch_ids: 监视ID列表
+        wait: 最多等待的秒数
+        limit: 最多返回的变化数
+
+    Returns:
+        Dict: watch_changes的返回结果
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, watch_changes, cursor, watch_ids, wait, limit)
+
+
+def watch_list_adapter():
+    """
+    为MCP适配的watch_list包装器
+    """
+    return watch_list()
+
+
+def watch_remove_adapter(watch_ids=None):
+    """
+    为MCP适配的watch_remove包装器
+    """
+    return watch_remove(watch_ids)
+
+
+def register_tool(mcp):
+    """
+    向MCP注册工具
+
+    Args:
+        mcp: MCP实例
+    """
+    mcp.tool(name="watch_add", description=ADD_TOOL_DESCRIPTION)(watch_add_adapter)
+    mcp.tool(name="watch_changes", description=CHANGES_TOOL_DESCRIPTION)(watch_changes_adapter)
+    mcp.tool(name="watch_list", description=LIST_TOOL_DESCRIPTION)(watch_list_adapter)
+    mcp.tool(name="watch_remove", description=REMOVE_TOOL_DESCRIPTION)(watch_remove_adapter)
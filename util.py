@@ -9,26 +9,416 @@ import os
 import socket
 import struct
 import json
-from collections import Counter, defaultdict
-from typing import Dict, List, Any, Tuple, Set, Optional, Union
+import hashlib
+import bisect
+import threading
+import itertools
+import functools
+import asyncio
+import atexit
+import queue
+import ctypes
+import ctypes.util
+from concurrent.futures import Future, InvalidStateError, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+from collections import Counter, OrderedDict, defaultdict
+from typing import Dict, List, Any, Tuple, Set, Optional, Union, Callable, Awaitable
 
 # 配置日志
 LOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mcp_ssh.log')
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    filename=LOG_FILE
-)
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# 日志中单个值的最大长度，超出部分截断
+LOG_VALUE_LIMIT = 200
+# 按工具的调试跟踪日志的父logger，子logger为MCP_SSH.trace.<工具名>
+TRACE_LOGGER = 'MCP_SSH.trace'
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    将日志记录原样放入队列，%格式化和写文件都由后台的QueueListener完成
+
+    标准QueueHandler会在调用方线程格式化消息；这里只提前格式化异常信息，
+    因此日志参数必须是之后不会再被修改的值(字符串、数字，或log_brief的结果)
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_file_handler = logging.FileHandler(LOG_FILE)
+_log_file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+_log_listener = QueueListener(_log_queue, _log_file_handler, respect_handler_level=True)
+logging.basicConfig(level=logging.INFO, handlers=[_DeferredQueueHandler(_log_queue)])
+_log_listener.start()
+# 退出时写完队列中剩余的日志
+atexit.register(_log_listener.stop)
 logger = logging.getLogger('MCP_SSH')
+# 按工具的跟踪设置(工具名 -> 是否开启)，优先于"*"
+_tool_trace: Dict[str, bool] = {}
+_trace_all = False
+
+
+def get_trace_logger(tool: str) -> logging.Logger:
+    """
+    获取工具的调试跟踪logger，默认只输出INFO以上级别，通过set_tool_trace开启DEBUG
+
+    调用方应先用isEnabledFor(logging.DEBUG)判断，关闭时不产生任何格式化开销
+    """
+    return logging.getLogger(f"{TRACE_LOGGER}.{tool}")
+
+
+def set_tool_trace(tool: str, enabled: bool) -> List[str]:
+    """
+    运行时开启或关闭某个工具的调试跟踪
+
+    单个工具的设置优先于"*"：开启"*"后仍可以单独关闭某个工具，反之亦然；
+    关闭"*"时同时清除所有工具的单独设置
+
+    参数:
+    - tool: 工具名，"*"表示所有工具
+    - enabled: 是否开启
+
+    返回:
+    - 当前开启了跟踪的工具列表
+    """
+    global _trace_all
+    if tool == "*":
+        _trace_all = enabled
+        logging.getLogger(TRACE_LOGGER).setLevel(logging.DEBUG if enabled else logging.NOTSET)
+        if not enabled:
+            for name in _tool_trace:
+                get_trace_logger(name).setLevel(logging.NOTSET)
+            _tool_trace.clear()
+    else:
+        # 关闭时显式设为INFO，不继承"*"的DEBUG
+        _tool_trace[tool] = enabled
+        get_trace_logger(tool).setLevel(logging.DEBUG if enabled else logging.INFO)
+    return traced_tools()
+
+
+def traced_tools() -> List[str]:
+    """
+    获取当前开启了跟踪的工具，开启了"*"时包含"*"
+    """
+    traced = sorted(name for name, enabled in _tool_trace.items() if enabled)
+    return ["*"] + traced if _trace_all else traced
+
+
+def untraced_tools() -> List[str]:
+    """
+    获取开启了"*"但单独关闭了跟踪的工具
+    """
+    return sorted(name for name, enabled in _tool_trace.items() if not enabled) if _trace_all else []
+
+
+def log_brief(value: Any, limit: int = LOG_VALUE_LIMIT) -> str:
+    """
+    将值转为有长度上限的日志字符串，长序列先切片再转换，避免为日志生成完整的repr
+
+    只应在确认日志级别已启用后调用
+    """
+    if isinstance(value, dict):
+        # 逐项转换，长度超过上限后不再处理剩余的项
+        parts = []
+        length = 0
+        for key, item in value.items():
+            if length > limit:
+                parts.append("...")
+                break
+            parts.append(f"{key!r}: {log_brief(item, limit)}")
+            length += len(parts[-1]) + 2
+        return "{" + ", ".join(parts) + "}"
+    total = None
+    if isinstance(value, (bytes, bytearray, memoryview, list, tuple)) and len(value) > limit:
+        total = len(value)
+        value = value[:limit]
+    if isinstance(value, memoryview):
+        value = bytes(value)
+    text = value if isinstance(value, str) else repr(value)
+    if len(text) > limit:
+        text = text[:limit] + "..."
+    return text if total is None else f"{text}(共{total}项)"
 
 # cheatEngine连接配置 - 默认值，可通过函数动态修改
 cheatEngine_config = {
     "host": "127.0.0.1",
     "port": 8082,
     "timeout": 10,
-    "retries": 3
+    "retries": 3,
+    "pool_size": 4,           # 连接池最大连接数
+    "pool_idle_timeout": 60,  # 空闲连接回收时间(秒)
+    "pipeline": False,        # 是否使用流水线模式(单连接多请求在途)
+    "long_frames": False,     # 是否协商长帧(单帧超过64KB)
+    "binary_payload": False,  # 是否请求以BYTECODE帧返回原始字节(而非JSON整数数组)
+    "local_multitype": True,  # 是否只向CE请求原始字节，在本地计算multiType/instructionMultiType
+    "ansi_codepage": "gbk",   # CE所在Windows系统的ANSI代码页，本地编解码CE目标的string时使用
+    "page_cache_pages": 0,    # 页缓存最多缓存的4KB页数，0表示禁用(默认)
+    "page_cache_ttl": 1.0,    # 可写区域(堆、栈、数据)缓存页的有效期(秒)
+    "page_cache_code_ttl": 300.0,  # 只读区域(代码)缓存页的有效期(秒)
+    "disasm_cache_size": 256, # 反汇编缓存最多保存的指令列表数，0表示禁用
+    "pointer_cache_ttl": 0.5, # 指针链解析中中间指针的缓存时间(秒)
+    "snapshot_max_bytes": 512 * 1024 * 1024,  # 内存快照的大小上限(字节)
+    "symbol_annotate": True,  # memory_read是否用模块导出符号标注值和跳转目标
+    "symbol_cache_dir": os.path.join(os.path.dirname(os.path.abspath(__file__)), 'symbol_cache'),  # 符号索引的磁盘缓存目录
+    "metrics_file": None,     # 定期写出Prometheus文本格式指标的文件路径，None表示不写出
+    "metrics_interval": 15,   # 写出指标文件的间隔(秒)
+    "pointer_size": 8         # 目标进程指针大小(x86=4, x64=8)
 }
 
+# 延迟直方图的桶上限(毫秒)
+LATENCY_BUCKETS_MS = (0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+# JSON解码耗时直方图的桶上限(毫秒)
+JSON_DECODE_BUCKETS_MS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50)
+
+
+class LatencyHistogram:
+    """
+    固定桶的延迟直方图(毫秒)，分位数按所在桶的上限估算
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        # 最后一个计数对应超过所有桶上限的值(+Inf)
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                break
+        bound = self.buckets[index] if index < len(self.buckets) else self.max
+        return round(min(bound, self.max), 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avgMs": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50Ms": self.quantile(0.5),
+            "p90Ms": self.quantile(0.9),
+            "p99Ms": self.quantile(0.99),
+            "maxMs": round(self.max, 3)
+        }
+
+
+class CEMetrics:
+    """
+    CE通信和工具调用的运行指标
+
+    记录每种数据包的往返延迟直方图、收发字节数、连接和重连次数、接收超时和重试次数、
+    JSON解码耗时，以及每个MCP工具的调用耗时。各客户端和工具包装器直接调用record_*方法，
+    collect_ce_stats汇总后由ce_stats工具返回或写出为Prometheus文本格式
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started_at = time.time()
+            # 数据包类型 -> 请求数、失败数、往返延迟、响应字节数；发送字节按帧的类型统计
+            self.packets: Dict[int, Dict[str, Any]] = {}
+            self.bytes_sent: Counter = Counter()
+            # 接收的全部字节(含帧头)，响应与请求的对应关系只在交换完成时才知道，按类型的统计见responseBytes
+            self.bytes_received = 0
+            # 工具名 -> 调用数、失败数、耗时
+            self.tools: Dict[str, Dict[str, Any]] = {}
+            self.connections = 0
+            self.connect_failures = 0
+            self.reconnects = 0
+            self.timeouts = 0
+            self.retries = 0
+            self.json_decode = LatencyHistogram(JSON_DECODE_BUCKETS_MS)
+            self.json_bytes = 0
+
+    def record_sent(self, packet_type: int, size: int) -> None:
+        with self._lock:
+            self.bytes_sent[packet_type] += size
+
+    def record_received(self, size: int) -> None:
+        with self._lock:
+            self.bytes_received += size
+
+    def record_request(self, packet_type: int, seconds: float, ok: bool, response_bytes: int = 0) -> None:
+        """
+        记录一次请求/响应交换
+
+        @param {int} packet_type - 请求的数据包类型
+        @param {float} seconds - 往返时间(秒)
+        @param {bool} ok - 是否收到了非ERROR的响应
+        @param {int} response_bytes - 响应帧(含二进制附加帧)的数据长度
+        """
+        with self._lock:
+            entry = self.packets.get(packet_type)
+            if entry is None:
+                entry = self.packets[packet_type] = {
+                    "requests": 0, "failures": 0, "responseBytes": 0, "rtt": LatencyHistogram()
+                }
+            entry["requests"] += 1
+            if not ok:
+                entry["failures"] += 1
+            entry["responseBytes"] += response_bytes
+            entry["rtt"].observe(seconds * 1000)
+
+    def record_connect(self, ok: bool, reconnect: bool = False) -> None:
+        with self._lock:
+            if not ok:
+                self.connect_failures += 1
+                return
+            self.connections += 1
+            if reconnect:
+                self.reconnects += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def record_json_decode(self, seconds: float, size: int) -> None:
+        with self._lock:
+            self.json_decode.observe(seconds * 1000)
+            self.json_bytes += size
+
+    def record_tool(self, name: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            entry = self.tools.get(name)
+            if entry is None:
+                entry = self.tools[name] = {"calls": 0, "errors": 0, "latency": LatencyHistogram()}
+            entry["calls"] += 1
+            if not ok:
+                entry["errors"] += 1
+            entry["latency"].observe(seconds * 1000)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        获取当前指标，直方图以分位数表示
+        """
+        names = {value: name for name, value in CESocketClient.PACKET_TYPE.items()}
+
+        def name_of(packet_type: int) -> str:
+            return names.get(packet_type, f"0x{packet_type:02X}")
+
+        with self._lock:
+            packets = {}
+            for packet_type in sorted(set(self.packets) | set(self.bytes_sent)):
+                entry = self.packets.get(packet_type)
+                item = {"requests": 0, "failures": 0, "responseBytes": 0} if entry is None else {
+                    "requests": entry["requests"], "failures": entry["failures"],
+                    "responseBytes": entry["responseBytes"], "rtt": entry["rtt"].to_dict()
+                }
+                item["bytesSent"] = self.bytes_sent[packet_type]
+                packets[name_of(packet_type)] = item
+            return {
+                "uptime": round(time.time() - self.started_at, 1),
+                "packets": packets,
+                "bytesSent": sum(self.bytes_sent.values()),
+                "bytesReceived": self.bytes_received,
+                "connection": {
+                    "connections": self.connections,
+                    "connectFailures": self.connect_failures,
+                    "reconnects": self.reconnects,
+                    "timeouts": self.timeouts,
+                    "retries": self.retries
+                },
+                "jsonDecode": dict(self.json_decode.to_dict(), bytes=self.json_bytes),
+                "tools": {
+                    name: {"calls": entry["calls"], "errors": entry["errors"], "latency": entry["latency"].to_dict()}
+                    for name, entry in sorted(self.tools.items())
+                }
+            }
+
+    def prometheus(self) -> List[str]:
+        """
+        以Prometheus文本格式输出通信和工具指标(直方图单位为秒)
+        """
+        names = {value: name for name, value in CESocketClient.PACKET_TYPE.items()}
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name: str, label: str, hist: LatencyHistogram) -> None:
+            prefix = label + "," if label else ""
+            suffix = "{" + label + "}" if label else ""
+            cumulative = 0
+            for bound, count in zip(hist.buckets, hist.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{prefix}le="{bound / 1000:g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {hist.count}')
+            lines.append(f"{name}_sum{suffix} {hist.total / 1000:.6f}")
+            lines.append(f"{name}_count{suffix} {hist.count}")
+
+        with self._lock:
+            packets = sorted(self.packets.items())
+            metric("ce_requests_total", "counter", "CE requests by packet type")
+            lines.extend(f'ce_requests_total{{type="{names.get(t, t)}"}} {e["requests"]}' for t, e in packets)
+            metric("ce_request_failures_total", "counter", "CE requests without a response or answered with ERROR")
+            lines.extend(f'ce_request_failures_total{{type="{names.get(t, t)}"}} {e["failures"]}' for t, e in packets)
+            metric("ce_request_duration_seconds", "histogram", "CE request round-trip time")
+            for packet_type, entry in packets:
+                histogram("ce_request_duration_seconds", f'type="{names.get(packet_type, packet_type)}"', entry["rtt"])
+            metric("ce_response_bytes_total", "counter", "Response payload bytes by request packet type")
+            lines.extend(f'ce_response_bytes_total{{type="{names.get(t, t)}"}} {e["responseBytes"]}' for t, e in packets)
+            metric("ce_bytes_sent_total", "counter", "Bytes sent including frame headers, by packet type")
+            lines.extend(f'ce_bytes_sent_total{{type="{names.get(t, t)}"}} {count}'
+                         for t, count in sorted(self.bytes_sent.items()))
+            for name, value, help_text in (
+                ("ce_bytes_received_total", self.bytes_received, "Bytes received including frame headers"),
+                ("ce_connections_total", self.connections, "Connections opened"),
+                ("ce_connect_failures_total", self.connect_failures, "Failed connection attempts"),
+                ("ce_reconnects_total", self.reconnects, "Connections reopened after a previous connection"),
+                ("ce_receive_timeouts_total", self.timeouts, "Requests that timed out waiting for a response"),
+                ("ce_receive_retries_total", self.retries, "Receive timeouts that were retried"),
+                ("ce_json_decode_bytes_total", self.json_bytes, "Bytes of JSON responses decoded"),
+            ):
+                metric(name, "counter", help_text)
+                lines.append(f"{name} {value}")
+            metric("ce_json_decode_seconds", "histogram", "Time spent decoding JSON responses")
+            histogram("ce_json_decode_seconds", "", self.json_decode)
+            tools = sorted(self.tools.items())
+            metric("ce_tool_calls_total", "counter", "MCP tool calls")
+            lines.extend(f'ce_tool_calls_total{{tool="{name}"}} {entry["calls"]}' for name, entry in tools)
+            metric("ce_tool_errors_total", "counter", "MCP tool calls that failed")
+            lines.extend(f'ce_tool_errors_total{{tool="{name}"}} {entry["errors"]}' for name, entry in tools)
+            metric("ce_tool_duration_seconds", "histogram", "MCP tool call duration")
+            for name, entry in tools:
+                histogram("ce_tool_duration_seconds", f'tool="{name}"', entry["latency"])
+        return lines
+
+
+_ce_metrics = CEMetrics()
+
+
+def get_ce_metrics() -> CEMetrics:
+    """
+    获取进程级共享的运行指标
+    """
+    return _ce_metrics
+
+
 class CESocketClient:
     """
     CheatEngine Socket客户端
@@ -53,8 +443,16 @@ class CESocketClient:
         "ERROR": 0xFF        # 错误
     }
     
+    # 帧头扩展标志，占用类型字段的高位，需先通过COMMAND协商后才能使用
+    FRAME_FLAG_TAGGED = 0x8000   # 帧头后附带4字节请求ID(流水线模式)
+    FRAME_FLAG_LONG = 0x4000     # 长度字段扩展为4字节(长帧)
+    FRAME_TYPE_MASK = 0x00FF     # 类型字段中真正表示数据包类型的部分
+    MAX_FRAME_SIZE = 0xFFFF      # 普通帧的最大数据长度
+    MAX_LONG_FRAME_SIZE = 64 * 1024 * 1024  # 长帧的最大数据长度，防止异常长度导致超大内存分配
+    NEGOTIATE_TIMEOUT = 2.0      # 等待帧格式协商回复的最长时间(秒)，老版本插件不回复未知命令
+    
     def __init__(self, host: str = "127.0.0.1", port: int = 8082, timeout: int = 10, 
-                 auto_connect: bool = True, max_retries: int = 3):
+                 auto_connect: bool = True, max_retries: int = 3, long_frames: bool = False):
         """
         初始化客户端
         
@@ -63,6 +461,7 @@ class CESocketClient:
         @param {int} timeout - 超时时间(秒)
         @param {bool} auto_connect - 是否开启自动连接
         @param {int} max_retries - 最大重试次数
+        @param {bool} long_frames - 是否在连接时协商长帧(4字节长度)
         """
         self.host = host
         self.port = port
@@ -71,26 +470,108 @@ class CESocketClient:
         self.connected = False
         self.auto_connect = auto_connect
         self.max_retries = max_retries
+        self.want_long_frames = long_frames
+        self.long_frames = False
+        self.max_frame_size = self.MAX_FRAME_SIZE
         self.logger = logger
+        # 是否曾经连接成功，之后的连接计为重连
+        self._was_connected = False
     
     def connect(self) -> bool:
         """
-        连接到服务器
+        连接到服务器，并按需协商扩展帧格式
+        
+        @return {bool} - 是否连接成功
+        """
+        if not self._open_socket():
+            return False
+        
+        options = self._framing_options()
+        accepted = self._negotiate(options) if options else {}
+        if not self.connected:
+            # 协商失败后重新建立连接也失败了
+            return False
+        self._apply_framing(accepted)
+        return True
+    
+    def _open_socket(self) -> bool:
+        """
+        建立TCP连接
         
         @return {bool} - 是否连接成功
         """
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            # 请求都是小数据包，关闭Nagle算法避免与对端的延迟确认叠加出数十毫秒的等待
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             self.socket.settimeout(self.timeout)
             self.socket.connect((self.host, self.port))
             self.connected = True
-            self.logger.info(f"已连接到CheatEngine服务器 {self.host}:{self.port}")
+            _ce_metrics.record_connect(True, self._was_connected)
+            self._was_connected = True
+            self.logger.info("已连接到CheatEngine服务器 %s:%s", self.host, self.port)
             return True
         except socket.error as e:
-            self.logger.error(f"连接CheatEngine服务器失败: {e}")
+            self.logger.error("连接CheatEngine服务器失败: %s", e)
+            _ce_metrics.record_connect(False)
             self.connected = False
             return False
     
+    def _framing_options(self) -> Dict[str, bool]:
+        """
+        需要向服务器协商的帧格式扩展
+        
+        @return {dict} - setFraming命令的options
+        """
+        return {"longFrames": True} if self.want_long_frames else {}
+    
+    def _negotiate(self, options: Dict[str, bool]) -> Dict[str, Any]:
+        """
+        通过COMMAND数据包协商扩展帧格式
+        
+        @param {dict} options - 请求启用的扩展
+        @return {dict} - 服务器的响应，不支持时为空字典
+        """
+        command = json.dumps({"command": "setFraming", "options": options})
+        # 老版本插件不回复未知命令，不按普通请求的超时等待
+        self.socket.settimeout(min(self.timeout, self.NEGOTIATE_TIMEOUT))
+        try:
+            packet = self._pack_data(command, self.PACKET_TYPE["COMMAND"])
+            self.socket.sendall(packet)
+            _ce_metrics.record_sent(self.PACKET_TYPE["COMMAND"], len(packet))
+            response_type, content = self.receive_response(retry_count=0)
+        except socket.error as e:
+            self.logger.warning("发送帧格式协商请求失败: %s", e)
+            response_type, content = None, None
+        finally:
+            if self.socket:
+                self.socket.settimeout(self.timeout)
+        
+        if response_type is None:
+            # 连接状态不可信(可能稍后才收到迟到的回复)，重新建立；失败时connected为False
+            CESocketClient.disconnect(self)
+            if self._open_socket():
+                self.logger.info("服务器未回复帧格式协商，按不支持扩展处理")
+            return {}
+        if response_type == self.PACKET_TYPE["ERROR"]:
+            return {}
+        try:
+            response = json.loads(content.decode('utf-8'))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return {}
+        return response if response.get("success") else {}
+    
+    def _apply_framing(self, accepted: Dict[str, Any]) -> None:
+        """
+        应用协商结果
+        
+        @param {dict} accepted - 服务器同意启用的扩展
+        """
+        self.long_frames = bool(accepted.get("longFrames"))
+        self.max_frame_size = self.MAX_LONG_FRAME_SIZE if self.long_frames else self.MAX_FRAME_SIZE
+        if self.want_long_frames:
+            self.logger.info("长帧模式: %s", '已启用' if self.long_frames else '服务器不支持')
+    
     def disconnect(self) -> None:
         """
         断开连接
@@ -108,23 +589,38 @@ class CESocketClient:
         @return {bool} - 是否已连接
         """
         if not self.connected and self.auto_connect:
-            self.logger.info(f"自动连接到CheatEngine服务器 {self.host}:{self.port}")
+            self.logger.info("自动连接到CheatEngine服务器 %s:%s", self.host, self.port)
             return self.connect()
         return self.connected
     
-    def _pack_data(self, data: Union[bytes, str], data_type: int) -> bytes:
+    def _pack_data(self, data: Union[bytes, str], data_type: int,
+                   request_id: Optional[int] = None) -> bytes:
         """
         打包数据
         
         @param {bytes|str} data - 要发送的数据
         @param {int} data_type - 数据类型
+        @param {int} request_id - 请求ID，仅在协商了流水线模式后使用
         @return {bytes} - 打包后的数据
         """
         if isinstance(data, str):
             data = data.encode('utf-8')
         
-        # 打包头部: >HH 表示大端序的两个2字节无符号整数
-        header = struct.pack(">HH", data_type, len(data))
+        length = len(data)
+        if length > self.max_frame_size:
+            raise ValueError(f"数据长度{length}超过单帧上限{self.max_frame_size}字节")
+        
+        flags = self.FRAME_FLAG_TAGGED if request_id is not None else 0
+        if length > self.MAX_FRAME_SIZE:
+            # 长帧: >HI 类型(含标志位)、4字节长度
+            header = struct.pack(">HI", data_type | flags | self.FRAME_FLAG_LONG, length)
+        else:
+            # 打包头部: >HH 表示大端序的两个2字节无符号整数
+            header = struct.pack(">HH", data_type | flags, length)
+        
+        if request_id is not None:
+            # 带请求ID的扩展帧头: 长度字段之后附带4字节请求ID
+            header += struct.pack(">I", request_id)
         return header + data
     
     def _unpack_data(self, packet: bytes) -> Tuple[Optional[int], Optional[bytes]]:
@@ -137,12 +633,25 @@ class CESocketClient:
         if not packet or len(packet) < 4:
             return None, None
         
-        data_type, length = struct.unpack(">HH", packet[:4])
+        data_type = struct.unpack_from(">H", packet)[0]
+        if data_type & self.FRAME_FLAG_LONG:
+            if len(packet) < 6:
+                return None, None
+            length = struct.unpack_from(">I", packet, 2)[0]
+            offset = 6
+        else:
+            length = struct.unpack_from(">H", packet, 2)[0]
+            offset = 4
+        
+        if data_type & self.FRAME_FLAG_TAGGED:
+            # 跳过请求ID
+            offset += 4
+        data_type &= self.FRAME_TYPE_MASK
         
-        if len(packet) < 4 + length:
+        if len(packet) < offset + length:
             return None, None
         
-        data = packet[4:4+length]
+        data = packet[offset:offset+length]
         return data_type, data
     
     def send_text(self, text: str) -> bool:
@@ -158,79 +667,118 @@ class CESocketClient:
         try:
             packet = self._pack_data(text, self.PACKET_TYPE["TEXT"])
             self.socket.sendall(packet)
-            self.logger.info(f"已发送文本消息: {text}")
+            _ce_metrics.record_sent(self.PACKET_TYPE["TEXT"], len(packet))
+            self.logger.info("已发送文本消息: %s", text)
             return True
         except socket.error as e:
-            self.logger.error(f"发送失败: {e}")
+            self.logger.error("发送失败: %s", e)
             self.connected = False
             return False
     
-    def receive_response(self, buffer_size: int = 16384, 
+    def _recv_exact_into(self, sock: socket.socket, view: memoryview, buffer_size: int,
+                         retry_count: int, retry_interval: float, attempts: List[int]) -> None:
+        """
+        将数据直接接收到给定的缓冲区中，直到填满
+        
+        接收超时时保留已接收的部分继续等待，重试次数在同一帧内累计
+        
+        @param {socket} sock - 套接字
+        @param {memoryview} view - 目标缓冲区
+        @param {int} buffer_size - 单次recv的最大字节数
+        @param {int} retry_count - 接收超时时的重试次数
+        @param {float} retry_interval - 重试间隔时间(秒)
+        @param {list} attempts - 单元素列表，记录本帧已重试的次数
+        """
+        received = 0
+        total = len(view)
+        while received < total:
+            try:
+                count = sock.recv_into(view[received:], min(buffer_size, total - received))
+            except socket.timeout:
+                if attempts[0] >= retry_count:
+                    raise
+                attempts[0] += 1
+                _ce_metrics.record_retry()
+                self.logger.warning("接收超时，等待%s秒后重试... (第%s/%s次)", retry_interval, attempts[0], retry_count)
+                if retry_interval:
+                    time.sleep(retry_interval)
+                continue
+            if not count:
+                raise ConnectionError("服务器关闭了连接")
+            received += count
+    
+    def _read_frame(self, sock: socket.socket, buffer_size: int = 262144, retry_count: int = 0,
+                    retry_interval: float = 0.5) -> Tuple[int, Optional[int], bytearray]:
+        """
+        读取一个完整的数据帧
+        
+        数据部分按帧头中的长度一次性分配bytearray，再用recv_into原地填充，
+        整个帧只在内核到用户态之间拷贝一次
+        
+        @param {socket} sock - 套接字
+        @param {int} buffer_size - 单次recv的最大字节数
+        @param {int} retry_count - 接收超时时的重试次数
+        @param {float} retry_interval - 重试间隔时间(秒)
+        @return {tuple} - (数据类型, 请求ID, 数据内容)
+        """
+        attempts = [0]
+        header = bytearray(4)
+        self._recv_exact_into(sock, memoryview(header), 4, retry_count, retry_interval, attempts)
+        data_type, length = struct.unpack(">HH", header)
+        
+        if data_type & self.FRAME_FLAG_LONG:
+            # 长帧的长度字段为4字节，已读取的2字节是其高位
+            low = bytearray(2)
+            self._recv_exact_into(sock, memoryview(low), 2, retry_count, retry_interval, attempts)
+            length = (length << 16) | struct.unpack(">H", low)[0]
+            if length > self.MAX_LONG_FRAME_SIZE:
+                raise ConnectionError(f"帧长度{length}超过上限，连接状态异常")
+        
+        request_id = None
+        if data_type & self.FRAME_FLAG_TAGGED:
+            tag = bytearray(4)
+            self._recv_exact_into(sock, memoryview(tag), 4, retry_count, retry_interval, attempts)
+            request_id = struct.unpack(">I", tag)[0]
+        
+        content = bytearray(length)
+        if length:
+            self._recv_exact_into(sock, memoryview(content), buffer_size, retry_count, retry_interval, attempts)
+        header_size = 4 + (2 if data_type & self.FRAME_FLAG_LONG else 0) + (4 if request_id is not None else 0)
+        _ce_metrics.record_received(header_size + length)
+        return data_type & self.FRAME_TYPE_MASK, request_id, content
+    
+    def receive_response(self, buffer_size: int = 262144, 
                          retry_count: int = 2, 
-                         retry_interval: float = 0.5) -> Tuple[Optional[int], Optional[bytes]]:
+                         retry_interval: float = 0.5,
+                         as_view: bool = False) -> Tuple[Optional[int], Optional[Union[bytearray, memoryview]]]:
         """
         接收服务器响应
         
-        @param {int} buffer_size - 缓冲区大小
+        @param {int} buffer_size - 单次recv的最大字节数
         @param {int} retry_count - 接收超时时的重试次数
         @param {float} retry_interval - 重试间隔时间(秒)
+        @param {bool} as_view - 是否以memoryview返回数据内容，切片时不再复制
         @return {tuple} - (数据类型, 数据内容)
         """
         if not self.connected:
             self.logger.error("未连接到CheatEngine服务器")
             return None, None
         
-        # 重试逻辑
-        for attempt in range(retry_count + 1):
-            try:
-                if attempt > 0:
-                    self.logger.info(f"正在尝试接收响应... (第{attempt}/{retry_count}次)")
-                
-                # 接收头部(4字节)
-                header_data = b''
-                while len(header_data) < 4:
-                    chunk = self.socket.recv(4 - len(header_data))
-                    if not chunk:
-                        self.logger.warning("服务器关闭了连接")
-                        self.disconnect()
-                        return None, None
-                    header_data += chunk
-                
-                # 解析头部，获取类型和长度
-                data_type, length = struct.unpack(">HH", header_data)
-                
-                # 接收完整数据
-                content = b''
-                remaining = length
-                
-                while remaining > 0:
-                    # 每次读取剩余数据量或缓冲区大小中的较小值
-                    read_size = min(buffer_size, remaining)
-                    chunk = self.socket.recv(read_size)
-                    
-                    if not chunk:
-                        self.logger.warning("接收数据过程中连接关闭")
-                        self.disconnect()
-                        return None, None
-                    
-                    content += chunk
-                    remaining -= len(chunk)
-                
-                return data_type, content
-                
-            except socket.timeout:
-                if attempt < retry_count:
-                    self.logger.warning(f"接收超时，等待{retry_interval}秒后重试...")
-                    time.sleep(retry_interval)
-                else:
-                    self.logger.warning("接收超时，已达到最大重试次数")
-                    return None, None
-            except socket.error as e:
-                self.logger.error(f"接收失败: {e}")
-                self.disconnect()
-                return None, None
-        
-        return None, None
+        try:
+            data_type, _, content = self._read_frame(self.socket, buffer_size, retry_count, retry_interval)
+            return data_type, (memoryview(content) if as_view else content)
+        except socket.timeout:
+            _ce_metrics.record_timeout()
+            self.logger.warning("接收超时，已达到最大重试次数")
+            return None, None
+        except ConnectionError as e:
+            self.logger.warning("接收数据过程中连接关闭: %s", e)
+            self.disconnect()
+            return None, None
+        except socket.error as e:
+            self.logger.error("接收失败: %s", e)
+            self.disconnect()
+            return None, None
     
     def check_server(self, timeout: int = 2) -> bool:
         """
@@ -253,6 +801,7 @@ class CESocketClient:
             ping_message = "PING"
             packet = self._pack_data(ping_message, self.PACKET_TYPE["TEXT"])
             self.socket.sendall(packet)
+            _ce_metrics.record_sent(self.PACKET_TYPE["TEXT"], len(packet))
             
             # 尝试接收响应
             data_type, content = self.receive_response(retry_count=0)
@@ -268,7 +817,7 @@ class CESocketClient:
                 return False
                 
         except socket.error as e:
-            self.logger.error(f"检测CheatEngine服务器状态时发生错误: {e}")
+            self.logger.error("检测CheatEngine服务器状态时发生错误: %s", e)
             self.connected = False
             return False
         finally:
@@ -278,70 +827,4081 @@ class CESocketClient:
             except:
                 pass
 
+    def is_alive(self) -> bool:
+        """
+        在不收发数据包的情况下检查连接是否仍然可用
 
-def create_ce_client(host: Optional[str] = None, 
-                     port: Optional[int] = None, 
-                     timeout: Optional[int] = None, 
-                     auto_connect: bool = True) -> CESocketClient:
-    """
-    创建CheatEngine客户端实例
-    
-    参数:
-    - host: 服务器主机名或IP地址，默认使用全局配置
-    - port: 服务器端口，默认使用全局配置
-    - timeout: 连接超时时间，默认使用全局配置
-    - auto_connect: 是否自动连接，默认为True
-    
-    返回:
-    - 创建的CESocketClient实例
-    """
-    # 使用参数或默认配置
-    actual_host = host or cheatEngine_config["host"]
-    actual_port = port or cheatEngine_config["port"]
-    actual_timeout = timeout or cheatEngine_config["timeout"]
-    
-    # 创建客户端实例
-    client = CESocketClient(
-        host=actual_host,
-        port=actual_port,
-        timeout=actual_timeout,
-        auto_connect=auto_connect,
-        max_retries=cheatEngine_config["retries"]
-    )
-    
-    # 如果设置了自动连接，则尝试连接
-    if auto_connect:
-        client.connect()
-    
-    return client
+        通过非阻塞的MSG_PEEK探测套接字: 对端关闭时返回空数据; 存在未读取的
+        残留数据说明上一次请求的响应没有被完整消费, 连接状态不可信, 同样视为不可用
 
+        @return {bool} - 连接是否健康
+        """
+        if not self.connected or not self.socket:
+            return False
 
-def update_ce_config(host: Optional[str] = None, 
-                     port: Optional[int] = None, 
-                     timeout: Optional[int] = None, 
-                     retries: Optional[int] = None) -> None:
+        try:
+            self.socket.setblocking(False)
+            try:
+                self.socket.recv(1, socket.MSG_PEEK)
+            finally:
+                self.socket.settimeout(self.timeout)
+            # 空数据表示对端已关闭，有数据表示存在残留响应
+            return False
+        except BlockingIOError:
+            return True
+        except socket.error:
+            return False
+
+    def request(self, packet_type: int, data: Union[bytes, str],
+                retry_count: int = 2) -> Tuple[Optional[int], Optional[bytes]]:
+        """
+        发送一个请求并等待响应
+
+        发送失败时(通常是连接池中的连接已被服务端关闭)会自动重连并重发一次。
+        接收超时或失败时断开连接, 避免迟到的响应被下一个请求误读
+
+        @param {int} packet_type - 数据包类型
+        @param {bytes|str} data - 请求数据
+        @param {int} retry_count - 接收超时时的重试次数
+        @return {tuple} - (数据类型, 数据内容)
+        """
+        response_type, content, _ = self._exchange(packet_type, data, retry_count, False)
+        return response_type, content
+
+    def request_binary(self, packet_type: int, data: Union[bytes, str],
+                       retry_count: int = 2) -> Tuple[Optional[int], Optional[bytes], Optional[bytearray]]:
+        """
+        发送一个请求并等待响应，同时接收响应前附带的二进制数据帧
+
+        请求选项中带有binaryBytes时，服务端先发送一个BYTECODE帧承载原始字节，
+        再发送JSON响应帧；不支持该选项的服务端只发送JSON响应帧，此时二进制数据为None
+
+        @param {int} packet_type - 数据包类型
+        @param {bytes|str} data - 请求数据
+        @param {int} retry_count - 接收超时时的重试次数
+        @return {tuple} - (数据类型, 数据内容, 二进制数据)
+        """
+        return self._exchange(packet_type, data, retry_count, True)
+
+    def _send_request(self, packet_type: int, data: Union[bytes, str]) -> bool:
+        """
+        发送请求，发送失败时自动重连并重发一次
+
+        @param {int} packet_type - 数据包类型
+        @param {bytes|str} data - 请求数据
+        @return {bool} - 是否发送成功
+        """
+        for attempt in range(2):
+            if not self.ensure_connected():
+                return False
+            try:
+                # 连接后再打包，单帧上限取决于协商结果
+                packet = self._pack_data(data, packet_type)
+                self.socket.sendall(packet)
+                # 发送成功后才计入字节数，重发不会重复统计
+                _ce_metrics.record_sent(packet_type, len(packet))
+                return True
+            except socket.error as e:
+                self.logger.warning("发送请求失败，尝试重新连接: %s", e)
+                self.disconnect()
+                self.connected = False
+                if not self.auto_connect:
+                    return False
+        return False
+
+    def _exchange(self, packet_type: int, data: Union[bytes, str], retry_count: int,
+                  binary: bool) -> Tuple[Optional[int], Optional[bytes], Optional[bytearray]]:
+        """
+        完成一次请求/响应交换
+
+        @param {int} packet_type - 数据包类型
+        @param {bytes|str} data - 请求数据
+        @param {int} retry_count - 接收超时时的重试次数
+        @param {bool} binary - 是否接收响应前附带的BYTECODE帧
+        @return {tuple} - (数据类型, 数据内容, 二进制数据)
+        """
+        started = time.perf_counter()
+        if not self._send_request(packet_type, data):
+            return None, None, None
+
+        response_type, content = self.receive_response(retry_count=retry_count)
+        payload = None
+        if binary and response_type == self.PACKET_TYPE["BYTECODE"]:
+            payload = content
+            response_type, content = self.receive_response(retry_count=retry_count)
+        _ce_metrics.record_request(packet_type, time.perf_counter() - started,
+                                   response_type not in (None, self.PACKET_TYPE["ERROR"]),
+                                   len(content or b"") + len(payload or b""))
+        if response_type is None:
+            self.disconnect()
+            return None, None, None
+        return response_type, content, payload
+
+    def request_many(self, requests: List[Tuple[int, Union[bytes, str]]],
+                     retry_count: int = 2) -> List[Tuple[Optional[int], Optional[bytes]]]:
+        """
+        发送多个请求并按请求顺序返回响应
+
+        普通连接逐个收发；流水线客户端会重写此方法，让所有请求同时在途
+
+        @param {list} requests - (数据包类型, 请求数据)列表
+        @param {int} retry_count - 接收超时时的重试次数
+        @return {list} - 与请求一一对应的(数据类型, 数据内容)列表
+        """
+        return [self.request(packet_type, data, retry_count=retry_count)
+                for packet_type, data in requests]
+
+    def request_many_binary(self, requests: List[Tuple[int, Union[bytes, str]]],
+                            retry_count: int = 2) -> List[Tuple[Optional[int], Optional[bytes], Optional[bytearray]]]:
+        """
+        request_many的二进制版本，见request_binary
+
+        @param {list} requests - (数据包类型, 请求数据)列表
+        @param {int} retry_count - 接收超时时的重试次数
+        @return {list} - 与请求一一对应的(数据类型, 数据内容, 二进制数据)列表
+        """
+        return [self.request_binary(packet_type, data, retry_count=retry_count)
+                for packet_type, data in requests]
+
+
+class CEPipelinedClient(CESocketClient):
     """
-    更新CheatEngine连接配置
-    
-    参数:
-    - host: 服务器主机名或IP地址
-    - port: 服务器端口
-    - timeout: 连接超时时间(秒)
-    - retries: 重试次数
+    流水线模式的CheatEngine Socket客户端
+    每个请求携带请求ID，同一连接上可以同时有多个请求在途，
+    由独立的读取线程按请求ID把乱序到达的响应分发给对应的等待方。
+    服务端不支持流水线模式时自动退化为加锁的逐个收发，对调用方透明
     """
-    global cheatEngine_config
-    
-    # 只更新提供的参数
-    if host is not None:
-        cheatEngine_config["host"] = host
-    
-    if port is not None:
-        cheatEngine_config["port"] = port
-    
-    if timeout is not None:
-        cheatEngine_config["timeout"] = timeout
-    
-    if retries is not None:
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8082, timeout: int = 10,
+                 auto_connect: bool = True, max_retries: int = 3, long_frames: bool = False,
+                 max_in_flight: int = 64):
+        """
+        初始化客户端
+
+        @param {str} host - 服务器地址
+        @param {int} port - 服务器端口
+        @param {int} timeout - 超时时间(秒)
+        @param {bool} auto_connect - 是否开启自动连接
+        @param {int} max_retries - 最大重试次数
+        @param {bool} long_frames - 是否在连接时协商长帧(4字节长度)
+        @param {int} max_in_flight - 同时在途的最大请求数
+        """
+        super().__init__(host, port, timeout, auto_connect, max_retries, long_frames)
+        self.max_in_flight = max_in_flight
+        self.pipelined = False
+        self._send_lock = threading.Lock()
+        self._state_lock = threading.RLock()
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._pending: Dict[int, Future] = {}
+        # 需要接收二进制附加帧的请求ID，以及已经到达但JSON响应尚未到达的二进制数据
+        self._binary_ids: Set[int] = set()
+        self._payloads: Dict[int, bytearray] = {}
+        self._next_id = itertools.count(1)
+        self._reader: Optional[threading.Thread] = None
+
+    def connect(self) -> bool:
+        """
+        连接到服务器并协商流水线模式
+
+        @return {bool} - 是否连接成功
+        """
+        with self._state_lock:
+            if not super().connect():
+                return False
+            if self.pipelined:
+                # 读取线程独占接收方向，超时由每个请求各自控制
+                self.socket.settimeout(None)
+                self._reader = threading.Thread(
+                    target=self._reader_loop, args=(self.socket,),
+                    name="ce-pipeline-reader", daemon=True
+                )
+                self._reader.start()
+                self.logger.info("已启用CheatEngine流水线模式")
+            else:
+                self.logger.info("CheatEngine服务器不支持流水线模式，使用逐个收发")
+            return True
+
+    def _framing_options(self) -> Dict[str, bool]:
+        """
+        在基类的扩展之外请求带请求ID的帧格式
+
+        @return {dict} - setFraming命令的options
+        """
+        options = super()._framing_options()
+        options["tagged"] = True
+        return options
+
+    def _apply_framing(self, accepted: Dict[str, Any]) -> None:
+        """
+        应用协商结果
+
+        @param {dict} accepted - 服务器同意启用的扩展
+        """
+        super()._apply_framing(accepted)
+        self.pipelined = bool(accepted.get("tagged"))
+
+    def disconnect(self) -> None:
+        """
+        断开连接，所有在途请求以连接错误结束
+        """
+        with self._state_lock:
+            if self.socket:
+                try:
+                    self.socket.shutdown(socket.SHUT_RDWR)
+                except socket.error:
+                    pass
+            super().disconnect()
+            self.pipelined = False
+            self._fail_pending(ConnectionError("与CheatEngine服务器的连接已断开"))
+
+    def _fail_pending(self, error: Exception) -> None:
+        """
+        以指定错误结束所有在途请求
+
+        @param {Exception} error - 设置到等待方的异常
+        """
+        with self._state_lock:
+            pending, self._pending = self._pending, {}
+            self._binary_ids.clear()
+            self._payloads.clear()
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    def _reader_loop(self, sock: socket.socket) -> None:
+        """
+        读取线程主循环，按请求ID分发响应
+
+        @param {socket} sock - 本线程负责读取的套接字
+        """
+        try:
+            while True:
+                data_type, request_id, content = self._read_frame(sock)
+
+                with self._state_lock:
+                    if (data_type == self.PACKET_TYPE["BYTECODE"] and request_id in self._binary_ids
+                            and request_id not in self._payloads):
+                        # 二进制附加帧，等待随后的JSON响应帧
+                        self._payloads[request_id] = content
+                        continue
+                    future = self._pending.pop(request_id, None)
+                    self._binary_ids.discard(request_id)
+                    payload = self._payloads.pop(request_id, None)
+                if future is None:
+                    # 已超时被放弃的请求，或服务器主动推送的消息
+                    self.logger.warning("丢弃无人等待的响应: 请求ID=%s, 类型=%s", request_id, data_type)
+                    continue
+                try:
+                    future.set_result((data_type, content, payload))
+                except InvalidStateError:
+                    # 等待方恰好在此时超时取消
+                    pass
+        except (socket.error, OSError) as e:
+            self.logger.warning("流水线读取线程异常退出: %s", e)
+
+        with self._state_lock:
+            # 只有仍是当前连接时才标记断开，避免影响重连后的新连接
+            if self.socket is sock:
+                self.logger.warning("服务器关闭了流水线连接")
+                self.disconnect()
+
+    def submit(self, packet_type: int, data: Union[bytes, str], binary: bool = False,
+               retry_count: Optional[int] = None) -> Future:
+        """
+        发送请求但不等待响应
+
+        @param {int} packet_type - 数据包类型
+        @param {bytes|str} data - 请求数据
+        @param {bool} binary - 是否接收响应前附带的BYTECODE帧
+        @param {int} retry_count - 服务端不支持流水线、退回逐个收发时接收超时的重试次数，默认为配置的retries
+        @return {Future} - 结果为(数据类型, 数据内容, 二进制数据)的Future
+        """
+        future = Future()
+        with self._state_lock:
+            if not self.ensure_connected():
+                future.set_exception(ConnectionError("未连接到CheatEngine服务器"))
+                return future
+            pipelined = self.pipelined
+
+        if not pipelined:
+            # 服务端不支持流水线，加锁逐个收发
+            with self._send_lock:
+                retries = self.max_retries if retry_count is None else retry_count
+                future.set_result(super()._exchange(packet_type, data, retries, binary))
+            return future
+
+        request_id = next(self._next_id) & 0xFFFFFFFF
+        packet = self._pack_data(data, packet_type, request_id)
+
+        self._in_flight.acquire()
+        future.add_done_callback(lambda _: self._in_flight.release())
+        started = time.perf_counter()
+        future.add_done_callback(lambda done: self._record_request(packet_type, started, done))
+        with self._state_lock:
+            self._pending[request_id] = future
+            if binary:
+                self._binary_ids.add(request_id)
+            sock = self.socket
+
+        try:
+            with self._send_lock:
+                sock.sendall(packet)
+            _ce_metrics.record_sent(packet_type, len(packet))
+        except (socket.error, AttributeError) as e:
+            self.logger.error("发送流水线请求失败: %s", e)
+            with self._state_lock:
+                self._pending.pop(request_id, None)
+                self._binary_ids.discard(request_id)
+            if not future.done():
+                future.set_exception(ConnectionError(f"发送失败: {e}"))
+            self.disconnect()
+        return future
+
+    def _record_request(self, packet_type: int, started: float, future: Future) -> None:
+        """
+        在途请求结束时记录往返时间，超时放弃或连接断开计为失败
+        """
+        if future.cancelled() or future.exception() is not None:
+            _ce_metrics.record_request(packet_type, time.perf_counter() - started, False)
+            return
+        response_type, content, payload = future.result()
+        _ce_metrics.record_request(packet_type, time.perf_counter() - started,
+                                   response_type != self.PACKET_TYPE["ERROR"],
+                                   len(content or b"") + len(payload or b""))
+
+    def _wait(self, future: Future, retry_count: int) -> Tuple[Optional[int], Optional[bytes], Optional[bytearray]]:
+        """
+        等待在途请求完成
+
+        @param {Future} future - submit返回的Future
+        @param {int} retry_count - 超时重试次数，总等待时间为timeout*(retry_count+1)
+        @return {tuple} - (数据类型, 数据内容, 二进制数据)，失败时全部为None
+        """
+        try:
+            return future.result(timeout=self.timeout * (retry_count + 1))
+        except FutureTimeoutError:
+            _ce_metrics.record_timeout()
+            self.logger.warning("等待流水线响应超时")
+            self._abandon(future)
+        except ConnectionError as e:
+            self.logger.error("流水线请求失败: %s", e)
+        return None, None, None
+
+    def _abandon(self, future: Future) -> None:
+        """
+        放弃一个超时的在途请求，其迟到的响应将被读取线程丢弃
+
+        @param {Future} future - 要放弃的请求
+        """
+        with self._state_lock:
+            for request_id, pending in list(self._pending.items()):
+                if pending is future:
+                    del self._pending[request_id]
+                    self._binary_ids.discard(request_id)
+                    self._payloads.pop(request_id, None)
+                    break
+        future.cancel()
+
+    def request(self, packet_type: int, data: Union[bytes, str],
+                retry_count: int = 2) -> Tuple[Optional[int], Optional[bytes]]:
+        """
+        发送一个请求并等待响应
+
+        @param {int} packet_type - 数据包类型
+        @param {bytes|str} data - 请求数据
+        @param {int} retry_count - 接收超时时的重试次数
+        @return {tuple} - (数据类型, 数据内容)
+        """
+        return self._wait(self.submit(packet_type, data, retry_count=retry_count), retry_count)[:2]
+
+    def request_binary(self, packet_type: int, data: Union[bytes, str],
+                       retry_count: int = 2) -> Tuple[Optional[int], Optional[bytes], Optional[bytearray]]:
+        """
+        发送一个请求并等待响应及其二进制附加帧
+
+        @param {int} packet_type - 数据包类型
+        @param {bytes|str} data - 请求数据
+        @param {int} retry_count - 接收超时时的重试次数
+        @return {tuple} - (数据类型, 数据内容, 二进制数据)
+        """
+        return self._wait(self.submit(packet_type, data, True, retry_count), retry_count)
+
+    def request_many(self, requests: List[Tuple[int, Union[bytes, str]]],
+                     retry_count: int = 2) -> List[Tuple[Optional[int], Optional[bytes]]]:
+        """
+        一次性发出所有请求后再统一等待响应
+
+        @param {list} requests - (数据包类型, 请求数据)列表
+        @param {int} retry_count - 接收超时时的重试次数
+        @return {list} - 与请求一一对应的(数据类型, 数据内容)列表
+        """
+        futures = [self.submit(packet_type, data, retry_count=retry_count) for packet_type, data in requests]
+        return [self._wait(future, retry_count)[:2] for future in futures]
+
+    def request_many_binary(self, requests: List[Tuple[int, Union[bytes, str]]],
+                            retry_count: int = 2) -> List[Tuple[Optional[int], Optional[bytes], Optional[bytearray]]]:
+        """
+        request_many的二进制版本，所有请求同时在途
+
+        @param {list} requests - (数据包类型, 请求数据)列表
+        @param {int} retry_count - 接收超时时的重试次数
+        @return {list} - 与请求一一对应的(数据类型, 数据内容, 二进制数据)列表
+        """
+        futures = [self.submit(packet_type, data, True, retry_count) for packet_type, data in requests]
+        return [self._wait(future, retry_count) for future in futures]
+
+    def is_alive(self) -> bool:
+        """
+        检查连接是否可用；流水线模式下接收方向由读取线程独占，只检查线程状态
+
+        @return {bool} - 连接是否健康
+        """
+        if not self.pipelined:
+            with self._send_lock:
+                return super().is_alive()
+        return self.connected and self._reader is not None and self._reader.is_alive()
+
+    def check_server(self, timeout: int = 2) -> bool:
+        """
+        检查服务器状态
+
+        @param {int} timeout - 检测超时时间(秒)
+        @return {bool} - 服务器是否正常响应
+        """
+        if not self.ensure_connected():
+            return False
+        if not self.pipelined:
+            with self._send_lock:
+                return super().check_server(timeout)
+
+        future = self.submit(self.PACKET_TYPE["TEXT"], "PING")
+        try:
+            future.result(timeout=timeout)
+            self.logger.info("CheatEngine服务器状态正常")
+            return True
+        except (FutureTimeoutError, ConnectionError):
+            self._abandon(future)
+            self.logger.warning("CheatEngine服务器无响应")
+            return False
+
+
+def create_ce_client(host: Optional[str] = None, 
+                     port: Optional[int] = None, 
+                     timeout: Optional[int] = None, 
+                     auto_connect: bool = True,
+                     pipelined: bool = False) -> CESocketClient:
+    """
+    创建CheatEngine客户端实例
+    
+    参数:
+    - host: 服务器主机名或IP地址，默认使用全局配置
+    - port: 服务器端口，默认使用全局配置
+    - timeout: 连接超时时间，默认使用全局配置
+    - auto_connect: 是否自动连接，默认为True
+    - pipelined: 是否创建流水线模式客户端，默认为False
+    
+    返回:
+    - 创建的CESocketClient实例
+    """
+    # 使用参数或默认配置
+    actual_host = host or cheatEngine_config["host"]
+    actual_port = port or cheatEngine_config["port"]
+    actual_timeout = timeout or cheatEngine_config["timeout"]
+    
+    # 创建客户端实例
+    client_class = CEPipelinedClient if pipelined else CESocketClient
+    client = client_class(
+        host=actual_host,
+        port=actual_port,
+        timeout=actual_timeout,
+        auto_connect=auto_connect,
+        max_retries=cheatEngine_config["retries"],
+        long_frames=cheatEngine_config["long_frames"]
+    )
+    
+    # 如果设置了自动连接，则尝试连接
+    if auto_connect:
+        client.connect()
+    
+    return client
+
+
+class CEConnectionPool:
+    """
+    CheatEngine连接池
+    进程级共享的CESocketClient池，负责连接复用、健康检查、空闲回收和断线重连。
+    流水线模式下所有调用方共享同一个CEPipelinedClient，请求在同一连接上并发在途
+    """
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 timeout: Optional[int] = None, max_size: Optional[int] = None,
+                 idle_timeout: Optional[float] = None, pipelined: Optional[bool] = None):
+        """
+        初始化连接池
+
+        @param {str} host - 服务器地址，默认使用全局配置
+        @param {int} port - 服务器端口，默认使用全局配置
+        @param {int} timeout - 超时时间(秒)，默认使用全局配置
+        @param {int} max_size - 最大连接数(空闲+使用中)
+        @param {float} idle_timeout - 空闲连接被回收前的最长时间(秒)
+        @param {bool} pipelined - 是否使用共享的流水线连接，默认使用全局配置
+        """
+        self.host = host or cheatEngine_config["host"]
+        self.port = port or cheatEngine_config["port"]
+        self.timeout = timeout or cheatEngine_config["timeout"]
+        self.max_size = max(1, max_size or cheatEngine_config["pool_size"])
+        self.idle_timeout = idle_timeout or cheatEngine_config["pool_idle_timeout"]
+        self.pipelined = cheatEngine_config["pipeline"] if pipelined is None else pipelined
+        self.logger = logger
+
+        self._cond = threading.Condition(threading.Lock())
+        # 空闲连接栈: (客户端, 最后使用时间)，后进先出以保持热连接
+        self._idle: List[Tuple[CESocketClient, float]] = []
+        self._in_use = 0
+        self._closed = False
+        # 流水线模式下共享的唯一连接
+        self._shared: Optional[CEPipelinedClient] = None
+
+    def _new_client(self) -> CESocketClient:
+        """
+        创建一个新的客户端并尝试连接
+
+        @return {CESocketClient} - 新客户端(连接失败时connected为False)
+        """
+        client_class = CEPipelinedClient if self.pipelined else CESocketClient
+        client = client_class(
+            host=self.host,
+            port=self.port,
+            timeout=self.timeout,
+            auto_connect=True,
+            max_retries=cheatEngine_config["retries"],
+            long_frames=cheatEngine_config["long_frames"]
+        )
+        client.connect()
+        return client
+
+    def _acquire_shared(self) -> CESocketClient:
+        """
+        获取流水线模式下共享的连接，连接失效时透明重建
+
+        @return {CESocketClient} - 共享的流水线客户端
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("连接池已关闭")
+            shared = self._shared
+            self._in_use += 1
+
+        # 健康检查和重连都可能阻塞，在锁外进行，只在发布新连接时持锁
+        if shared is not None and shared.is_alive():
+            return shared
+        if shared is not None:
+            self.logger.info("共享的流水线连接已失效，重新建立")
+        try:
+            client = self._new_client()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+            raise
+
+        with self._cond:
+            if self._closed:
+                self._in_use -= 1
+                stale, client = client, None
+            elif self._shared is shared:
+                stale, self._shared = shared, client
+            else:
+                # 其他调用方已经发布了新的共享连接，丢弃自己建立的这一个
+                stale, client = client, self._shared
+        if stale is not None:
+            stale.disconnect()
+        if client is None:
+            raise RuntimeError("连接池已关闭")
+        return client
+
+    def _evict_idle(self) -> None:
+        """
+        回收超过空闲时间的连接，调用方需持有锁
+        """
+        deadline = time.monotonic() - self.idle_timeout
+        expired = [c for c, last_used in self._idle if last_used < deadline]
+        if expired:
+            self._idle = [(c, t) for c, t in self._idle if t >= deadline]
+            for client in expired:
+                client.disconnect()
+            self.logger.info("连接池回收了%s个空闲连接", len(expired))
+
+    def acquire(self, timeout: Optional[float] = None) -> CESocketClient:
+        """
+        从连接池获取一个客户端
+
+        优先复用健康的空闲连接；没有可用连接且未达上限时新建连接；
+        达到上限时等待其他调用方归还
+
+        @param {float} timeout - 等待可用连接的最长时间(秒)，默认使用客户端超时
+        @return {CESocketClient} - 客户端实例(无法连接时connected为False)
+        """
+        if self.pipelined:
+            return self._acquire_shared()
+
+        wait_timeout = self.timeout if timeout is None else timeout
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("连接池已关闭")
+            self._evict_idle()
+
+            if not self._idle and self._in_use >= self.max_size:
+                if not self._cond.wait_for(
+                        lambda: self._idle or self._in_use < self.max_size or self._closed,
+                        timeout=wait_timeout):
+                    raise TimeoutError(f"等待CheatEngine连接超时({wait_timeout}秒)")
+                if self._closed:
+                    raise RuntimeError("连接池已关闭")
+
+            while self._idle:
+                client, _ = self._idle.pop()
+                if client.is_alive():
+                    self._in_use += 1
+                    return client
+                self.logger.info("连接池中的连接已失效，丢弃")
+                client.disconnect()
+
+            self._in_use += 1
+
+        # 在锁外建立连接，避免阻塞其他调用方
+        try:
+            return self._new_client()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, client: CESocketClient, discard: bool = False) -> None:
+        """
+        将客户端归还连接池
+
+        @param {CESocketClient} client - 要归还的客户端
+        @param {bool} discard - 是否直接关闭而不放回池中
+        """
+        with self._cond:
+            self._in_use -= 1
+            if client is self._shared:
+                # 请求按ID匹配，单个请求出错不会破坏共享连接的收发状态
+                if self._closed:
+                    client.disconnect()
+                return
+            if discard or self._closed or not client.connected:
+                client.disconnect()
+            else:
+                self._idle.append((client, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def client(self, timeout: Optional[float] = None):
+        """
+        以上下文管理器的方式借用客户端，退出时自动归还
+
+        发生异常时连接的收发状态不可信，会被直接丢弃
+
+        @param {float} timeout - 等待可用连接的最长时间(秒)
+        """
+        client = self.acquire(timeout)
+        try:
+            yield client
+        except BaseException:
+            self.release(client, discard=True)
+            raise
+        else:
+            self.release(client)
+
+    def close(self) -> None:
+        """
+        关闭连接池及其中所有空闲连接，使用中的连接在归还时关闭
+        """
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            shared, self._shared = self._shared, None
+            self._cond.notify_all()
+        for client, _ in idle:
+            client.disconnect()
+        if shared is not None:
+            shared.disconnect()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取连接池状态
+
+        @return {dict} - 连接池状态信息
+        """
+        with self._cond:
+            return {
+                "host": self.host,
+                "port": self.port,
+                "maxSize": self.max_size,
+                "pipelined": self.pipelined,
+                "idle": len(self._idle),
+                "inUse": self._in_use
+            }
+
+
+# 进程级共享连接池，首次使用时按全局配置创建
+_ce_pool: Optional[CEConnectionPool] = None
+_ce_pool_lock = threading.Lock()
+
+
+def get_ce_pool() -> CEConnectionPool:
+    """
+    获取进程级共享的CheatEngine连接池
+
+    返回:
+    - CEConnectionPool实例
+    """
+    global _ce_pool
+    with _ce_pool_lock:
+        if _ce_pool is None:
+            _ce_pool = CEConnectionPool()
+        return _ce_pool
+
+
+def reset_ce_pool() -> None:
+    """
+    关闭并丢弃当前连接池，下次使用时按最新配置重建
+    """
+    global _ce_pool, _async_ce_client
+    with _ce_pool_lock:
+        pool, _ce_pool = _ce_pool, None
+    if pool is not None:
+        pool.close()
+
+    # asyncio客户端只能在其事件循环中关闭
+    client, _async_ce_client = _async_ce_client, None
+    if client is not None and client._loop is not None and not client._loop.is_closed():
+        client._loop.call_soon_threadsafe(client._close_transport)
+
+
+def ce_client(timeout: Optional[float] = None):
+    """
+    从共享连接池借用一个CheatEngine客户端
+
+    用法:
+        with ce_client() as client:
+            data_type, content = client.request(...)
+
+    参数:
+    - timeout: 等待可用连接的最长时间(秒)
+
+    返回:
+    - 上下文管理器，进入时得到CESocketClient实例
+    """
+    return get_ce_pool().client(timeout)
+
+
+class AsyncCESocketClient:
+    """
+    基于asyncio流的CheatEngine Socket客户端
+    与CESocketClient使用相同的数据包类型和帧格式。等待响应时不占用线程；
+    协商流水线模式成功后同一连接上可以有多个请求并发在途，否则以协程锁逐个收发
+    """
+
+    PACKET_TYPE = CESocketClient.PACKET_TYPE
+    FRAME_FLAG_TAGGED = CESocketClient.FRAME_FLAG_TAGGED
+    FRAME_FLAG_LONG = CESocketClient.FRAME_FLAG_LONG
+    FRAME_TYPE_MASK = CESocketClient.FRAME_TYPE_MASK
+    MAX_FRAME_SIZE = CESocketClient.MAX_FRAME_SIZE
+    MAX_LONG_FRAME_SIZE = CESocketClient.MAX_LONG_FRAME_SIZE
+    NEGOTIATE_TIMEOUT = CESocketClient.NEGOTIATE_TIMEOUT
+
+    # 帧的打包和解包与同步客户端完全一致
+    _pack_data = CESocketClient._pack_data
+    _unpack_data = CESocketClient._unpack_data
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8082, timeout: int = 10,
+                 pipelined: bool = False, long_frames: bool = False, max_in_flight: int = 64):
+        """
+        初始化客户端
+
+        @param {str} host - 服务器地址
+        @param {int} port - 服务器端口
+        @param {int} timeout - 超时时间(秒)
+        @param {bool} pipelined - 是否尝试协商流水线模式
+        @param {bool} long_frames - 是否尝试协商长帧(4字节长度)
+        @param {int} max_in_flight - 流水线模式下同时在途的最大请求数
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.want_pipelined = pipelined
+        self.want_long_frames = long_frames
+        self.pipelined = False
+        self.long_frames = False
+        self.max_frame_size = self.MAX_FRAME_SIZE
+        self.connected = False
+        self.logger = logger
+        self._was_connected = False
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._binary_ids: Set[int] = set()
+        self._payloads: Dict[int, bytes] = {}
+        self._next_id = itertools.count(1)
+        self._max_in_flight = max_in_flight
+        # 协程锁和信号量在首次连接时创建，绑定到当前事件循环
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._io_lock: Optional[asyncio.Lock] = None
+        self._in_flight: Optional[asyncio.Semaphore] = None
+
+    def _bind_loop(self) -> None:
+        """
+        将客户端绑定到当前运行的事件循环
+        """
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._connect_lock = asyncio.Lock()
+            self._io_lock = asyncio.Lock()
+            self._in_flight = asyncio.Semaphore(self._max_in_flight)
+
+    async def connect(self) -> bool:
+        """
+        连接到服务器，按需协商流水线模式和长帧
+
+        @return {bool} - 是否连接成功
+        """
+        self._bind_loop()
+        if not await self._open_stream():
+            return False
+
+        options = {}
+        if self.want_pipelined:
+            options["tagged"] = True
+        if self.want_long_frames:
+            options["longFrames"] = True
+        accepted = await self._negotiate(options) if options else {}
+        if not self.connected:
+            # 协商失败后重新建立连接也失败了
+            return False
+
+        self.pipelined = bool(accepted.get("tagged"))
+        self.long_frames = bool(accepted.get("longFrames"))
+        self.max_frame_size = self.MAX_LONG_FRAME_SIZE if self.long_frames else self.MAX_FRAME_SIZE
+        if self.pipelined:
+            self._reader_task = asyncio.ensure_future(self._reader_loop(self._reader))
+            self.logger.info("已启用CheatEngine流水线模式 (asyncio)")
+        return self.connected
+
+    async def _open_stream(self) -> bool:
+        """
+        建立TCP连接
+
+        @return {bool} - 是否连接成功
+        """
+        try:
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), timeout=self.timeout
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            self.logger.error("连接CheatEngine服务器失败: %s", e)
+            _ce_metrics.record_connect(False)
+            self.connected = False
+            return False
+
+        self.connected = True
+        _ce_metrics.record_connect(True, self._was_connected)
+        self._was_connected = True
+        self.logger.info("已连接到CheatEngine服务器 %s:%s (asyncio)", self.host, self.port)
+        return True
+
+    async def ensure_connected(self) -> bool:
+        """
+        确保已连接到服务器，如果未连接则尝试连接
+
+        @return {bool} - 是否已连接
+        """
+        self._bind_loop()
+        async with self._connect_lock:
+            if not self.connected:
+                self.logger.info("自动连接到CheatEngine服务器 %s:%s (asyncio)", self.host, self.port)
+                return await self.connect()
+            return True
+
+    def _close_transport(self) -> None:
+        """
+        关闭底层连接并以连接错误结束所有在途请求
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._reader = None
+            self.logger.info("已断开与CheatEngine服务器的连接 (asyncio)")
+        self.connected = False
+        self.pipelined = False
+        if self._reader_task is not None and self._reader_task is not asyncio.current_task():
+            self._reader_task.cancel()
+        self._reader_task = None
+
+        pending, self._pending = self._pending, {}
+        self._binary_ids.clear()
+        self._payloads.clear()
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("与CheatEngine服务器的连接已断开"))
+
+    async def disconnect(self) -> None:
+        """
+        断开连接
+        """
+        writer = self._writer
+        self._close_transport()
+        if writer is not None:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def _read_frame(self, reader: asyncio.StreamReader) -> Tuple[int, Optional[int], bytes]:
+        """
+        读取一个完整的数据帧
+
+        @param {StreamReader} reader - 流读取器
+        @return {tuple} - (数据类型, 请求ID, 数据内容)
+        """
+        header = await reader.readexactly(4)
+        data_type, length = struct.unpack(">HH", header)
+        if data_type & self.FRAME_FLAG_LONG:
+            # 长帧的长度字段为4字节，已读取的2字节是其高位
+            length = (length << 16) | struct.unpack(">H", await reader.readexactly(2))[0]
+            if length > self.MAX_LONG_FRAME_SIZE:
+                raise ConnectionError(f"帧长度{length}超过上限，连接状态异常")
+        request_id = None
+        if data_type & self.FRAME_FLAG_TAGGED:
+            request_id = struct.unpack(">I", await reader.readexactly(4))[0]
+        content = await reader.readexactly(length) if length else b''
+        header_size = 4 + (2 if data_type & self.FRAME_FLAG_LONG else 0) + (4 if request_id is not None else 0)
+        _ce_metrics.record_received(header_size + length)
+        return data_type & self.FRAME_TYPE_MASK, request_id, content
+
+    async def _negotiate(self, options: Dict[str, bool]) -> Dict[str, Any]:
+        """
+        通过COMMAND数据包协商扩展帧格式
+
+        @param {dict} options - 请求启用的扩展
+        @return {dict} - 服务器的响应，不支持时为空字典
+        """
+        command = json.dumps({"command": "setFraming", "options": options})
+        # 老版本插件不回复未知命令，不按普通请求的超时等待
+        response_type, content, _ = await self._request_serial(
+            self.PACKET_TYPE["COMMAND"], command, 0, timeout=min(self.timeout, self.NEGOTIATE_TIMEOUT)
+        )
+        if response_type is None:
+            # 连接状态不可信，重新建立；失败时connected为False
+            await self.disconnect()
+            if await self._open_stream():
+                self.logger.info("服务器未回复帧格式协商，按不支持扩展处理 (asyncio)")
+            return {}
+        if response_type == self.PACKET_TYPE["ERROR"]:
+            return {}
+        try:
+            response = json.loads(content.decode('utf-8'))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return {}
+        return response if response.get("success") else {}
+
+    async def _reader_loop(self, reader: asyncio.StreamReader) -> None:
+        """
+        流水线模式的读取任务，按请求ID分发响应
+
+        @param {StreamReader} reader - 本任务负责读取的流
+        """
+        try:
+            while True:
+                data_type, request_id, content = await self._read_frame(reader)
+                if (data_type == self.PACKET_TYPE["BYTECODE"] and request_id in self._binary_ids
+                        and request_id not in self._payloads):
+                    # 二进制附加帧，等待随后的JSON响应帧
+                    self._payloads[request_id] = content
+                    continue
+                future = self._pending.pop(request_id, None)
+                self._binary_ids.discard(request_id)
+                payload = self._payloads.pop(request_id, None)
+                if future is None or future.done():
+                    self.logger.warning("丢弃无人等待的响应: 请求ID=%s, 类型=%s", request_id, data_type)
+                    continue
+                future.set_result((data_type, content, payload))
+        except asyncio.CancelledError:
+            return
+        except (asyncio.IncompleteReadError, OSError) as e:
+            self.logger.warning("流水线读取任务退出: %r", e)
+
+        if self._reader is reader:
+            self.logger.warning("服务器关闭了流水线连接")
+            self._close_transport()
+
+    async def _request_serial(self, packet_type: int, data: Union[bytes, str], retry_count: int,
+                              binary: bool = False,
+                              timeout: Optional[float] = None) -> Tuple[Optional[int], Optional[bytes], Optional[bytes]]:
+        """
+        逐个收发模式下发送请求并等待响应
+
+        @param {int} packet_type - 数据包类型
+        @param {bytes|str} data - 请求数据
+        @param {int} retry_count - 超时重试次数，总等待时间为timeout*(retry_count+1)
+        @param {bool} binary - 是否接收响应前附带的BYTECODE帧
+        @param {float} timeout - 等待每帧响应的时间(秒)，指定时忽略retry_count
+        @return {tuple} - (数据类型, 数据内容, 二进制数据)
+        """
+        async with self._io_lock:
+            if self._writer is None:
+                return None, None, None
+            try:
+                packet = self._pack_data(data, packet_type)
+                self._writer.write(packet)
+                await self._writer.drain()
+                _ce_metrics.record_sent(packet_type, len(packet))
+                if timeout is None:
+                    timeout = self.timeout * (retry_count + 1)
+                data_type, _, content = await asyncio.wait_for(self._read_frame(self._reader), timeout)
+                payload = None
+                if binary and data_type == self.PACKET_TYPE["BYTECODE"]:
+                    payload = content
+                    data_type, _, content = await asyncio.wait_for(self._read_frame(self._reader), timeout)
+                return data_type, content, payload
+            except asyncio.TimeoutError:
+                _ce_metrics.record_timeout()
+                self.logger.warning("接收超时，已达到最大重试次数")
+            except (asyncio.IncompleteReadError, OSError) as e:
+                self.logger.error("收发失败: %r", e)
+        # 超时或出错后流的状态不可信，断开以免下一个请求读到迟到的响应
+        self._close_transport()
+        return None, None, None
+
+    async def _request_tagged(self, packet_type: int, data: Union[bytes, str], retry_count: int,
+                              binary: bool = False) -> Tuple[Optional[int], Optional[bytes], Optional[bytes]]:
+        """
+        流水线模式下发送请求并等待对应请求ID的响应
+
+        @param {int} packet_type - 数据包类型
+        @param {bytes|str} data - 请求数据
+        @param {int} retry_count - 超时重试次数，总等待时间为timeout*(retry_count+1)
+        @param {bool} binary - 是否接收响应前附带的BYTECODE帧
+        @return {tuple} - (数据类型, 数据内容, 二进制数据)
+        """
+        async with self._in_flight:
+            if self._writer is None:
+                return None, None, None
+            request_id = next(self._next_id) & 0xFFFFFFFF
+            future = self._loop.create_future()
+            self._pending[request_id] = future
+            if binary:
+                self._binary_ids.add(request_id)
+            try:
+                packet = self._pack_data(data, packet_type, request_id)
+                self._writer.write(packet)
+                await self._writer.drain()
+                _ce_metrics.record_sent(packet_type, len(packet))
+                return await asyncio.wait_for(future, timeout=self.timeout * (retry_count + 1))
+            except asyncio.TimeoutError:
+                _ce_metrics.record_timeout()
+                self.logger.warning("等待流水线响应超时")
+            except (ConnectionError, OSError) as e:
+                self.logger.error("流水线请求失败: %r", e)
+            finally:
+                self._pending.pop(request_id, None)
+                self._binary_ids.discard(request_id)
+                self._payloads.pop(request_id, None)
+            return None, None, None
+
+    async def _exchange(self, packet_type: int, data: Union[bytes, str], retry_count: int,
+                        binary: bool) -> Tuple[Optional[int], Optional[bytes], Optional[bytes]]:
+        """
+        完成一次请求/响应交换
+
+        @param {int} packet_type - 数据包类型
+        @param {bytes|str} data - 请求数据
+        @param {int} retry_count - 接收超时时的重试次数
+        @param {bool} binary - 是否接收响应前附带的BYTECODE帧
+        @return {tuple} - (数据类型, 数据内容, 二进制数据)
+        """
+        if not await self.ensure_connected():
+            return None, None, None
+        started = time.perf_counter()
+        if self.pipelined:
+            response = await self._request_tagged(packet_type, data, retry_count, binary)
+        else:
+            response = await self._request_serial(packet_type, data, retry_count, binary)
+        response_type, content, payload = response
+        _ce_metrics.record_request(packet_type, time.perf_counter() - started,
+                                   response_type not in (None, self.PACKET_TYPE["ERROR"]),
+                                   len(content or b"") + len(payload or b""))
+        return response
+
+    async def request(self, packet_type: int, data: Union[bytes, str],
+                      retry_count: int = 2) -> Tuple[Optional[int], Optional[bytes]]:
+        """
+        发送一个请求并等待响应
+
+        @param {int} packet_type - 数据包类型
+        @param {bytes|str} data - 请求数据
+        @param {int} retry_count - 接收超时时的重试次数
+        @return {tuple} - (数据类型, 数据内容)
+        """
+        response_type, content, _ = await self._exchange(packet_type, data, retry_count, False)
+        return response_type, content
+
+    async def request_binary(self, packet_type: int, data: Union[bytes, str],
+                             retry_count: int = 2) -> Tuple[Optional[int], Optional[bytes], Optional[bytes]]:
+        """
+        发送一个请求并等待响应及其二进制附加帧，见CESocketClient.request_binary
+
+        @param {int} packet_type - 数据包类型
+        @param {bytes|str} data - 请求数据
+        @param {int} retry_count - 接收超时时的重试次数
+        @return {tuple} - (数据类型, 数据内容, 二进制数据)
+        """
+        return await self._exchange(packet_type, data, retry_count, True)
+
+    async def request_many(self, requests: List[Tuple[int, Union[bytes, str]]],
+                           retry_count: int = 2) -> List[Tuple[Optional[int], Optional[bytes]]]:
+        """
+        并发发送多个请求并按请求顺序返回响应
+
+        @param {list} requests - (数据包类型, 请求数据)列表
+        @param {int} retry_count - 接收超时时的重试次数
+        @return {list} - 与请求一一对应的(数据类型, 数据内容)列表
+        """
+        return list(await asyncio.gather(
+            *(self.request(packet_type, data, retry_count) for packet_type, data in requests)
+        ))
+
+    async def request_many_binary(self, requests: List[Tuple[int, Union[bytes, str]]],
+                                  retry_count: int = 2) -> List[Tuple[Optional[int], Optional[bytes], Optional[bytes]]]:
+        """
+        request_many的二进制版本
+
+        @param {list} requests - (数据包类型, 请求数据)列表
+        @param {int} retry_count - 接收超时时的重试次数
+        @return {list} - 与请求一一对应的(数据类型, 数据内容, 二进制数据)列表
+        """
+        return list(await asyncio.gather(
+            *(self.request_binary(packet_type, data, retry_count) for packet_type, data in requests)
+        ))
+
+    async def check_server(self, timeout: int = 2) -> bool:
+        """
+        检查服务器状态
+
+        @param {int} timeout - 检测超时时间(秒)
+        @return {bool} - 服务器是否正常响应
+        """
+        self.logger.info("正在检测CheatEngine服务器状态...")
+        try:
+            data_type, _ = await asyncio.wait_for(
+                self.request(self.PACKET_TYPE["TEXT"], "PING", retry_count=0), timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            data_type = None
+        if data_type is not None:
+            self.logger.info("CheatEngine服务器状态正常")
+            return True
+        self.logger.warning("CheatEngine服务器无响应")
+        return False
+
+
+# 进程级共享的asyncio客户端，绑定到首次使用它的事件循环
+_async_ce_client: Optional[AsyncCESocketClient] = None
+
+
+async def get_async_ce_client() -> AsyncCESocketClient:
+    """
+    获取进程级共享的asyncio CheatEngine客户端，未连接时自动连接
+
+    是否协商流水线模式由全局配置pipeline决定；未启用时并发请求在同一连接上排队
+
+    返回:
+    - AsyncCESocketClient实例(无法连接时connected为False)
+    """
+    global _async_ce_client
+    loop = asyncio.get_running_loop()
+    client = _async_ce_client
+    if client is None or (client._loop is not None and client._loop is not loop):
+        client = AsyncCESocketClient(
+            host=cheatEngine_config["host"],
+            port=cheatEngine_config["port"],
+            timeout=cheatEngine_config["timeout"],
+            pipelined=cheatEngine_config["pipeline"],
+            long_frames=cheatEngine_config["long_frames"]
+        )
+        _async_ce_client = client
+    await client.ensure_connected()
+    return client
+
+
+def attach_binary_payload(response: Dict[str, Any], payload: Union[bytes, bytearray]) -> Dict[str, Any]:
+    """
+    将二进制附加帧中的数据挂回JSON响应中的对应字段
+
+    响应中的binary字段描述了附加帧的布局，每项为
+    {"path": ["results", 0, "bytes"], "offset": 0, "length": 16}，
+    对应字段被替换为附加帧上的memoryview切片，不产生额外复制
+
+    参数:
+    - response: 已解析的JSON响应
+    - payload: BYTECODE帧的数据
+
+    返回:
+    - 处理后的响应(原地修改)
+    """
+    view = memoryview(payload)
+    for entry in response.pop("binary", None) or []:
+        path = entry["path"]
+        offset = entry.get("offset", 0)
+        target = response
+        for key in path[:-1]:
+            target = target[key]
+        target[path[-1]] = view[offset:offset + entry["length"]]
+    return response
+
+
+def decode_json_response(content: Union[bytes, bytearray],
+                         payload: Optional[Union[bytes, bytearray]] = None) -> Dict[str, Any]:
+    """
+    解析CE返回的JSON响应，兼容包含控制字符的内容，并挂载二进制附加帧
+
+    参数:
+    - content: JSON响应帧的数据
+    - payload: 响应前附带的BYTECODE帧数据(没有时为None)
+
+    返回:
+    - 解析后的响应字典
+    """
+    started = time.perf_counter()
+    try:
+        response = json.loads(content.decode('utf-8'))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        response = json.loads(content.decode('utf-8', errors='replace'), strict=False)
+    _ce_metrics.record_json_decode(time.perf_counter() - started, len(content))
+    if payload is not None and isinstance(response, dict) and response.get("binary"):
+        attach_binary_payload(response, payload)
+    return response
+
+
+# 定长数据类型的struct格式，与docs/Api_zh.md中的数据类型参考一致
+DATA_TYPE_FORMATS = {
+    "int8": "b", "byte": "b",
+    "uint8": "B", "ubyte": "B",
+    "int16": "h", "short": "h",
+    "uint16": "H", "ushort": "H",
+    "int32": "i", "long": "i",
+    "uint32": "I", "ulong": "I",
+    "int64": "q",
+    "uint64": "Q",
+    "float": "f",
+    "double": "d",
+}
+
+# 变长类型未指定大小时的默认读取长度(字节)
+STRING_READ_SIZE = 64
+BYTES_READ_SIZE = 16
+
+# 依赖编码的类型：CE按目标进程的ANSI代码页解码字符串，本地无法可靠还原，
+# 经过CE的读取总是交给CE解码，不从原始字节在本地解码
+CE_DECODED_TYPES = ("string", "wstring")
+
+
+def data_type_size(data_type: str, size: Optional[int] = None) -> int:
+    """
+    获取数据类型在内存中占用的字节数
+
+    参数:
+    - data_type: 数据类型名称
+    - size: 变长类型(string/wstring/bytes)的读取长度，定长类型忽略
+
+    返回:
+    - 字节数
+    """
+    data_type = data_type.lower()
+    if data_type in DATA_TYPE_FORMATS:
+        return struct.calcsize(DATA_TYPE_FORMATS[data_type])
+    if data_type == "pointer":
+        return cheatEngine_config["pointer_size"]
+    if data_type in ("string", "wstring"):
+        return size or STRING_READ_SIZE
+    if data_type in ("bytes", "aob"):
+        return size or BYTES_READ_SIZE
+    raise ValueError(f"不支持的数据类型: {data_type}")
+
+
+def decode_value(data: bytes, data_type: str, endian: str = "little", encoding: str = "utf-8") -> Any:
+    """
+    在本地将原始字节解码为指定类型的值
+
+    参数:
+    - data: 原始字节，长度不小于该类型的大小
+    - data_type: 数据类型名称
+    - endian: 字节序，little或big
+    - encoding: string类型的字符编码，CE目标为ANSI代码页(见MemoryBackend.string_encoding)
+
+    返回:
+    - 解码后的值(bytes类型返回整数列表，与CE响应格式一致)
+    """
+    data_type = data_type.lower()
+    prefix = ">" if endian == "big" else "<"
+    if data_type in DATA_TYPE_FORMATS:
+        return struct.unpack_from(prefix + DATA_TYPE_FORMATS[data_type], data)[0]
+    if data_type == "pointer":
+        fmt = "Q" if cheatEngine_config["pointer_size"] == 8 else "I"
+        return struct.unpack_from(prefix + fmt, data)[0]
+    if data_type == "string":
+        return bytes(data).split(b"\0", 1)[0].decode(encoding, errors="replace")
+    if data_type == "wstring":
+        raw = bytes(data)
+        for i in range(0, len(raw) - 1, 2):
+            if raw[i] == 0 and raw[i + 1] == 0:
+                raw = raw[:i]
+                break
+        return raw[:len(raw) & ~1].decode("utf-16-be" if endian == "big" else "utf-16-le", errors="replace")
+    if data_type in ("bytes", "aob"):
+        return list(data)
+    raise ValueError(f"不支持的数据类型: {data_type}")
+
+
+def encode_value(value: Any, data_type: str, endian: str = "little", encoding: str = "utf-8") -> bytes:
+    """
+    将值编码为写入内存的原始字节，是decode_value的逆操作
+
+    参数:
+    - value: 要写入的值；整数类型也接受"0x10"形式的字符串，
+             bytes类型为整数列表或"90 90 C3"形式的十六进制字节串
+    - data_type: 数据类型名称
+    - endian: 字节序，little或big
+    - encoding: string类型的字符编码
+
+    返回:
+    - 编码后的字节；字符串不附加结尾的\\0
+
+    异常:
+    - ValueError: 数据类型不支持或值无法按该类型编码
+    """
+    data_type = data_type.lower()
+    prefix = ">" if endian == "big" else "<"
+    if data_type == "pointer":
+        data_type = "uint64" if cheatEngine_config["pointer_size"] == 8 else "uint32"
+    if data_type in DATA_TYPE_FORMATS:
+        fmt = DATA_TYPE_FORMATS[data_type]
+        try:
+            if fmt in "fd":
+                return struct.pack(prefix + fmt, float(value))
+            if isinstance(value, str):
+                value = int(value, 0)
+            elif isinstance(value, float):
+                if not value.is_integer():
+                    raise ValueError(f"{data_type}类型的值必须是整数: {value}")
+                value = int(value)
+            return struct.pack(prefix + fmt, value)
+        except (struct.error, TypeError) as e:
+            raise ValueError(f"无法将{value!r}编码为{data_type}: {e}")
+    if data_type == "string":
+        try:
+            return str(value).encode(encoding)
+        except UnicodeEncodeError as e:
+            raise ValueError(f"无法用{encoding}编码字符串: {e}")
+    if data_type == "wstring":
+        return str(value).encode("utf-16-be" if endian == "big" else "utf-16-le")
+    if data_type in ("bytes", "aob"):
+        if isinstance(value, str):
+            try:
+                return bytes.fromhex(value)
+            except ValueError:
+                raise ValueError(f"无效的十六进制字节串: {value}")
+        try:
+            return bytes(value)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"无效的字节列表: {e}")
+    raise ValueError(f"不支持的数据类型: {data_type}")
+
+
+# multiType包含的类型，顺序与CE响应一致；wstring为本地解码时额外提供
+MULTI_TYPE_TYPES = ("int8", "uint8", "int16", "uint16", "int32", "uint32", "int64", "uint64",
+                    "float", "double", "string", "wstring")
+# 计算multiType需要的字节数(字符串类型决定)
+MULTI_TYPE_READ_SIZE = STRING_READ_SIZE
+
+
+def decode_multi_type(data: bytes, endian: str = "little", encoding: str = "utf-8") -> Dict[str, Any]:
+    """
+    将同一段字节解释为多种类型，结果与CE响应中的multiType字段格式一致
+
+    参数:
+    - data: 从目标地址开始的原始字节，通常为MULTI_TYPE_READ_SIZE字节
+    - endian: 字节序，little或big
+    - encoding: string类型的字符编码
+
+    返回:
+    - 类型名到值的字典，字节数不足的定长类型不包含在内
+    """
+    result = {}
+    for data_type in MULTI_TYPE_TYPES:
+        if data_type in DATA_TYPE_FORMATS and len(data) < struct.calcsize(DATA_TYPE_FORMATS[data_type]):
+            continue
+        value = decode_value(data, data_type, endian, encoding)
+        # NaN和无穷大不能序列化为标准JSON，以字符串表示
+        if isinstance(value, float) and (value != value or value in (float("inf"), float("-inf"))):
+            value = str(value)
+        result[data_type] = value
+    return result
+
+
+# 批量读取参数: 合并间隔不超过BATCH_MERGE_GAP字节的相邻范围，
+# 每个MEMORY_BATCH地址读取的长度取自BATCH_SIZE_CLASSES，最大不超过一页
+BATCH_PAGE_SIZE = 4096
+BATCH_MERGE_GAP = 64
+BATCH_SIZE_CLASSES = (16, 64, 256, 1024, 4096)
+# JSON整数数组中每个字节平均占用的字符数，以及每条结果的固定开销，用于估算响应大小
+BATCH_JSON_BYTES_PER_BYTE = 5
+BATCH_JSON_RESULT_OVERHEAD = 128
+
+
+def coalesce_ranges(ranges: List[Tuple[int, int]], gap: int = BATCH_MERGE_GAP) -> List[Tuple[int, int]]:
+    """
+    合并重叠或相邻的内存范围
+
+    参数:
+    - ranges: (起始地址, 长度)列表，顺序任意
+    - gap: 两个范围之间不超过该字节数的空隙也会被合并
+
+    返回:
+    - 按地址排序、互不重叠的(起始地址, 长度)列表
+    """
+    merged: List[List[int]] = []
+    for start, size in sorted(r for r in ranges if r[1] > 0):
+        end = start + size
+        if merged and start <= merged[-1][1] + gap:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end - start) for start, end in merged]
+
+
+def _split_range_chunks(start: int, size: int) -> List[Tuple[int, int]]:
+    """
+    将一个范围拆成若干个长度取自BATCH_SIZE_CLASSES的读取块
+
+    读取块向上取整到尺寸等级，但始终落在原范围已经覆盖的内存页内，
+    因此取整不会因为读到相邻的未映射页而导致整块读取失败
+
+    参数:
+    - start: 起始地址
+    - size: 长度
+
+    返回:
+    - (块起始地址, 块长度)列表
+    """
+    chunks = []
+    end = start + size
+    pos = start
+    while pos < end:
+        length = min(end - pos, BATCH_PAGE_SIZE)
+        chunk_size = next(c for c in BATCH_SIZE_CLASSES if c >= length)
+        page_low = pos & ~(BATCH_PAGE_SIZE - 1)
+        page_high = (pos + length + BATCH_PAGE_SIZE - 1) & ~(BATCH_PAGE_SIZE - 1)
+        chunks.append((max(page_low, min(pos, page_high - chunk_size)), chunk_size))
+        pos += length
+    return chunks
+
+
+def plan_batch_reads(ranges: List[Tuple[int, int]], max_frame_size: int = CESocketClient.MAX_FRAME_SIZE,
+                     coalesce: bool = True, binary: bool = False) -> Dict[str, Any]:
+    """
+    为一组内存范围规划尽可能少的MEMORY_BATCH请求
+
+    相邻/重叠范围先合并，再按尺寸等级拆成读取块；同一尺寸等级的块放进同一个
+    MEMORY_BATCH请求，直到估算的响应大小达到帧长度上限
+
+    参数:
+    - ranges: (起始地址, 长度)列表
+    - max_frame_size: 单个响应帧允许的最大数据长度
+    - coalesce: 是否合并相邻范围
+    - binary: 是否请求以BYTECODE帧返回原始字节
+
+    返回:
+    - 读取计划，包含合并后的范围(merged)、每个范围的读取块(chunks)、
+      请求JSON列表(requests)及每个请求对应的块(layout)
+    """
+    merged = coalesce_ranges(ranges) if coalesce else sorted(set(r for r in ranges if r[1] > 0))
+    chunks = [_split_range_chunks(start, size) for start, size in merged]
+
+    by_size: Dict[int, List[int]] = defaultdict(list)
+    for range_chunks in chunks:
+        for chunk_start, chunk_size in range_chunks:
+            by_size[chunk_size].append(chunk_start)
+
+    # 二进制模式下原始字节在BYTECODE帧中按1:1传输
+    bytes_per_byte = 1 if binary else BATCH_JSON_BYTES_PER_BYTE
+    options = {"rawBytes": True, "binaryBytes": True} if binary else {"rawBytes": True}
+
+    requests = []
+    layout = []
+    for chunk_size in sorted(by_size):
+        starts = sorted(set(by_size[chunk_size]))
+        per_request = max(1, max_frame_size // (chunk_size * bytes_per_byte + BATCH_JSON_RESULT_OVERHEAD))
+        for i in range(0, len(starts), per_request):
+            part = starts[i:i + per_request]
+            requests.append(json.dumps({
+                "addresses": [f"0x{addr:X}" for addr in part],
+                "dataType": "ubyte",
+                "options": dict(options, bytesSize=chunk_size)
+            }))
+            layout.append((chunk_size, part))
+
+    return {"merged": merged, "chunks": chunks, "requests": requests, "layout": layout}
+
+
+def _assemble_batch_reads(plan: Dict[str, Any], ranges: List[Tuple[int, int]],
+                          responses: List[Tuple[Optional[int], Optional[bytes], Optional[bytearray]]]) -> List[Optional[bytes]]:
+    """
+    将MEMORY_BATCH响应中的读取块拼回每个请求的范围
+
+    参数:
+    - plan: plan_batch_reads返回的读取计划
+    - ranges: 原始(起始地址, 长度)列表
+    - responses: 与plan["requests"]一一对应的(数据类型, 数据内容, 二进制数据)
+
+    返回:
+    - 与ranges一一对应的字节数据，读取失败的范围为None
+    """
+    blocks: Dict[Tuple[int, int], bytes] = {}
+    for (chunk_size, starts), (response_type, content, payload) in zip(plan["layout"], responses):
+        if response_type is None or content is None:
+            continue
+        try:
+            response = decode_json_response(content, payload)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            logger.warning("批量读取响应解析失败: %s", e)
+            continue
+        for addr, item in zip(starts, response.get("results") or []):
+            data = item.get("bytes")
+            if item.get("success", True) and data and len(data) >= chunk_size:
+                blocks[(addr, chunk_size)] = bytes(data[:chunk_size])
+
+    # 先拼出合并后的完整范围，再从中切出每个原始范围
+    merged_data: List[Optional[bytearray]] = []
+    for (start, size), range_chunks in zip(plan["merged"], plan["chunks"]):
+        buffer = bytearray(size)
+        for chunk_start, chunk_size in range_chunks:
+            block = blocks.get((chunk_start, chunk_size))
+            if block is None:
+                buffer = None
+                break
+            low = max(chunk_start, start)
+            high = min(chunk_start + chunk_size, start + size)
+            buffer[low - start:high - start] = block[low - chunk_start:high - chunk_start]
+        merged_data.append(buffer)
+
+    starts = [start for start, _ in plan["merged"]]
+    results: List[Optional[bytes]] = []
+    for addr, size in ranges:
+        index = bisect.bisect_right(starts, addr) - 1
+        buffer = merged_data[index] if index >= 0 else None
+        if buffer is None or size <= 0:
+            results.append(None if size > 0 else b"")
+            continue
+        offset = addr - starts[index]
+        results.append(bytes(buffer[offset:offset + size]))
+    return results
+
+
+def read_memory_ranges(client: CESocketClient, ranges: List[Tuple[int, int]]) -> Tuple[List[Optional[bytes]], int]:
+    """
+    通过MEMORY_BATCH批量读取多个内存范围的原始字节
+
+    相邻范围合并后读取，所有请求经request_many发出(流水线客户端下同时在途)。
+    合并后整体读取失败的范围会不合并地单独重试一次，避免一个无效地址拖累相邻的有效地址
+
+    参数:
+    - client: CheatEngine客户端
+    - ranges: (起始地址, 长度)列表
+
+    返回:
+    - (与ranges一一对应的字节数据列表(失败为None), 实际发出的请求数)
+    """
+    batch_type = client.PACKET_TYPE["MEMORY_BATCH"]
+    binary = cheatEngine_config["binary_payload"]
+    plan = plan_batch_reads(ranges, client.max_frame_size, binary=binary)
+    responses = client.request_many_binary([(batch_type, data) for data in plan["requests"]])
+    results = _assemble_batch_reads(plan, ranges, responses)
+    request_count = len(plan["requests"])
+
+    failed = [i for i, data in enumerate(results) if data is None]
+    if failed and len(plan["merged"]) < len(ranges):
+        retry_ranges = [ranges[i] for i in failed]
+        retry_plan = plan_batch_reads(retry_ranges, client.max_frame_size, coalesce=False, binary=binary)
+        retry_responses = client.request_many_binary([(batch_type, data) for data in retry_plan["requests"]])
+        for i, data in zip(failed, _assemble_batch_reads(retry_plan, retry_ranges, retry_responses)):
+            results[i] = data
+        request_count += len(retry_plan["requests"])
+
+    return results, request_count
+
+
+async def read_memory_ranges_async(client: "AsyncCESocketClient",
+                                   ranges: List[Tuple[int, int]]) -> Tuple[List[Optional[bytes]], int]:
+    """
+    read_memory_ranges的asyncio版本
+
+    参数:
+    - client: asyncio CheatEngine客户端
+    - ranges: (起始地址, 长度)列表
+
+    返回:
+    - (与ranges一一对应的字节数据列表(失败为None), 实际发出的请求数)
+    """
+    batch_type = client.PACKET_TYPE["MEMORY_BATCH"]
+    binary = cheatEngine_config["binary_payload"]
+    plan = plan_batch_reads(ranges, client.max_frame_size, binary=binary)
+    responses = await client.request_many_binary([(batch_type, data) for data in plan["requests"]])
+    results = _assemble_batch_reads(plan, ranges, responses)
+    request_count = len(plan["requests"])
+
+    failed = [i for i, data in enumerate(results) if data is None]
+    if failed and len(plan["merged"]) < len(ranges):
+        retry_ranges = [ranges[i] for i in failed]
+        retry_plan = plan_batch_reads(retry_ranges, client.max_frame_size, coalesce=False, binary=binary)
+        retry_responses = await client.request_many_binary([(batch_type, data) for data in retry_plan["requests"]])
+        for i, data in zip(failed, _assemble_batch_reads(retry_plan, retry_ranges, retry_responses)):
+            results[i] = data
+        request_count += len(retry_plan["requests"])
+
+    return results, request_count
+
+
+# 写入分组参数: 距主地址不超过WRITE_GROUP_SPAN字节的写入作为multiValues合并进同一个MEMORY_WRITE请求
+WRITE_GROUP_SPAN = 4096
+
+
+def prepare_memory_writes(writes: List[Dict[str, Any]], endian: str = "little",
+                          encoding: str = "utf-8") -> Tuple[List[Optional[bytes]], List[Dict[str, Any]]]:
+    """
+    在本地编码并检查一组写入
+
+    同一次调用中相互重叠的写入在服务端的执行顺序不确定，因此后出现的一项按失败处理
+
+    参数:
+    - writes: 写入列表，每项包含address(整数)、dataType、value，可选previousValue
+    - endian: 字节序
+    - encoding: string类型的字符编码
+
+    返回:
+    - (每项编码后的字节(无效项为None), 每项的结果字典，无效项已填入错误信息)
+    """
+    datas: List[Optional[bytes]] = []
+    results: List[Dict[str, Any]] = []
+    for write in writes:
+        result = {"success": False, "error": None}
+        data = None
+        try:
+            data = encode_value(write["value"], write["dataType"], endian, encoding)
+            if not data:
+                raise ValueError("写入内容为空")
+            if write.get("previousValue") is not None:
+                encode_value(write["previousValue"], write["dataType"], endian, encoding)
+        except ValueError as e:
+            data = None
+            result["error"] = str(e)
+        datas.append(data)
+        results.append(result)
+
+    # 已接受的写入互不重叠，新的一项只需与按地址排序后的前后两项比较
+    starts: List[int] = []
+    owners: List[int] = []
+    for i, write in enumerate(writes):
+        if datas[i] is None:
+            continue
+        start, end = write["address"], write["address"] + len(datas[i])
+        pos = bisect.bisect_right(starts, start)
+        for neighbor in owners[max(pos - 1, 0):pos + 1]:
+            other = writes[neighbor]["address"]
+            if other < end and start < other + len(datas[neighbor]):
+                datas[i] = None
+                results[i]["error"] = f"与第{neighbor + 1}项写入的范围重叠"
+                break
+        else:
+            starts.insert(pos, start)
+            owners.insert(pos, i)
+    return datas, results
+
+
+def _wire_value(value: Any, data: bytes, data_type: str, endian: str) -> Any:
+    """
+    将写入值转为MEMORY_WRITE请求中的JSON值(字符串保持原样，其余类型取编码后重新解码的值)
+    """
+    if data_type.lower() in ("string", "wstring"):
+        return str(value)
+    return decode_value(data, data_type, endian)
+
+
+def plan_memory_writes(writes: List[Dict[str, Any]], datas: List[Optional[bytes]],
+                       endian: str = "little", span: int = WRITE_GROUP_SPAN) -> Tuple[List[List[int]], List[str]]:
+    """
+    为一组写入规划尽可能少的MEMORY_WRITE请求
+
+    写入按地址排序后贪心分组，组内第一项为主地址，其余项以相对偏移放进multiValues；
+    带previousValue的写入单独成为一个conditional请求，条件只约束它自己
+
+    参数:
+    - writes: 写入列表
+    - datas: prepare_memory_writes返回的编码结果，None的项不写入
+    - endian: 字节序
+    - span: 组内最后一个写入的结束位置距主地址的最大字节数
+
+    返回:
+    - (每个请求包含的写入下标列表, 请求JSON列表)
+    """
+    groups: List[List[int]] = []
+    current: Optional[List[int]] = None
+    for i in sorted((i for i, data in enumerate(datas) if data is not None), key=lambda i: writes[i]["address"]):
+        write = writes[i]
+        if write.get("previousValue") is not None:
+            groups.append([i])
+            continue
+        if current is not None and write["address"] + len(datas[i]) - writes[current[0]]["address"] <= span:
+            current.append(i)
+        else:
+            current = [i]
+            groups.append(current)
+
+    requests = []
+    for group in groups:
+        main = writes[group[0]]
+        options: Dict[str, Any] = {"endian": endian}
+        if main.get("previousValue") is not None:
+            previous = encode_value(main["previousValue"], main["dataType"], endian)
+            options["conditional"] = {
+                "previousValue": _wire_value(main["previousValue"], previous, main["dataType"], endian)
+            }
+        if len(group) > 1:
+            options["multiValues"] = {
+                str(writes[i]["address"] - main["address"]): {
+                    "value": _wire_value(writes[i]["value"], datas[i], writes[i]["dataType"], endian),
+                    "dataType": writes[i]["dataType"]
+                }
+                for i in group[1:]
+            }
+        requests.append(json.dumps({
+            "address": f"0x{main['address']:X}",
+            "value": _wire_value(main["value"], datas[group[0]], main["dataType"], endian),
+            "dataType": main["dataType"],
+            "options": options
+        }))
+    return groups, requests
+
+
+def _apply_write_responses(writes: List[Dict[str, Any]], groups: List[List[int]],
+                           responses: List[Tuple[Optional[int], Optional[bytes]]],
+                           results: List[Dict[str, Any]]) -> None:
+    """
+    将MEMORY_WRITE响应拆回每个写入的结果，multiValues的结果来自multiValuesResult
+    """
+    for group, (response_type, content) in zip(groups, responses):
+        main = writes[group[0]]
+        try:
+            if response_type is None or content is None:
+                raise ValueError("未收到服务器响应")
+            response = decode_json_response(content)
+        except (ValueError, UnicodeDecodeError) as e:
+            for i in group:
+                results[i].update(success=False, error=str(e))
+            continue
+
+        error = response.get("error")
+        success = bool(response.get("success"))
+        results[group[0]].update(success=success, error=None if success else (error or "写入失败"))
+        item_results = response.get("multiValuesResult") or {}
+        for i in group[1:]:
+            item = item_results.get(str(writes[i]["address"] - main["address"]))
+            if item is None:
+                results[i].update(success=False, error=error or "服务器未返回该项的写入结果")
+            else:
+                item_success = bool(item.get("success"))
+                results[i].update(success=item_success,
+                                  error=None if item_success else (item.get("error") or "写入失败"))
+
+
+def write_memory_values(client: CESocketClient, writes: List[Dict[str, Any]], datas: List[Optional[bytes]],
+                        results: List[Dict[str, Any]], endian: str = "little") -> int:
+    """
+    通过MEMORY_WRITE写入一组已编码的值，所有请求经request_many发出
+
+    参数:
+    - client: CheatEngine客户端
+    - writes: 写入列表
+    - datas: prepare_memory_writes返回的编码结果
+    - results: prepare_memory_writes返回的结果列表，原地更新
+    - endian: 字节序
+
+    返回:
+    - 实际发出的请求数
+    """
+    groups, requests = plan_memory_writes(writes, datas, endian)
+    write_type = client.PACKET_TYPE["MEMORY_WRITE"]
+    responses = client.request_many([(write_type, data) for data in requests])
+    _apply_write_responses(writes, groups, responses, results)
+    return len(requests)
+
+
+async def write_memory_values_async(client: "AsyncCESocketClient", writes: List[Dict[str, Any]],
+                                    datas: List[Optional[bytes]], results: List[Dict[str, Any]],
+                                    endian: str = "little") -> int:
+    """
+    write_memory_values的asyncio版本
+    """
+    groups, requests = plan_memory_writes(writes, datas, endian)
+    write_type = client.PACKET_TYPE["MEMORY_WRITE"]
+    responses = await client.request_many([(write_type, data) for data in requests])
+    _apply_write_responses(writes, groups, responses, results)
+    return len(requests)
+
+
+class MemoryBackend:
+    """
+    内存访问后端接口
+
+    工具通过get_memory_backend()获取当前会话的后端读取内存，
+    无需关心数据来自CheatEngine还是直接读取本地进程
+    """
+
+    # 后端名称，以及读取结果是否需要在本地解码(不经过CE)
+    name = "base"
+    is_local = False
+
+    @property
+    def string_encoding(self) -> str:
+        """
+        在本地编解码string类型使用的字符编码
+        """
+        return "utf-8"
+
+    def read(self, address: int, size: int) -> Optional[bytes]:
+        """
+        读取一段内存
+
+        参数:
+        - address: 起始地址
+        - size: 长度
+
+        返回:
+        - 读取到的字节，失败时为None
+        """
+        datas, _ = self.read_many([(address, size)])
+        return datas[0]
+
+    def read_many(self, ranges: List[Tuple[int, int]]) -> Tuple[List[Optional[bytes]], int]:
+        """
+        读取多段内存
+
+        参数:
+        - ranges: (起始地址, 长度)列表
+
+        返回:
+        - (与ranges一一对应的字节数据列表(失败为None), 实际发出的请求数)
+        """
+        raise NotImplementedError
+
+    async def read_many_async(self, ranges: List[Tuple[int, int]]) -> Tuple[List[Optional[bytes]], int]:
+        """
+        read_many的asyncio版本，默认直接调用read_many
+        """
+        return self.read_many(ranges)
+
+    def write_many(self, writes: List[Dict[str, Any]],
+                   endian: str = "little") -> Tuple[List[Dict[str, Any]], int]:
+        """
+        写入多个值，写入后使涉及范围的页缓存和反汇编缓存失效
+
+        参数:
+        - writes: 写入列表，每项包含address(整数)、dataType、value，
+                  可选previousValue(当前值等于它时才写入)
+        - endian: 字节序
+
+        返回:
+        - (与writes一一对应的{"success", "error"}列表, 实际发出的请求数)
+        """
+        datas, results = prepare_memory_writes(writes, endian, self.string_encoding)
+        try:
+            request_count = self._write_prepared(writes, datas, results, endian)
+        finally:
+            _invalidate_written(writes, datas)
+        return results, request_count
+
+    async def write_many_async(self, writes: List[Dict[str, Any]],
+                               endian: str = "little") -> Tuple[List[Dict[str, Any]], int]:
+        """
+        write_many的asyncio版本
+        """
+        datas, results = prepare_memory_writes(writes, endian, self.string_encoding)
+        try:
+            request_count = await self._write_prepared_async(writes, datas, results, endian)
+        finally:
+            _invalidate_written(writes, datas)
+        return results, request_count
+
+    def _write_prepared(self, writes: List[Dict[str, Any]], datas: List[Optional[bytes]],
+                        results: List[Dict[str, Any]], endian: str) -> int:
+        """
+        写入prepare_memory_writes编码后的值，原地更新results，返回请求数
+        """
+        raise NotImplementedError
+
+    async def _write_prepared_async(self, writes: List[Dict[str, Any]], datas: List[Optional[bytes]],
+                                    results: List[Dict[str, Any]], endian: str) -> int:
+        return self._write_prepared(writes, datas, results, endian)
+
+    def regions(self) -> List[Dict[str, Any]]:
+        """
+        枚举目标进程的内存区域
+
+        返回:
+        - 区域列表，每项包含start、end、perms、name、path
+        """
+        raise NotImplementedError
+
+    def module_symbols(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        获取模块的区段和导出符号
+
+        参数:
+        - name: 模块名
+
+        返回:
+        - 与ENUM_MODULES的detailed结果格式相同的模块信息，后端不提供符号时为None
+        """
+        return None
+
+    def describe(self) -> Dict[str, Any]:
+        """
+        返回后端的描述信息
+        """
+        return {"backend": self.name, "local": self.is_local}
+
+    def close(self) -> None:
+        """
+        释放后端占用的资源
+        """
+
+
+class CEBackend(MemoryBackend):
+    """
+    通过CheatEngine插件读取内存的后端(默认)
+    """
+
+    name = "ce"
+
+    @property
+    def string_encoding(self) -> str:
+        # CE按其所在系统的ANSI代码页编解码string，本地解码时必须与之一致
+        return cheatEngine_config["ansi_codepage"]
+
+    def read_many(self, ranges: List[Tuple[int, int]]) -> Tuple[List[Optional[bytes]], int]:
+        with ce_client() as client:
+            if not client.connected:
+                raise ConnectionError("未连接到CheatEngine服务器")
+            return read_memory_ranges(client, ranges)
+
+    async def read_many_async(self, ranges: List[Tuple[int, int]]) -> Tuple[List[Optional[bytes]], int]:
+        client = await get_async_ce_client()
+        if not client.connected:
+            raise ConnectionError("未连接到CheatEngine服务器")
+        return await read_memory_ranges_async(client, ranges)
+
+    def _write_prepared(self, writes: List[Dict[str, Any]], datas: List[Optional[bytes]],
+                        results: List[Dict[str, Any]], endian: str) -> int:
+        with ce_client() as client:
+            if not client.connected:
+                raise ConnectionError("未连接到CheatEngine服务器")
+            return write_memory_values(client, writes, datas, results, endian)
+
+    async def _write_prepared_async(self, writes: List[Dict[str, Any]], datas: List[Optional[bytes]],
+                                    results: List[Dict[str, Any]], endian: str) -> int:
+        client = await get_async_ce_client()
+        if not client.connected:
+            raise ConnectionError("未连接到CheatEngine服务器")
+        return await write_memory_values_async(client, writes, datas, results, endian)
+
+    def regions(self) -> List[Dict[str, Any]]:
+        # CE只提供模块级别的信息，区段权限由符号索引按需从detailed结果中获取(见region_perms)
+        with ce_client() as client:
+            response_type, content = client.request(client.PACKET_TYPE["ENUM_MODULES"], "{}")
+        if response_type is None or content is None:
+            raise ConnectionError("未收到服务器响应")
+        response = decode_json_response(content)
+        if not response.get("success"):
+            raise RuntimeError(response.get("error") or "枚举模块失败")
+
+        regions = []
+        for module in response.get("modules") or []:
+            base = module["baseAddress"]
+            start = int(base, 16) if isinstance(base, str) else int(base)
+            regions.append({
+                "start": start,
+                "end": start + int(module.get("size", 0)),
+                "perms": "",
+                "name": module.get("name", ""),
+                "path": module.get("path", "")
+            })
+        return regions
+
+    def module_symbols(self, name: str) -> Optional[Dict[str, Any]]:
+        request = json.dumps({"options": {"nameFilter": name, "detailed": True}})
+        with ce_client() as client:
+            response_type, content = client.request(client.PACKET_TYPE["ENUM_MODULES"], request)
+        if response_type is None or content is None:
+            raise ConnectionError("未收到服务器响应")
+        response = decode_json_response(content)
+        if not response.get("success"):
+            raise RuntimeError(response.get("error") or "枚举模块失败")
+        # nameFilter可能是子串匹配，只取名称完全相同的模块
+        for module in response.get("modules") or []:
+            if module.get("name", "").lower() == name.lower():
+                return module
+        return None
+
+    def describe(self) -> Dict[str, Any]:
+        info = super().describe()
+        info.update(host=cheatEngine_config["host"], port=cheatEngine_config["port"])
+        return info
+
+
+class _IOVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+def _load_process_vm_readv():
+    """
+    加载libc中的process_vm_readv，不可用时返回None
+    """
+    libc_name = ctypes.util.find_library("c")
+    if not libc_name:
+        return None
+    try:
+        func = ctypes.CDLL(libc_name, use_errno=True).process_vm_readv
+    except (OSError, AttributeError):
+        return None
+    func.argtypes = [ctypes.c_int, ctypes.POINTER(_IOVec), ctypes.c_ulong,
+                     ctypes.POINTER(_IOVec), ctypes.c_ulong, ctypes.c_ulong]
+    func.restype = ctypes.c_ssize_t
+    return func
+
+
+class LinuxProcessBackend(MemoryBackend):
+    """
+    直接读取本机Linux进程内存的后端
+
+    优先使用process_vm_readv在一次系统调用中读取多段内存，
+    不可用(内核限制或非Linux系统)时退回/proc/<pid>/mem；
+    内存区域来自/proc/<pid>/maps。需要对目标进程有ptrace权限
+    """
+
+    name = "linux"
+    is_local = True
+
+    # 单次process_vm_readv最多的iovec数量(IOV_MAX)
+    MAX_IOV = 1024
+
+    def __init__(self, pid: int):
+        """
+        @param {int} pid - 目标进程ID
+        """
+        self.pid = int(pid)
+        if not os.path.isdir(f"/proc/{self.pid}"):
+            raise ProcessLookupError(f"进程不存在: {self.pid}")
+        self._readv = _load_process_vm_readv()
+        self._mem_fd: Optional[int] = None
+        self._write_fd: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def read_many(self, ranges: List[Tuple[int, int]]) -> Tuple[List[Optional[bytes]], int]:
+        results: List[Optional[bytes]] = [None] * len(ranges)
+        calls = 0
+        for begin in range(0, len(ranges), self.MAX_IOV):
+            part = ranges[begin:begin + self.MAX_IOV]
+            datas, count = self._read_vector(part)
+            results[begin:begin + len(part)] = datas
+            calls += count
+        return results, calls
+
+    async def read_many_async(self, ranges: List[Tuple[int, int]]) -> Tuple[List[Optional[bytes]], int]:
+        """
+        系统调用和/proc/<pid>/mem读取是阻塞的，放到线程池中执行，不阻塞事件循环
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self.read_many, ranges)
+
+    def _read_vector(self, ranges: List[Tuple[int, int]]) -> Tuple[List[Optional[bytes]], int]:
+        """
+        用一次process_vm_readv读取多段内存
+
+        process_vm_readv遇到不可读的远程范围时会提前返回，
+        此时已完整读取的范围直接使用，其余范围逐个重读
+        """
+        if self._readv is None:
+            return [self._read_mem(address, size) for address, size in ranges], len(ranges)
+
+        total = sum(size for _, size in ranges)
+        buffer = ctypes.create_string_buffer(total)
+        local = (_IOVec * 1)(_IOVec(ctypes.addressof(buffer), total))
+        remote = (_IOVec * len(ranges))(*(_IOVec(address, size) for address, size in ranges))
+        done = self._readv(self.pid, local, 1, remote, len(ranges), 0)
+        if done < 0:
+            errno = ctypes.get_errno()
+            if errno in (1, 38):
+                # EPERM/ENOSYS: 当前环境不允许process_vm_readv，之后改用/proc/<pid>/mem
+                logger.warning("process_vm_readv不可用(%s)，改用/proc/%s/mem", os.strerror(errno), self.pid)
+                self._readv = None
+            return [self._read_single(address, size) for address, size in ranges], len(ranges) + 1
+
+        raw = buffer.raw
+        results: List[Optional[bytes]] = []
+        calls = 1
+        offset = 0
+        for address, size in ranges:
+            if offset + size <= done:
+                results.append(raw[offset:offset + size])
+            else:
+                results.append(self._read_single(address, size))
+                calls += 1
+            offset += size
+        return results, calls
+
+    def _read_single(self, address: int, size: int) -> Optional[bytes]:
+        """
+        读取单段内存，部分不可读时视为失败
+        """
+        if self._readv is None:
+            return self._read_mem(address, size)
+        buffer = ctypes.create_string_buffer(size)
+        local = _IOVec(ctypes.addressof(buffer), size)
+        remote = _IOVec(address, size)
+        done = self._readv(self.pid, ctypes.byref(local), 1, ctypes.byref(remote), 1, 0)
+        if done == size:
+            return buffer.raw
+        if done < 0:
+            return self._read_mem(address, size)
+        return None
+
+    def _read_mem(self, address: int, size: int) -> Optional[bytes]:
+        """
+        通过/proc/<pid>/mem读取单段内存
+        """
+        with self._lock:
+            if self._mem_fd is None:
+                self._mem_fd = os.open(f"/proc/{self.pid}/mem", os.O_RDONLY)
+            fd = self._mem_fd
+        try:
+            data = os.pread(fd, size, address)
+        except (OSError, OverflowError):
+            return None
+        return data if len(data) == size else None
+
+    def _write_prepared(self, writes: List[Dict[str, Any]], datas: List[Optional[bytes]],
+                        results: List[Dict[str, Any]], endian: str) -> int:
+        """
+        通过/proc/<pid>/mem写入，与CE一样可以写入只读页(例如代码段)
+
+        previousValue的比较与写入之间没有原子性保证，
+        所有条件写入的当前值先用一次read_many读出
+        """
+        pending = [i for i, data in enumerate(datas) if data is not None]
+        calls = 0
+        conditional = [i for i in pending if writes[i].get("previousValue") is not None]
+        if conditional:
+            encoding = self.string_encoding
+            previous = {i: encode_value(writes[i]["previousValue"], writes[i]["dataType"], endian, encoding)
+                        for i in conditional}
+            currents, calls = self.read_many([(writes[i]["address"], len(previous[i])) for i in conditional])
+            for i, current in zip(conditional, currents):
+                if current is None:
+                    results[i]["error"] = "读取当前值失败"
+                elif current != previous[i]:
+                    current = decode_value(current, writes[i]["dataType"], endian, encoding)
+                    results[i]["error"] = f"当前值不等于previousValue: {current}"
+            pending = [i for i in pending if results[i]["error"] is None]
+
+        with self._lock:
+            if self._write_fd is None:
+                self._write_fd = os.open(f"/proc/{self.pid}/mem", os.O_RDWR)
+            fd = self._write_fd
+        for i in pending:
+            calls += 1
+            try:
+                written = os.pwrite(fd, datas[i], writes[i]["address"])
+            except (OSError, OverflowError) as e:
+                results[i]["error"] = f"写入失败: {e}"
+                continue
+            if written == len(datas[i]):
+                results[i]["success"] = True
+            else:
+                results[i]["error"] = f"只写入了{written}/{len(datas[i])}字节"
+        return calls
+
+    async def _write_prepared_async(self, writes: List[Dict[str, Any]], datas: List[Optional[bytes]],
+                                    results: List[Dict[str, Any]], endian: str) -> int:
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._write_prepared, writes, datas, results, endian)
+
+    def regions(self) -> List[Dict[str, Any]]:
+        regions = []
+        with open(f"/proc/{self.pid}/maps", "r") as f:
+            for line in f:
+                # 地址范围 权限 偏移 设备 inode [路径]
+                fields = line.split(None, 5)
+                if len(fields) < 5:
+                    continue
+                start, end = fields[0].split("-")
+                path = fields[5].strip() if len(fields) > 5 else ""
+                regions.append({
+                    "start": int(start, 16),
+                    "end": int(end, 16),
+                    "perms": fields[1],
+                    "offset": int(fields[2], 16),
+                    "name": os.path.basename(path) if path.startswith("/") else path,
+                    "path": path
+                })
+        return regions
+
+    def describe(self) -> Dict[str, Any]:
+        info = super().describe()
+        info.update(pid=self.pid, method="process_vm_readv" if self._readv is not None else "/proc/pid/mem")
+        return info
+
+    def close(self) -> None:
+        with self._lock:
+            fds = (self._mem_fd, self._write_fd)
+            self._mem_fd = self._write_fd = None
+        for fd in fds:
+            if fd is not None:
+                os.close(fd)
+
+
+# 当前会话使用的内存后端，默认通过CheatEngine读取
+_memory_backend: Optional[MemoryBackend] = None
+_memory_backend_lock = threading.Lock()
+
+
+def get_memory_backend() -> MemoryBackend:
+    """
+    获取当前会话使用的内存后端
+
+    返回:
+    - MemoryBackend实例，未选择时为CEBackend
+    """
+    global _memory_backend
+    with _memory_backend_lock:
+        if _memory_backend is None:
+            _memory_backend = CEBackend()
+        return _memory_backend
+
+
+def set_memory_backend(backend: Optional[MemoryBackend]) -> MemoryBackend:
+    """
+    切换当前会话使用的内存后端，并释放旧后端
+
+    参数:
+    - backend: 新的后端，为None时恢复为CEBackend
+
+    返回:
+    - 切换后的后端
+    """
+    global _memory_backend
+    with _memory_backend_lock:
+        old, _memory_backend = _memory_backend, backend or CEBackend()
+        current = _memory_backend
+    if old is not None and old is not current:
+        old.close()
+        # 缓存的内容属于旧后端的目标进程
+        invalidate_page_cache()
+        invalidate_disassembly_cache()
+        invalidate_pointer_cache()
+    logger.info("内存后端已切换为: %s", current.describe())
+    return current
+
+
+# 区域表缓存的有效期(秒)，过期后下次查询时增量刷新
+REGION_MAP_TTL = 30
+# 完整区域表中找不到地址时，距上次刷新超过该时间(秒)则先刷新再判断，以覆盖新分配的内存
+REGION_MAP_MISS_REFRESH = 1
+
+
+class RegionMap:
+    """
+    目标进程内存区域表
+
+    区域按起始地址排序保存，通过二分查找在O(log n)内定位地址所在区域。
+    complete为True表示区域表覆盖了全部已映射内存(如/proc/<pid>/maps)，
+    此时不在任何区域内的地址可以判定为未映射；CE的ENUM_MODULES只包含模块，
+    不覆盖堆和栈，只能用于模块+偏移的标注和解析
+    """
+
+    def __init__(self, regions: Optional[List[Dict[str, Any]]] = None, complete: bool = False):
+        """
+        @param {list} regions - 区域列表，每项包含start、end、perms、name、path
+        @param {bool} complete - 区域表是否覆盖全部已映射内存
+        """
+        self.complete = complete
+        self.updated_at = 0.0
+        self._lock = threading.Lock()
+        self._starts: List[int] = []
+        self._regions: List[Dict[str, Any]] = []
+        self._module_bases: Dict[str, int] = {}
+        if regions is not None:
+            self.update(regions)
+
+    @staticmethod
+    def _region_key(region: Dict[str, Any]) -> tuple:
+        return region["start"], region["end"], region.get("perms", ""), region.get("path", "")
+
+    def update(self, regions: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        用最新的区域列表增量刷新区域表，未变化的区域保持原对象
+
+        @param {list} regions - 最新的区域列表
+        @return {dict} - 新增和移除的区域数量
+        """
+        with self._lock:
+            old = {self._region_key(region): region for region in self._regions}
+            merged = []
+            added = 0
+            for region in regions:
+                key = self._region_key(region)
+                if key in old:
+                    merged.append(old.pop(key))
+                else:
+                    merged.append(region)
+                    added += 1
+            merged.sort(key=lambda region: region["start"])
+
+            # 同一模块在/proc/<pid>/maps中会拆成多个映射，模块基址取最低的起始地址
+            bases: Dict[str, int] = {}
+            for region in merged:
+                name = region.get("name")
+                if name and name.lower() not in bases:
+                    bases[name.lower()] = region["start"]
+
+            self._regions = merged
+            self._starts = [region["start"] for region in merged]
+            self._module_bases = bases
+            self.updated_at = time.time()
+        return {"added": added, "removed": len(old)}
+
+    def find(self, address: int) -> Optional[Dict[str, Any]]:
+        """
+        查找地址所在的区域
+
+        @param {int} address - 地址
+        @return {dict} - 区域信息，不在任何区域内时为None
+        """
+        with self._lock:
+            index = bisect.bisect_right(self._starts, address) - 1
+            if index >= 0 and address < self._regions[index]["end"]:
+                return self._regions[index]
+        return None
+
+    def contains(self, address: int, size: int = 1) -> bool:
+        """
+        判断一段地址是否完全位于已映射的区域内(允许跨越首尾相接的区域)
+
+        @param {int} address - 起始地址
+        @param {int} size - 长度
+        @return {bool} - 是否已映射
+        """
+        end = address + max(size, 1)
+        with self._lock:
+            index = bisect.bisect_right(self._starts, address) - 1
+            while 0 <= index < len(self._regions):
+                region = self._regions[index]
+                if region["start"] > address or address >= region["end"]:
+                    return False
+                if end <= region["end"]:
+                    return True
+                address = region["end"]
+                index += 1
+        return False
+
+    def module_offset(self, address: int) -> Optional[str]:
+        """
+        将地址表示为"模块名+偏移"
+
+        @param {int} address - 地址
+        @return {str} - 如"game.exe+1A2B"，不属于任何模块时为None
+        """
+        region = self.find(address)
+        if region is None or not region.get("name") or region["name"].startswith("["):
+            return None
+        base = self._module_bases.get(region["name"].lower(), region["start"])
+        return f"{region['name']}+{address - base:X}"
+
+    def resolve(self, module: str, offset: int = 0) -> Optional[int]:
+        """
+        将模块名+偏移解析为地址
+
+        @param {str} module - 模块名(不区分大小写)
+        @param {int} offset - 偏移
+        @return {int} - 地址，模块不存在时为None
+        """
+        base = self._module_bases.get(module.lower())
+        return None if base is None else base + offset
+
+    def module_regions(self) -> List[Tuple[int, int, str, int]]:
+        """
+        列出属于模块的区域，用于判断静态地址
+
+        @return {list} - (起始地址, 结束地址, 模块名, 模块基址)列表，按起始地址排序
+        """
+        with self._lock:
+            return [
+                (region["start"], region["end"], region["name"], self._module_bases[region["name"].lower()])
+                for region in self._regions
+                if region.get("name") and not region["name"].startswith("[")
+            ]
+
+    def __len__(self) -> int:
+        return len(self._regions)
+
+
+# 当前后端的区域表缓存
+_region_map: Optional[RegionMap] = None
+_region_map_backend: Optional[MemoryBackend] = None
+_region_map_lock = threading.Lock()
+
+
+def get_region_map(max_age: float = REGION_MAP_TTL) -> RegionMap:
+    """
+    获取当前内存后端的区域表，缓存超过max_age秒时增量刷新
+
+    刷新失败(例如CE未连接)时返回空表，不影响调用方继续读取
+
+    参数:
+    - max_age: 允许的缓存时间(秒)
+
+    返回:
+    - RegionMap实例
+    """
+    global _region_map, _region_map_backend
+    backend = get_memory_backend()
+    with _region_map_lock:
+        region_map = _region_map
+        if region_map is None or _region_map_backend is not backend:
+            region_map = RegionMap(complete=backend.is_local)
+            _region_map, _region_map_backend = region_map, backend
+        if time.time() - region_map.updated_at <= max_age:
+            return region_map
+
+        try:
+            changes = region_map.update(backend.regions())
+            logger.info("内存区域表已刷新: %s个区域, 新增%s, 移除%s", len(region_map), changes['added'], changes['removed'])
+        except Exception as e:
+            # 记下刷新时间，避免每次读取都重试
+            logger.warning("获取内存区域失败: %s", e)
+            region_map.updated_at = time.time()
+    return region_map
+
+
+async def get_region_map_async(max_age: float = REGION_MAP_TTL) -> RegionMap:
+    """
+    get_region_map的asyncio版本，需要刷新时在线程池中执行，不阻塞事件循环
+    """
+    region_map = _region_map
+    if (region_map is not None and _region_map_backend is get_memory_backend()
+            and time.time() - region_map.updated_at <= max_age):
+        return region_map
+    return await asyncio.get_running_loop().run_in_executor(None, get_region_map, max_age)
+
+
+def parse_address(address: Union[str, int], region_map: Optional[RegionMap] = None) -> int:
+    """
+    解析工具参数和CE响应中的地址
+
+    支持整数、十六进制字符串(可带0x或$前缀)、"模块名+偏移"以及"十六进制地址+偏移"，偏移均为十六进制
+
+    参数:
+    - address: 地址
+    - region_map: 解析模块名使用的区域表，为None时按需获取当前后端的区域表
+
+    返回:
+    - 地址整数值
+
+    异常:
+    - ValueError: 地址格式无效或找不到模块
+    """
+    if not isinstance(address, str):
+        return int(address)
+    text = address.strip()
+    if text.startswith('$'):
+        text = text[1:]
+    left, sep, right = text.partition('+')
+    left, right = left.strip(), right.strip()
+    try:
+        offset = int(right, 16) if sep else 0
+    except ValueError:
+        raise ValueError(f"无效的地址偏移: {address}")
+    try:
+        return int(left, 16) + offset
+    except ValueError:
+        pass
+    if not left:
+        raise ValueError(f"无效的内存地址格式: {address}")
+
+    region_map = region_map if region_map is not None else get_region_map()
+    resolved = region_map.resolve(left, offset)
+    if resolved is None:
+        raise ValueError(f"找不到模块: {left}")
+    return resolved
+
+
+def parse_json_arg(value: Any) -> Any:
+    """
+    解析以JSON字符串形式传入的列表或字典参数，其余值原样返回(例如结构体名、脚本名)
+    """
+    if isinstance(value, str) and value.strip().startswith(("{", "[")):
+        return json.loads(value)
+    return value
+
+
+def parse_options(options: Optional[Union[Dict, str]]) -> Dict:
+    """
+    解析工具的options参数，可以是JSON字符串，为空时返回空字典
+    """
+    return parse_json_arg(options) or {}
+
+
+def invalidate_region_map() -> None:
+    """
+    丢弃区域表缓存，下次使用时重新获取
+    """
+    global _region_map, _region_map_backend
+    with _region_map_lock:
+        _region_map, _region_map_backend = None, None
+
+
+def check_mapped(address: int, size: int = 1) -> Tuple[bool, RegionMap]:
+    """
+    检查地址是否已映射
+
+    只有完整的区域表才能判定未映射；找不到时如果缓存不是刚刚刷新的，
+    先刷新一次再判断，以免把新分配的内存误判为未映射
+
+    参数:
+    - address: 起始地址
+    - size: 长度
+
+    返回:
+    - (是否可能已映射, 使用的区域表)
+    """
+    region_map = get_region_map()
+    if not region_map.complete or region_map.contains(address, size):
+        return True, region_map
+    region_map = get_region_map(REGION_MAP_MISS_REFRESH)
+    return region_map.contains(address, size), region_map
+
+
+async def check_mapped_async(address: int, size: int = 1) -> Tuple[bool, RegionMap]:
+    """
+    check_mapped的asyncio版本
+    """
+    region_map = await get_region_map_async()
+    if not region_map.complete or region_map.contains(address, size):
+        return True, region_map
+    region_map = await get_region_map_async(REGION_MAP_MISS_REFRESH)
+    return region_map.contains(address, size), region_map
+
+
+class ModuleSymbols:
+    """
+    一个模块的导出符号表
+
+    导出地址以相对模块基址的偏移(RVA)按升序保存，同一个模块加载到不同基址时可以复用，
+    通过二分查找在O(log n)内找到地址之前最近的导出符号
+    """
+
+    def __init__(self, exports: List[Tuple[int, str]], sections: List[Tuple[int, int, str, str]]):
+        """
+        @param {list} exports - (偏移, 符号名)列表
+        @param {list} sections - (起始偏移, 结束偏移, 区段名, 权限)列表，权限如"rx"
+        """
+        exports = sorted(exports)
+        self.offsets = [offset for offset, _ in exports]
+        self.names = [name for _, name in exports]
+        self.sections = sorted(sections)
+        self._section_starts = [section[0] for section in self.sections]
+
+    @classmethod
+    def from_module(cls, module: Dict[str, Any]) -> "ModuleSymbols":
+        """
+        从ENUM_MODULES的detailed结果构建符号表
+        """
+        base = parse_address(module["baseAddress"])
+        exports = [(parse_address(item["address"]) - base, item.get("name") or f"#{item.get('ordinal')}")
+                   for item in module.get("exports") or []]
+        sections = []
+        for item in module.get("sections") or []:
+            start = parse_address(item["address"]) - base
+            sections.append((start, start + int(item.get("size", 0)), item.get("name", ""), item.get("flags", "")))
+        return cls(exports, sections)
+
+    def _section(self, offset: int) -> int:
+        index = bisect.bisect_right(self._section_starts, offset) - 1
+        if index >= 0 and offset < self.sections[index][1]:
+            return index
+        return -1
+
+    def lookup(self, offset: int) -> Optional[str]:
+        """
+        将模块内偏移表示为"导出符号+偏移"
+
+        已知区段时，只使用与该偏移位于同一区段的导出符号
+
+        @param {int} offset - 相对模块基址的偏移
+        @return {str} - 如"CreateFileW+1A"，找不到合适的符号时为None
+        """
+        index = bisect.bisect_right(self.offsets, offset) - 1
+        if index < 0:
+            return None
+        export = self.offsets[index]
+        if self.sections and self._section(offset) != self._section(export):
+            return None
+        delta = offset - export
+        return f"{self.names[index]}+{delta:X}" if delta else self.names[index]
+
+    def perms(self, offset: int) -> Optional[str]:
+        """
+        获取模块内偏移所在区段的权限
+
+        @param {int} offset - 相对模块基址的偏移
+        @return {str} - 如"rx"，不在任何区段内或CE未提供权限时为None
+        """
+        index = self._section(offset)
+        return (self.sections[index][3] or None) if index >= 0 else None
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"exports": list(zip(self.offsets, self.names)), "sections": self.sections}
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "ModuleSymbols":
+        return cls([tuple(item) for item in data["exports"]], [tuple(item) for item in data["sections"]])
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+
+# 符号缓存文件的格式版本(2: 区段带权限)；获取符号失败的模块在SYMBOL_RETRY_INTERVAL秒内不再重试
+SYMBOL_CACHE_VERSION = 2
+SYMBOL_RETRY_INTERVAL = 60.0
+
+
+class SymbolIndex:
+    """
+    地址到"模块!导出符号+偏移"的索引
+
+    模块的符号表在第一次查询到该模块的地址时才获取，并以模块路径+大小为键保存到磁盘，
+    重启后直接读取缓存文件，不需要重新向CE枚举
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        @param {str} cache_dir - 磁盘缓存目录，为None时不持久化
+        """
+        self.cache_dir = cache_dir
+        self._modules: Dict[Tuple[str, int], ModuleSymbols] = {}
+        self._failed: Dict[Tuple[str, int], float] = {}
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.resolved = 0
+        self.fetches = 0
+        self.file_loads = 0
+
+    @staticmethod
+    def _module_key(region: Dict[str, Any]) -> Tuple[str, int]:
+        return (region.get("path") or region["name"]).lower(), region["end"] - region["start"]
+
+    def _cache_path(self, key: Tuple[str, int]) -> str:
+        digest = hashlib.sha1(f"{key[0]}|{key[1]}".encode("utf-8")).hexdigest()[:20]
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _load_file(self, key: Tuple[str, int]) -> Optional[ModuleSymbols]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._cache_path(key), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != SYMBOL_CACHE_VERSION or data.get("path") != key[0] or data.get("size") != key[1]:
+            return None
+        return ModuleSymbols.from_json(data)
+
+    def _save_file(self, key: Tuple[str, int], symbols: ModuleSymbols) -> None:
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._cache_path(key)
+            data = dict(symbols.to_json(), version=SYMBOL_CACHE_VERSION, path=key[0], size=key[1])
+            # 先写临时文件再替换，避免并发读取到写了一半的文件
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            logger.warning("保存符号缓存失败: %s", e)
+
+    def _module_symbols(self, region: Dict[str, Any], backend: MemoryBackend) -> Optional[ModuleSymbols]:
+        """
+        获取区域所属模块的符号表：内存 -> 磁盘缓存 -> 后端
+        """
+        key = self._module_key(region)
+        with self._lock:
+            symbols = self._modules.get(key)
+            if symbols is not None:
+                return symbols
+            if time.time() - self._failed.get(key, 0.0) < SYMBOL_RETRY_INTERVAL:
+                return None
+
+        symbols = self._load_file(key)
+        if symbols is not None:
+            self.file_loads += 1
+        else:
+            try:
+                self.fetches += 1
+                module = backend.module_symbols(region["name"])
+            except Exception as e:
+                logger.warning("获取模块符号失败: %s, %s", region['name'], e)
+                module = None
+            if module is None or "exports" not in module:
+                with self._lock:
+                    self._failed[key] = time.time()
+                return None
+            symbols = ModuleSymbols.from_module(module)
+            self._save_file(key, symbols)
+            logger.info("已建立模块符号索引: %s, %s个导出符号", region['name'], len(symbols))
+
+        with self._lock:
+            self._modules[key] = symbols
+        return symbols
+
+    @staticmethod
+    def _module_region(address: int, region_map: RegionMap) -> Optional[Dict[str, Any]]:
+        region = region_map.find(address)
+        if region is None or not region.get("name") or region["name"].startswith("["):
+            return None
+        return region
+
+    def symbolize(self, address: int, region_map: RegionMap,
+                  backend: Optional[MemoryBackend] = None) -> Optional[str]:
+        """
+        将地址表示为"模块!导出符号+偏移"
+
+        @param {int} address - 地址
+        @param {RegionMap} region_map - 当前后端的区域表
+        @param {MemoryBackend} backend - 获取符号使用的后端，为None时使用当前后端
+        @return {str} - 如"kernel32.dll!CreateFileW+1A"，不在模块内或没有合适的符号时为None
+        """
+        self.lookups += 1
+        region = self._module_region(address, region_map)
+        if region is None:
+            return None
+        symbols = self._module_symbols(region, backend or get_memory_backend())
+        if symbols is None:
+            return None
+        base = region_map.resolve(region["name"])
+        name = symbols.lookup(address - (base if base is not None else region["start"]))
+        if name is None:
+            return None
+        self.resolved += 1
+        return f"{region['name']}!{name}"
+
+    def section_perms(self, address: int, region_map: RegionMap, load: bool = False,
+                      backend: Optional[MemoryBackend] = None) -> Optional[str]:
+        """
+        获取地址所在模块区段的权限
+
+        CE的ENUM_MODULES只给出整个模块的范围，区段权限取自detailed结果中的区段flags
+
+        @param {int} address - 地址
+        @param {RegionMap} region_map - 当前后端的区域表
+        @param {bool} load - 符号表未加载时是否从磁盘缓存或后端获取；为False时不做任何I/O
+        @param {MemoryBackend} backend - 获取符号使用的后端，为None时使用当前后端
+        @return {str} - 如"rx"，不在模块内或区段未知时为None
+        """
+        region = self._module_region(address, region_map)
+        if region is None:
+            return None
+        if load:
+            symbols = self._module_symbols(region, backend or get_memory_backend())
+        else:
+            with self._lock:
+                symbols = self._modules.get(self._module_key(region))
+        if symbols is None:
+            return None
+        base = region_map.resolve(region["name"])
+        return symbols.perms(address - (base if base is not None else region["start"]))
+
+    async def section_perms_async(self, address: int, region_map: RegionMap) -> Optional[str]:
+        """
+        section_perms(load=True)的asyncio版本，需要加载符号表时在线程池中进行
+        """
+        if self.is_loaded(address, region_map):
+            return self.section_perms(address, region_map)
+        return await asyncio.get_running_loop().run_in_executor(
+            None, lambda: self.section_perms(address, region_map, load=True)
+        )
+
+    def is_loaded(self, address: int, region_map: RegionMap) -> bool:
+        """
+        判断查询该地址是否不需要I/O(不在模块内、符号表已加载或最近获取失败)
+        """
+        region = self._module_region(address, region_map)
+        if region is None:
+            return True
+        key = self._module_key(region)
+        with self._lock:
+            return key in self._modules or time.time() - self._failed.get(key, 0.0) < SYMBOL_RETRY_INTERVAL
+
+    async def symbolize_many_async(self, addresses: List[int], region_map: RegionMap) -> Dict[int, Optional[str]]:
+        """
+        批量查询符号，需要加载符号表时在线程池中进行，不阻塞事件循环
+        """
+        def lookup_all():
+            return {address: self.symbolize(address, region_map) for address in addresses}
+
+        if all(self.is_loaded(address, region_map) for address in addresses):
+            return lookup_all()
+        return await asyncio.get_running_loop().run_in_executor(None, lookup_all)
+
+    def clear(self) -> None:
+        """
+        丢弃内存中的符号表和失败记录(磁盘缓存保留)
+        """
+        with self._lock:
+            self._modules.clear()
+            self._failed.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "modules": len(self._modules),
+                "exports": sum(len(symbols) for symbols in self._modules.values()),
+                "lookups": self.lookups,
+                "resolved": self.resolved,
+                "fetches": self.fetches,
+                "fileLoads": self.file_loads
+            }
+
+
+_symbol_index: Optional[SymbolIndex] = None
+_symbol_index_lock = threading.Lock()
+
+
+def get_symbol_index() -> SymbolIndex:
+    """
+    获取进程级共享的符号索引
+    """
+    global _symbol_index
+    with _symbol_index_lock:
+        if _symbol_index is None:
+            _symbol_index = SymbolIndex(cheatEngine_config["symbol_cache_dir"])
+        return _symbol_index
+
+
+def region_perms(region_map: Optional[RegionMap], address: int, load: bool = False) -> str:
+    """
+    获取地址所在区域的权限
+
+    区域表自带权限时(/proc/<pid>/maps)直接使用；CE的区域表只有模块范围，
+    此时改用符号索引中该模块的区段权限
+
+    参数:
+    - region_map: 当前后端的区域表
+    - address: 地址
+    - load: 模块符号表未加载时是否获取(一次ENUM_MODULES detailed，之后走磁盘缓存)
+
+    返回:
+    - 权限字符串，如"r-xp"或"rx"，未知时为空字符串
+    """
+    region = region_map.find(address) if region_map is not None else None
+    if region is None:
+        return ""
+    if region.get("perms"):
+        return region["perms"]
+    return get_symbol_index().section_perms(address, region_map, load) or ""
+
+
+async def region_perms_async(region_map: Optional[RegionMap], address: int) -> str:
+    """
+    region_perms(load=True)的asyncio版本
+    """
+    region = region_map.find(address) if region_map is not None else None
+    if region is None:
+        return ""
+    if region.get("perms"):
+        return region["perms"]
+    return await get_symbol_index().section_perms_async(address, region_map) or ""
+
+
+class PageCache:
+    """
+    按4KB页缓存的内存读取缓存
+
+    整页读取原始字节并缓存，之后落在同一页内的任意类型读取都在本地完成。
+    只读区域(代码)与可写区域(堆、栈、数据)使用不同的有效期，
+    缓存页数超过上限时按LRU淘汰；任何写内存的操作都应调用invalidate
+    """
+
+    PAGE_SIZE = BATCH_PAGE_SIZE
+    # 超过该页数的读取直接透传，不占用缓存
+    MAX_CACHED_READ_PAGES = 4
+    # 未命中时短于该长度的读取按原始范围读取，不为几个字节拉取整页
+    MIN_FILL_SIZE = PAGE_SIZE // 4
+
+    def __init__(self, max_pages: int = 1024, ttl: float = 1.0, code_ttl: float = 300.0):
+        """
+        @param {int} max_pages - 最多缓存的页数
+        @param {float} ttl - 可写区域页的有效期(秒)
+        @param {float} code_ttl - 只读区域页的有效期(秒)
+        """
+        self.max_pages = max_pages
+        self.ttl = ttl
+        self.code_ttl = code_ttl
+        self._lock = threading.Lock()
+        # 页地址 -> (页数据, 过期时间)，按最近使用排序
+        self._pages: "OrderedDict[int, Tuple[bytes, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _page_range(self, address: int, size: int) -> range:
+        first = address - address % self.PAGE_SIZE
+        return range(first, address + max(size, 1), self.PAGE_SIZE)
+
+    def _page_ttl(self, page: int, region_map: Optional["RegionMap"]) -> float:
+        """
+        根据页所在区域的权限选择有效期，权限未知时按可写区域处理
+
+        只使用已加载的区段信息，不在缓存锁内做I/O
+        """
+        perms = region_perms(region_map, page)
+        if perms and "w" not in perms:
+            return self.code_ttl
+        return self.ttl
+
+    def _lookup(self, ranges: List[Tuple[int, int]]) -> Tuple[List[int], List[int]]:
+        """
+        找出需要读取的缺失页
+
+        @return {tuple} - (缺失页地址列表, 不经过缓存直接读取的范围下标列表)
+        """
+        now = time.time()
+        missing: Dict[int, None] = {}
+        direct = []
+        with self._lock:
+            for index, (address, size) in enumerate(ranges):
+                pages = self._page_range(address, size)
+                if len(pages) > self.MAX_CACHED_READ_PAGES:
+                    direct.append(index)
+                    continue
+                stale = [page for page in pages if not self._fresh(page, now)]
+                if not stale:
+                    self.hits += 1
+                    continue
+                self.misses += 1
+                # 短读取不单独拉取整页，同一批中其他读取拉取的页仍可满足它
+                if size >= self.MIN_FILL_SIZE:
+                    missing.update(dict.fromkeys(stale))
+        return list(missing), direct
+
+    def _fresh(self, page: int, now: float) -> bool:
+        """
+        页是否已缓存且未过期，调用方需持有锁
+        """
+        entry = self._pages.get(page)
+        return entry is not None and entry[1] >= now
+
+    def peek(self, address: int, size: int) -> Optional[bytes]:
+        """
+        只从缓存读取，不发出任何请求
+
+        参数:
+        - address: 起始地址
+        - size: 长度
+
+        返回:
+        - 范围内的页全部缓存且未过期时返回数据，否则为None
+        """
+        pages = self._page_range(address, size)
+        if len(pages) > self.MAX_CACHED_READ_PAGES:
+            return None
+        now = time.time()
+        with self._lock:
+            if not all(self._fresh(page, now) for page in pages):
+                self.misses += 1
+                return None
+            self.hits += 1
+        return self._assemble([(address, size)], set())[0]
+
+    def _store(self, pages: List[int], datas: List[Optional[bytes]], region_map: Optional["RegionMap"]) -> None:
+        """
+        保存新读取的页，并按LRU淘汰超出上限的页
+        """
+        now = time.time()
+        with self._lock:
+            for page, data in zip(pages, datas):
+                if data is None:
+                    self._pages.pop(page, None)
+                    continue
+                self._pages[page] = (bytes(data), now + self._page_ttl(page, region_map))
+                self._pages.move_to_end(page)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+                self.evictions += 1
+
+    def _assemble(self, ranges: List[Tuple[int, int]], skip: Set[int]) -> List[Optional[bytes]]:
+        """
+        从缓存页中切出每个范围的数据，缺页或页已过期的范围为None
+        """
+        now = time.time()
+        results: List[Optional[bytes]] = []
+        with self._lock:
+            for index, (address, size) in enumerate(ranges):
+                if index in skip:
+                    results.append(None)
+                    continue
+                parts = []
+                for page in self._page_range(address, size):
+                    entry = self._pages.get(page)
+                    if entry is None or entry[1] < now:
+                        parts = None
+                        break
+                    self._pages.move_to_end(page)
+                    parts.append(entry[0])
+                if parts is None:
+                    results.append(None)
+                    continue
+                offset = address % self.PAGE_SIZE
+                results.append(b"".join(parts)[offset:offset + size])
+        return results
+
+    def read_many(self, ranges: List[Tuple[int, int]],
+                  fetch: Callable[[List[Tuple[int, int]]], Tuple[List[Optional[bytes]], int]],
+                  region_map: Optional["RegionMap"] = None) -> Tuple[List[Optional[bytes]], int]:
+        """
+        通过缓存读取多段内存
+
+        缺失的页合并成一次fetch读取；仍未覆盖的短读取(小于MIN_FILL_SIZE)和
+        整页读取失败的范围(例如跨越了不可读页)再按原始范围直接读取一次，不写入缓存
+
+        参数:
+        - ranges: (起始地址, 长度)列表
+        - fetch: 实际读取内存的函数，参数和返回值与read_memory_ranges相同
+        - region_map: 用于选择页有效期的区域表
+
+        返回:
+        - (与ranges一一对应的字节数据列表(失败为None), 实际发出的请求数)
+        """
+        missing, direct = self._lookup(ranges)
+        request_count = 0
+        if missing:
+            datas, request_count = fetch([(page, self.PAGE_SIZE) for page in missing])
+            self._store(missing, datas, region_map)
+
+        results = self._assemble(ranges, set(direct))
+        retry = [i for i, data in enumerate(results) if data is None]
+        if retry:
+            datas, count = fetch([ranges[i] for i in retry])
+            request_count += count
+            for i, data in zip(retry, datas):
+                results[i] = data
+        return results, request_count
+
+    async def read_many_async(self, ranges: List[Tuple[int, int]],
+                              fetch: Callable[[List[Tuple[int, int]]], Awaitable[Tuple[List[Optional[bytes]], int]]],
+                              region_map: Optional["RegionMap"] = None) -> Tuple[List[Optional[bytes]], int]:
+        """
+        read_many的asyncio版本，fetch为协程函数
+        """
+        missing, direct = self._lookup(ranges)
+        request_count = 0
+        if missing:
+            datas, request_count = await fetch([(page, self.PAGE_SIZE) for page in missing])
+            self._store(missing, datas, region_map)
+
+        results = self._assemble(ranges, set(direct))
+        retry = [i for i, data in enumerate(results) if data is None]
+        if retry:
+            datas, count = await fetch([ranges[i] for i in retry])
+            request_count += count
+            for i, data in zip(retry, datas):
+                results[i] = data
+        return results, request_count
+
+    def invalidate(self, address: Optional[int] = None, size: int = 1) -> int:
+        """
+        使缓存失效
+
+        参数:
+        - address: 起始地址，为None时清空整个缓存
+        - size: 长度
+
+        返回:
+        - 丢弃的页数
+        """
+        with self._lock:
+            self.invalidations += 1
+            if address is None:
+                count = len(self._pages)
+                self._pages.clear()
+                return count
+            count = 0
+            for page in self._page_range(address, size):
+                if self._pages.pop(page, None) is not None:
+                    count += 1
+            return count
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计信息
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "pages": len(self._pages),
+                "maxPages": self.max_pages,
+                "bytes": len(self._pages) * self.PAGE_SIZE,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "ttl": self.ttl,
+                "codeTtl": self.code_ttl
+            }
+
+
+# 进程级共享的页缓存
+_page_cache: Optional[PageCache] = None
+_page_cache_lock = threading.Lock()
+
+
+def get_page_cache() -> Optional[PageCache]:
+    """
+    获取进程级共享的页缓存
+
+    返回:
+    - PageCache实例，page_cache_pages配置为0时返回None(禁用缓存)
+    """
+    global _page_cache
+    with _page_cache_lock:
+        if _page_cache is None and cheatEngine_config["page_cache_pages"] > 0:
+            _page_cache = PageCache(
+                max_pages=cheatEngine_config["page_cache_pages"],
+                ttl=cheatEngine_config["page_cache_ttl"],
+                code_ttl=cheatEngine_config["page_cache_code_ttl"]
+            )
+        return _page_cache
+
+
+def invalidate_page_cache(address: Optional[int] = None, size: int = 1) -> int:
+    """
+    使页缓存失效，写内存的工具在写入后调用
+
+    参数:
+    - address: 起始地址，为None时清空整个缓存
+    - size: 长度
+
+    返回:
+    - 丢弃的页数
+    """
+    cache = _page_cache
+    return cache.invalidate(address, size) if cache is not None else 0
+
+
+class DisassemblyCache:
+    """
+    CE反汇编结果缓存
+
+    按起始地址保存CE返回的指令列表，同时记录覆盖这些指令的代码字节的哈希。
+    命中时用一次原始字节读取校验代码未被修改(只读区域直接信任)，
+    并且可以从缓存列表的任意一条指令开始切出请求的窗口，不必再让CE反汇编
+    """
+
+    # x86指令的最大长度，最后一条指令的字节范围按此估算
+    MAX_INSTRUCTION_SIZE = 15
+
+    def __init__(self, max_listings: int = 256):
+        """
+        @param {int} max_listings - 最多缓存的指令列表数量
+        """
+        self.max_listings = max_listings
+        self._lock = threading.Lock()
+        # 起始地址和选项 -> 缓存项，按最近使用排序
+        self._listings: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        # 指令地址和选项 -> (缓存项, 指令下标)，用于从列表中间开始的请求
+        self._by_address: Dict[tuple, Tuple[Dict[str, Any], int]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    @staticmethod
+    def code_hash(data: bytes) -> str:
+        return hashlib.blake2b(bytes(data), digest_size=16).hexdigest()
+
+    @classmethod
+    def code_range(cls, instructions: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        计算指令列表覆盖的代码字节范围
+
+        @return {tuple} - (起始地址, 长度)
+        """
+        start = parse_address(instructions[0]["address"])
+        end = parse_address(instructions[-1]["address"]) + cls.MAX_INSTRUCTION_SIZE
+        return start, end - start
+
+    def _find(self, address: int, count: int, variant: tuple) -> Optional[Tuple[Dict[str, Any], int]]:
+        with self._lock:
+            found = self._by_address.get((address, variant))
+            if found is None or len(found[0]["instructions"]) - found[1] < count:
+                self.misses += 1
+                return None
+            self._listings.move_to_end(found[0]["key"])
+            return found
+
+    def _check(self, found: Tuple[Dict[str, Any], int], data: Optional[bytes], count: int) -> Optional[List[Dict[str, Any]]]:
+        entry, index = found
+        if not entry["trusted"] and (data is None or self.code_hash(data) != entry["hash"]):
+            # 代码已被修改或无法读取，缓存作废
+            with self._lock:
+                self.stale += 1
+                self.misses += 1
+                self._remove(entry["key"])
+            return None
+        with self._lock:
+            self.hits += 1
+        return self._window(entry["instructions"], index, count)
+
+    @staticmethod
+    def _window(instructions: List[Dict[str, Any]], index: int, count: int) -> List[Dict[str, Any]]:
+        """
+        切出指令窗口，并按窗口重新编号首尾标记和指令序号
+        """
+        window = []
+        for number, instruction in enumerate(instructions[index:index + count], 1):
+            item = dict(instruction)
+            item.pop("isFirstInstruction", None)
+            item.pop("isLastInstruction", None)
+            item["instructionCount"] = number
+            window.append(item)
+        if window:
+            window[0]["isFirstInstruction"] = True
+            window[-1]["isLastInstruction"] = True
+        return window
+
+    def get(self, address: int, count: int, variant: tuple,
+            read: Callable[[int, int], Optional[bytes]]) -> Optional[List[Dict[str, Any]]]:
+        """
+        查找从address开始的count条指令
+
+        参数:
+        - address: 起始地址
+        - count: 指令数量
+        - variant: 影响指令内容的选项(comments、instructionMultiType)
+        - read: 读取代码字节的函数，用于校验缓存
+
+        返回:
+        - 指令列表，未命中时为None
+        """
+        found = self._find(address, count, variant)
+        if found is None:
+            return None
+        entry = found[0]
+        data = None if entry["trusted"] else read(entry["start"], entry["size"])
+        return self._check(found, data, count)
+
+    async def get_async(self, address: int, count: int, variant: tuple,
+                        read: Callable[[int, int], Awaitable[Optional[bytes]]]) -> Optional[List[Dict[str, Any]]]:
+        """
+        get的asyncio版本，read为协程函数
+        """
+        found = self._find(address, count, variant)
+        if found is None:
+            return None
+        entry = found[0]
+        data = None if entry["trusted"] else await read(entry["start"], entry["size"])
+        return self._check(found, data, count)
+
+    def put(self, address: int, instructions: List[Dict[str, Any]], variant: tuple,
+            data: Optional[bytes], trusted: bool = False) -> bool:
+        """
+        保存CE返回的指令列表
+
+        参数:
+        - address: 起始地址
+        - instructions: CE返回的assembly列表
+        - variant: 影响指令内容的选项
+        - data: code_range范围内的代码字节，用于之后的校验
+        - trusted: 是否位于只读区域，命中时不再校验
+
+        返回:
+        - 是否已缓存
+        """
+        if not instructions or (data is None and not trusted):
+            return False
+        # 保存副本，调用方之后修改结果不影响缓存
+        instructions = [dict(instruction) for instruction in instructions]
+        start, size = self.code_range(instructions)
+        key = (address, variant)
+        entry = {
+            "key": key,
+            "instructions": instructions,
+            "start": start,
+            "size": size,
+            "hash": self.code_hash(data) if data is not None else None,
+            "trusted": trusted
+        }
+        with self._lock:
+            self._remove(key)
+            self._listings[key] = entry
+            for index, instruction in enumerate(instructions):
+                addr_key = (parse_address(instruction["address"]), variant)
+                current = self._by_address.get(addr_key)
+                # 同一地址出现在多个列表中时，保留后面剩余指令更多的那个
+                if current is None or len(current[0]["instructions"]) - current[1] < len(instructions) - index:
+                    self._by_address[addr_key] = (entry, index)
+            while len(self._listings) > self.max_listings:
+                self._remove(next(iter(self._listings)))
+        return True
+
+    def _remove(self, key: tuple) -> None:
+        """
+        删除一个缓存项及其指令索引，调用方需持有锁
+        """
+        entry = self._listings.pop(key, None)
+        if entry is None:
+            return
+        variant = key[1]
+        for instruction in entry["instructions"]:
+            addr_key = (parse_address(instruction["address"]), variant)
+            current = self._by_address.get(addr_key)
+            if current is not None and current[0] is entry:
+                del self._by_address[addr_key]
+
+    def invalidate(self, address: Optional[int] = None, size: int = 1) -> int:
+        """
+        使与指定范围重叠的缓存项失效
+
+        参数:
+        - address: 起始地址，为None时清空
+        - size: 长度
+
+        返回:
+        - 丢弃的缓存项数量
+        """
+        with self._lock:
+            if address is None:
+                count = len(self._listings)
+                self._listings.clear()
+                self._by_address.clear()
+                return count
+            end = address + max(size, 1)
+            keys = [key for key, entry in self._listings.items()
+                    if entry["start"] < end and address < entry["start"] + entry["size"]]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计信息
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "listings": len(self._listings),
+                "maxListings": self.max_listings,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "hitRate": round(self.hits / total, 4) if total else 0.0
+            }
+
+
+# 进程级共享的反汇编缓存
+_disassembly_cache: Optional[DisassemblyCache] = None
+_disassembly_cache_lock = threading.Lock()
+
+
+def get_disassembly_cache() -> Optional[DisassemblyCache]:
+    """
+    获取进程级共享的反汇编缓存
+
+    返回:
+    - DisassemblyCache实例，disasm_cache_size配置为0时返回None(禁用缓存)
+    """
+    global _disassembly_cache
+    with _disassembly_cache_lock:
+        if _disassembly_cache is None and cheatEngine_config["disasm_cache_size"] > 0:
+            _disassembly_cache = DisassemblyCache(cheatEngine_config["disasm_cache_size"])
+        return _disassembly_cache
+
+
+def invalidate_disassembly_cache(address: Optional[int] = None, size: int = 1) -> int:
+    """
+    使反汇编缓存失效，修改代码的工具在写入后调用
+
+    参数:
+    - address: 起始地址，为None时清空整个缓存
+    - size: 长度
+
+    返回:
+    - 丢弃的缓存项数量
+    """
+    cache = _disassembly_cache
+    return cache.invalidate(address, size) if cache is not None else 0
+
+
+class PointerCache:
+    """
+    指针链解析中间指针的缓存
+
+    保存 指针所在地址 -> (指针值, 读取时间)，只在maxAge内复用；
+    写入覆盖到指针所在的字节时按范围失效，不必等待过期
+    """
+
+    def __init__(self, max_entries: int = 65536):
+        """
+        @param {int} max_entries - 超过该数量时清空缓存
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[int, Tuple[int, float, int]] = {}
+
+    def get_many(self, addresses: List[int], max_age: float) -> Dict[int, int]:
+        """
+        查询一组地址，返回未过期的 地址 -> 指针值
+        """
+        now = time.time()
+        values = {}
+        with self._lock:
+            for address in addresses:
+                cached = self._entries.get(address)
+                if cached is not None and now - cached[1] <= max_age:
+                    values[address] = cached[0]
+        return values
+
+    def put_many(self, values: Dict[int, int], size: int, read_at: float) -> None:
+        """
+        保存一组读取时间为read_at、长度为size的指针值
+        """
+        with self._lock:
+            if len(self._entries) + len(values) > self.max_entries:
+                self._entries.clear()
+            for address, value in values.items():
+                self._entries[address] = (value, read_at, size)
+
+    def invalidate(self, address: Optional[int] = None, size: int = 1) -> int:
+        """
+        丢弃与[address, address+size)重叠的缓存项，address为None时清空
+
+        @return {int} - 丢弃的缓存项数量
+        """
+        with self._lock:
+            if address is None:
+                count = len(self._entries)
+                self._entries.clear()
+                return count
+            end = address + size
+            stale = [key for key, (_, _, length) in self._entries.items() if key < end and key + length > address]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+
+# 进程级共享的中间指针缓存
+_pointer_cache: Optional[PointerCache] = None
+_pointer_cache_lock = threading.Lock()
+
+
+def get_pointer_cache() -> PointerCache:
+    """
+    获取进程级共享的中间指针缓存
+    """
+    global _pointer_cache
+    with _pointer_cache_lock:
+        if _pointer_cache is None:
+            _pointer_cache = PointerCache()
+        return _pointer_cache
+
+
+def invalidate_pointer_cache(address: Optional[int] = None, size: int = 1) -> int:
+    """
+    使中间指针缓存失效
+
+    参数:
+    - address: 起始地址，为None时清空整个缓存
+    - size: 长度
+
+    返回:
+    - 丢弃的缓存项数量
+    """
+    cache = _pointer_cache
+    return cache.invalidate(address, size) if cache is not None else 0
+
+
+def _invalidate_written(writes: List[Dict[str, Any]], datas: List[Optional[bytes]]) -> None:
+    """
+    使一组写入涉及的范围在页缓存、反汇编缓存和指针缓存中失效，相邻范围先合并以减少遍历
+    """
+    ranges = [(write["address"], len(data)) for write, data in zip(writes, datas) if data is not None]
+    for address, size in coalesce_ranges(ranges, gap=0):
+        invalidate_page_cache(address, size)
+        invalidate_disassembly_cache(address, size)
+        invalidate_pointer_cache(address, size)
+
+
+# 生成快照时每次读取的块大小，读取失败的块不计入快照
+SNAPSHOT_CHUNK_SIZE = 65536
+
+
+class MemorySnapshot:
+    """
+    目标进程内存在某一时刻的副本
+
+    由若干按起始地址排序、互不重叠的连续段组成，扫描类工具在快照上离线计算，
+    不需要在扫描过程中反复向目标进程读取
+    """
+
+    def __init__(self, segments: List[Tuple[int, bytes]], taken_at: Optional[float] = None):
+        """
+        @param {list} segments - (起始地址, 数据)列表
+        @param {float} taken_at - 快照时间
+        """
+        self.segments = sorted(segments, key=lambda segment: segment[0])
+        self.taken_at = taken_at if taken_at is not None else time.time()
+        self._starts = [start for start, _ in self.segments]
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(len(data) for _, data in self.segments)
+
+    def read(self, address: int, size: int) -> Optional[bytes]:
+        """
+        从快照中读取一段数据
+
+        @param {int} address - 起始地址
+        @param {int} size - 长度
+        @return {bytes} - 数据，不完全位于同一段内时为None
+        """
+        index = bisect.bisect_right(self._starts, address) - 1
+        if index < 0:
+            return None
+        start, data = self.segments[index]
+        offset = address - start
+        if offset + size > len(data):
+            return None
+        return bytes(data[offset:offset + size])
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+
+def snapshot_regions(backend: MemoryBackend, writable_only: bool = True) -> List[Tuple[int, int]]:
+    """
+    选择需要放入快照的内存区域
+
+    参数:
+    - backend: 内存后端
+    - writable_only: 是否只包含可写区域(权限未知的区域总是包含)
+
+    返回:
+    - (起始地址, 长度)列表
+    """
+    regions = []
+    for region in backend.regions():
+        perms = region.get("perms", "")
+        if perms and ("r" not in perms or (writable_only and "w" not in perms)):
+            continue
+        # 内核提供的特殊映射不能读取
+        if region.get("path") in ("[vvar]", "[vsyscall]"):
+            continue
+        regions.append((region["start"], region["end"] - region["start"]))
+    return regions
+
+
+def take_memory_snapshot(backend: Optional[MemoryBackend] = None,
+                         regions: Optional[List[Tuple[int, int]]] = None,
+                         writable_only: bool = True,
+                         max_bytes: Optional[int] = None) -> MemorySnapshot:
+    """
+    读取一组内存区域，生成快照
+
+    参数:
+    - backend: 内存后端，默认为当前会话的后端
+    - regions: (起始地址, 长度)列表，默认由snapshot_regions选择
+    - writable_only: 未指定regions时是否只包含可写区域
+    - max_bytes: 快照大小上限，默认使用snapshot_max_bytes配置
+
+    返回:
+    - MemorySnapshot实例
+    """
+    backend = backend or get_memory_backend()
+    if regions is None:
+        regions = snapshot_regions(backend, writable_only)
+    max_bytes = max_bytes if max_bytes is not None else cheatEngine_config["snapshot_max_bytes"]
+
+    chunks = []
+    total = 0
+    for start, size in sorted(regions):
+        if total + size > max_bytes:
+            logger.warning("快照超过大小上限(%s字节)，跳过区域: 0x%X", max_bytes, start)
+            continue
+        total += size
+        for offset in range(0, size, SNAPSHOT_CHUNK_SIZE):
+            chunks.append((start + offset, min(SNAPSHOT_CHUNK_SIZE, size - offset)))
+
+    taken_at = time.time()
+    datas, request_count = backend.read_many(chunks)
+
+    # 相邻的成功块拼接为连续段
+    segments: List[Tuple[int, bytes]] = []
+    current_start, parts, current_end = None, [], None
+    for (start, size), data in zip(chunks, datas):
+        if data is not None and start == current_end:
+            parts.append(data)
+            current_end += size
+            continue
+        if parts:
+            segments.append((current_start, b"".join(parts)))
+        current_start, parts, current_end = (start, [data], start + size) if data is not None else (None, [], None)
+    if parts:
+        segments.append((current_start, b"".join(parts)))
+
+    snapshot = MemorySnapshot(segments, taken_at)
+    logger.info("内存快照完成: %s段, %s字节, %s次请求", len(segments), snapshot.total_bytes, request_count)
+    return snapshot
+
+
+# LUA_EXEC预编译脚本: 服务端没有缓存该脚本时返回的错误代码，以及默认的执行超时(毫秒)
+LUA_SCRIPT_NOT_LOADED = 15
+LUA_DEFAULT_TIMEOUT = 5000
+
+
+class LuaScriptRegistry:
+    """
+    预编译Lua脚本注册表
+
+    脚本注册一次，以内容的SHA-256作为ID；第一次调用时连同源码发送，服务端编译后按ID缓存，
+    之后的调用只发送scriptId和params。客户端记录服务端已持有的ID，
+    服务端重启或淘汰了缓存时返回LUA_SCRIPT_NOT_LOADED，客户端补发源码后重试一次；
+    不支持预编译的旧服务端不会在响应中回传scriptId，此后始终发送源码
+    """
+
+    def __init__(self):
+        self._scripts: Dict[str, Dict[str, Any]] = {}
+        self._names: Dict[str, str] = {}
+        # 服务端已持有的脚本ID；None表示尚不知道服务端是否支持预编译
+        self._loaded: Set[str] = set()
+        self.supported: Optional[bool] = None
+        self._lock = threading.Lock()
+
+    def register(self, source: str, name: Optional[str] = None) -> str:
+        """
+        注册脚本，内容相同的脚本只注册一次
+
+        参数:
+        - source: Lua源码
+        - name: 可选的名称，之后可以用名称代替ID调用
+
+        返回:
+        - 脚本ID
+        """
+        script_id = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        with self._lock:
+            if script_id not in self._scripts:
+                self._scripts[script_id] = {"source": source, "name": name, "calls": 0, "uploads": 0, "bytesSaved": 0}
+            if name:
+                self._scripts[script_id]["name"] = name
+                self._names[name] = script_id
+        return script_id
+
+    def resolve(self, script: str) -> str:
+        """
+        将脚本ID或名称解析为脚本ID
+
+        异常:
+        - KeyError: 脚本未注册
+        """
+        with self._lock:
+            if script in self._scripts:
+                return script
+            if script in self._names:
+                return self._names[script]
+        raise KeyError(f"未注册的Lua脚本: {script}")
+
+    def build_request(self, script_id: str, params: Optional[Dict[str, Any]] = None,
+                      timeout: int = LUA_DEFAULT_TIMEOUT, upload: bool = False) -> Tuple[str, bool]:
+        """
+        生成LUA_EXEC请求
+
+        参数:
+        - script_id: 脚本ID
+        - params: 传给脚本的参数
+        - timeout: 执行超时(毫秒)
+        - upload: 是否强制附带源码
+
+        返回:
+        - (请求JSON, 是否附带了源码)
+        """
+        with self._lock:
+            entry = self._scripts[script_id]
+            upload = upload or self.supported is False or script_id not in self._loaded
+            entry["calls"] += 1
+            if upload:
+                entry["uploads"] += 1
+            else:
+                entry["bytesSaved"] += len(entry["source"])
+            request = {"scriptId": script_id, "timeout": timeout}
+            if upload:
+                request["script"] = entry["source"]
+        if params:
+            request["params"] = params
+        return json.dumps(request), upload
+
+    def needs_upload(self, response: Dict[str, Any], uploaded: bool, script_id: str) -> bool:
+        """
+        根据响应更新服务端缓存状态
+
+        返回:
+        - 是否需要附带源码重发(服务端没有缓存该脚本)
+        """
+        error = response.get("error")
+        with self._lock:
+            if not uploaded:
+                if isinstance(error, dict) and error.get("code") == LUA_SCRIPT_NOT_LOADED:
+                    # 重发会再次计数，撤销这次调用的统计
+                    entry = self._scripts[script_id]
+                    entry["calls"] -= 1
+                    entry["bytesSaved"] -= len(entry["source"])
+                    self._loaded.discard(script_id)
+                    return True
+                return False
+            if response.get("scriptId") == script_id:
+                self.supported = True
+                self._loaded.add(script_id)
+            elif self.supported is None and response.get("success"):
+                # 执行成功却没有回传scriptId，服务端不支持预编译
+                self.supported = False
+                logger.info("服务端不支持Lua脚本预编译，之后始终发送源码")
+        return False
+
+    def forget_loaded(self) -> None:
+        """
+        清除服务端缓存状态，切换服务端后调用
+        """
+        with self._lock:
+            self._loaded.clear()
+            self.supported = None
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        获取每个已注册脚本的调用统计
+        """
+        with self._lock:
+            return [
+                {
+                    "scriptId": script_id,
+                    "name": entry["name"],
+                    "size": len(entry["source"]),
+                    "loaded": script_id in self._loaded,
+                    "calls": entry["calls"],
+                    "uploads": entry["uploads"],
+                    "bytesSaved": entry["bytesSaved"]
+                }
+                for script_id, entry in self._scripts.items()
+            ]
+
+
+_lua_registry = LuaScriptRegistry()
+
+
+def get_lua_registry() -> LuaScriptRegistry:
+    """
+    获取进程级共享的Lua脚本注册表
+    """
+    return _lua_registry
+
+
+def _decode_lua_response(response_type: Optional[int], content: Optional[bytes]) -> Dict[str, Any]:
+    if response_type is None or content is None:
+        raise ConnectionError("未收到服务器响应")
+    return decode_json_response(content)
+
+
+def call_lua_script(client: CESocketClient, script_id: str, params: Optional[Dict[str, Any]] = None,
+                    timeout: int = LUA_DEFAULT_TIMEOUT) -> Tuple[Dict[str, Any], int, bool]:
+    """
+    通过脚本ID调用已注册的Lua脚本
+
+    参数:
+    - client: CheatEngine客户端
+    - script_id: 脚本ID
+    - params: 传给脚本的参数
+    - timeout: 执行超时(毫秒)
+
+    返回:
+    - (LUA_EXEC响应, 实际发出的请求数, 是否上传了源码)
+    """
+    registry = _lua_registry
+    lua_type = client.PACKET_TYPE["LUA_EXEC"]
+    request, uploaded = registry.build_request(script_id, params, timeout)
+    response = _decode_lua_response(*client.request(lua_type, request))
+    if not registry.needs_upload(response, uploaded, script_id):
+        return response, 1, uploaded
+    request, uploaded = registry.build_request(script_id, params, timeout, upload=True)
+    response = _decode_lua_response(*client.request(lua_type, request))
+    registry.needs_upload(response, uploaded, script_id)
+    return response, 2, uploaded
+
+
+async def call_lua_script_async(client: "AsyncCESocketClient", script_id: str,
+                                params: Optional[Dict[str, Any]] = None,
+                                timeout: int = LUA_DEFAULT_TIMEOUT) -> Tuple[Dict[str, Any], int, bool]:
+    """
+    call_lua_script的asyncio版本
+    """
+    registry = _lua_registry
+    lua_type = client.PACKET_TYPE["LUA_EXEC"]
+    request, uploaded = registry.build_request(script_id, params, timeout)
+    response = _decode_lua_response(*await client.request(lua_type, request))
+    if not registry.needs_upload(response, uploaded, script_id):
+        return response, 1, uploaded
+    request, uploaded = registry.build_request(script_id, params, timeout, upload=True)
+    response = _decode_lua_response(*await client.request(lua_type, request))
+    registry.needs_upload(response, uploaded, script_id)
+    return response, 2, uploaded
+
+
+def _cache_stats() -> Dict[str, Any]:
+    """
+    汇总各缓存的统计信息，只读取已经创建的缓存，不会因此创建新的缓存
+    """
+    caches: Dict[str, Any] = {}
+    if _page_cache is not None:
+        caches["page"] = _page_cache.stats()
+    if _disassembly_cache is not None:
+        caches["disassembly"] = _disassembly_cache.stats()
+    if _symbol_index is not None:
+        caches["symbols"] = _symbol_index.stats()
+    scripts = _lua_registry.stats()
+    calls = sum(item["calls"] for item in scripts)
+    uploads = sum(item["uploads"] for item in scripts)
+    if calls:
+        # 服务端脚本缓存：不需要上传源码的调用视为命中
+        caches["luaScripts"] = {
+            "hits": calls - uploads,
+            "misses": uploads,
+            "hitRate": round((calls - uploads) / calls, 4),
+            "bytesSaved": sum(item["bytesSaved"] for item in scripts)
+        }
+    return caches
+
+
+def collect_ce_stats() -> Dict[str, Any]:
+    """
+    汇总运行指标、缓存命中率和连接池状态
+
+    返回:
+    - 见CEMetrics.snapshot，另含caches(各缓存统计)和pool(连接池状态，未创建时为None)
+    """
+    stats = _ce_metrics.snapshot()
+    stats["caches"] = _cache_stats()
+    pool = _ce_pool
+    stats["pool"] = pool.stats() if pool is not None else None
+    return stats
+
+
+def format_prometheus_metrics() -> str:
+    """
+    以Prometheus文本格式输出运行指标和缓存命中情况
+    """
+    lines = _ce_metrics.prometheus()
+    caches = [(name, stats) for name, stats in _cache_stats().items() if "hits" in stats]
+    for metric, key, kind, help_text in (("ce_cache_hits_total", "hits", "counter", "Cache hits"),
+                                         ("ce_cache_misses_total", "misses", "counter", "Cache misses"),
+                                         ("ce_cache_hit_ratio", "hitRate", "gauge", "Cache hit ratio")):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        lines.extend(f'{metric}{{cache="{name}"}} {stats[key]}' for name, stats in caches)
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus_metrics(path: str) -> None:
+    """
+    将Prometheus文本格式的指标写入文件，先写临时文件再替换，读取方不会看到写了一半的内容
+
+    参数:
+    - path: 目标文件路径
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(format_prometheus_metrics())
+    os.replace(temp_path, path)
+
+
+_metrics_writer: Optional[threading.Thread] = None
+_metrics_writer_lock = threading.Lock()
+
+
+def _metrics_writer_loop() -> None:
+    while True:
+        path = cheatEngine_config.get("metrics_file")
+        if path:
+            try:
+                write_prometheus_metrics(path)
+            except OSError as e:
+                logger.warning("写出指标文件失败: %s", e)
+        time.sleep(max(1.0, float(cheatEngine_config.get("metrics_interval") or 15)))
+
+
+def start_metrics_writer() -> bool:
+    """
+    配置了metrics_file时启动后台线程，每metrics_interval秒写出一次指标文件
+
+    返回:
+    - 写出线程是否在运行
+    """
+    global _metrics_writer
+    with _metrics_writer_lock:
+        if _metrics_writer is None and cheatEngine_config.get("metrics_file"):
+            _metrics_writer = threading.Thread(target=_metrics_writer_loop, name="ce-metrics-writer", daemon=True)
+            _metrics_writer.start()
+        return _metrics_writer is not None
+
+
+def _tool_succeeded(result: Any) -> bool:
+    return not (isinstance(result, dict) and result.get("success") is False)
+
+
+def _trace_call(trace: logging.Logger, args: tuple, kwargs: Dict[str, Any]) -> None:
+    trace.debug("调用参数: args=%s, kwargs=%s", log_brief(args), log_brief(kwargs))
+
+
+def _trace_result(trace: logging.Logger, started: float, result: Any) -> None:
+    trace.debug("返回(%.3fms): %s", (time.perf_counter() - started) * 1000, log_brief(result))
+
+
+def instrument_tool(name: str, func: Callable) -> Callable:
+    """
+    包装MCP工具函数，记录每次调用的耗时和是否成功
+
+    返回带success字段的字典且success为False，或抛出异常时计为失败。
+    通过set_tool_trace开启该工具的跟踪后，以DEBUG级别记录调用参数和(截断的)返回值。
+    包装后的函数保留原函数的签名，协程函数仍包装为协程函数
+
+    参数:
+    - name: 工具名
+    - func: 工具函数
+
+    返回:
+    - 包装后的函数
+    """
+    trace = get_trace_logger(name)
+
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            tracing = trace.isEnabledFor(logging.DEBUG)
+            if tracing:
+                _trace_call(trace, args, kwargs)
+            ok = False
+            try:
+                result = await func(*args, **kwargs)
+                ok = _tool_succeeded(result)
+                if tracing:
+                    _trace_result(trace, started, result)
+                return result
+            finally:
+                _ce_metrics.record_tool(name, time.perf_counter() - started, ok)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        tracing = trace.isEnabledFor(logging.DEBUG)
+        if tracing:
+            _trace_call(trace, args, kwargs)
+        ok = False
+        try:
+            result = func(*args, **kwargs)
+            ok = _tool_succeeded(result)
+            if tracing:
+                _trace_result(trace, started, result)
+            return result
+        finally:
+            _ce_metrics.record_tool(name, time.perf_counter() - started, ok)
+    return wrapper
+
+
+def update_ce_config(host: Optional[str] = None, 
+                     port: Optional[int] = None, 
+                     timeout: Optional[int] = None, 
+                     retries: Optional[int] = None,
+                     pipeline: Optional[bool] = None,
+                     long_frames: Optional[bool] = None,
+                     binary_payload: Optional[bool] = None) -> None:
+    """
+    更新CheatEngine连接配置
+    
+    参数:
+    - host: 服务器主机名或IP地址
+    - port: 服务器端口
+    - timeout: 连接超时时间(秒)
+    - retries: 重试次数
+    - pipeline: 是否使用流水线模式
+    - long_frames: 是否协商长帧
+    - binary_payload: 是否请求以BYTECODE帧返回原始字节
+    """
+    global cheatEngine_config
+    
+    # 只更新提供的参数
+    if host is not None:
+        cheatEngine_config["host"] = host
+    
+    if port is not None:
+        cheatEngine_config["port"] = port
+    
+    if timeout is not None:
+        cheatEngine_config["timeout"] = timeout
+    
+    if retries is not None:
         cheatEngine_config["retries"] = retries
     
-    logger.info(f"已更新CheatEngine连接配置: {cheatEngine_config}")
+    if pipeline is not None:
+        cheatEngine_config["pipeline"] = pipeline
+    
+    if long_frames is not None:
+        cheatEngine_config["long_frames"] = long_frames
+    
+    if binary_payload is not None:
+        cheatEngine_config["binary_payload"] = binary_payload
+    
+    # 连接池中的连接仍指向旧配置，需要重建
+    reset_ce_pool()
+    # 目标可能已经变化，区域表和缓存需要重新获取
+    invalidate_region_map()
+    invalidate_page_cache()
+    invalidate_disassembly_cache()
+    invalidate_pointer_cache()
+    # 新的服务端没有缓存之前上传的Lua脚本
+    _lua_registry.forget_loaded()
+    
+    logger.info("已更新CheatEngine连接配置: %s", dict(cheatEngine_config))